@@ -0,0 +1,97 @@
+from typing import AsyncIterable, AsyncIterator, Iterable, Iterator, List
+
+from app.audio.wav import build_wav_header, fix_wav_header, parse_wav_header
+
+
+def strip_id3(data: bytes) -> bytes:
+    """
+    Remove as tags ID3v2 (início) e ID3v1 (fim) de um MP3, deixando só os frames
+
+    Args:
+        data: Bytes do arquivo MP3
+
+    Returns:
+        Frames MPEG do arquivo
+    """
+    start = 0
+    if data[:3] == b"ID3" and len(data) >= 10:
+        # Tamanho da tag em inteiro "syncsafe" (7 bits por byte)
+        size = (data[6] << 21) | (data[7] << 14) | (data[8] << 7) | data[9]
+        start = 10 + size
+        if data[5] & 0x10:
+            start += 10  # Rodapé presente
+    end = len(data)
+    if end - start >= 128 and data[end - 128:end - 125] == b"TAG":
+        end -= 128
+    return data[start:end]
+
+
+class _SegmentStreamer:
+    """Converte cada segmento completo nos blocos que ele acrescenta ao stream"""
+
+    def __init__(self, media_type: str):
+        self.media_type = media_type
+        self._header_sent = False
+
+    def feed(self, segment: bytes) -> List[bytes]:
+        if self.media_type == "audio/wav":
+            info = parse_wav_header(segment)
+            if info is None:
+                raise ValueError("Segmento de áudio não é um WAV PCM válido")
+            blocks = []
+            if not self._header_sent:
+                blocks.append(build_wav_header(info.sample_rate, info.channels, info.sample_width))
+                self._header_sent = True
+            blocks.append(segment[info.data_offset:info.data_offset + info.data_size])
+            return blocks
+        if self.media_type == "audio/mpeg":
+            return [strip_id3(segment)]
+        return [segment]
+
+
+def stream_audio_segments(segments: Iterable[bytes], media_type: str) -> Iterator[bytes]:
+    """
+    Converte arquivos de áudio completos (um por frase) em um único stream contínuo
+
+    Para WAV, envia um cabeçalho de tamanho indefinido seguido apenas do PCM de
+    cada segmento; para MP3, concatena os frames sem as tags ID3. Cada segmento
+    é repassado assim que é produzido.
+
+    Args:
+        segments: Arquivos de áudio, na ordem de reprodução
+        media_type: Media type dos segmentos ("audio/wav" ou "audio/mpeg")
+
+    Yields:
+        Blocos do stream de áudio
+    """
+    streamer = _SegmentStreamer(media_type)
+    for segment in segments:
+        yield from streamer.feed(segment)
+
+
+async def stream_audio_segments_async(segments: AsyncIterable[bytes], media_type: str) -> AsyncIterator[bytes]:
+    """Versão assíncrona de stream_audio_segments"""
+    streamer = _SegmentStreamer(media_type)
+    async for segment in segments:
+        for block in streamer.feed(segment):
+            yield block
+
+
+def join_audio_segments(segments: Iterable[bytes], media_type: str) -> bytes:
+    """
+    Junta arquivos de áudio completos (um por frase) em um único arquivo
+
+    Para WAV, o cabeçalho é reescrito com o tamanho total do PCM; para MP3, os
+    frames são concatenados sem as tags ID3 intermediárias.
+
+    Args:
+        segments: Arquivos de áudio, na ordem de reprodução
+        media_type: Media type dos segmentos ("audio/wav" ou "audio/mpeg")
+
+    Returns:
+        Arquivo de áudio resultante
+    """
+    audio = b"".join(stream_audio_segments(segments, media_type))
+    if media_type == "audio/wav":
+        return fix_wav_header(audio)
+    return audio
@@ -0,0 +1,130 @@
+import os
+import shutil
+import subprocess
+import threading
+from collections import deque
+from typing import Deque, Optional
+
+from app.utils.log import logger
+
+
+class FFmpegError(Exception):
+    """Falha ao decodificar áudio com o ffmpeg"""
+
+
+class FFmpegDecoder:
+    """
+    Decodificador de áudio comprimido por processos ffmpeg pré-iniciados
+
+    Cada decodificação usa um processo `ffmpeg -i pipe:0 ... pipe:1` que já
+    está rodando e aguardando dados: o áudio entra pelo stdin e o PCM sai pelo
+    stdout, sem arquivos temporários. Um substituto é iniciado em segundo plano
+    logo após cada uso, de modo que o custo de criar o processo fica fora do
+    caminho da requisição.
+    """
+
+    def __init__(self, sample_rate: int = 16000, prewarm: int = 2, timeout: float = 60.0,
+                 binary: Optional[str] = None):
+        """
+        Inicializa o decodificador (os processos são criados no primeiro uso)
+
+        Args:
+            sample_rate: Taxa de amostragem do PCM de saída
+            prewarm: Processos mantidos prontos
+            timeout: Tempo máximo de uma decodificação, em segundos
+            binary: Caminho do executável (padrão: ffmpeg do PATH)
+        """
+        self.sample_rate = sample_rate
+        self.prewarm = max(0, prewarm)
+        self.timeout = timeout
+        self.binary = binary or shutil.which("ffmpeg")
+
+        self._ready: Deque[subprocess.Popen] = deque()
+        self._lock = threading.Lock()
+        self._pid = os.getpid()
+
+    @property
+    def available(self) -> bool:
+        """Indica se o executável do ffmpeg foi encontrado"""
+        return self.binary is not None
+
+    def _command(self):
+        return [
+            self.binary, "-hide_banner", "-loglevel", "error",
+            "-i", "pipe:0",
+            "-f", "s16le", "-acodec", "pcm_s16le", "-ac", "1", "-ar", str(self.sample_rate),
+            "pipe:1",
+        ]
+
+    def _spawn(self) -> subprocess.Popen:
+        return subprocess.Popen(self._command(), stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+                                stderr=subprocess.PIPE)
+
+    def _take(self) -> subprocess.Popen:
+        with self._lock:
+            if self._pid != os.getpid():
+                # Processos herdados por fork pertencem ao processo pai
+                self._ready.clear()
+                self._pid = os.getpid()
+            while self._ready:
+                process = self._ready.popleft()
+                if process.poll() is None:
+                    return process
+        return self._spawn()
+
+    def _refill(self) -> None:
+        try:
+            while True:
+                with self._lock:
+                    if len(self._ready) >= self.prewarm:
+                        return
+                process = self._spawn()
+                with self._lock:
+                    self._ready.append(process)
+        except OSError as e:
+            logger.warning("ffmpeg", "Não foi possível pré-iniciar o ffmpeg", error=str(e))
+
+    def warm_up(self) -> None:
+        """Inicia os processos de reserva"""
+        if self.available:
+            self._refill()
+
+    def decode(self, data: bytes) -> bytes:
+        """
+        Decodifica um arquivo de áudio em PCM 16 bits mono
+
+        Args:
+            data: Arquivo de áudio em qualquer formato suportado pelo ffmpeg
+
+        Returns:
+            Bytes PCM 16 bits little-endian na taxa `sample_rate`
+
+        Raises:
+            FFmpegError: Se o ffmpeg não estiver disponível ou falhar
+        """
+        if not self.available:
+            raise FFmpegError("ffmpeg não encontrado: instale-o para decodificar formatos comprimidos")
+
+        process = self._take()
+        threading.Thread(target=self._refill, daemon=True).start()
+        try:
+            pcm, errors = process.communicate(data, timeout=self.timeout)
+        except subprocess.TimeoutExpired:
+            process.kill()
+            process.communicate()
+            raise FFmpegError(f"Tempo limite de {self.timeout}s excedido ao decodificar o áudio")
+
+        if process.returncode != 0:
+            raise FFmpegError(f"ffmpeg falhou: {errors.decode('utf-8', errors='replace').strip()}")
+        return pcm
+
+    def close(self) -> None:
+        """Encerra os processos de reserva"""
+        with self._lock:
+            ready, self._ready = list(self._ready), deque()
+            owner = self._pid == os.getpid()
+        if not owner:
+            return
+        for process in ready:
+            process.kill()
+            process.wait()
@@ -0,0 +1,393 @@
+import contextvars
+import threading
+import time
+from typing import Dict, List, Optional, Tuple, Union
+
+import numpy as np
+from starlette.concurrency import run_in_threadpool
+
+from app.audio.ffmpeg import FFmpegDecoder, FFmpegError
+from app.audio.pcm import WAVE_FORMAT_IEEE_FLOAT, WAVE_FORMAT_PCM, float32_to_pcm16, pcm_to_float32, pcm16_to_float32
+from app.audio.resample import StreamResampler, resample, resampler_name
+from app.audio.vad import VADResult, create_detector
+from app.audio.wav import WavInfo, build_wav_header, parse_wav_header
+from app.utils.tracing import span
+
+# Formato de entrada padrão dos modelos de STT: float32 mono a 16 kHz
+SAMPLE_RATE = 16000
+
+# Áudio já decodificado ou bytes de um arquivo ainda a decodificar
+AudioInput = Union[bytes, np.ndarray]
+
+
+class AudioDecodeError(ValueError):
+    """O áudio enviado não pôde ser decodificado"""
+
+
+class IngestStats:
+    """
+    Custo da decodificação e da normalização de um áudio
+
+    Uma instância é associada à requisição por start_ingest_stats() e
+    preenchida pelas funções de decodificação, para que a rota possa
+    reportá-la nos headers de debug.
+    """
+
+    def __init__(self):
+        self.source = ""  # "wav", "ffmpeg" ou "array"
+        self.input_rate = 0
+        self.input_channels = 0
+        self.output_rate = 0
+        self.audio_seconds = 0.0
+        self.decode_ms = 0.0
+        self.resample_ms = 0.0
+        self.vad_applied = False
+        self.vad_ms = 0.0
+        self.speech_seconds = 0.0
+        self.skipped_seconds = 0.0
+
+    def to_headers(self) -> Dict[str, str]:
+        """Headers de debug com o caminho e o custo da normalização"""
+        if not self.source:
+            return {}
+        headers = {
+            "X-Debug-Audio-Decode": self.source,
+            "X-Debug-Audio-Decode-Ms": str(round(self.decode_ms, 2)),
+            "X-Debug-Resample": (f"{self.input_rate}Hz/{self.input_channels}ch -> "
+                                 f"{self.output_rate}Hz/1ch ({resampler_name()})"),
+            "X-Debug-Resample-Ms": str(round(self.resample_ms, 2)),
+        }
+        if self.vad_applied:
+            headers.update({
+                "X-Debug-VAD-Ms": str(round(self.vad_ms, 2)),
+                "X-Debug-VAD-Speech-Seconds": str(round(self.speech_seconds, 2)),
+                "X-Debug-VAD-Skipped-Seconds": str(round(self.skipped_seconds, 2)),
+            })
+        return headers
+
+
+_ingest_stats: contextvars.ContextVar[Optional[IngestStats]] = contextvars.ContextVar("ingest_stats", default=None)
+
+
+def start_ingest_stats() -> IngestStats:
+    """Associa um novo IngestStats ao contexto atual (requisição) e o retorna"""
+    stats = IngestStats()
+    _ingest_stats.set(stats)
+    return stats
+
+
+def _record(source: str, input_rate: int, input_channels: int, output_rate: int,
+            decode_ms: float, resample_ms: float, audio_seconds: float) -> None:
+    stats = _ingest_stats.get()
+    if stats is None:
+        return
+    stats.source = source
+    stats.input_rate = input_rate
+    stats.input_channels = input_channels
+    stats.output_rate = output_rate
+    stats.decode_ms = decode_ms
+    stats.resample_ms = resample_ms
+    stats.audio_seconds = audio_seconds
+
+
+_decoder: Optional[FFmpegDecoder] = None
+_decoder_lock = threading.Lock()
+
+
+def get_ffmpeg_decoder() -> FFmpegDecoder:
+    """Retorna o decodificador ffmpeg compartilhado pelo processo"""
+    global _decoder
+    with _decoder_lock:
+        if _decoder is None:
+            from app.config import settings
+            _decoder = FFmpegDecoder(
+                sample_rate=SAMPLE_RATE,
+                prewarm=settings.audio_ffmpeg_prewarm,
+                timeout=settings.audio_ffmpeg_timeout,
+            )
+        return _decoder
+
+
+def _normalize(audio: np.ndarray, source: str, input_rate: int, input_channels: int,
+               target_rate: int, decode_started: float) -> np.ndarray:
+    """Reamostra para a taxa desejada e registra o custo de cada etapa"""
+    resample_started = time.perf_counter()
+    audio = resample(audio, input_rate, target_rate)
+    finished = time.perf_counter()
+    _record(source, input_rate, input_channels, target_rate,
+            (resample_started - decode_started) * 1000, (finished - resample_started) * 1000,
+            len(audio) / target_rate)
+    return audio
+
+
+def decode_wav(data: bytes, target_rate: int = SAMPLE_RATE) -> Optional[np.ndarray]:
+    """
+    Decodifica um WAV PCM sem arquivo temporário nem subprocesso
+
+    As amostras são lidas direto do buffer recebido (memoryview + np.frombuffer),
+    mixadas para mono e reamostradas para `target_rate` com filtro polifásico.
+    Aceita 8, 16, 24 e 32 bits inteiros e 32/64 bits em ponto flutuante.
+
+    Args:
+        data: Bytes do arquivo WAV
+        target_rate: Taxa de amostragem desejada
+
+    Returns:
+        Amostras float32 mono, ou None se os bytes não forem um WAV suportado
+    """
+    started = time.perf_counter()
+    info = parse_wav_header(data)
+    if info is None or info.audio_format not in (WAVE_FORMAT_PCM, WAVE_FORMAT_IEEE_FLOAT):
+        return None
+    pcm = memoryview(data)[info.data_offset:info.data_offset + info.data_size]
+    try:
+        audio = pcm_to_float32(pcm, info.sample_width, info.channels, info.audio_format)
+    except ValueError:
+        return None
+    return _normalize(audio, "wav", info.sample_rate, info.channels, target_rate, started)
+
+
+def _decode_compressed(data: bytes, target_rate: int) -> np.ndarray:
+    started = time.perf_counter()
+    try:
+        audio = pcm16_to_float32(get_ffmpeg_decoder().decode(data))
+    except FFmpegError as e:
+        raise AudioDecodeError(str(e))
+    return _normalize(audio, "ffmpeg", SAMPLE_RATE, 1, target_rate, started)
+
+
+def decode_audio(data: bytes, target_rate: int = SAMPLE_RATE) -> np.ndarray:
+    """
+    Decodifica um arquivo de áudio para float32 mono na taxa desejada (bloqueante)
+
+    WAV PCM é lido diretamente; os demais formatos passam pelo pipe do ffmpeg.
+
+    Args:
+        data: Bytes do arquivo de áudio
+        target_rate: Taxa de amostragem desejada
+
+    Returns:
+        Amostras float32 mono
+
+    Raises:
+        AudioDecodeError: Se o áudio não puder ser decodificado
+    """
+    if not data:
+        raise AudioDecodeError("Áudio vazio")
+    audio = decode_wav(data, target_rate)
+    if audio is not None:
+        return audio
+    return _decode_compressed(data, target_rate)
+
+
+async def decode_audio_async(data: bytes, target_rate: int = SAMPLE_RATE) -> np.ndarray:
+    """
+    Versão assíncrona de decode_audio, inteira fora do event loop
+
+    Em qualquer formato a decodificação é executada no threadpool: a leitura
+    do WAV, a conversão para float32 e a reamostragem de um arquivo longo
+    bloqueariam o loop (e todos os WebSockets e requisições do worker) por
+    segundos.
+    """
+    if not data:
+        raise AudioDecodeError("Áudio vazio")
+    return await run_in_threadpool(decode_audio, data, target_rate)
+
+
+def _gate(audio: np.ndarray, sample_rate: int) -> Optional[VADResult]:
+    """Aplica o VAD (se ativado) e registra o custo nas estatísticas da requisição"""
+    detector = create_detector(sample_rate)
+    if detector is None:
+        return None
+    started = time.perf_counter()
+    result = detector.gate(audio)
+    stats = _ingest_stats.get()
+    if stats is not None:
+        stats.vad_applied = True
+        stats.vad_ms = (time.perf_counter() - started) * 1000
+        stats.speech_seconds = result.speech_seconds
+        stats.skipped_seconds = result.skipped_seconds
+    return result
+
+
+def remove_silence(audio: np.ndarray, sample_rate: int = SAMPLE_RATE) -> np.ndarray:
+    """
+    Descarta os trechos sem fala (VAD), se o VAD estiver ativado
+
+    Args:
+        audio: Amostras float32 mono
+        sample_rate: Taxa de amostragem das amostras
+
+    Returns:
+        Apenas os trechos de fala, concatenados
+    """
+    result = _gate(audio, sample_rate)
+    return audio if result is None else result.audio
+
+
+def detect_speech(audio: np.ndarray, sample_rate: int = SAMPLE_RATE) -> Optional[List[Tuple[int, int]]]:
+    """
+    Localiza os trechos de fala (VAD) sem alterar o áudio
+
+    Args:
+        audio: Amostras float32 mono
+        sample_rate: Taxa de amostragem das amostras
+
+    Returns:
+        Lista de (início, fim) em amostras, ou None se o VAD estiver desativado
+    """
+    result = _gate(audio, sample_rate)
+    return None if result is None else result.regions
+
+
+def decode_speech(data: bytes, split_samples: Optional[int] = None,
+                  target_rate: int = SAMPLE_RATE) -> Tuple[np.ndarray, Optional[List[Tuple[int, int]]]]:
+    """
+    Decodifica o arquivo e aplica o VAD (bloqueante)
+
+    Áudios curtos têm o silêncio descartado. Com `split_samples` amostras ou
+    mais, o áudio é mantido inteiro e o VAD só localiza as regiões de fala,
+    onde ele será cortado em segmentos.
+
+    Args:
+        data: Bytes do arquivo de áudio
+        split_samples: Duração (em amostras) a partir da qual o áudio é segmentado; None nunca segmenta
+        target_rate: Taxa de amostragem desejada
+
+    Returns:
+        Tupla (amostras float32 mono, regiões de fala ou None)
+
+    Raises:
+        AudioDecodeError: Se o áudio não puder ser decodificado
+    """
+    with span("audio.decode", audio_bytes=len(data)):
+        audio = decode_audio(data, target_rate)
+    with span("audio.vad", audio_seconds=round(len(audio) / target_rate, 3)):
+        if split_samples is None or len(audio) < split_samples:
+            return remove_silence(audio, target_rate), None
+        return audio, detect_speech(audio, target_rate)
+
+
+async def decode_speech_async(data: bytes, split_samples: Optional[int] = None,
+                              target_rate: int = SAMPLE_RATE) -> Tuple[np.ndarray, Optional[List[Tuple[int, int]]]]:
+    """
+    Versão assíncrona de decode_speech: decodificação e VAD em uma única chamada no threadpool
+
+    Ambos percorrem o arquivo inteiro; no event loop, um upload longo (ou um
+    arquivo de job em lote) travaria as requisições interativas do worker.
+    """
+    if not data:
+        raise AudioDecodeError("Áudio vazio")
+    return await run_in_threadpool(decode_speech, data, split_samples, target_rate)
+
+
+async def ensure_audio_array(audio: AudioInput, target_rate: int = SAMPLE_RATE) -> np.ndarray:
+    """
+    Garante que o áudio esteja decodificado, em mono e na taxa desejada
+
+    Arquivos recebidos em bytes também passam pelo VAD, que descarta o
+    silêncio antes da inferência. Arrays são considerados já tratados por
+    quem os produziu (ex.: sessões de streaming, que têm VAD próprio).
+
+    Args:
+        audio: Array já decodificado (float32 a 16 kHz) ou bytes de um arquivo de áudio
+        target_rate: Taxa de amostragem desejada
+
+    Returns:
+        Amostras float32 mono na taxa desejada (vazio se não houver fala)
+    """
+    if isinstance(audio, np.ndarray):
+        stats = _ingest_stats.get()
+        if stats is not None and stats.source:
+            # Trecho de um áudio já decodificado nesta requisição (ex.: segmento
+            # de um arquivo longo): mantém as estatísticas da decodificação
+            return resample(audio, SAMPLE_RATE, target_rate)
+        return _normalize(audio, "array", SAMPLE_RATE, 1, target_rate, time.perf_counter())
+    audio, _ = await decode_speech_async(audio, target_rate=target_rate)
+    return audio
+
+
+def to_wav_bytes(audio: np.ndarray, sample_rate: int = SAMPLE_RATE) -> bytes:
+    """
+    Codifica amostras float32 mono como WAV PCM 16 bits em memória
+
+    Args:
+        audio: Amostras float32
+        sample_rate: Taxa de amostragem das amostras
+
+    Returns:
+        Bytes do arquivo WAV
+    """
+    pcm = float32_to_pcm16(audio)
+    return build_wav_header(sample_rate, data_size=len(pcm)) + pcm
+
+
+class PCMStreamNormalizer:
+    """
+    Converte o PCM de um WAV recebido em partes para PCM 16 bits mono na taxa desejada
+
+    Cada parte é convertida assim que chega, sem acumular o arquivo: só o
+    quadro incompleto do final de uma parte e as amostras ainda necessárias
+    ao filtro de reamostragem ficam guardados para a próxima. O resultado é
+    o mesmo de converter o arquivo inteiro de uma vez; flush() emite o
+    restante ao final. Áudio já em 16 bits, mono e na taxa desejada passa
+    sem conversão.
+    """
+
+    def __init__(self, info: WavInfo, target_rate: int = SAMPLE_RATE):
+        """
+        Inicializa o conversor
+
+        Args:
+            info: Formato do WAV (cabeçalho já lido)
+            target_rate: Taxa de amostragem desejada
+
+        Raises:
+            AudioDecodeError: Se o formato das amostras não for suportado
+        """
+        if (info.audio_format not in (WAVE_FORMAT_PCM, WAVE_FORMAT_IEEE_FLOAT)
+                or info.sample_width not in (1, 2, 3, 4, 8) or info.channels < 1 or info.sample_rate <= 0):
+            raise AudioDecodeError("Formato WAV não suportado para ingestão incremental")
+        self.info = info
+        self.target_rate = target_rate
+        self.frame_bytes = info.sample_width * info.channels
+        self._passthrough = (info.audio_format == WAVE_FORMAT_PCM and info.sample_width == 2
+                             and info.channels == 1 and info.sample_rate == target_rate)
+        self._resampler = StreamResampler(info.sample_rate, target_rate)
+        self._remainder = b""
+        self.input_bytes = 0
+
+    @property
+    def seconds(self) -> float:
+        """Duração do áudio recebido até agora"""
+        return self.input_bytes / (self.frame_bytes * self.info.sample_rate)
+
+    def feed(self, data: bytes) -> bytes:
+        """
+        Converte mais uma parte dos dados PCM
+
+        Args:
+            data: Bytes PCM no formato do cabeçalho
+
+        Returns:
+            PCM 16 bits mono na taxa desejada (pode ser vazio)
+        """
+        data = self._remainder + data
+        usable = len(data) - len(data) % self.frame_bytes
+        data, self._remainder = data[:usable], data[usable:]
+        self.input_bytes += usable
+        if not data or self._passthrough:
+            return data
+        audio = pcm_to_float32(data, self.info.sample_width, self.info.channels, self.info.audio_format)
+        return float32_to_pcm16(self._resampler.process(audio))
+
+    def flush(self) -> bytes:
+        """
+        Converte o que restou ao final do áudio
+
+        Returns:
+            PCM 16 bits mono das últimas amostras reamostradas (pode ser vazio)
+        """
+        if self._passthrough:
+            return b""
+        return float32_to_pcm16(self._resampler.flush())
@@ -0,0 +1,96 @@
+from typing import Union
+
+import numpy as np
+
+# Formatos de amostra do WAV (campo audio_format do chunk fmt)
+WAVE_FORMAT_PCM = 1
+WAVE_FORMAT_IEEE_FLOAT = 3
+
+
+def downmix(samples: np.ndarray, channels: int) -> np.ndarray:
+    """
+    Mistura amostras intercaladas de vários canais em mono (média dos canais)
+
+    Args:
+        samples: Amostras intercaladas (quadro a quadro)
+        channels: Número de canais
+
+    Returns:
+        Uma amostra por quadro
+    """
+    if channels <= 1:
+        return samples
+    frames = len(samples) // channels
+    return samples[:frames * channels].reshape(frames, channels).mean(axis=1, dtype=np.float32)
+
+
+def pcm_to_float32(data: Union[bytes, memoryview], sample_width: int = 2, channels: int = 1,
+                   audio_format: int = WAVE_FORMAT_PCM) -> np.ndarray:
+    """
+    Converte PCM de qualquer largura (8, 16, 24 ou 32 bits, inteiro ou float) em float32 mono
+
+    O buffer é lido sem cópia (np.frombuffer); a conversão para float32 e a
+    mixagem dos canais são operações vetorizadas sobre o array inteiro.
+
+    Args:
+        data: Bytes PCM intercalados, ou uma memoryview sobre eles
+        sample_width: Bytes por amostra
+        channels: Número de canais intercalados (são mixados para mono)
+        audio_format: Formato das amostras (PCM inteiro ou ponto flutuante)
+
+    Returns:
+        Array float32 no intervalo [-1, 1] com uma amostra por quadro
+
+    Raises:
+        ValueError: Se a largura de amostra não for suportada
+    """
+    usable = len(data) - len(data) % (sample_width * max(channels, 1))
+    if usable != len(data):
+        # Quadro final incompleto (chunk de streaming cortado no meio de uma amostra)
+        data = memoryview(data)[:usable]
+
+    if audio_format == WAVE_FORMAT_IEEE_FLOAT and sample_width in (4, 8):
+        samples = np.frombuffer(data, dtype="<f4" if sample_width == 4 else "<f8").astype(np.float32)
+    elif sample_width == 1:
+        # PCM de 8 bits é sem sinal, centrado em 128
+        samples = (np.frombuffer(data, dtype=np.uint8).astype(np.float32) - 128.0) / 128.0
+    elif sample_width == 2:
+        samples = np.frombuffer(data, dtype="<i2").astype(np.float32) / 32768.0
+    elif sample_width == 3:
+        raw = np.frombuffer(data, dtype=np.uint8).reshape(-1, 3).astype(np.int32)
+        values = raw[:, 0] | (raw[:, 1] << 8) | (raw[:, 2] << 16)
+        values = np.where(values & 0x800000, values - 0x1000000, values)
+        samples = values.astype(np.float32) / 8388608.0
+    elif sample_width == 4:
+        samples = (np.frombuffer(data, dtype="<i4") / 2147483648.0).astype(np.float32)
+    else:
+        raise ValueError(f"Largura de amostra não suportada: {sample_width * 8} bits")
+
+    return downmix(samples, channels)
+
+
+def pcm16_to_float32(data: Union[bytes, memoryview], channels: int = 1) -> np.ndarray:
+    """
+    Converte PCM 16 bits little-endian em amostras float32 mono no intervalo [-1, 1]
+
+    Args:
+        data: Bytes PCM, ou uma memoryview sobre eles
+        channels: Número de canais intercalados (são mixados para mono)
+
+    Returns:
+        Array float32 com uma amostra por quadro
+    """
+    return pcm_to_float32(data, 2, channels)
+
+
+def float32_to_pcm16(audio: np.ndarray) -> bytes:
+    """
+    Converte amostras float32 em [-1, 1] para PCM 16 bits little-endian
+
+    Args:
+        audio: Amostras float32 mono
+
+    Returns:
+        Bytes PCM
+    """
+    return (np.clip(audio, -1.0, 1.0) * 32767).astype("<i2").tobytes()
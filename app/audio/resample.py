@@ -0,0 +1,118 @@
+from math import ceil, gcd
+
+import numpy as np
+
+try:
+    from scipy.signal import resample_poly as _resample_poly
+except ImportError:
+    _resample_poly = None
+
+
+def resample(audio: np.ndarray, orig_rate: int, target_rate: int) -> np.ndarray:
+    """
+    Converte a taxa de amostragem com um filtro polifásico
+
+    Usa scipy.signal.resample_poly (filtro anti-aliasing FIR aplicado só nas
+    amostras que são mantidas, sem interpolar na taxa intermediária). Sem
+    SciPy, cai para interpolação linear vetorizada, de qualidade inferior.
+
+    Args:
+        audio: Amostras float32 mono
+        orig_rate: Taxa de amostragem de entrada
+        target_rate: Taxa de amostragem desejada
+
+    Returns:
+        Amostras float32 na taxa desejada
+    """
+    if orig_rate == target_rate or len(audio) == 0:
+        return audio
+    divisor = gcd(orig_rate, target_rate)
+    up, down = target_rate // divisor, orig_rate // divisor
+
+    if _resample_poly is not None:
+        return _resample_poly(audio, up, down).astype(np.float32, copy=False)
+
+    length = int(round(len(audio) * target_rate / orig_rate))
+    positions = np.arange(length, dtype=np.float64) * (orig_rate / target_rate)
+    return np.interp(positions, np.arange(len(audio)), audio).astype(np.float32)
+
+
+class StreamResampler:
+    """
+    Reamostra um sinal recebido em partes com o mesmo resultado de resample() no sinal inteiro
+
+    Reamostrar cada parte isoladamente cria transientes do filtro em cada
+    borda e acumula o arredondamento do comprimento. Aqui cada chamada só
+    emite as amostras de saída cujo filtro já tem todas as amostras de
+    entrada; as últimas amostras de entrada ficam guardadas para a próxima
+    chamada, que as processa de novo (sobreposição), e flush() emite o
+    restante no fim do sinal.
+    """
+
+    def __init__(self, orig_rate: int, target_rate: int):
+        """
+        Args:
+            orig_rate: Taxa de amostragem de entrada
+            target_rate: Taxa de amostragem desejada
+        """
+        self.orig_rate = orig_rate
+        self.target_rate = target_rate
+        divisor = gcd(orig_rate, target_rate)
+        self.up, self.down = target_rate // divisor, orig_rate // divisor
+        # Alcance do filtro de resample_poly (meio comprimento de 10 * max(up, down)
+        # na taxa intermediária), em amostras de entrada, com folga
+        self._reach = 10 * max(self.up, self.down) // self.up + 2
+        self._buffer = np.zeros(0, dtype=np.float32)
+        self._buffer_start = 0  # Índice (no sinal inteiro) da primeira amostra guardada
+        self._received = 0
+        self._emitted = 0
+
+    def process(self, audio: np.ndarray) -> np.ndarray:
+        """
+        Recebe mais amostras e retorna as amostras de saída já definitivas
+
+        Args:
+            audio: Amostras float32 mono, na taxa de entrada
+
+        Returns:
+            Amostras float32 na taxa desejada (pode ser vazio)
+        """
+        if self.orig_rate == self.target_rate:
+            return audio
+        self._buffer = np.concatenate([self._buffer, audio.astype(np.float32, copy=False)])
+        self._received += len(audio)
+        # Saída k depende das entradas até k * down / up + alcance
+        ready = self._received - self._reach
+        if ready <= 0:
+            return np.zeros(0, dtype=np.float32)
+        return self._emit((ready - 1) * self.up // self.down + 1)
+
+    def flush(self) -> np.ndarray:
+        """Emite as amostras restantes ao final do sinal"""
+        if self.orig_rate == self.target_rate:
+            return np.zeros(0, dtype=np.float32)
+        return self._emit(ceil(self._received * self.up / self.down))
+
+    def _emit(self, end: int) -> np.ndarray:
+        if end <= self._emitted:
+            return np.zeros(0, dtype=np.float32)
+        # A janela começa em um múltiplo de `down`, para que a saída 0 da
+        # janela coincida com uma saída inteira do sinal completo
+        first = self._emitted * self.down // self.up
+        start = max(0, first - self._reach) // self.down * self.down
+        window = self._buffer[start - self._buffer_start:]
+        offset = start * self.up // self.down
+        result = resample(window, self.orig_rate, self.target_rate)[self._emitted - offset:end - offset]
+        self._emitted = end
+
+        # Descarta a entrada que nenhuma saída futura vai usar
+        keep = max(0, end * self.down // self.up - self._reach) // self.down * self.down
+        if keep > self._buffer_start:
+            self._buffer = self._buffer[keep - self._buffer_start:]
+            self._buffer_start = keep
+        return result
+
+
+def resampler_name() -> str:
+    """Identifica o método de reamostragem disponível"""
+    return "polyphase" if _resample_poly is not None else "linear"
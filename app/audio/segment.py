@@ -0,0 +1,104 @@
+from typing import List, NamedTuple, Optional, Sequence, Tuple
+
+import numpy as np
+
+_EPSILON = 1e-10
+
+
+class AudioSegment(NamedTuple):
+    """Trecho de um áudio longo transcrito de forma independente"""
+    start: int  # Primeira amostra, no áudio original
+    end: int  # Amostra final (exclusiva), no áudio original
+    pieces: Tuple[Tuple[int, int], ...]  # Trechos de fala contidos no segmento
+
+    def extract(self, audio: np.ndarray) -> np.ndarray:
+        """Retorna o áudio do segmento (apenas os trechos de fala, concatenados)"""
+        if len(self.pieces) == 1:
+            start, end = self.pieces[0]
+            return audio[start:end]
+        return np.concatenate([audio[start:end] for start, end in self.pieces])
+
+
+def _frame_energy(audio: np.ndarray, frame_length: int) -> np.ndarray:
+    count = len(audio) // frame_length
+    frames = audio[:count * frame_length].reshape(count, frame_length)
+    return np.mean(frames ** 2, axis=1) + _EPSILON
+
+
+def split_region(audio: np.ndarray, start: int, end: int, max_length: int,
+                 frame_length: int) -> List[Tuple[int, int]]:
+    """
+    Divide um trecho maior que `max_length` nos pontos mais silenciosos
+
+    Cada corte é feito no quadro de menor energia da segunda metade da janela
+    máxima, o que costuma cair em uma pausa entre palavras.
+
+    Args:
+        audio: Amostras float32 mono
+        start: Início do trecho, em amostras
+        end: Fim do trecho, em amostras
+        max_length: Tamanho máximo de cada parte, em amostras
+        frame_length: Amostras por quadro na busca do ponto de corte
+
+    Returns:
+        Lista de (início, fim) cobrindo o trecho inteiro
+    """
+    parts = []
+    position = start
+    while end - position > max_length:
+        search_start = position + max_length // 2
+        energy = _frame_energy(audio[search_start:position + max_length], frame_length)
+        if len(energy):
+            # Em caso de empate, o corte mais tardio mantém o segmento mais longo
+            quietest = len(energy) - 1 - int(np.argmin(energy[::-1]))
+            cut = search_start + quietest * frame_length + frame_length // 2
+        else:
+            cut = position + max_length
+        parts.append((position, cut))
+        position = cut
+    parts.append((position, end))
+    return parts
+
+
+def plan_segments(audio: np.ndarray, sample_rate: int, max_seconds: Optional[float] = None,
+                  regions: Optional[Sequence[Tuple[int, int]]] = None,
+                  frame_ms: int = 30) -> List[AudioSegment]:
+    """
+    Agrupa os trechos de fala em segmentos de até `max_seconds` de fala cada
+
+    Os cortes caem no silêncio entre os trechos detectados pelo VAD; trechos
+    de fala mais longos que o limite são divididos no ponto mais silencioso.
+
+    Args:
+        audio: Amostras float32 mono
+        sample_rate: Taxa de amostragem das amostras
+        max_seconds: Fala máxima por segmento (None = um único segmento)
+        regions: Trechos de fala (início, fim) em amostras; None = o áudio inteiro
+        frame_ms: Duração dos quadros na busca de pontos de corte
+
+    Returns:
+        Segmentos em ordem, vazio se não houver fala
+    """
+    if regions is None:
+        regions = [(0, len(audio))] if len(audio) else []
+    if not regions:
+        return []
+
+    pieces: List[Tuple[int, int]] = list(regions)
+    max_length = int(max_seconds * sample_rate) if max_seconds else 0
+    if max_length:
+        frame_length = max(1, int(sample_rate * frame_ms / 1000))
+        pieces = [part for start, end in pieces
+                  for part in split_region(audio, start, end, max_length, frame_length)]
+
+    segments: List[AudioSegment] = []
+    group: List[Tuple[int, int]] = []
+    length = 0
+    for start, end in pieces:
+        if group and max_length and length + (end - start) > max_length:
+            segments.append(AudioSegment(group[0][0], group[-1][1], tuple(group)))
+            group, length = [], 0
+        group.append((start, end))
+        length += end - start
+    segments.append(AudioSegment(group[0][0], group[-1][1], tuple(group)))
+    return segments
@@ -0,0 +1,318 @@
+import threading
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+
+import numpy as np
+
+from app.audio.pcm import pcm16_to_float32
+
+_EPSILON = 1e-10
+
+
+class VADResult(NamedTuple):
+    """Resultado do corte de silêncio de um áudio completo"""
+    audio: np.ndarray
+    regions: List[Tuple[int, int]]  # (início, fim) em amostras, no áudio original
+    total_seconds: float
+    speech_seconds: float
+
+    @property
+    def skipped_seconds(self) -> float:
+        return self.total_seconds - self.speech_seconds
+
+
+class VADChunk(NamedTuple):
+    """Resultado da detecção em um chunk de streaming"""
+    audio: bytes  # Áudio a repassar ao reconhecedor (vazio se silêncio)
+    speech_ended: bool  # A fala terminou neste chunk (fim do hangover)
+
+
+class _VADTotals:
+    """Segundos analisados e descartados pelo VAD no processo"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.total_seconds = 0.0
+        self.skipped_seconds = 0.0
+
+    def add(self, total: float, skipped: float) -> None:
+        with self._lock:
+            self.total_seconds += total
+            self.skipped_seconds += skipped
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            total, skipped = self.total_seconds, self.skipped_seconds
+        return {
+            "audio_seconds": round(total, 2),
+            "skipped_seconds": round(skipped, 2),
+            "skipped_ratio": round(skipped / total, 4) if total else 0.0,
+        }
+
+
+_totals = _VADTotals()
+
+
+def get_vad_stats() -> Dict[str, Any]:
+    """Retorna quanto áudio o VAD analisou e descartou desde o início do processo"""
+    return _totals.get_stats()
+
+
+def frame_features(audio: np.ndarray, frame_length: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Calcula energia (dBFS) e planicidade espectral de cada quadro, vetorizado
+
+    A planicidade espectral (média geométrica / média aritmética do espectro
+    de potência) é próxima de 1 para ruído e baixa para fala vozeada.
+
+    Args:
+        audio: Amostras float32 mono
+        frame_length: Amostras por quadro
+
+    Returns:
+        Tupla (energia_db, planicidade), um valor por quadro completo
+    """
+    count = len(audio) // frame_length
+    if count == 0:
+        return np.zeros(0, dtype=np.float32), np.zeros(0, dtype=np.float32)
+    frames = audio[:count * frame_length].reshape(count, frame_length)
+    energy_db = 10 * np.log10(np.mean(frames ** 2, axis=1) + _EPSILON)
+
+    power = np.abs(np.fft.rfft(frames * np.hanning(frame_length), axis=1)) ** 2 + _EPSILON
+    flatness = np.exp(np.mean(np.log(power), axis=1)) / np.mean(power, axis=1)
+    return energy_db, flatness
+
+
+def _dilate(mask: np.ndarray, before: int, after: int) -> np.ndarray:
+    """Estende cada trecho verdadeiro `before` quadros para trás e `after` para frente"""
+    if not mask.any() or (before == 0 and after == 0):
+        return mask
+    kernel = np.ones(before + after + 1)
+    # A convolução centrada em `after` desloca a extensão para o lado certo
+    spread = np.convolve(mask.astype(np.float32), kernel)[before:before + len(mask)]
+    return spread > 0
+
+
+class VoiceActivityDetector:
+    """
+    Detector de atividade de voz por energia e planicidade espectral
+
+    Um quadro é fala quando sua energia supera o piso de ruído estimado em
+    `threshold_db` (e um mínimo absoluto) e seu espectro não é plano como o de
+    ruído. Trechos de fala são estendidos por `padding_ms` antes e depois, e
+    por mais `hangover_ms` depois, para não cortar começos e finais de palavras.
+    """
+
+    def __init__(self, sample_rate: int = 16000, frame_ms: int = 30, threshold_db: float = 9.0,
+                 min_energy_db: float = -55.0, flatness_max: float = 0.45, padding_ms: int = 200,
+                 hangover_ms: int = 300):
+        """
+        Inicializa o detector
+
+        Args:
+            sample_rate: Taxa de amostragem do áudio
+            frame_ms: Duração de cada quadro analisado
+            threshold_db: Margem acima do piso de ruído para considerar fala
+            min_energy_db: Energia mínima (dBFS) de um quadro de fala
+            flatness_max: Planicidade espectral máxima de um quadro de fala
+            padding_ms: Áudio mantido antes e depois de cada trecho de fala
+            hangover_ms: Tempo extra mantido após o fim da fala
+        """
+        self.sample_rate = sample_rate
+        self.frame_length = max(1, int(sample_rate * frame_ms / 1000))
+        self.threshold_db = threshold_db
+        self.min_energy_db = min_energy_db
+        self.flatness_max = flatness_max
+        self.padding_frames = int(round(padding_ms / frame_ms))
+        self.hangover_frames = int(round(hangover_ms / frame_ms))
+
+    def _classify(self, energy_db: np.ndarray, flatness: np.ndarray, noise_floor: float,
+                  peak_db: float) -> np.ndarray:
+        # Em áudios quase só de fala o piso estimado é a própria fala: o limiar
+        # nunca fica mais de 20 dB abaixo do pico
+        threshold = max(self.min_energy_db, min(noise_floor + self.threshold_db, peak_db - 20.0))
+        return (energy_db > threshold) & (flatness < self.flatness_max)
+
+    def speech_mask(self, audio: np.ndarray) -> np.ndarray:
+        """
+        Marca os quadros de fala de um áudio completo, já com padding e hangover
+
+        Args:
+            audio: Amostras float32 mono
+
+        Returns:
+            Máscara booleana, um valor por quadro
+        """
+        energy_db, flatness = frame_features(audio, self.frame_length)
+        if len(energy_db) == 0:
+            return np.zeros(0, dtype=bool)
+        speech = self._classify(energy_db, flatness, float(np.percentile(energy_db, 10)),
+                                float(np.percentile(energy_db, 95)))
+        return _dilate(speech, self.padding_frames, self.padding_frames + self.hangover_frames)
+
+    def regions(self, audio: np.ndarray) -> List[Tuple[int, int]]:
+        """
+        Localiza os trechos de fala
+
+        Args:
+            audio: Amostras float32 mono
+
+        Returns:
+            Lista de (início, fim) em amostras
+        """
+        mask = self.speech_mask(audio)
+        if not mask.any():
+            return []
+        edges = np.diff(np.concatenate(([0], mask.astype(np.int8), [0])))
+        starts = np.flatnonzero(edges == 1) * self.frame_length
+        ends = np.flatnonzero(edges == -1) * self.frame_length
+        # O último trecho inclui o quadro incompleto do final do áudio
+        if ends[-1] >= len(mask) * self.frame_length:
+            ends[-1] = len(audio)
+        return list(zip(starts.tolist(), ends.tolist()))
+
+    def gate(self, audio: np.ndarray) -> VADResult:
+        """
+        Remove o silêncio de um áudio completo, mantendo só os trechos de fala
+
+        Args:
+            audio: Amostras float32 mono
+
+        Returns:
+            VADResult com o áudio concatenado dos trechos de fala
+        """
+        regions = self.regions(audio)
+        if regions:
+            speech = np.concatenate([audio[start:end] for start, end in regions])
+        else:
+            speech = audio[:0]
+        result = VADResult(speech, regions, len(audio) / self.sample_rate, len(speech) / self.sample_rate)
+        _totals.add(result.total_seconds, result.skipped_seconds)
+        return result
+
+
+class StreamingVAD:
+    """
+    Detector de voz para streaming (PCM 16 bits mono, chunk a chunk)
+
+    Chunks de silêncio não são repassados ao reconhecedor. Os últimos
+    `padding_ms` de silêncio ficam guardados e são enviados junto com o chunk
+    em que a fala recomeça; após a fala, o áudio continua sendo repassado por
+    `hangover_ms`. O piso de ruído é estimado continuamente.
+    """
+
+    def __init__(self, detector: VoiceActivityDetector, padding_ms: int = 200, hangover_ms: int = 300):
+        """
+        Inicializa o detector de streaming
+
+        Args:
+            detector: Detector com os limiares e a taxa de amostragem
+            padding_ms: Silêncio repassado antes do início da fala
+            hangover_ms: Tempo repassado após o fim da fala
+        """
+        self.detector = detector
+        self._bytes_per_second = detector.sample_rate * 2
+        self._preroll_bytes = int(self._bytes_per_second * padding_ms / 1000) // 2 * 2
+        self._hangover_seconds = hangover_ms / 1000
+
+        self._preroll = b""
+        self._remainder = b""
+        self._noise_floor: Optional[float] = None
+        self._peak_db = detector.min_energy_db
+        self._position = 0.0  # Segundos de áudio recebidos
+        self._last_speech: Optional[float] = None
+        self.speech_seconds = 0.0
+        self.skipped_seconds = 0.0
+
+    @property
+    def in_speech(self) -> bool:
+        """Indica se o detector está dentro de um trecho de fala (ou do seu hangover)"""
+        return self._last_speech is not None
+
+    def process(self, chunk: bytes) -> VADChunk:
+        """
+        Classifica um chunk de áudio
+
+        Args:
+            chunk: PCM 16 bits mono
+
+        Returns:
+            VADChunk com o áudio a repassar e se a fala acabou de terminar
+        """
+        data = self._remainder + chunk
+        usable = len(data) - len(data) % 2
+        self._remainder = data[usable:]
+        data = data[:usable]
+        if not data:
+            return VADChunk(b"", False)
+
+        duration = len(data) / self._bytes_per_second
+        energy_db, flatness = frame_features(pcm16_to_float32(data), self.detector.frame_length)
+        has_speech = False
+        if len(energy_db):
+            chunk_floor = float(energy_db.min())
+            if self._noise_floor is None or chunk_floor < self._noise_floor:
+                self._noise_floor = chunk_floor
+            else:
+                # Sobe devagar, para acompanhar mudanças do ruído de fundo
+                self._noise_floor += 0.05 * (chunk_floor - self._noise_floor)
+            self._peak_db = max(self._peak_db - 0.5, float(energy_db.max()))
+            has_speech = bool(self.detector._classify(energy_db, flatness, self._noise_floor, self._peak_db).any())
+
+        self._position += duration
+        if has_speech:
+            # O pré-roll, contado como descartado, acaba sendo repassado
+            preroll_seconds = len(self._preroll) / self._bytes_per_second
+            forwarded = self._preroll + data
+            self._preroll = b""
+            self._last_speech = self._position
+            self.speech_seconds += duration + preroll_seconds
+            self.skipped_seconds -= preroll_seconds
+            _totals.add(duration, -preroll_seconds)
+            return VADChunk(forwarded, False)
+
+        if self._last_speech is not None and self._position - self._last_speech <= self._hangover_seconds:
+            self.speech_seconds += duration
+            _totals.add(duration, 0.0)
+            return VADChunk(data, False)
+
+        speech_ended = self._last_speech is not None
+        self._last_speech = None
+        self._preroll = (self._preroll + data)[-self._preroll_bytes:] if self._preroll_bytes else b""
+        self.skipped_seconds += duration
+        _totals.add(duration, duration)
+        return VADChunk(b"", speech_ended)
+
+
+def create_detector(sample_rate: int = 16000) -> Optional[VoiceActivityDetector]:
+    """
+    Cria um detector com a configuração da aplicação
+
+    Returns:
+        VoiceActivityDetector, ou None se o VAD estiver desativado
+    """
+    from app.config import settings
+    if not settings.vad_enabled:
+        return None
+    return VoiceActivityDetector(
+        sample_rate=sample_rate,
+        frame_ms=settings.vad_frame_ms,
+        threshold_db=settings.vad_threshold_db,
+        min_energy_db=settings.vad_min_energy_db,
+        flatness_max=settings.vad_flatness_max,
+        padding_ms=settings.vad_padding_ms,
+        hangover_ms=settings.vad_hangover_ms,
+    )
+
+
+def create_stream_vad(sample_rate: int = 16000) -> Optional[StreamingVAD]:
+    """
+    Cria um detector de streaming com a configuração da aplicação
+
+    Returns:
+        StreamingVAD, ou None se o VAD estiver desativado
+    """
+    from app.config import settings
+    detector = create_detector(sample_rate)
+    if detector is None:
+        return None
+    return StreamingVAD(detector, padding_ms=settings.vad_padding_ms, hangover_ms=settings.vad_hangover_ms)
@@ -0,0 +1,113 @@
+import struct
+from typing import NamedTuple, Optional
+
+# Tamanho do cabeçalho WAV canônico (RIFF + fmt PCM + data)
+WAV_HEADER_SIZE = 44
+
+
+class WavInfo(NamedTuple):
+    """Formato e posição dos dados PCM de um arquivo WAV"""
+    sample_rate: int
+    channels: int
+    sample_width: int
+    data_offset: int
+    data_size: int
+    audio_format: int = 1  # 1 = PCM inteiro, 3 = ponto flutuante IEEE
+
+
+def build_wav_header(sample_rate: int, channels: int = 1, sample_width: int = 2,
+                     data_size: Optional[int] = None) -> bytes:
+    """
+    Monta um cabeçalho WAV PCM de 44 bytes
+
+    Args:
+        sample_rate: Taxa de amostragem
+        channels: Número de canais
+        sample_width: Bytes por amostra
+        data_size: Tamanho dos dados PCM em bytes (None = desconhecido, para streaming)
+
+    Returns:
+        Cabeçalho em bytes
+    """
+    if data_size is None:
+        # Tamanho máximo representável: leitores tratam como "até o fim do stream"
+        data_size = 0xFFFFFFFF - 36
+    block_align = channels * sample_width
+    return struct.pack(
+        "<4sI4s4sIHHIIHH4sI",
+        b"RIFF", min(36 + data_size, 0xFFFFFFFF), b"WAVE",
+        b"fmt ", 16, 1, channels, sample_rate, sample_rate * block_align, block_align, sample_width * 8,
+        b"data", data_size
+    )
+
+
+# Tamanhos de chunk de dados que indicam "desconhecido" (WAVs gerados em streaming)
+_UNKNOWN_DATA_SIZES = (0, 0xFFFFFFFF, 0xFFFFFFFF - 36)
+
+
+def parse_wav_header(data: bytes, partial: bool = False) -> Optional[WavInfo]:
+    """
+    Localiza o formato e o chunk de dados de um WAV sem copiar as amostras
+
+    Percorre os chunks RIFF (ignorando LIST, fact etc.). Se o tamanho declarado
+    do chunk de dados for inválido (WAVs gerados em streaming), assume que os
+    dados vão até o fim do buffer.
+
+    Args:
+        data: Bytes do arquivo WAV (ou ao menos do seu início)
+        partial: `data` é só o início do arquivo: mantém o tamanho declarado do
+            chunk de dados (0 se desconhecido) em vez de limitá-lo ao buffer
+
+    Returns:
+        WavInfo, ou None se os bytes não forem um WAV PCM reconhecível
+    """
+    if len(data) < 12 or data[:4] != b"RIFF" or data[8:12] != b"WAVE":
+        return None
+
+    offset = 12
+    fmt = None
+    while offset + 8 <= len(data):
+        chunk_id = data[offset:offset + 4]
+        chunk_size = struct.unpack_from("<I", data, offset + 4)[0]
+        body = offset + 8
+        if chunk_id == b"fmt " and body + 16 <= len(data):
+            audio_format, channels, sample_rate, _, _, bits = struct.unpack_from("<HHIIHH", data, body)
+            if audio_format == 0xFFFE and chunk_size >= 40 and body + 26 <= len(data):
+                # WAVE_FORMAT_EXTENSIBLE: o formato real está no início do subformato
+                audio_format = struct.unpack_from("<H", data, body + 24)[0]
+            fmt = (sample_rate, channels, bits // 8, audio_format)
+        elif chunk_id == b"data":
+            if fmt is None:
+                return None
+            if partial:
+                return WavInfo(fmt[0], fmt[1], fmt[2], body,
+                               0 if chunk_size in _UNKNOWN_DATA_SIZES else chunk_size, fmt[3])
+            available = len(data) - body
+            if chunk_size == 0 or chunk_size > available:
+                chunk_size = available
+            return WavInfo(fmt[0], fmt[1], fmt[2], body, chunk_size, fmt[3])
+        # Chunks têm tamanho par (byte de preenchimento)
+        offset = body + chunk_size + (chunk_size & 1)
+    return None
+
+
+def fix_wav_header(data: bytes) -> bytes:
+    """
+    Corrige os campos de tamanho de um WAV gerado em streaming
+
+    Ferramentas como `espeak --stdout` escrevem o cabeçalho antes de conhecer o
+    tamanho final do áudio. Esta função reescreve RIFF e data com os tamanhos
+    reais, no formato canônico de 44 bytes.
+
+    Args:
+        data: Bytes do arquivo WAV
+
+    Returns:
+        WAV com cabeçalho consistente (ou os bytes originais se não for WAV)
+    """
+    info = parse_wav_header(data)
+    if info is None:
+        return data
+    pcm = memoryview(data)[info.data_offset:info.data_offset + info.data_size]
+    header = build_wav_header(info.sample_rate, info.channels, info.sample_width, len(pcm))
+    return header + pcm.tobytes()
@@ -0,0 +1,234 @@
+import hashlib
+import os
+import re
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+from app.utils.log import logger
+
+
+class TTSCache:
+    """
+    Cache de áudio sintetizado endereçado por conteúdo
+
+    A chave combina backend, voz, velocidade, idioma e o hash do texto
+    normalizado. Há dois níveis: um LRU em memória limitado em bytes e um nível
+    opcional em disco que sobrevive a reinícios. Toda entrada expira após
+    `ttl_seconds`.
+    """
+
+    def __init__(self, max_memory_bytes: int = 64 * 1024 * 1024, disk_dir: Optional[str] = None,
+                 ttl_seconds: float = 86400):
+        """
+        Inicializa o cache
+
+        Args:
+            max_memory_bytes: Tamanho máximo do nível em memória (em bytes de áudio)
+            disk_dir: Diretório do nível em disco (None desativa o disco)
+            ttl_seconds: Tempo de vida de cada entrada (0 = sem expiração)
+        """
+        self.max_memory_bytes = max_memory_bytes
+        self.disk_dir = disk_dir
+        self.ttl_seconds = ttl_seconds
+
+        self._memory: "OrderedDict[str, Tuple[bytes, float]]" = OrderedDict()
+        self._memory_bytes = 0
+        self._lock = threading.Lock()
+
+        self._counters = {
+            "hits_memory": 0,
+            "hits_disk": 0,
+            "misses": 0,
+            "evictions": 0,
+            "expirations": 0,
+            "puts": 0,
+        }
+
+        if self.disk_dir:
+            os.makedirs(self.disk_dir, exist_ok=True)
+
+    @staticmethod
+    def normalize_text(text: str) -> str:
+        """
+        Normaliza o texto para que variações irrelevantes compartilhem a mesma entrada
+
+        Aplica normalização Unicode NFC, colapsa espaços em branco e remove
+        espaços nas extremidades. Maiúsculas e pontuação são preservadas, pois
+        alteram a prosódia da síntese.
+        """
+        return re.sub(r"\s+", " ", unicodedata.normalize("NFC", text)).strip()
+
+    @classmethod
+    def make_key(cls, backend: str, voice: Optional[str], speed: float, language: Optional[str],
+                 text: str) -> str:
+        """
+        Monta a chave de cache de uma síntese
+
+        Args:
+            backend: Identificação do serviço de TTS
+            voice: Voz efetiva da síntese
+            speed: Velocidade da fala
+            language: Idioma da síntese
+            text: Texto a ser sintetizado
+
+        Returns:
+            Chave hexadecimal (SHA-256)
+        """
+        text_hash = hashlib.sha256(cls.normalize_text(text).encode("utf-8")).hexdigest()
+        material = "\x1f".join([backend or "", voice or "", f"{float(speed):g}", language or "", text_hash])
+        return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+    def _expires_at(self, created_at: float) -> float:
+        return created_at + self.ttl_seconds if self.ttl_seconds else float("inf")
+
+    def _disk_path(self, key: str) -> str:
+        return os.path.join(self.disk_dir, key[:2], f"{key}.audio")
+
+    def lookup(self, key: str) -> Tuple[Optional[bytes], str]:
+        """
+        Procura uma entrada nos níveis de memória e disco
+
+        Args:
+            key: Chave gerada por make_key
+
+        Returns:
+            Tupla (áudio ou None, nível): nível é "memory", "disk" ou "miss"
+        """
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                data, expires_at = entry
+                if expires_at > now:
+                    self._memory.move_to_end(key)
+                    self._counters["hits_memory"] += 1
+                    return data, "memory"
+                self._remove_memory(key)
+                self._counters["expirations"] += 1
+
+        data, expires_at = self._read_disk(key, now)
+        with self._lock:
+            if data is None:
+                self._counters["misses"] += 1
+                return None, "miss"
+            self._counters["hits_disk"] += 1
+            self._store_memory(key, data, expires_at)
+        return data, "disk"
+
+    def get(self, key: str) -> Optional[bytes]:
+        """Retorna o áudio da entrada ou None se ausente/expirada"""
+        return self.lookup(key)[0]
+
+    def put(self, key: str, data: bytes) -> None:
+        """
+        Armazena um áudio nos níveis de memória e disco
+
+        Args:
+            key: Chave gerada por make_key
+            data: Áudio sintetizado
+        """
+        now = time.time()
+        expires_at = self._expires_at(now)
+        with self._lock:
+            self._counters["puts"] += 1
+            self._store_memory(key, data, expires_at)
+        self._write_disk(key, data)
+
+    def _store_memory(self, key: str, data: bytes, expires_at: float) -> None:
+        # Entradas maiores que o limite ficam apenas no disco
+        if len(data) > self.max_memory_bytes:
+            return
+        if key in self._memory:
+            self._remove_memory(key)
+        self._memory[key] = (data, expires_at)
+        self._memory_bytes += len(data)
+        while self._memory_bytes > self.max_memory_bytes:
+            old_key, (old_data, _) = self._memory.popitem(last=False)
+            self._memory_bytes -= len(old_data)
+            self._counters["evictions"] += 1
+
+    def _remove_memory(self, key: str) -> None:
+        data, _ = self._memory.pop(key)
+        self._memory_bytes -= len(data)
+
+    def _read_disk(self, key: str, now: float) -> Tuple[Optional[bytes], float]:
+        if not self.disk_dir:
+            return None, 0.0
+        path = self._disk_path(key)
+        try:
+            # O mtime do arquivo marca a criação da entrada
+            expires_at = self._expires_at(os.stat(path).st_mtime)
+            if expires_at <= now:
+                os.remove(path)
+                with self._lock:
+                    self._counters["expirations"] += 1
+                return None, 0.0
+            with open(path, "rb") as cached:
+                return cached.read(), expires_at
+        except OSError:
+            return None, 0.0
+
+    def _write_disk(self, key: str, data: bytes) -> None:
+        if not self.disk_dir:
+            return
+        path = self._disk_path(key)
+        temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(temp_path, "wb") as cached:
+                cached.write(data)
+            # Troca atômica: leitores nunca veem um arquivo parcial
+            os.replace(temp_path, path)
+        except OSError as e:
+            logger.warning("cache", "Não foi possível gravar o cache de TTS em disco", error=str(e))
+            try:
+                os.remove(temp_path)
+            except OSError:
+                pass
+
+    def purge_expired(self) -> int:
+        """
+        Remove do disco as entradas expiradas
+
+        Returns:
+            Número de arquivos removidos
+        """
+        if not self.disk_dir or not self.ttl_seconds:
+            return 0
+        removed = 0
+        now = time.time()
+        for root, _, files in os.walk(self.disk_dir):
+            for name in files:
+                path = os.path.join(root, name)
+                try:
+                    if self._expires_at(os.stat(path).st_mtime) <= now:
+                        os.remove(path)
+                        removed += 1
+                except OSError:
+                    pass
+        with self._lock:
+            self._counters["expirations"] += removed
+        return removed
+
+    def clear(self) -> None:
+        """Esvazia o nível em memória"""
+        with self._lock:
+            self._memory.clear()
+            self._memory_bytes = 0
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Retorna contadores e ocupação do cache"""
+        with self._lock:
+            stats: Dict[str, Any] = dict(self._counters)
+            stats["memory_entries"] = len(self._memory)
+            stats["memory_bytes"] = self._memory_bytes
+        hits = stats["hits_memory"] + stats["hits_disk"]
+        lookups = hits + stats["misses"]
+        stats["hit_ratio"] = round(hits / lookups, 4) if lookups else 0.0
+        stats["max_memory_bytes"] = self.max_memory_bytes
+        stats["disk_enabled"] = bool(self.disk_dir)
+        stats["ttl_seconds"] = self.ttl_seconds
+        return stats
@@ -1,3 +1,5 @@
+from typing import Dict
+
 from pydantic_settings import BaseSettings
 
 class Settings(BaseSettings):
@@ -16,6 +18,18 @@ class Settings(BaseSettings):
     stt_service_type: str = "vosk"
     stt_model_path: str = "app/models/vosk-model-small"
     
+    # Configurações de log (fila com escrita em thread própria)
+    log_level: str = "info"  # debug, info, warning ou error
+    log_format: str = "text"  # "text" ou "json" (uma linha JSON por registro)
+    log_queue_size: int = 10000  # Registros aguardando escrita antes de descartar
+    log_sample_rates: Dict[str, float] = {}  # Fração registrada por categoria, ex.: {"stt.request": 0.01}
+    
+    # Configurações de tracing por requisição (header Server-Timing e exportação OTLP em JSON)
+    tracing_enabled: bool = True
+    tracing_export_path: str = ""  # Arquivo JSON Lines dos traces; vazio desativa a exportação
+    tracing_export_min_ms: float = 0.0  # Exporta apenas requisições com pelo menos esta duração
+    tracing_export_queue_size: int = 1000  # Traces aguardando escrita antes de descartar
+    
     # Configurações de TTS (Text-to-Speech)
     tts_service_type: str = "azure"
     tts_lang: str = "pt-br"
@@ -36,11 +50,96 @@ class Settings(BaseSettings):
     azure_openai_stt_endpoint: str = ""
     azure_openai_stt_deployment: str = "whisper"  # Nome do deployment do modelo Whisper
     azure_openai_stt_api_version: str = "2025-03-01-preview"
+    azure_openai_stt_stream_segment_seconds: float = 2.0  # Áudio enviado por requisição no streaming
+    azure_openai_stt_stream_max_in_flight: int = 3  # Segmentos aguardando resposta ao mesmo tempo
+    azure_openai_stt_stream_overlap_ms: int = 300  # Áudio repetido entre segmentos (0 = sem sobreposição)
     
     # Configurações legadas (fallback para compatibilidade)
     azure_openai_api_key: str = ""
     azure_openai_endpoint: str = ""
     
+    # Configurações do cache de TTS
+    tts_cache_enabled: bool = True
+    tts_cache_memory_bytes: int = 64 * 1024 * 1024  # Limite do cache em memória (64 MB)
+    tts_cache_dir: str = "cache/tts"  # Diretório do cache em disco (vazio desativa o disco)
+    tts_cache_ttl_seconds: int = 86400  # Validade de cada entrada (0 = sem expiração)
+    
+    # Configurações dos clientes HTTP (Azure OpenAI)
+    http_max_connections: int = 100  # Conexões simultâneas por processo
+    http_max_keepalive_connections: int = 20  # Conexões ociosas mantidas no pool
+    http_keepalive_expiry: float = 30.0  # Segundos até fechar uma conexão ociosa
+    http_connect_timeout: float = 5.0
+    http_read_timeout: float = 60.0
+    http2: bool = True  # Usado apenas se o pacote h2 estiver instalado
+    http_max_retries: int = 2  # Novas tentativas por requisição (falhas de rede, 429 e 5xx)
+    http_retry_budget_ratio: float = 0.2  # Novas tentativas como fração das requisições
+    http_retry_backoff: float = 0.2  # Espera base (segundos) entre tentativas, dobrada a cada uma
+    
+    # Configurações de síntese de textos longos
+    tts_long_text_chars: int = 400  # A partir deste tamanho o texto é sintetizado frase a frase
+    tts_parallel_workers: int = 4  # Frases sintetizadas simultaneamente
+    
+    # Configurações do registro de modelos
+    preload_models: bool = True  # Carregar os modelos na inicialização da aplicação
+    
+    # Configurações do executor de inferência
+    inference_workers: int = 2  # Workers por executor (threads ou processos)
+    inference_max_queue: int = 16  # Tarefas aguardando além das em execução antes de responder 503
+    inference_retry_after: int = 1  # Segundos informados no header Retry-After quando saturado
+    whisper_executor_kind: str = "auto"  # "auto", "process" ou "thread"; auto usa threads no modo pre-fork
+    tts_workers: int = 4  # Threads do executor de TTS, separado dos de STT
+    
+    # Configurações do escalonador de inferência (prioridades e cotas)
+    tenant_header: str = "X-Tenant-ID"  # Header que identifica o tenant da requisição
+    scheduler_tenant_max_concurrency: int = 0  # Workers simultâneos por tenant em cada executor (0 = sem limite)
+    scheduler_batch_queue_share: float = 0.5  # Fração da fila de cada executor aceita para jobs em lote
+    
+    # Configurações de micro-batching do Whisper
+    whisper_batch_enabled: bool = True
+    whisper_batch_window_ms: float = 20  # Janela para agrupar requisições simultâneas (10-50ms)
+    whisper_batch_max_size: int = 8  # Máximo de áudios por passada do modelo
+    
+    # Configurações de decodificação de áudio
+    audio_ffmpeg_prewarm: int = 2  # Processos ffmpeg mantidos prontos para formatos comprimidos
+    audio_ffmpeg_timeout: float = 60.0  # Tempo máximo de uma decodificação (segundos)
+    
+    # Configurações de transcrição de áudios longos
+    stt_long_audio_seconds: float = 60.0  # A partir desta duração o áudio é dividido em segmentos
+    stt_segment_seconds: float = 30.0  # Fala máxima por segmento (o Whisper decodifica até 30s)
+    stt_parallel_segments: int = 4  # Segmentos transcritos simultaneamente
+    
+    # Configurações da transcrição incremental (corpo da requisição em streaming)
+    stt_incremental_max_bytes: int = 1073741824  # Tamanho máximo do WAV enviado (1 GiB)
+    stt_incremental_max_seconds: float = 14400.0  # Duração máxima do áudio (4 horas)
+    
+    # Configurações dos jobs de transcrição em lote
+    stt_jobs_dir: str = "data/jobs"  # Diretório dos arquivos e resultados dos jobs
+    stt_jobs_concurrency: int = 1  # Arquivos de lote processados simultaneamente por worker do servidor
+    stt_jobs_max_queued_files: int = 10000  # Arquivos aguardando na fila antes de recusar novos jobs
+    stt_jobs_max_files: int = 10000  # Arquivos aceitos em um único job
+    stt_jobs_max_file_bytes: int = 268435456  # Tamanho máximo de cada arquivo, já extraído (256 MiB)
+    stt_jobs_max_job_bytes: int = 4294967296  # Tamanho máximo de todos os arquivos de um job (4 GiB)
+    stt_jobs_busy_backoff_seconds: float = 0.5  # Espera quando a inferência está ocupada com requisições interativas
+    
+    # Configurações do protocolo de streaming v2 (WebSocket)
+    stt_stream_min_partial_interval_ms: int = 200  # Intervalo mínimo entre parciais (o cliente pode alterar)
+    stt_stream_max_unacked_bytes: int = 65536  # Áudio que o cliente pode enviar sem ack (~2s a 16 kHz)
+    
+    # Configurações de detecção de voz (VAD)
+    vad_enabled: bool = True  # Descartar silêncio antes da inferência
+    vad_frame_ms: int = 30  # Duração de cada quadro analisado
+    vad_threshold_db: float = 9.0  # Margem acima do piso de ruído para considerar fala
+    vad_min_energy_db: float = -55.0  # Energia mínima (dBFS) de um quadro de fala
+    vad_flatness_max: float = 0.45  # Planicidade espectral máxima (ruído tende a 1)
+    vad_padding_ms: int = 200  # Áudio mantido antes e depois de cada trecho de fala
+    vad_hangover_ms: int = 300  # Tempo extra mantido após o fim da fala
+    
+    # Configurações do streaming incremental do Whisper
+    whisper_stream_min_chunk_seconds: float = 1.0  # Áudio novo necessário para decodificar de novo
+    whisper_stream_trim_seconds: float = 10.0  # Janela a partir da qual o áudio já confirmado é descartado
+    whisper_stream_max_window_seconds: float = 25.0  # Limite da janela (o Whisper decodifica até 30s)
+    whisper_stream_prompt_chars: int = 200  # Texto confirmado repassado como prompt
+    
     # Configurações de servidor
     host: str = "0.0.0.0"
     port: int = 8000
@@ -1,34 +1,29 @@
+from typing import Any, Dict, Optional
+
 from fastapi import Depends
 
 from app.interfaces.stt_service import SpeechToTextService
 from app.interfaces.tts_service import TextToSpeechService
-from app.factories.service_factory import ServiceFactory
+from app.registry.model_registry import registry
+from app.cache.tts_cache import TTSCache
+from app.jobs.batch import BatchJobManager
 from app.config import settings
+from app.utils.log import logger
 
-def get_stt_service() -> SpeechToTextService:
-    """
-    Provê uma instância do serviço de Speech-to-Text configurado
-    
-    Returns:
-        Instância de SpeechToTextService conforme configuração
-    """
-    return ServiceFactory.get_stt_service(
-        service_type=settings.stt_service_type,
-        model_path=settings.stt_model_path
-    )
+def _stt_service_kwargs() -> Dict[str, Any]:
+    """Monta os parâmetros do serviço de STT a partir da configuração"""
+    return {
+        "service_type": settings.stt_service_type,
+        "model_path": settings.stt_model_path
+    }
 
-def get_tts_service() -> TextToSpeechService:
-    """
-    Provê uma instância do serviço de Text-to-Speech configurado
-    
-    Returns:
-        Instância de TextToSpeechService conforme configuração
-    """
+def _tts_service_kwargs() -> Dict[str, Any]:
+    """Monta os parâmetros do serviço de TTS a partir da configuração"""
     service_type = settings.tts_service_type
-    
+
     # Parâmetros básicos para qualquer serviço
-    kwargs = {"lang": settings.tts_lang}
-    
+    kwargs = {"service_type": service_type, "lang": settings.tts_lang}
+
     # Adicionar parâmetros específicos de acordo com o tipo de serviço
     if service_type == "azure":
         kwargs.update({
@@ -43,5 +38,90 @@ def get_tts_service() -> TextToSpeechService:
             "model": settings.azure_openai_tts_model,
             "voice": settings.azure_openai_tts_voice
         })
+
+    return kwargs
+
+def get_stt_service() -> SpeechToTextService:
+    """
+    Provê a instância compartilhada do serviço de Speech-to-Text configurado
+
+    Returns:
+        Instância de SpeechToTextService conforme configuração
+    """
+    return registry.get_stt_service(**_stt_service_kwargs())
+
+def get_tts_service() -> TextToSpeechService:
+    """
+    Provê uma instância do serviço de Text-to-Speech configurado
+
+    A instância é uma cópia leve do serviço registrado, de modo que voz e
+    velocidade definidas em uma requisição não afetem as demais.
+
+    Returns:
+        Instância de TextToSpeechService conforme configuração
+    """
+    return registry.get_tts_service(**_tts_service_kwargs()).clone()
+
+_tts_cache: Optional[TTSCache] = None
+
+def get_tts_cache() -> Optional[TTSCache]:
+    """
+    Provê o cache de TTS compartilhado pelo processo
+    
+    Returns:
+        Instância de TTSCache, ou None se o cache estiver desativado
+    """
+    global _tts_cache
+    if not settings.tts_cache_enabled:
+        return None
+    if _tts_cache is None:
+        _tts_cache = TTSCache(
+            max_memory_bytes=settings.tts_cache_memory_bytes,
+            disk_dir=settings.tts_cache_dir or None,
+            ttl_seconds=settings.tts_cache_ttl_seconds
+        )
+        _tts_cache.purge_expired()
+    return _tts_cache
+
+_job_manager: Optional[BatchJobManager] = None
+
+def get_job_manager() -> BatchJobManager:
+    """
+    Provê o gerenciador de jobs de transcrição em lote do processo
     
-    return ServiceFactory.get_tts_service(service_type=service_type, **kwargs)
+    Returns:
+        Instância de BatchJobManager
+    """
+    global _job_manager
+    if _job_manager is None:
+        _job_manager = BatchJobManager(
+            root_dir=settings.stt_jobs_dir,
+            concurrency=settings.stt_jobs_concurrency,
+            max_queued_files=settings.stt_jobs_max_queued_files,
+            max_files_per_job=settings.stt_jobs_max_files,
+            max_file_bytes=settings.stt_jobs_max_file_bytes,
+            max_job_bytes=settings.stt_jobs_max_job_bytes,
+            busy_backoff=settings.stt_jobs_busy_backoff_seconds
+        )
+    return _job_manager
+
+def warm_up_services() -> None:
+    """
+    Carrega antecipadamente os serviços configurados no registro
+
+    Falhas são apenas reportadas; o serviço volta a ser carregado sob demanda
+    na primeira requisição, preservando o comportamento de erro das rotas.
+    """
+    loaders = (
+        ("STT", lambda: registry.get_stt_service(**_stt_service_kwargs())),
+        ("TTS", lambda: registry.get_tts_service(**_tts_service_kwargs())),
+    )
+    for name, loader in loaders:
+        try:
+            loader()
+        except Exception as e:
+            logger.warning("registry", "Não foi possível pré-carregar o serviço", service=name, error=str(e))
+
+    for stats in registry.get_stats():
+        logger.info("registry", "Modelo carregado", kind=stats['kind'], service_type=stats['service_type'],
+                    service_class=stats['class'], load_time_ms=stats['load_time_ms'], memory_bytes=stats['memory_bytes'])
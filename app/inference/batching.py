@@ -0,0 +1,155 @@
+import asyncio
+import time
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Optional, Tuple
+
+from app.inference.executor import ExecutorSaturatedError, TaskTimings, get_task_timings, start_task_timings
+from app.inference.scheduling import WorkContext, get_work_context, work_context
+from app.utils.tracing import Span, detach_trace, get_current_span, record_span
+
+# (item, futuro do resultado, contexto, tempos da requisição, span da requisição, instante da submissão)
+_BatchItem = Tuple[Any, asyncio.Future, WorkContext, Optional[TaskTimings], Optional[Span], float]
+
+
+class MicroBatcher:
+    """
+    Agrupa requisições concorrentes em lotes para uma única passada do modelo
+
+    A primeira requisição de um grupo abre uma janela curta (`window_ms`); tudo
+    que chegar com a mesma chave dentro da janela, até `max_batch_size` itens,
+    é enviado junto para `run_batch`. Os resultados são devolvidos a cada
+    chamador na mesma ordem em que os itens foram submetidos.
+
+    O lote é executado com a prioridade do item mais urgente que ele contém
+    (ver app.inference.scheduling) e com a soma dos custos estimados. Os
+    tempos de fila e de execução do lote são somados aos de cada requisição.
+    """
+
+    def __init__(self, run_batch: Callable[[Hashable, List[Any]], Awaitable[List[Any]]],
+                 window_ms: float = 20, max_batch_size: int = 8, max_pending: int = 64,
+                 name: str = "batch", retry_after: int = 1):
+        """
+        Inicializa o agrupador
+
+        Args:
+            run_batch: Corrotina que recebe (chave, itens) e retorna um resultado por item
+            window_ms: Tempo máximo de espera para completar um lote
+            max_batch_size: Número máximo de itens por lote
+            max_pending: Itens aguardando lote antes de recusar novas submissões
+            name: Nome usado nas mensagens de erro
+            retry_after: Segundos sugeridos para nova tentativa quando saturado
+        """
+        self._run_batch = run_batch
+        self.window = max(window_ms, 0) / 1000
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_pending = max_pending
+        self.name = name
+        self.retry_after = retry_after
+
+        self._queues: Dict[Hashable, List[_BatchItem]] = {}
+        self._timers: Dict[Hashable, asyncio.TimerHandle] = {}
+        self._pending = 0
+        self.batches_dispatched = 0
+        self.items_dispatched = 0
+
+    @property
+    def pending(self) -> int:
+        """Número de itens aguardando a formação de um lote"""
+        return self._pending
+
+    async def submit(self, item: Any, key: Hashable = None) -> Any:
+        """
+        Submete um item e aguarda o resultado do lote em que ele for incluído
+
+        Args:
+            item: Item a ser processado
+            key: Chave de agrupamento (apenas itens com a mesma chave vão juntos)
+
+        Returns:
+            Resultado correspondente ao item
+
+        Raises:
+            ExecutorSaturatedError: Se houver itens demais aguardando
+        """
+        if self._pending >= self.max_pending:
+            raise ExecutorSaturatedError(self.name, self.retry_after)
+
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        queue = self._queues.setdefault(key, [])
+        queue.append((item, future, get_work_context(), get_task_timings(), get_current_span(), time.perf_counter()))
+        self._pending += 1
+
+        if len(queue) >= self.max_batch_size:
+            self._flush(key)
+        elif key not in self._timers:
+            self._timers[key] = loop.call_later(self.window, self._flush, key)
+
+        return await future
+
+    def _flush(self, key: Hashable) -> None:
+        timer = self._timers.pop(key, None)
+        if timer is not None:
+            timer.cancel()
+
+        queue = self._queues.get(key)
+        if not queue:
+            return
+
+        batch = queue[:self.max_batch_size]
+        del queue[:self.max_batch_size]
+        self._pending -= len(batch)
+        if queue:
+            # O que sobrou abre uma nova janela
+            loop = asyncio.get_running_loop()
+            self._timers[key] = loop.call_later(self.window, self._flush, key)
+        else:
+            self._queues.pop(key, None)
+
+        asyncio.ensure_future(self._dispatch(key, batch))
+
+    async def _dispatch(self, key: Hashable, batch: List[_BatchItem]) -> None:
+        self.batches_dispatched += 1
+        self.items_dispatched += len(batch)
+        contexts = [context for _, _, context, _, _, _ in batch]
+        urgent = min(contexts, key=lambda context: (context.priority, context.cost))
+        batch_timings = start_task_timings()
+        # O lote é de várias requisições: cada uma recebe os spans do lote
+        # abaixo, em vez de o trace de quem abriu a janela receber tudo
+        detach_trace()
+        started = time.perf_counter()
+        try:
+            with work_context(urgent.priority, urgent.tenant, sum(context.cost for context in contexts)):
+                results = await self._run_batch(key, [item for item, _, _, _, _, _ in batch])
+        except Exception as e:
+            results, error = None, e
+        else:
+            error = None
+        finished = time.perf_counter()
+
+        for _, _, _, timings, span, submitted_at in batch:
+            if timings is not None:
+                timings.add(batch_timings.queue_seconds, batch_timings.run_seconds, batch_timings.tasks)
+            record_span(span, "batch.wait", submitted_at, started, batcher=self.name)
+            record_span(span, "batch.run", started, finished, batcher=self.name, batch_size=len(batch),
+                        queue_ms=round(batch_timings.queue_seconds * 1000, 2))
+
+        if error is not None:
+            for _, future, _, _, _, _ in batch:
+                if not future.done():
+                    future.set_exception(error)
+            return
+
+        for (_, future, _, _, _, _), result in zip(batch, results):
+            if not future.done():
+                future.set_result(result)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Retorna contadores do agrupador"""
+        batches = self.batches_dispatched
+        return {
+            "name": self.name,
+            "pending": self._pending,
+            "batches": batches,
+            "items": self.items_dispatched,
+            "avg_batch_size": round(self.items_dispatched / batches, 2) if batches else 0.0,
+        }
@@ -0,0 +1,419 @@
+import asyncio
+import contextvars
+import functools
+import heapq
+import itertools
+import multiprocessing
+import threading
+import time
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from collections import deque
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from app.inference.scheduling import PRIORITY_BATCH, PRIORITY_NAMES, QueueTimeStats, WorkContext, get_work_context
+from app.utils.metrics import EXECUTOR_QUEUE_SECONDS
+from app.utils.tracing import get_current_span, record_span
+
+
+class ExecutorSaturatedError(Exception):
+    """
+    Erro lançado quando o executor de inferência não aceita novas tarefas
+
+    Carrega o tempo sugerido (em segundos) para o cliente tentar novamente.
+    """
+
+    def __init__(self, name: str, retry_after: int):
+        self.name = name
+        self.retry_after = retry_after
+        super().__init__(f"Executor de inferência '{name}' saturado. Tente novamente em {retry_after}s.")
+
+
+class TaskTimings:
+    """
+    Tempo que as tarefas de uma requisição passaram na fila e em execução
+
+    Uma instância é associada à requisição por start_task_timings() e
+    acumula os tempos de todas as tarefas que ela submeter aos executores
+    (ex.: segmentos de um áudio longo transcritos em paralelo).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.queue_seconds = 0.0
+        self.run_seconds = 0.0
+        self.tasks = 0
+
+    def add(self, queue_seconds: float = 0.0, run_seconds: float = 0.0, tasks: int = 0) -> None:
+        with self._lock:
+            self.queue_seconds += queue_seconds
+            self.run_seconds += run_seconds
+            self.tasks += tasks
+
+
+_task_timings: contextvars.ContextVar[Optional[TaskTimings]] = contextvars.ContextVar("task_timings", default=None)
+
+
+def start_task_timings() -> TaskTimings:
+    """Associa um novo TaskTimings ao contexto atual (requisição) e o retorna"""
+    timings = TaskTimings()
+    _task_timings.set(timings)
+    return timings
+
+
+def get_task_timings() -> Optional[TaskTimings]:
+    """Retorna o TaskTimings da requisição atual, se houver"""
+    return _task_timings.get()
+
+
+class _QueuedTask:
+    """Tarefa aguardando um worker livre na fila de prioridade do executor"""
+
+    __slots__ = ("call", "future", "priority", "tenant", "timings", "span", "enqueued_at", "started_at", "dispatched")
+
+    def __init__(self, call: Callable[[], Any], future: Future, context: WorkContext):
+        self.call = call
+        self.future = future
+        self.priority = context.priority
+        self.tenant = context.tenant
+        self.timings = _task_timings.get()
+        # Span da requisição: a fila e a execução entram no trace dela
+        self.span = get_current_span()
+        self.enqueued_at = time.perf_counter()
+        self.started_at = 0.0
+        self.dispatched = False
+
+
+class InferenceExecutor:
+    """
+    Executor de inferência com fila limitada e escalonamento por prioridade
+
+    Executa chamadas bloqueantes (Vosk, Whisper, TTS) fora do event loop, em um
+    pool de threads ou de processos. No máximo `max_workers + max_queue`
+    tarefas ficam pendentes; acima disso a submissão falha imediatamente com
+    ExecutorSaturatedError, para que a rota responda 503 em vez de enfileirar
+    sem limite. Trabalho em lote só ocupa `batch_queue_share` da fila.
+
+    As tarefas só são entregues ao pool quando há worker livre. Até lá esperam
+    em uma fila ordenada pelo contexto de escalonamento de quem as submeteu
+    (ver app.inference.scheduling): classe de prioridade (streaming antes de
+    arquivos, arquivos antes de lote), depois custo estimado (mais curto
+    primeiro) e ordem de chegada. Cada tenant ocupa no máximo
+    `tenant_max_concurrency` workers ao mesmo tempo (0 = sem limite).
+    """
+
+    KINDS = ("thread", "process")
+
+    def __init__(self, name: str, kind: str = "thread", max_workers: int = 2, max_queue: int = 16,
+                 retry_after: int = 1, initializer: Optional[Callable[..., Any]] = None,
+                 initargs: Tuple = (), tenant_max_concurrency: int = 0, batch_queue_share: float = 1.0):
+        """
+        Inicializa o executor (o pool é criado apenas no primeiro uso)
+
+        Args:
+            name: Nome do executor (usado em mensagens e métricas)
+            kind: Tipo de pool ("thread" ou "process")
+            max_workers: Número de workers do pool
+            max_queue: Tarefas aceitas além das que estão em execução
+            retry_after: Segundos sugeridos no header Retry-After quando saturado
+            initializer: Função executada em cada worker ao iniciar (opcional)
+            initargs: Argumentos da função de inicialização
+            tenant_max_concurrency: Workers simultâneos por tenant (0 = sem limite)
+            batch_queue_share: Fração da fila disponível para trabalho em lote
+        """
+        if kind not in self.KINDS:
+            raise ValueError(f"Tipo de executor '{kind}' não suportado")
+
+        self.name = name
+        self.kind = kind
+        self.max_workers = max(1, max_workers)
+        self.max_queue = max(0, max_queue)
+        self.retry_after = retry_after
+        self._initializer = initializer
+        self._initargs = initargs
+
+        self.tenant_max_concurrency = max(0, tenant_max_concurrency)
+        self.batch_capacity = self.max_workers + int(self.max_queue * min(max(batch_queue_share, 0.0), 1.0))
+
+        self._pool: Optional[Executor] = None
+        self._pending = 0
+        self._running = 0
+        self._running_by_tenant: Dict[str, int] = {}
+        self._queue: List[Tuple[int, float, int, _QueuedTask]] = []
+        self._sequence = itertools.count()
+        self._lock = threading.Lock()
+        self.queue_times = QueueTimeStats()
+
+    @property
+    def capacity(self) -> int:
+        """Número máximo de tarefas pendentes (em execução + na fila)"""
+        return self.max_workers + self.max_queue
+
+    @property
+    def pending(self) -> int:
+        """Número de tarefas pendentes no momento"""
+        return self._pending
+
+    def _get_pool(self) -> Executor:
+        # Criação tardia: evita threads/processos herdados em um fork do servidor
+        if self._pool is None:
+            with self._lock:
+                if self._pool is None:
+                    if self.kind == "process":
+                        self._pool = ProcessPoolExecutor(
+                            max_workers=self.max_workers,
+                            mp_context=multiprocessing.get_context("spawn"),
+                            initializer=self._initializer,
+                            initargs=self._initargs,
+                        )
+                    else:
+                        self._pool = ThreadPoolExecutor(
+                            max_workers=self.max_workers,
+                            thread_name_prefix=f"inference-{self.name}",
+                            initializer=self._initializer,
+                            initargs=self._initargs,
+                        )
+        return self._pool
+
+    def submit(self, fn: Callable[..., Any], *args, **kwargs) -> Future:
+        """
+        Submete uma tarefa respeitando o limite da fila e a prioridade do contexto atual
+
+        Args:
+            fn: Função bloqueante a ser executada
+            *args: Argumentos posicionais da função
+            **kwargs: Argumentos nomeados da função
+
+        Returns:
+            Future da tarefa
+
+        Raises:
+            ExecutorSaturatedError: Se a fila estiver cheia
+        """
+        context = get_work_context()
+        limit = self.batch_capacity if context.priority >= PRIORITY_BATCH else self.capacity
+        future: Future = Future()
+        task = _QueuedTask(functools.partial(fn, *args, **kwargs), future, context)
+        with self._lock:
+            if self._pending >= limit:
+                raise ExecutorSaturatedError(self.name, self.retry_after)
+            self._pending += 1
+            heapq.heappush(self._queue, (context.priority, context.cost, next(self._sequence), task))
+        # Cancelada enquanto aguarda (ex.: cliente desconectado): libera a vaga na hora
+        future.add_done_callback(lambda _: self._discard(task))
+        self._dispatch()
+        return future
+
+    def _discard(self, task: _QueuedTask) -> None:
+        with self._lock:
+            if task.dispatched or not task.future.cancelled():
+                return
+            task.dispatched = True
+            self._pending -= 1
+        self._dispatch()
+
+    def _next_task(self) -> Optional[_QueuedTask]:
+        # Primeira tarefa da fila cujo tenant ainda está abaixo da cota
+        skipped = []
+        task = None
+        while self._queue:
+            entry = heapq.heappop(self._queue)
+            candidate = entry[-1]
+            if candidate.dispatched:
+                continue
+            if (self.tenant_max_concurrency
+                    and self._running_by_tenant.get(candidate.tenant, 0) >= self.tenant_max_concurrency):
+                skipped.append(entry)
+                continue
+            task = candidate
+            break
+        for entry in skipped:
+            heapq.heappush(self._queue, entry)
+        return task
+
+    def _dispatch(self) -> None:
+        """Entrega tarefas da fila ao pool enquanto houver workers livres"""
+        while True:
+            with self._lock:
+                if self._running >= self.max_workers:
+                    return
+                task = self._next_task()
+                if task is None:
+                    return
+                task.dispatched = True
+                if not task.future.set_running_or_notify_cancel():
+                    self._pending -= 1
+                    continue
+                self._running += 1
+                self._running_by_tenant[task.tenant] = self._running_by_tenant.get(task.tenant, 0) + 1
+            task.started_at = time.perf_counter()
+            waited = task.started_at - task.enqueued_at
+            self.queue_times.record(task.priority, waited)
+            EXECUTOR_QUEUE_SECONDS.observe(waited, executor=self.name,
+                                           priority=PRIORITY_NAMES.get(task.priority, str(task.priority)))
+            if task.timings is not None:
+                task.timings.add(queue_seconds=waited, tasks=1)
+            record_span(task.span, "executor.queue", task.enqueued_at, task.started_at, executor=self.name,
+                        priority=PRIORITY_NAMES.get(task.priority, str(task.priority)))
+            try:
+                inner = self._get_pool().submit(task.call)
+            except BaseException as e:
+                self._finish(task, None, e)
+                continue
+            inner.add_done_callback(functools.partial(self._on_done, task))
+
+    def _on_done(self, task: _QueuedTask, inner: Future) -> None:
+        try:
+            self._finish(task, inner.result(), None)
+        except BaseException as e:
+            self._finish(task, None, e)
+
+    def _finish(self, task: _QueuedTask, result: Any, error: Optional[BaseException]) -> None:
+        # A vaga só é liberada quando a tarefa termina de fato, mesmo que o
+        # chamador tenha desistido de esperar (ex.: cliente desconectado)
+        with self._lock:
+            self._pending -= 1
+            self._running -= 1
+            remaining = self._running_by_tenant.get(task.tenant, 1) - 1
+            if remaining:
+                self._running_by_tenant[task.tenant] = remaining
+            else:
+                self._running_by_tenant.pop(task.tenant, None)
+        finished = time.perf_counter()
+        if task.timings is not None:
+            task.timings.add(run_seconds=finished - task.started_at)
+        record_span(task.span, "executor.run", task.started_at, finished, executor=self.name,
+                    error=type(error).__name__ if error is not None else None)
+        self._dispatch()
+        if error is not None:
+            task.future.set_exception(error)
+        else:
+            task.future.set_result(result)
+
+    async def run(self, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        """
+        Executa uma função bloqueante no pool sem bloquear o event loop
+
+        Args:
+            fn: Função bloqueante a ser executada
+            *args: Argumentos posicionais da função
+            **kwargs: Argumentos nomeados da função
+
+        Returns:
+            Resultado da função
+
+        Raises:
+            ExecutorSaturatedError: Se a fila estiver cheia
+        """
+        return await asyncio.wrap_future(self.submit(fn, *args, **kwargs))
+
+    def map_ordered(self, fn: Callable[[Any], Any], items: Iterable[Any],
+                    window: Optional[int] = None) -> Iterator[Any]:
+        """
+        Aplica uma função aos itens em paralelo, devolvendo os resultados na ordem original
+
+        Mantém no máximo `window` tarefas em andamento: cada resultado é
+        entregue assim que ele e todos os anteriores estão prontos, e só então
+        o próximo item é submetido. Se o executor estiver saturado, o item é
+        processado na própria thread do chamador em vez de falhar.
+
+        Args:
+            fn: Função bloqueante aplicada a cada item
+            items: Itens a processar
+            window: Tarefas simultâneas por chamada (padrão: max_workers)
+
+        Yields:
+            Resultados, na mesma ordem dos itens
+        """
+        window = max(1, window or self.max_workers)
+        in_flight: "deque[Future]" = deque()
+        iterator = iter(items)
+        try:
+            for item in iterator:
+                try:
+                    in_flight.append(self.submit(fn, item))
+                except ExecutorSaturatedError:
+                    done: Future = Future()
+                    try:
+                        done.set_result(fn(item))
+                    except Exception as e:
+                        done.set_exception(e)
+                    in_flight.append(done)
+                if len(in_flight) >= window:
+                    yield in_flight.popleft().result()
+            while in_flight:
+                yield in_flight.popleft().result()
+        finally:
+            # Consumidor desistiu (ou houve erro): descarta o que não começou
+            for future in in_flight:
+                future.cancel()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Retorna a ocupação atual do executor"""
+        with self._lock:
+            pending, running = self._pending, self._running
+            tenants = dict(self._running_by_tenant)
+        return {
+            "name": self.name,
+            "kind": self.kind,
+            "max_workers": self.max_workers,
+            "max_queue": self.max_queue,
+            "pending": pending,
+            "running": running,
+            "queued": pending - running,
+            "running_by_tenant": tenants,
+            "queue_time": self.queue_times.snapshot(),
+        }
+
+    def shutdown(self, wait: bool = False) -> None:
+        """Encerra o pool, se já tiver sido criado"""
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=wait, cancel_futures=True)
+
+
+_executors: Dict[str, InferenceExecutor] = {}
+_executors_lock = threading.Lock()
+
+
+def get_executor(name: str, kind: str = "thread", **kwargs) -> InferenceExecutor:
+    """
+    Retorna o executor compartilhado com o nome informado, criando-o se necessário
+
+    Tamanho do pool, tamanho da fila e Retry-After seguem a configuração da
+    aplicação, a menos que sejam informados explicitamente.
+
+    Args:
+        name: Nome do executor
+        kind: Tipo de pool ("thread" ou "process")
+        **kwargs: Parâmetros adicionais de InferenceExecutor
+
+    Returns:
+        Instância compartilhada de InferenceExecutor
+    """
+    with _executors_lock:
+        executor = _executors.get(name)
+        if executor is None:
+            from app.config import settings
+            kwargs.setdefault("max_workers", settings.inference_workers)
+            kwargs.setdefault("max_queue", settings.inference_max_queue)
+            kwargs.setdefault("retry_after", settings.inference_retry_after)
+            kwargs.setdefault("tenant_max_concurrency", settings.scheduler_tenant_max_concurrency)
+            kwargs.setdefault("batch_queue_share", settings.scheduler_batch_queue_share)
+            executor = InferenceExecutor(name, kind=kind, **kwargs)
+            _executors[name] = executor
+        return executor
+
+
+def get_executor_stats() -> List[Dict[str, Any]]:
+    """Retorna a ocupação de todos os executores criados"""
+    return [executor.get_stats() for executor in list(_executors.values())]
+
+
+def shutdown_executors() -> None:
+    """Encerra todos os executores criados"""
+    with _executors_lock:
+        executors = list(_executors.values())
+        _executors.clear()
+    for executor in executors:
+        executor.shutdown()
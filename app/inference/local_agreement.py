@@ -0,0 +1,138 @@
+import re
+from typing import List, NamedTuple
+
+
+class TimedWord(NamedTuple):
+    """Palavra reconhecida com início e fim absolutos (em segundos desde o início da sessão)"""
+    start: float
+    end: float
+    text: str
+
+
+def _normalize(word: str) -> str:
+    return re.sub(r"[^\w]", "", word.lower())
+
+
+class LocalAgreement:
+    """
+    Política de confirmação "local agreement" para transcrição incremental
+
+    Cada nova decodificação da janela de áudio produz uma hipótese. Uma palavra
+    só é confirmada quando duas hipóteses consecutivas concordam com ela (e com
+    todas as anteriores): o maior prefixo comum entre a hipótese anterior e a
+    atual é confirmado e nunca mais é reemitido.
+    """
+
+    def __init__(self, max_ngram_overlap: int = 5):
+        """
+        Inicializa a política
+
+        Args:
+            max_ngram_overlap: Maior sequência de palavras repetidas na fronteira
+                com o texto já confirmado que é descartada
+        """
+        self.max_ngram_overlap = max_ngram_overlap
+        self.committed: List[TimedWord] = []
+        self._hypothesis: List[TimedWord] = []
+
+    @property
+    def last_committed_time(self) -> float:
+        """Fim da última palavra confirmada"""
+        return self.committed[-1].end if self.committed else 0.0
+
+    def _drop_committed(self, words: List[TimedWord]) -> List[TimedWord]:
+        # Palavras que terminam antes do último ponto confirmado já foram emitidas
+        boundary = self.last_committed_time
+        words = [word for word in words if word.start > boundary - 0.1]
+        if not words or not self.committed or abs(words[0].start - boundary) > 1.0:
+            return words
+
+        # O Whisper às vezes repete na fronteira as últimas palavras confirmadas
+        for size in range(min(self.max_ngram_overlap, len(words), len(self.committed)), 0, -1):
+            tail = [_normalize(word.text) for word in self.committed[-size:]]
+            head = [_normalize(word.text) for word in words[:size]]
+            if tail == head:
+                return words[size:]
+        return words
+
+    def insert(self, words: List[TimedWord]) -> List[TimedWord]:
+        """
+        Registra uma nova hipótese e confirma o prefixo em que ela concorda com a anterior
+
+        Args:
+            words: Palavras da decodificação atual, com tempos absolutos
+
+        Returns:
+            Palavras confirmadas nesta chamada
+        """
+        words = self._drop_committed(words)
+        agreed: List[TimedWord] = []
+        for previous, current in zip(self._hypothesis, words):
+            if _normalize(previous.text) != _normalize(current.text):
+                break
+            agreed.append(current)
+
+        self.committed.extend(agreed)
+        self._hypothesis = words[len(agreed):]
+        return agreed
+
+    def pending(self) -> List[TimedWord]:
+        """Palavras da última hipótese ainda não confirmadas"""
+        return list(self._hypothesis)
+
+    def flush(self) -> List[TimedWord]:
+        """
+        Confirma incondicionalmente o restante da última hipótese (fim do stream)
+
+        Returns:
+            Palavras confirmadas nesta chamada
+        """
+        flushed, self._hypothesis = self._hypothesis, []
+        self.committed.extend(flushed)
+        return flushed
+
+    def committed_text(self, max_chars: int = 0) -> str:
+        """
+        Texto confirmado até agora
+
+        Args:
+            max_chars: Se maior que zero, retorna apenas o final do texto
+
+        Returns:
+            Texto confirmado
+        """
+        text = join_words(self.committed)
+        if max_chars and len(text) > max_chars:
+            text = text[-max_chars:]
+            # Evita começar no meio de uma palavra
+            text = text.split(" ", 1)[-1]
+        return text
+
+
+def join_words(words: List[TimedWord]) -> str:
+    """Junta palavras do Whisper (que trazem o espaço inicial) em um texto"""
+    return "".join(word.text for word in words).strip()
+
+
+def strip_overlap(previous: str, current: str, max_words: int = 5) -> str:
+    """
+    Remove do início de `current` as palavras que repetem o final de `previous`
+
+    Usado para costurar transcrições de segmentos enviados com sobreposição
+    de áudio, em que a fronteira aparece nos dois textos.
+
+    Args:
+        previous: Texto do segmento anterior
+        current: Texto do segmento atual
+        max_words: Maior sequência repetida procurada
+
+    Returns:
+        Texto atual sem a repetição
+    """
+    tail = [_normalize(word) for word in previous.split()]
+    words = current.split()
+    head = [_normalize(word) for word in words]
+    for size in range(min(max_words, len(tail), len(head)), 0, -1):
+        if tail[-size:] == head[:size]:
+            return " ".join(words[size:])
+    return current.strip()
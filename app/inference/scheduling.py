@@ -0,0 +1,119 @@
+import contextvars
+import threading
+from collections import deque
+from contextlib import contextmanager
+from typing import Any, Deque, Dict, Iterator, Mapping, NamedTuple, Optional
+
+# Classes de prioridade (menor = mais urgente)
+PRIORITY_LIVE = 0  # Sessões de streaming (WebSocket)
+PRIORITY_INTERACTIVE = 1  # Requisições com o cliente aguardando (arquivo, síntese)
+PRIORITY_BATCH = 2  # Jobs em lote
+PRIORITY_NAMES = {PRIORITY_LIVE: "live", PRIORITY_INTERACTIVE: "interactive", PRIORITY_BATCH: "batch"}
+
+DEFAULT_TENANT = "default"
+
+
+class WorkContext(NamedTuple):
+    """Como o trabalho da requisição atual deve ser escalonado"""
+    priority: int = PRIORITY_INTERACTIVE
+    tenant: str = DEFAULT_TENANT
+    cost: float = 0.0  # Estimativa do custo (ex.: segundos de áudio); menor roda antes
+
+
+_work_context: contextvars.ContextVar[WorkContext] = contextvars.ContextVar("work_context", default=WorkContext())
+
+
+def get_work_context() -> WorkContext:
+    """Retorna o contexto de escalonamento atual"""
+    return _work_context.get()
+
+
+def set_work_context(priority: Optional[int] = None, tenant: Optional[str] = None,
+                     cost: Optional[float] = None) -> contextvars.Token:
+    """
+    Define o contexto de escalonamento para o restante da tarefa atual
+
+    Campos não informados mantêm o valor atual. Tarefas asyncio criadas a
+    partir daqui herdam o contexto.
+
+    Returns:
+        Token para restaurar o contexto anterior
+    """
+    current = _work_context.get()
+    return _work_context.set(WorkContext(
+        current.priority if priority is None else priority,
+        current.tenant if tenant is None else (tenant or DEFAULT_TENANT),
+        current.cost if cost is None else cost,
+    ))
+
+
+@contextmanager
+def work_context(priority: Optional[int] = None, tenant: Optional[str] = None,
+                 cost: Optional[float] = None) -> Iterator[WorkContext]:
+    """Define o contexto de escalonamento dentro de um bloco"""
+    token = set_work_context(priority, tenant, cost)
+    try:
+        yield _work_context.get()
+    finally:
+        _work_context.reset(token)
+
+
+def tenant_from_headers(headers: Mapping[str, str]) -> str:
+    """Identifica o tenant pelo header configurado (TENANT_HEADER)"""
+    from app.config import settings
+    tenant = headers.get(settings.tenant_header, "").strip()
+    return tenant[:64] or DEFAULT_TENANT
+
+
+def estimate_audio_seconds(data: bytes) -> float:
+    """
+    Estima a duração de um arquivo de áudio sem decodificá-lo
+
+    WAVs têm a duração lida do cabeçalho; para formatos comprimidos assume
+    ~128 kbit/s, o suficiente para ordenar os arquivos por tamanho.
+
+    Args:
+        data: Bytes do arquivo (ou ao menos do seu início, para WAV)
+
+    Returns:
+        Duração estimada em segundos
+    """
+    from app.audio.wav import parse_wav_header
+    info = parse_wav_header(data[:65536], partial=True)
+    if info is not None and info.sample_rate > 0 and info.channels > 0 and info.sample_width > 0:
+        data_size = info.data_size or max(len(data) - info.data_offset, 0)
+        return data_size / (info.sample_rate * info.channels * info.sample_width)
+    return len(data) / 16000
+
+
+class QueueTimeStats:
+    """Tempo de espera na fila por classe de prioridade (janela das últimas amostras)"""
+
+    def __init__(self, window: int = 1024):
+        self._lock = threading.Lock()
+        self._samples: Dict[int, Deque[float]] = {}
+        self._counts: Dict[int, int] = {}
+        self._window = window
+
+    def record(self, priority: int, seconds: float) -> None:
+        with self._lock:
+            self._samples.setdefault(priority, deque(maxlen=self._window)).append(seconds)
+            self._counts[priority] = self._counts.get(priority, 0) + 1
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """Percentis (ms) do tempo de fila de cada classe"""
+        with self._lock:
+            samples = {priority: sorted(values) for priority, values in self._samples.items()}
+            counts = dict(self._counts)
+        result = {}
+        for priority, values in sorted(samples.items()):
+            def percentile(q: float) -> float:
+                return round(values[min(len(values) - 1, int(q * len(values)))] * 1000, 2)
+            result[PRIORITY_NAMES.get(priority, str(priority))] = {
+                "count": counts[priority],
+                "p50_ms": percentile(0.5),
+                "p95_ms": percentile(0.95),
+                "p99_ms": percentile(0.99),
+                "max_ms": round(values[-1] * 1000, 2),
+            }
+        return result
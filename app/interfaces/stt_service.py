@@ -1,27 +1,150 @@
+import asyncio
 from abc import ABC, abstractmethod
-from typing import Generator, Optional, Dict
+from collections import deque
+from typing import AsyncGenerator, List, NamedTuple, Optional, Dict, Tuple
+
+import numpy as np
+
+from app.audio.ingest import SAMPLE_RATE, AudioInput, decode_speech_async
+from app.audio.segment import AudioSegment, plan_segments
+from app.config import settings
+from app.utils.tracing import span
+
+class TranscriptSegment(NamedTuple):
+    """Texto de um segmento, com sua posição (em segundos) no áudio original"""
+    start: float
+    end: float
+    text: str
+
+def join_segments(segments: List[TranscriptSegment]) -> str:
+    """Une os textos dos segmentos em uma única transcrição"""
+    return " ".join(segment.text.strip() for segment in segments if segment.text.strip())
+
+# Prefixo dos resultados parciais no protocolo de texto (v1) do streaming
+PARTIAL_PREFIX = "(parcial) "
+
+class StreamEvent(NamedTuple):
+    """Resultado de um chunk de streaming: parcial (pode mudar) ou final"""
+    text: str
+    final: bool
+
+class StreamSession(ABC):
+    """
+    Sessão de streaming de uma única conexão
+
+    A sessão é dona do seu estado (recognizer, buffers), enquanto o modelo
+    permanece no serviço e é compartilhado entre todas as sessões.
+    """
 
-class SpeechToTextService(ABC):
     @abstractmethod
-    async def transcribe_audio(self, audio_data: bytes, language: Optional[str] = None) -> str:
-        """Transcreve dados de áudio para texto"""
+    async def process_audio_stream(self, audio_chunk: bytes) -> AsyncGenerator[str, None]:
+        """Processa um chunk de áudio da sessão"""
         pass
-    
+
     @abstractmethod
-    async def start_stream(self) -> None:
-        """Inicia uma sessão de streaming"""
+    async def end_stream(self) -> str:
+        """Finaliza a sessão e retorna a transcrição restante"""
         pass
-    
+
+    async def process_audio_events(self, audio_chunk: bytes, partials: bool = True) -> AsyncGenerator[StreamEvent, None]:
+        """
+        Processa um chunk de áudio e emite resultados tipados
+
+        A implementação padrão adapta process_audio_stream, reconhecendo os
+        parciais pelo prefixo. Sessões podem sobrescrevê-la para nem calcular
+        o parcial quando `partials` for False.
+
+        Args:
+            audio_chunk: Chunk de áudio em bytes
+            partials: Se resultados parciais devem ser emitidos
+        """
+        async for text in self.process_audio_stream(audio_chunk):
+            if text.startswith(PARTIAL_PREFIX):
+                if partials:
+                    yield StreamEvent(text[len(PARTIAL_PREFIX):], False)
+            elif text:
+                yield StreamEvent(text, True)
+
+class SpeechToTextService(ABC):
     @abstractmethod
-    async def process_audio_stream(self, audio_chunk: bytes) -> Generator[str, None, None]:
-        """Processa streaming de áudio"""
+    async def transcribe_audio(self, audio_data: AudioInput, language: Optional[str] = None) -> str:
+        """
+        Transcreve dados de áudio para texto
+
+        Aceita o áudio já decodificado (float32 mono a 16 kHz, ver app.audio.ingest)
+        ou os bytes de um arquivo, que são decodificados em memória.
+        """
         pass
-    
+
+    async def transcribe_segments(self, audio_data: AudioInput, language: Optional[str] = None) -> List[TranscriptSegment]:
+        """
+        Transcreve um arquivo, dividindo áudios longos em segmentos paralelos
+
+        Áudios com `stt_long_audio_seconds` ou mais são cortados nas pausas
+        detectadas pelo VAD em segmentos de até `stt_segment_seconds` de fala,
+        transcritos até `stt_parallel_segments` por vez nos workers de
+        inferência. Áudios curtos viram um único segmento.
+
+        Args:
+            audio_data: Áudio decodificado (float32 a 16 kHz) ou bytes do arquivo
+            language: Código do idioma (opcional)
+
+        Returns:
+            Segmentos transcritos, na ordem do áudio (vazio se não houver fala)
+        """
+        if isinstance(audio_data, np.ndarray):
+            audio, regions = audio_data, None
+        else:
+            # Decodificação e VAD percorrem o arquivo inteiro: fora do event loop
+            audio, regions = await decode_speech_async(
+                audio_data, split_samples=int(settings.stt_long_audio_seconds * SAMPLE_RATE)
+            )
+
+        max_seconds = None
+        if len(audio) >= settings.stt_long_audio_seconds * SAMPLE_RATE:
+            max_seconds = settings.stt_segment_seconds
+        segments = plan_segments(audio, SAMPLE_RATE, max_seconds, regions)
+
+        window = max(1, settings.stt_parallel_segments)
+        pending: "deque[Tuple[AudioSegment, asyncio.Task]]" = deque()
+        results: List[TranscriptSegment] = []
+
+        async def transcribe(segment: AudioSegment) -> str:
+            with span("stt.segment", start_seconds=round(segment.start / SAMPLE_RATE, 2),
+                      end_seconds=round(segment.end / SAMPLE_RATE, 2)):
+                return await self.transcribe_segment(segment.extract(audio), language)
+
+        async def collect() -> None:
+            segment, task = pending.popleft()
+            results.append(TranscriptSegment(segment.start / SAMPLE_RATE, segment.end / SAMPLE_RATE, await task))
+
+        try:
+            for segment in segments:
+                task = asyncio.ensure_future(transcribe(segment))
+                pending.append((segment, task))
+                if len(pending) >= window:
+                    await collect()
+            while pending:
+                await collect()
+        finally:
+            for _, task in pending:
+                task.cancel()
+        return results
+
+    async def transcribe_segment(self, audio: np.ndarray, language: Optional[str] = None) -> str:
+        """
+        Transcreve um segmento de um áudio longo (já decodificado e sem silêncio)
+
+        Por padrão usa transcribe_audio; serviços podem sobrescrever para
+        distribuir os segmentos entre os workers de outra forma.
+        """
+        return await self.transcribe_audio(audio, language=language)
+
     @abstractmethod
-    async def end_stream(self) -> str:
-        """Finaliza a sessão de streaming e retorna a transcrição completa"""
+    async def start_stream(self) -> StreamSession:
+        """Inicia uma sessão de streaming independente sobre o modelo compartilhado"""
         pass
-    
+
     def get_debug_info(self) -> Dict[str, str]:
         """Retorna informações de debug do serviço (implementação opcional)"""
         return {
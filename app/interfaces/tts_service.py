@@ -1,5 +1,26 @@
+import asyncio
+import copy
 from abc import ABC, abstractmethod
-from typing import List, Dict
+from collections import deque
+from typing import AsyncIterator, Dict, Iterator, List
+
+from app.audio.concat import join_audio_segments, stream_audio_segments
+from app.config import settings
+from app.inference.executor import InferenceExecutor, get_executor
+from app.utils.text import split_sentences
+
+def get_tts_executor() -> InferenceExecutor:
+    """Executor dedicado à síntese, isolado dos executores de STT"""
+    return get_executor("tts", kind="thread", max_workers=settings.tts_workers)
+
+async def iterate_in_executor(executor: InferenceExecutor, iterator: Iterator[bytes]) -> AsyncIterator[bytes]:
+    """Consome um iterador bloqueante no executor, um item por tarefa"""
+    done = object()
+    while True:
+        item = await executor.run(next, iterator, done)
+        if item is done:
+            return
+        yield item
 
 class TextToSpeechService(ABC):
     @abstractmethod
@@ -22,6 +43,98 @@ class TextToSpeechService(ABC):
         """Define a voz a ser usada"""
         pass
     
+    def synthesize_stream(self, text: str) -> Iterator[bytes]:
+        """
+        Sintetiza o texto entregando o áudio em blocos, à medida que é produzido
+        
+        A implementação padrão sintetiza frase a frase, de modo que a primeira
+        frase pode ser reproduzida enquanto as seguintes ainda são geradas.
+        Serviços com streaming nativo devem sobrescrever este método.
+        """
+        return self.synthesize_long_stream(text)
+    
+    def synthesize_long(self, text: str) -> bytes:
+        """
+        Sintetiza um texto longo frase a frase, em paralelo, e junta o áudio em ordem
+        
+        Evita os limites de tamanho dos backends e faz a latência crescer com o
+        número de frases dividido pelo número de workers, e não linearmente.
+        """
+        return join_audio_segments(self._synthesize_sentences(text), self.get_media_type())
+    
+    def synthesize_long_stream(self, text: str) -> Iterator[bytes]:
+        """
+        Como synthesize_long, mas entrega cada frase assim que ela e as anteriores estão prontas
+        """
+        return stream_audio_segments(self._synthesize_sentences(text), self.get_media_type())
+    
+    def _synthesize_sentences(self, text: str) -> Iterator[bytes]:
+        sentences = split_sentences(text)
+        if len(sentences) <= 1:
+            return (self.synthesize(sentence) for sentence in sentences)
+        
+        executor = get_executor(
+            "tts-sentences", kind="thread",
+            max_workers=settings.tts_parallel_workers,
+            max_queue=settings.tts_parallel_workers * 4
+        )
+        return executor.map_ordered(self.synthesize, sentences, window=settings.tts_parallel_workers)
+    
+    async def synthesize_async(self, text: str) -> bytes:
+        """
+        Versão assíncrona de synthesize
+        
+        A implementação padrão executa synthesize no executor de TTS; serviços
+        com cliente assíncrono nativo devem sobrescrever este método.
+        """
+        return await get_tts_executor().run(self.synthesize, text)
+    
+    async def synthesize_long_async(self, text: str) -> bytes:
+        """Versão assíncrona de synthesize_long"""
+        return await get_tts_executor().run(self.synthesize_long, text)
+    
+    def synthesize_stream_async(self, text: str) -> AsyncIterator[bytes]:
+        """Versão assíncrona de synthesize_stream"""
+        return iterate_in_executor(get_tts_executor(), self.synthesize_stream(text))
+    
+    def synthesize_long_stream_async(self, text: str) -> AsyncIterator[bytes]:
+        """Versão assíncrona de synthesize_long_stream"""
+        return iterate_in_executor(get_tts_executor(), self.synthesize_long_stream(text))
+    
+    async def _synthesize_sentences_async(self, text: str) -> AsyncIterator[bytes]:
+        """
+        Sintetiza as frases com synthesize_async, no máximo `tts_parallel_workers`
+        por vez, entregando os áudios na ordem original
+        
+        Para serviços assíncronos nativos, que não precisam de threads para
+        sintetizar frases em paralelo.
+        """
+        window = max(1, settings.tts_parallel_workers)
+        pending: "deque[asyncio.Task]" = deque()
+        try:
+            for sentence in split_sentences(text):
+                pending.append(asyncio.ensure_future(self.synthesize_async(sentence)))
+                if len(pending) >= window:
+                    yield await pending.popleft()
+            while pending:
+                yield await pending.popleft()
+        finally:
+            for task in pending:
+                task.cancel()
+    
+    def get_media_type(self) -> str:
+        """Retorna o media type do áudio produzido por synthesize"""
+        return "audio/wav"
+    
+    def clone(self) -> "TextToSpeechService":
+        """
+        Retorna uma cópia leve do serviço para uso em uma única requisição
+
+        A cópia compartilha os recursos pesados (engine, clientes, configuração
+        do SDK) com a instância registrada, mas mantém voz e velocidade próprias.
+        """
+        return copy.copy(self)
+    
     def get_debug_info(self) -> Dict[str, str]:
         """Retorna informações de debug do serviço (implementação opcional)"""
         return {
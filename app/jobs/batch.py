@@ -0,0 +1,580 @@
+import asyncio
+import json
+import os
+import shutil
+import tarfile
+import threading
+import time
+import uuid
+import zipfile
+from typing import Any, BinaryIO, Callable, Dict, Iterator, List, Optional, Tuple
+
+from starlette.concurrency import run_in_threadpool
+
+from app.audio.ingest import start_ingest_stats
+from app.inference.executor import ExecutorSaturatedError
+from app.inference.scheduling import DEFAULT_TENANT, PRIORITY_BATCH, estimate_audio_seconds, set_work_context
+from app.interfaces.stt_service import SpeechToTextService, join_segments
+from app.utils.log import logger
+from app.utils.metrics import observe_audio
+
+# Estados de um job; os três últimos são finais
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_COMPLETED = "completed"
+JOB_CANCELLED = "cancelled"
+JOB_INTERRUPTED = "interrupted"
+FINAL_STATES = (JOB_COMPLETED, JOB_CANCELLED, JOB_INTERRUPTED)
+
+_ARCHIVE_SUFFIXES = (".zip", ".tar", ".tar.gz", ".tgz", ".tar.bz2", ".tar.xz")
+
+
+class JobQueueFullError(Exception):
+    """A fila de jobs não comporta os arquivos enviados"""
+
+    def __init__(self, queued: int, capacity: int, retry_after: int = 60):
+        self.retry_after = retry_after
+        super().__init__(f"Fila de jobs cheia ({queued}/{capacity} arquivos aguardando). "
+                         f"Tente novamente em {retry_after}s.")
+
+
+class JobTooLargeError(ValueError):
+    """Um arquivo (ou o job inteiro) excede o limite de bytes"""
+
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+class BatchJob:
+    """
+    Job de transcrição em lote, persistido em disco
+
+    Cada job tem um diretório com os arquivos de entrada (inputs/), o estado
+    (job.json) e os resultados (results.jsonl, uma linha por arquivo, na ordem
+    em que terminam). Um arquivo "cancel" no diretório pede o cancelamento ao
+    processo dono do job (ex.: DELETE recebido por outro worker do servidor).
+    """
+
+    def __init__(self, job_id: str, directory: str, files: List[str], language: Optional[str] = None,
+                 status: str = JOB_QUEUED, completed: int = 0, failed: int = 0,
+                 created_at: Optional[float] = None, started_at: Optional[float] = None,
+                 finished_at: Optional[float] = None, owner_pid: Optional[int] = None,
+                 tenant: str = DEFAULT_TENANT):
+        self.id = job_id
+        self.directory = directory
+        self.files = files
+        self.language = language
+        self.status = status
+        self.completed = completed
+        self.failed = failed
+        self.created_at = created_at or time.time()
+        self.started_at = started_at
+        self.finished_at = finished_at
+        self.owner_pid = owner_pid or os.getpid()
+        self.tenant = tenant
+        self._changed = asyncio.Event()
+        self._save_lock = threading.RLock()
+
+    @property
+    def inputs_dir(self) -> str:
+        return os.path.join(self.directory, "inputs")
+
+    @property
+    def results_path(self) -> str:
+        return os.path.join(self.directory, "results.jsonl")
+
+    @property
+    def cancel_path(self) -> str:
+        return os.path.join(self.directory, "cancel")
+
+    def input_path(self, index: int) -> str:
+        return os.path.join(self.inputs_dir, f"{index:06d}")
+
+    @property
+    def done(self) -> int:
+        return self.completed + self.failed
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Estado do job, no formato persistido e retornado pela API"""
+        total = len(self.files)
+        return {
+            "job_id": self.id,
+            "status": self.status,
+            "language": self.language,
+            "tenant": self.tenant,
+            "total": total,
+            "completed": self.completed,
+            "failed": self.failed,
+            "progress": round(self.done / total, 4) if total else 1.0,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "owner_pid": self.owner_pid,
+            "files": self.files,
+        }
+
+    def save(self) -> None:
+        """Grava job.json de forma atômica"""
+        with self._save_lock:
+            self._write(self.to_dict())
+
+    def save_progress(self) -> Dict[str, Any]:
+        """
+        Grava o progresso, concluindo o job se todos os arquivos terminaram (bloqueante)
+
+        O estado é lido e gravado sob o lock do job: arquivos que terminam em
+        threads diferentes nunca deixam em disco um estado mais antigo.
+
+        Returns:
+            Estado gravado
+        """
+        with self._save_lock:
+            state = self.to_dict()
+            if state["status"] not in FINAL_STATES and self.done == len(self.files):
+                state.update(status=JOB_COMPLETED, finished_at=time.time())
+            self._write(state)
+        return state
+
+    def _write(self, state: Dict[str, Any]) -> None:
+        path = os.path.join(self.directory, "job.json")
+        temp_path = f"{path}.{os.getpid()}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as target:
+            json.dump(state, target, ensure_ascii=False)
+        os.replace(temp_path, path)
+
+    def touch(self) -> None:
+        """Persiste o estado e acorda quem acompanha o progresso (no event loop)"""
+        self.save()
+        self.notify()
+
+    def notify(self) -> None:
+        """Acorda quem acompanha o progresso (no event loop)"""
+        self._changed.set()
+        self._changed = asyncio.Event()
+
+    async def wait_for_change(self, timeout: float) -> None:
+        try:
+            await asyncio.wait_for(self._changed.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+
+    @classmethod
+    def load(cls, directory: str) -> Optional["BatchJob"]:
+        """Lê um job do disco (ex.: criado por outro worker do servidor)"""
+        try:
+            with open(os.path.join(directory, "job.json"), encoding="utf-8") as state:
+                data = json.load(state)
+        except (OSError, ValueError):
+            return None
+        return cls(
+            data["job_id"], directory, data["files"], data.get("language"), data["status"],
+            data.get("completed", 0), data.get("failed", 0), data.get("created_at"),
+            data.get("started_at"), data.get("finished_at"), data.get("owner_pid"),
+            data.get("tenant", DEFAULT_TENANT)
+        )
+
+
+class BatchJobManager:
+    """
+    Fila de jobs de transcrição em lote com workers de concorrência limitada
+
+    Os arquivos de cada job são gravados em disco na submissão e processados
+    por `concurrency` workers assíncronos. A fila aceita no máximo
+    `max_queued_files` arquivos pendentes; acima disso a submissão falha com
+    JobQueueFullError. Para não competir com as requisições interativas, um
+    worker só começa um arquivo quando o executor de inferência do serviço tem
+    workers livres, e um executor saturado adia o arquivo em vez de falhar.
+    """
+
+    def __init__(self, root_dir: str, concurrency: int = 1, max_queued_files: int = 10000,
+                 max_files_per_job: int = 10000, max_file_bytes: int = 268435456,
+                 max_job_bytes: int = 4294967296, busy_backoff: float = 0.5, max_attempts: int = 3):
+        """
+        Inicializa o gerenciador (os workers só começam em start())
+
+        Args:
+            root_dir: Diretório onde os jobs são armazenados
+            concurrency: Arquivos processados simultaneamente
+            max_queued_files: Arquivos aguardando na fila, somando todos os jobs
+            max_files_per_job: Arquivos aceitos em um único job
+            max_file_bytes: Tamanho máximo de cada arquivo, já extraído do pacote
+            max_job_bytes: Tamanho máximo somando todos os arquivos de um job
+            busy_backoff: Espera (segundos) quando a inferência está ocupada
+            max_attempts: Tentativas por arquivo quando o executor está saturado
+        """
+        self.root_dir = root_dir
+        self.concurrency = max(1, concurrency)
+        self.max_queued_files = max(1, max_queued_files)
+        self.max_files_per_job = max(1, max_files_per_job)
+        self.max_file_bytes = max_file_bytes
+        self.max_job_bytes = max_job_bytes
+        self.busy_backoff = busy_backoff
+        self.max_attempts = max(1, max_attempts)
+
+        self._jobs: Dict[str, BatchJob] = {}
+        self._queue: Optional[asyncio.Queue] = None
+        self._workers: List[asyncio.Task] = []
+        self._service_provider: Optional[Callable[[], SpeechToTextService]] = None
+        self._counters = {"files_processed": 0, "files_failed": 0, "busy_waits": 0}
+
+    def start(self, service_provider: Callable[[], SpeechToTextService]) -> None:
+        """
+        Inicia os workers no event loop atual
+
+        Args:
+            service_provider: Função que retorna o serviço de STT a usar
+        """
+        if self._workers:
+            return
+        os.makedirs(self.root_dir, exist_ok=True)
+        self._service_provider = service_provider
+        self._queue = asyncio.Queue()
+        self._workers = [asyncio.ensure_future(self._worker()) for _ in range(self.concurrency)]
+
+    async def stop(self) -> None:
+        """Interrompe os workers; jobs não concluídos ficam como interrompidos"""
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+        for job in self._jobs.values():
+            if job.status not in FINAL_STATES:
+                job.status = JOB_INTERRUPTED
+                job.finished_at = time.time()
+                job.touch()
+
+    @property
+    def queued(self) -> int:
+        return self._queue.qsize() if self._queue is not None else 0
+
+    def _job_dir(self, job_id: str) -> str:
+        return os.path.join(self.root_dir, job_id)
+
+    def create_job(self, uploads: List[Tuple[str, BinaryIO]], language: Optional[str] = None,
+                   tenant: str = DEFAULT_TENANT) -> BatchJob:
+        """
+        Grava os arquivos enviados no diretório de um novo job (bloqueante)
+
+        Arquivos .zip e .tar(.gz) são extraídos: cada arquivo regular do
+        pacote vira um item do job.
+
+        Args:
+            uploads: Lista de (nome, arquivo aberto)
+            language: Código do idioma (opcional)
+            tenant: Tenant dono do job (cotas do escalonador de inferência)
+
+        Returns:
+            Job criado, ainda não enfileirado
+
+        Raises:
+            ValueError: Se não houver arquivos ou houver arquivos demais
+            JobTooLargeError: Se um arquivo ou o job exceder o limite de bytes
+        """
+        job_id = uuid.uuid4().hex
+        job = BatchJob(job_id, self._job_dir(job_id), [], language, tenant=tenant)
+        os.makedirs(job.inputs_dir)
+        job_bytes = 0
+        try:
+            for name, source in uploads:
+                if name.lower().endswith(_ARCHIVE_SUFFIXES):
+                    job_bytes = self._extract_archive(job, source, job_bytes)
+                else:
+                    job_bytes += self._add_file(job, name, source, job_bytes)
+            if not job.files:
+                raise ValueError("Nenhum arquivo de áudio enviado")
+        except Exception:
+            shutil.rmtree(job.directory, ignore_errors=True)
+            raise
+        job.save()
+        return job
+
+    def _add_file(self, job: BatchJob, name: str, source: BinaryIO, job_bytes: int,
+                  size: Optional[int] = None) -> int:
+        """
+        Grava um arquivo do job, interrompendo a cópia ao passar do limite
+
+        Args:
+            job: Job em criação
+            name: Nome do arquivo
+            source: Conteúdo do arquivo
+            job_bytes: Bytes já gravados no job
+            size: Tamanho declarado pelo pacote, verificado antes da cópia
+
+        Returns:
+            Bytes gravados
+        """
+        if len(job.files) >= self.max_files_per_job:
+            raise ValueError(f"Um job aceita no máximo {self.max_files_per_job} arquivos")
+        limit = min(self.max_file_bytes, self.max_job_bytes - job_bytes)
+        if size is not None and size > limit:
+            raise self._too_large(name, size, job_bytes)
+        written = 0
+        with open(job.input_path(len(job.files)), "wb") as target:
+            # O tamanho declarado pode ser falso: o limite vale para os bytes lidos
+            while True:
+                chunk = source.read(1024 * 1024)
+                if not chunk:
+                    break
+                written += len(chunk)
+                if written > limit:
+                    raise self._too_large(name, written, job_bytes)
+                target.write(chunk)
+        job.files.append(name)
+        return written
+
+    def _too_large(self, name: str, size: int, job_bytes: int) -> JobTooLargeError:
+        if size > self.max_file_bytes:
+            return JobTooLargeError(f"Arquivo '{name}' maior que o limite de {self.max_file_bytes} bytes")
+        return JobTooLargeError(f"Job maior que o limite de {self.max_job_bytes} bytes")
+
+    def _extract_archive(self, job: BatchJob, source: BinaryIO, job_bytes: int) -> int:
+        # Os nomes dos membros nunca viram caminhos: cada um é gravado como inputs/<índice>
+        if zipfile.is_zipfile(source):
+            source.seek(0)
+            with zipfile.ZipFile(source) as archive:
+                for member in archive.infolist():
+                    if not member.is_dir() and not os.path.basename(member.filename).startswith("."):
+                        with archive.open(member) as data:
+                            job_bytes += self._add_file(job, member.filename, data, job_bytes, member.file_size)
+            return job_bytes
+        source.seek(0)
+        try:
+            with tarfile.open(fileobj=source, mode="r:*") as archive:
+                for member in archive:
+                    if member.isfile() and not os.path.basename(member.name).startswith("."):
+                        job_bytes += self._add_file(job, member.name, archive.extractfile(member),
+                                                    job_bytes, member.size)
+        except tarfile.TarError as e:
+            raise ValueError(f"Pacote inválido: {str(e)}")
+        return job_bytes
+
+    def submit(self, job: BatchJob) -> None:
+        """
+        Enfileira todos os arquivos de um job
+
+        Raises:
+            JobQueueFullError: Se a fila não comportar os arquivos do job
+        """
+        if self._queue is None:
+            raise RuntimeError("Gerenciador de jobs não iniciado")
+        if self.queued + len(job.files) > self.max_queued_files:
+            shutil.rmtree(job.directory, ignore_errors=True)
+            raise JobQueueFullError(self.queued, self.max_queued_files)
+        self._jobs[job.id] = job
+        for index in range(len(job.files)):
+            self._queue.put_nowait((job.id, index))
+
+    def get_job(self, job_id: str) -> Optional[BatchJob]:
+        """
+        Retorna um job deste processo ou, se não estiver em memória, do disco
+
+        Jobs de outro worker do servidor que morreu antes de concluí-los são
+        reportados como interrompidos.
+        """
+        job = self._jobs.get(job_id)
+        if job is not None:
+            return job
+        if not job_id.isalnum():
+            return None
+        job = BatchJob.load(self._job_dir(job_id))
+        if job is not None and job.status not in FINAL_STATES and not _pid_alive(job.owner_pid):
+            job.status = JOB_INTERRUPTED
+        return job
+
+    def is_local(self, job: BatchJob) -> bool:
+        """Indica se o job é processado por este processo"""
+        return self._jobs.get(job.id) is job
+
+    def iter_results(self, job: BatchJob) -> Iterator[bytes]:
+        """Lê os resultados já gravados, linha a linha (bloqueante)"""
+        try:
+            with open(job.results_path, "rb") as results:
+                yield from results
+        except FileNotFoundError:
+            return
+
+    def cancel(self, job: BatchJob) -> None:
+        """Cancela um job: arquivos ainda na fila são descartados pelos workers (no event loop)"""
+        if job.status in FINAL_STATES:
+            return
+        job.status = JOB_CANCELLED
+        job.finished_at = time.time()
+        job.touch()
+
+    async def delete(self, job: BatchJob) -> None:
+        """
+        Cancela o job e remove seus arquivos e resultados do disco
+
+        O cancelamento acontece no event loop (acorda quem acompanha o job);
+        só a remoção do diretório vai para o threadpool.
+        """
+        self.cancel(job)
+        self._jobs.pop(job.id, None)
+        await run_in_threadpool(shutil.rmtree, job.directory, True)
+
+    def request_cancel(self, job: BatchJob) -> None:
+        """Pede o cancelamento ao processo dono de um job de outro worker (bloqueante)"""
+        try:
+            with open(job.cancel_path, "w"):
+                pass
+        except OSError:
+            pass
+
+    @staticmethod
+    def _cancel_requested(job: BatchJob) -> Optional[str]:
+        """
+        Verifica no disco se outro worker cancelou ou removeu o job (bloqueante)
+
+        Returns:
+            "deleted", "cancel" ou None
+        """
+        if not os.path.isdir(job.directory):
+            return "deleted"
+        if os.path.exists(job.cancel_path):
+            return "cancel"
+        return None
+
+    def _apply_cancel(self, job: BatchJob, reason: Optional[str]) -> bool:
+        """Aplica no event loop um cancelamento encontrado por _cancel_requested"""
+        if reason is None:
+            return False
+        if reason == "deleted":
+            # Removido do disco: não há mais onde gravar o estado
+            job.status = JOB_CANCELLED
+            job.finished_at = time.time()
+            self._jobs.pop(job.id, None)
+            job.notify()
+        else:
+            self.cancel(job)
+        return True
+
+    async def _cancelled_elsewhere(self, job: BatchJob) -> bool:
+        """
+        Aplica um cancelamento pedido por outro worker (arquivo "cancel" ou diretório removido)
+
+        Returns:
+            Se o job foi cancelado
+        """
+        return self._apply_cancel(job, await run_in_threadpool(self._cancel_requested, job))
+
+    def _inference_busy(self, service: SpeechToTextService) -> bool:
+        executor = getattr(service, "executor", None)
+        return executor is not None and executor.pending >= executor.max_workers
+
+    async def _worker(self) -> None:
+        while True:
+            job_id, index = await self._queue.get()
+            try:
+                job = self._jobs.get(job_id)
+                if job is not None and job.status not in FINAL_STATES and not await self._cancelled_elsewhere(job):
+                    await self._process(job, index)
+            except Exception as e:
+                logger.error("batch", "Erro ao processar arquivo", job=job_id, file=index, error=str(e))
+            finally:
+                self._queue.task_done()
+
+    async def _process(self, job: BatchJob, index: int) -> None:
+        if job.status == JOB_QUEUED:
+            job.status = JOB_RUNNING
+            job.started_at = time.time()
+            await run_in_threadpool(job.save)
+            job.notify()
+
+        start_time = time.perf_counter()
+        result: Dict[str, Any] = {"index": index, "file": job.files[index]}
+        try:
+            service = self._service_provider()
+            audio_data = await run_in_threadpool(self._read_input, job.input_path(index))
+            # Lote tem a menor prioridade no executor; arquivos curtos passam à frente
+            set_work_context(PRIORITY_BATCH, job.tenant, estimate_audio_seconds(audio_data))
+            for attempt in range(self.max_attempts):
+                # Requisições interativas têm prioridade sobre o lote; o cancelamento
+                # (inclusive por outro worker) é verificado logo antes da inferência
+                while True:
+                    if job.status in FINAL_STATES or await self._cancelled_elsewhere(job):
+                        return
+                    if not self._inference_busy(service):
+                        break
+                    self._counters["busy_waits"] += 1
+                    await asyncio.sleep(self.busy_backoff)
+                try:
+                    ingest_stats = start_ingest_stats()
+                    inference_started = time.perf_counter()
+                    segments = await service.transcribe_segments(audio_data, language=job.language)
+                    debug_info = getattr(service, "get_debug_info", lambda: {})() or {}
+                    observe_audio(debug_info.get("service_type", type(service).__name__), debug_info.get("model", ""),
+                                  ingest_stats.audio_seconds, "batch", time.perf_counter() - inference_started)
+                    break
+                except ExecutorSaturatedError:
+                    if attempt + 1 == self.max_attempts:
+                        raise
+                    await asyncio.sleep(self.busy_backoff * (attempt + 1))
+            result.update({"status": "ok", "transcript": join_segments(segments)})
+            job.completed += 1
+            self._counters["files_processed"] += 1
+        except Exception as e:
+            result.update({"status": "error", "error": str(e)})
+            job.failed += 1
+            self._counters["files_failed"] += 1
+        result["processing_ms"] = round((time.perf_counter() - start_time) * 1000, 2)
+
+        if job.status in FINAL_STATES:
+            return
+        reason, state = await run_in_threadpool(self._persist_result, job, index, result)
+        if self._apply_cancel(job, reason) or job.status in FINAL_STATES:
+            # Cancelado durante o processamento: o resultado é descartado
+            return
+        if state["status"] == JOB_COMPLETED:
+            job.status, job.finished_at = state["status"], state["finished_at"]
+        job.notify()
+
+    def _persist_result(self, job: BatchJob, index: int,
+                        result: Dict[str, Any]) -> Tuple[Optional[str], Optional[Dict[str, Any]]]:
+        """
+        Grava o resultado de um arquivo e o estado do job (bloqueante)
+
+        Verificação do cancelamento, resultado, remoção da entrada e job.json
+        vão juntos em uma única chamada ao threadpool.
+
+        Returns:
+            Motivo do cancelamento por outro worker (ver _cancel_requested), se
+            houver, e o estado gravado
+        """
+        reason = self._cancel_requested(job)
+        if reason is not None:
+            return reason, None
+        try:
+            with open(job.results_path, "a", encoding="utf-8") as results:
+                results.write(json.dumps(result, ensure_ascii=False) + "\n")
+            try:
+                os.remove(job.input_path(index))
+            except OSError:
+                pass
+            state = job.save_progress()
+        except FileNotFoundError:
+            # Diretório removido entre a verificação e a escrita
+            return "deleted", None
+        return None, state
+
+    @staticmethod
+    def _read_input(path: str) -> bytes:
+        with open(path, "rb") as source:
+            return source.read()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Retorna a ocupação da fila e os contadores do processo"""
+        active = [job for job in self._jobs.values() if job.status not in FINAL_STATES]
+        return {
+            "workers": len(self._workers),
+            "queued_files": self.queued,
+            "max_queued_files": self.max_queued_files,
+            "active_jobs": len(active),
+            **self._counters,
+        }
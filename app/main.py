@@ -1,16 +1,52 @@
+import os
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 import uvicorn
 
 from app.config import settings
-from app.routes import speech
+from app.dependencies import get_job_manager, get_stt_service, get_tts_cache, warm_up_services
+from app.inference.executor import get_executor_stats, shutdown_executors
+from app.registry.model_registry import registry
+from app.utils.memory import get_memory_info
+from app.utils.http_client import close_http_clients, get_http_stats
+from app.utils.log import logger
+from app.utils.metrics import Counter, Gauge, metrics_registry
+from app.utils.tracing import ServerTimingMiddleware, get_trace_exporter
+from app.audio.ingest import get_ffmpeg_decoder
+from app.audio.vad import get_vad_stats
+from app.routes import jobs, speech
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Ciclo de vida da aplicação: carrega os modelos uma única vez na inicialização
+    """
+    if settings.preload_models:
+        warm_up_services()
+    # Processos ffmpeg de reserva são criados em cada worker, nunca herdados
+    get_ffmpeg_decoder().warm_up()
+    get_job_manager().start(get_stt_service)
+    yield
+    await get_job_manager().stop()
+    get_ffmpeg_decoder().close()
+    await close_http_clients()
+    shutdown_executors()
+    registry.clear()
+    exporter = get_trace_exporter()
+    if exporter is not None:
+        exporter.flush()
+    logger.flush()
 
 # Criar aplicação FastAPI
 app = FastAPI(
     title=settings.app_name,
     description=settings.app_description,
     version="0.1.0",
+    lifespan=lifespan,
 )
 
 # Configurar CORS
@@ -20,10 +56,15 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["Server-Timing"],
 )
 
+# Tracing por requisição: header Server-Timing e exportação opcional dos traces
+app.add_middleware(ServerTimingMiddleware)
+
 # Incluir router
 app.include_router(speech.router)
+app.include_router(jobs.router)
 
 # Servir arquivos estáticos (para frontend demo)
 app.mount("/static", StaticFiles(directory="static"), name="static")
@@ -48,6 +89,112 @@ async def health_check():
     """
     return {"status": "ok"}
 
+# Modelos carregados
+@app.get("/health/models")
+async def models_health():
+    """
+    Lista os modelos carregados com tempo de carga e memória de cada um
+    """
+    return {"models": registry.get_stats()}
+
+# Memória do processo
+@app.get("/health/memory")
+async def memory_health():
+    """
+    Memória do worker atual, incluindo páginas compartilhadas com o processo mestre
+    """
+    return {"pid": os.getpid(), "memory": get_memory_info()}
+
+# Ocupação dos executores de inferência
+@app.get("/health/executors")
+async def executors_health():
+    """
+    Lista os executores de inferência com workers, fila, tarefas por tenant e tempo de fila por prioridade
+    """
+    return {"executors": get_executor_stats()}
+
+@app.get("/health/http")
+async def http_health():
+    """
+    Mostra o estado do cliente HTTP compartilhado e do orçamento de novas tentativas
+    """
+    return get_http_stats()
+
+@app.get("/health/jobs")
+async def jobs_health():
+    """
+    Mostra a fila de jobs de transcrição em lote deste processo
+    """
+    return get_job_manager().get_stats()
+
+@app.get("/health/vad")
+async def vad_health():
+    """
+    Mostra quanto áudio o VAD analisou e quanto silêncio deixou de ir à inferência
+    """
+    return {"enabled": settings.vad_enabled, **get_vad_stats()}
+
+def _collect_runtime_metrics():
+    """Métricas lidas das estatísticas dos componentes no momento da coleta"""
+    queue_depth = Gauge("speech_executor_queue_depth", "Tarefas aguardando worker em cada executor", ("executor",))
+    running = Gauge("speech_executor_running", "Tarefas em execução em cada executor", ("executor",))
+    for stats in get_executor_stats():
+        queue_depth.set(stats["queued"], executor=stats["name"])
+        running.set(stats["running"], executor=stats["name"])
+    yield queue_depth
+    yield running
+
+    tts_cache = get_tts_cache()
+    if tts_cache is not None:
+        stats = tts_cache.get_stats()
+        lookups = Counter("speech_tts_cache_lookups_total", "Consultas ao cache de TTS por resultado", ("result",))
+        lookups.inc(stats["hits_memory"], result="hit_memory")
+        lookups.inc(stats["hits_disk"], result="hit_disk")
+        lookups.inc(stats["misses"], result="miss")
+        hit_ratio = Gauge("speech_tts_cache_hit_ratio", "Fração das consultas ao cache de TTS atendidas")
+        hit_ratio.set(stats["hit_ratio"])
+        yield lookups
+        yield hit_ratio
+
+    queued_files = Gauge("speech_batch_queued_files", "Arquivos de jobs em lote aguardando processamento")
+    queued_files.set(get_job_manager().queued)
+    yield queued_files
+
+    vad_stats = get_vad_stats()
+    vad_skipped = Counter("speech_vad_skipped_seconds_total", "Segundos de silêncio descartados pelo VAD")
+    vad_skipped.inc(vad_stats["skipped_seconds"])
+    yield vad_skipped
+
+    log_stats = logger.get_stats()
+    log_records = Counter("speech_log_records_total", "Registros de log por destino", ("result",))
+    log_records.inc(log_stats["written"], result="written")
+    log_records.inc(log_stats["dropped"], result="dropped")
+    log_records.inc(log_stats["sampled_out"], result="sampled_out")
+    log_queue = Gauge("speech_log_queue_depth", "Registros de log aguardando a thread de escrita")
+    log_queue.set(log_stats["queued"])
+    yield log_records
+    yield log_queue
+
+    exporter = get_trace_exporter()
+    if exporter is not None:
+        trace_stats = exporter.get_stats()
+        traces = Counter("speech_trace_exports_total", "Traces de requisições por destino", ("result",))
+        traces.inc(trace_stats["exported"], result="exported")
+        traces.inc(trace_stats["dropped"], result="dropped")
+        yield traces
+
+metrics_registry.add_collector(_collect_runtime_metrics)
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    """
+    Métricas do processo no formato texto do Prometheus
+
+    Com vários workers (pre-fork), cada processo responde pelas próprias
+    métricas; o Prometheus deve coletar cada worker ou somar as séries.
+    """
+    return PlainTextResponse(metrics_registry.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
 if __name__ == "__main__":
     # Iniciar servidor quando executado diretamente
     uvicorn.run(
@@ -0,0 +1,103 @@
+import threading
+import time
+import datetime
+from typing import Any, Callable, Dict, List, Tuple
+
+from app.interfaces.stt_service import SpeechToTextService
+from app.interfaces.tts_service import TextToSpeechService
+from app.factories.service_factory import ServiceFactory
+from app.utils.memory import get_rss_bytes
+
+
+class ModelRegistry:
+    """
+    Registro de serviços STT/TTS compartilhados pelo processo
+
+    Cada combinação de tipo de serviço e parâmetros é construída uma única vez
+    (carregando o modelo Vosk/Whisper, a engine espeak ou a configuração do SDK)
+    e a mesma instância aquecida é entregue a todas as requisições. O tempo de
+    carga e o crescimento de memória de cada modelo ficam registrados.
+    """
+
+    def __init__(self):
+        self._services: Dict[Tuple, Any] = {}
+        self._stats: Dict[Tuple, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _make_key(kind: str, service_type: str, kwargs: Dict[str, Any]) -> Tuple:
+        """Monta uma chave estável a partir do tipo de serviço e seus parâmetros"""
+        return (kind, service_type, tuple(sorted((k, repr(v)) for k, v in kwargs.items())))
+
+    def get_stt_service(self, service_type: str, **kwargs) -> SpeechToTextService:
+        """
+        Retorna o serviço de STT compartilhado, carregando-o na primeira chamada
+
+        Args:
+            service_type: Tipo de serviço ('vosk', 'whisper', etc)
+            **kwargs: Argumentos repassados ao ServiceFactory
+
+        Returns:
+            Instância compartilhada de SpeechToTextService
+        """
+        return self._get_or_load("stt", service_type, kwargs, ServiceFactory.get_stt_service)
+
+    def get_tts_service(self, service_type: str, **kwargs) -> TextToSpeechService:
+        """
+        Retorna o serviço de TTS compartilhado, carregando-o na primeira chamada
+
+        Args:
+            service_type: Tipo de serviço ('pyttsx3', 'gtts', 'azure', etc)
+            **kwargs: Argumentos repassados ao ServiceFactory
+
+        Returns:
+            Instância compartilhada de TextToSpeechService
+        """
+        return self._get_or_load("tts", service_type, kwargs, ServiceFactory.get_tts_service)
+
+    def _get_or_load(self, kind: str, service_type: str, kwargs: Dict[str, Any],
+                     builder: Callable[..., Any]) -> Any:
+        key = self._make_key(kind, service_type, kwargs)
+        service = self._services.get(key)
+        if service is not None:
+            return service
+
+        # Cargas são serializadas para evitar modelos duplicados e picos de memória
+        with self._lock:
+            service = self._services.get(key)
+            if service is None:
+                rss_before = get_rss_bytes()
+                start = time.perf_counter()
+                service = builder(service_type=service_type, **kwargs)
+                load_time_ms = (time.perf_counter() - start) * 1000
+                rss_after = get_rss_bytes()
+
+                self._stats[key] = {
+                    "kind": kind,
+                    "service_type": service_type,
+                    "class": type(service).__name__,
+                    "load_time_ms": round(load_time_ms, 2),
+                    "memory_bytes": max(rss_after - rss_before, 0),
+                    "loaded_at": datetime.datetime.now().isoformat(),
+                }
+                self._services[key] = service
+        return service
+
+    def get_stats(self) -> List[Dict[str, Any]]:
+        """
+        Retorna tempo de carga e memória de cada modelo registrado
+
+        Returns:
+            Lista com um dicionário por serviço carregado
+        """
+        return [dict(stats) for stats in self._stats.values()]
+
+    def clear(self) -> None:
+        """Descarta todas as instâncias registradas"""
+        with self._lock:
+            self._services.clear()
+            self._stats.clear()
+
+
+# Instância global do registro
+registry = ModelRegistry()
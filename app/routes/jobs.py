@@ -0,0 +1,139 @@
+import json
+from typing import AsyncIterator, List, Optional
+
+from fastapi import APIRouter, Depends, File, HTTPException, Query, Request, UploadFile
+from fastapi.responses import JSONResponse, StreamingResponse
+from starlette.concurrency import iterate_in_threadpool, run_in_threadpool
+
+from app.dependencies import get_job_manager
+from app.inference.scheduling import tenant_from_headers
+from app.jobs.batch import FINAL_STATES, BatchJob, BatchJobManager, JobQueueFullError, JobTooLargeError
+from app.utils.log import logger
+
+router = APIRouter(
+    prefix="/speech",
+    tags=["batch-jobs"],
+    responses={404: {"description": "Not found"}},
+)
+
+# Intervalo entre eventos de progresso de jobs de outro processo (lidos do disco)
+_REMOTE_POLL_SECONDS = 1.0
+
+def _get_job_or_404(manager: BatchJobManager, job_id: str) -> BatchJob:
+    job = manager.get_job(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job '{job_id}' não encontrado")
+    return job
+
+def _summary(job: BatchJob) -> dict:
+    summary = job.to_dict()
+    # A lista de arquivos pode ser enorme: fica disponível nos resultados
+    summary.pop("files")
+    summary.pop("owner_pid")
+    return summary
+
+@router.post("/stt/jobs", status_code=202)
+async def create_transcription_job(
+    request: Request,
+    files: List[UploadFile] = File(..., description="Arquivos de áudio ou pacotes .zip/.tar(.gz)"),
+    language: Optional[str] = Query(None, description="Código do idioma (2 letras): en, es, pt, etc."),
+    manager: BatchJobManager = Depends(get_job_manager)
+):
+    """
+    Cria um job de transcrição em lote
+
+    Os arquivos são gravados em disco e processados em segundo plano pela fila
+    de jobs, sem ocupar a conexão. Acompanhe o progresso em
+    /speech/stt/jobs/{job_id} ou /speech/stt/jobs/{job_id}/events e leia os
+    resultados em /speech/stt/jobs/{job_id}/results.
+
+    Args:
+        request: Requisição (o tenant vem do header TENANT_HEADER)
+        files: Arquivos de áudio e/ou pacotes com arquivos de áudio
+        language: Código do idioma (opcional)
+        manager: Gerenciador de jobs (injetado)
+
+    Returns:
+        JSON com o id e o estado do job (202)
+    """
+    uploads = [(upload.filename or f"arquivo-{index}", upload.file) for index, upload in enumerate(files)]
+    try:
+        job = await run_in_threadpool(manager.create_job, uploads, language, tenant_from_headers(request.headers))
+        manager.submit(job)
+    except JobTooLargeError as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except JobQueueFullError as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": str(e.retry_after)})
+
+    logger.info("batch", "Job criado", job=job.id, files=len(job.files), queued_files=manager.queued)
+    return JSONResponse(
+        status_code=202,
+        content=_summary(job),
+        headers={"Location": f"/speech/stt/jobs/{job.id}"}
+    )
+
+@router.get("/stt/jobs/{job_id}")
+async def get_transcription_job(job_id: str, manager: BatchJobManager = Depends(get_job_manager)):
+    """
+    Retorna o estado e o progresso de um job
+    """
+    return _summary(_get_job_or_404(manager, job_id))
+
+@router.get("/stt/jobs/{job_id}/events")
+async def stream_transcription_job(job_id: str, manager: BatchJobManager = Depends(get_job_manager)):
+    """
+    Acompanha um job em NDJSON: uma linha com o estado a cada arquivo concluído, até o fim do job
+    """
+    job = _get_job_or_404(manager, job_id)
+
+    async def events() -> AsyncIterator[bytes]:
+        current = job
+        last_done = -1
+        while True:
+            if current.done != last_done or current.status in FINAL_STATES:
+                last_done = current.done
+                yield (json.dumps(_summary(current), ensure_ascii=False) + "\n").encode("utf-8")
+            if current.status in FINAL_STATES:
+                return
+            if manager.is_local(current):
+                await current.wait_for_change(timeout=15.0)
+            else:
+                await current.wait_for_change(timeout=_REMOTE_POLL_SECONDS)
+                current = manager.get_job(job_id) or current
+
+    return StreamingResponse(events(), media_type="application/x-ndjson")
+
+@router.get("/stt/jobs/{job_id}/results")
+async def get_transcription_job_results(job_id: str, manager: BatchJobManager = Depends(get_job_manager)):
+    """
+    Retorna os resultados já concluídos de um job em NDJSON (um arquivo por linha)
+    """
+    job = _get_job_or_404(manager, job_id)
+    return StreamingResponse(
+        iterate_in_threadpool(manager.iter_results(job)),
+        media_type="application/x-ndjson",
+        headers={"X-Job-Status": job.status}
+    )
+
+@router.delete("/stt/jobs/{job_id}")
+async def delete_transcription_job(job_id: str, manager: BatchJobManager = Depends(get_job_manager)):
+    """
+    Cancela um job e remove seus arquivos e resultados do disco
+
+    Um job em andamento em outro worker do servidor não é removido daqui: o
+    cancelamento é pedido ao worker dono e a resposta é 409, até o job ficar
+    cancelado e poder ser removido.
+    """
+    job = _get_job_or_404(manager, job_id)
+    if not manager.is_local(job) and job.status not in FINAL_STATES:
+        await run_in_threadpool(manager.request_cancel, job)
+        raise HTTPException(
+            status_code=409,
+            detail=f"Job '{job_id}' em processamento por outro worker; cancelamento solicitado, "
+                   f"repita o DELETE em instantes",
+            headers={"Retry-After": "1"}
+        )
+    await manager.delete(job)
+    return {"job_id": job_id, "status": "deleted"}
@@ -1,14 +1,27 @@
-from fastapi import APIRouter, Depends, WebSocket, UploadFile, File, HTTPException, Response, Query
-from fastapi.responses import JSONResponse, FileResponse
+from fastapi import APIRouter, Depends, Request, WebSocket, WebSocketDisconnect, UploadFile, File, HTTPException, Response, Query
+from fastapi.responses import JSONResponse, StreamingResponse
+from starlette.concurrency import run_in_threadpool
 from pydantic import BaseModel
-import tempfile
-import os
-from typing import List, Optional, Dict, Any
+from typing import AsyncIterator, List, Optional, Dict, Any, Tuple
 import datetime
+import json
+import time
 
-from app.interfaces.stt_service import SpeechToTextService
+from app.interfaces.stt_service import SpeechToTextService, StreamEvent, join_segments
 from app.interfaces.tts_service import TextToSpeechService
-from app.dependencies import get_stt_service, get_tts_service
+from app.config import settings
+from app.dependencies import get_stt_service, get_tts_service, get_tts_cache
+from app.cache.tts_cache import TTSCache
+from app.audio.wav import WavInfo, fix_wav_header, parse_wav_header
+from app.audio.ingest import SAMPLE_RATE, AudioDecodeError, PCMStreamNormalizer, start_ingest_stats
+from app.inference.executor import ExecutorSaturatedError, TaskTimings, start_task_timings
+from app.inference.scheduling import (
+    PRIORITY_INTERACTIVE, PRIORITY_LIVE, estimate_audio_seconds, set_work_context, tenant_from_headers
+)
+from app.utils.log import logger
+from app.utils.metrics import TTS_CHARACTERS, WEBSOCKET_SESSIONS, observe_audio, observe_request
+from app.utils.stream_protocol import StreamProtocol
+from app.utils.tracing import get_current_span, record_span, span
 
 router = APIRouter(
     prefix="/speech",
@@ -16,9 +29,30 @@ router = APIRouter(
     responses={404: {"description": "Not found"}},
 )
 
+def _metric_labels(service: Any) -> Tuple[str, str]:
+    """Backend e modelo de um serviço, como rótulos das métricas"""
+    debug_info_dict = getattr(service, 'get_debug_info', lambda: {})() or {}
+    return debug_info_dict.get('service_type', type(service).__name__), debug_info_dict.get('model', '')
+
+def _inference_stages(elapsed: float, timings: TaskTimings, decode: Optional[float] = None) -> Dict[str, float]:
+    """
+    Divide o tempo de inferência de uma requisição em fila e execução
+    
+    Com executor, usa os tempos medidos nas tarefas (somados, se houve
+    tarefas em paralelo); serviços remotos (HTTP) não passam por executor e
+    têm como inferência todo o tempo que não foi decodificação.
+    """
+    stages = {} if decode is None else {"decode": decode}
+    if timings.tasks:
+        stages.update({"queue": timings.queue_seconds, "inference": timings.run_seconds})
+    else:
+        stages["inference"] = max(elapsed - (decode or 0.0), 0.0)
+    return stages
+
 # STT endpoints
 @router.post("/stt")
 async def transcribe_audio(
+    request: Request,
     audio: UploadFile = File(...),
     language: Optional[str] = Query(None, description="Código do idioma (2 letras): en, es, pt, etc."),
     stt_service: SpeechToTextService = Depends(get_stt_service)
@@ -27,6 +61,7 @@ async def transcribe_audio(
     Endpoint para transcrever um arquivo de áudio
     
     Args:
+        request: Requisição (o tenant vem do header TENANT_HEADER)
         audio: Arquivo de áudio a ser transcrito
         language: Código do idioma (2 letras): en, es, pt, etc. (opcional)
         stt_service: Serviço de STT (injetado)
@@ -35,15 +70,29 @@ async def transcribe_audio(
         JSON com a transcrição (debug info nos headers)
     """
     start_time = datetime.datetime.now()
+    start_counter = time.perf_counter()
+    backend, model = _metric_labels(stt_service)
     
     try:
-        audio_data = await audio.read()
-        transcript = await stt_service.transcribe_audio(audio_data, language=language)
+        with span("audio.read") as read_span:
+            audio_data = await audio.read()
+            if read_span is not None:
+                read_span.set_attribute("audio.bytes", len(audio_data))
+        # Arquivos curtos passam à frente dos longos na fila do executor
+        set_work_context(PRIORITY_INTERACTIVE, tenant_from_headers(request.headers),
+                         estimate_audio_seconds(audio_data))
+        ingest_stats = start_ingest_stats()
+        task_timings = start_task_timings()
+        inference_started = time.perf_counter()
+        with span("stt.transcribe", backend=backend, model=model):
+            segments = await stt_service.transcribe_segments(audio_data, language=language)
+        inference_elapsed = time.perf_counter() - inference_started
+        transcript = join_segments(segments)
         
         # Obter informações de debug do serviço
         debug_info_dict = getattr(stt_service, 'get_debug_info', lambda: {})() or {}
         
-        processing_time = (datetime.datetime.now() - start_time).total_seconds() * 1000
+        processing_time = (time.perf_counter() - start_counter) * 1000
         
         # Preparar headers de debug
         debug_headers = {
@@ -53,27 +102,203 @@ async def transcribe_audio(
             "X-Debug-Timestamp": start_time.isoformat(),
             "X-Debug-Processing-Time-Ms": str(round(processing_time, 2)),
             "X-Debug-Audio-Size-Bytes": str(len(audio_data)),
-            "X-Debug-Transcript-Length": str(len(transcript))
+            "X-Debug-Transcript-Length": str(len(transcript)),
+            "X-Debug-Segments": str(len(segments)),
+            **ingest_stats.to_headers()
         }
         
         # Log para monitoramento
-        print(f"[STT DEBUG] Service: {debug_headers['X-Debug-Service-Type']}, Model: {debug_headers['X-Debug-Model']}, "
-              f"Language: {debug_headers['X-Debug-Language']}, Processing time: {processing_time:.2f}ms, "
-              f"Audio size: {len(audio_data)} bytes, Transcript length: {len(transcript)}")
+        logger.info("stt.request", "Transcrição concluída",
+                    service=debug_headers['X-Debug-Service-Type'], model=debug_headers['X-Debug-Model'],
+                    language=debug_headers['X-Debug-Language'], processing_ms=processing_time,
+                    audio_bytes=len(audio_data), transcript_length=len(transcript), segments=len(segments),
+                    resample=debug_headers.get('X-Debug-Resample', 'n/a'), resample_ms=ingest_stats.resample_ms)
         
-        response_data = {"success": True, "transcript": transcript}
+        serialization_started = time.perf_counter()
+        with span("response.serialize"):
+            response_data = {"success": True, "transcript": transcript}
+            if len(segments) > 1:
+                # Áudio longo: informa a posição de cada segmento no original
+                response_data["segments"] = [
+                    {"start": round(segment.start, 2), "end": round(segment.end, 2), "text": segment.text.strip()}
+                    for segment in segments
+                ]
+            
+            response = JSONResponse(
+                content=response_data,
+                headers=debug_headers
+            )
+        finished = time.perf_counter()
+        decode_seconds = (ingest_stats.decode_ms + ingest_stats.resample_ms + ingest_stats.vad_ms) / 1000
+        observe_request("stt", backend, model, {
+            **_inference_stages(inference_elapsed, task_timings, decode_seconds),
+            "serialization": finished - serialization_started,
+            "total": finished - start_counter,
+        })
+        observe_audio(backend, model, ingest_stats.audio_seconds, "file", inference_elapsed)
+        return response
         
-        return JSONResponse(
-            content=response_data,
-            headers=debug_headers
+    except AudioDecodeError as e:
+        observe_request("stt", backend, model, {}, status="invalid")
+        logger.warning("stt.request", "Áudio inválido", service=type(stt_service).__name__, error=str(e))
+        raise HTTPException(status_code=400, detail=f"Áudio inválido: {str(e)}")
+    except ExecutorSaturatedError as e:
+        observe_request("stt", backend, model, {}, status="busy")
+        logger.warning("stt.request", "Executor saturado", service=type(stt_service).__name__, error=str(e))
+        raise HTTPException(
+            status_code=503,
+            detail=str(e),
+            headers={"Retry-After": str(e.retry_after)}
         )
-        
     except Exception as e:
-        processing_time = (datetime.datetime.now() - start_time).total_seconds() * 1000
-        print(f"[STT ERROR] Service: {type(stt_service).__name__}, Error: {str(e)}, "
-              f"Processing time: {processing_time:.2f}ms")
+        observe_request("stt", backend, model, {}, status="error")
+        processing_time = (time.perf_counter() - start_counter) * 1000
+        logger.error("stt.request", "Erro ao transcrever", service=type(stt_service).__name__, error=str(e),
+                     processing_ms=processing_time)
         raise HTTPException(status_code=500, detail=f"Erro ao processar áudio: {str(e)}")
 
+# Bytes lidos do início do corpo à procura do chunk de dados do WAV
+_WAV_HEADER_SEARCH_BYTES = 65536
+
+async def _read_wav_header(body: AsyncIterator[bytes]) -> Tuple[WavInfo, bytes]:
+    """
+    Lê do corpo apenas o necessário para interpretar o cabeçalho WAV
+    
+    Returns:
+        Tupla (formato, bytes já lidos)
+        
+    Raises:
+        HTTPException: 415 se o corpo não for um WAV PCM
+    """
+    head = b""
+    async for chunk in body:
+        head += chunk
+        info = parse_wav_header(head, partial=True)
+        if info is not None:
+            return info, head
+        if len(head) >= _WAV_HEADER_SEARCH_BYTES or (len(head) >= 12 and head[:4] != b"RIFF"):
+            break
+    raise HTTPException(status_code=415, detail="A transcrição incremental aceita apenas WAV PCM; use /speech/stt para outros formatos")
+
+def _ndjson(message: Dict[str, Any]) -> bytes:
+    return (json.dumps(message, ensure_ascii=False) + "\n").encode("utf-8")
+
+@router.post("/stt/incremental")
+async def transcribe_audio_incremental(
+    request: Request,
+    stt_service: SpeechToTextService = Depends(get_stt_service)
+):
+    """
+    Transcreve um WAV enviado no corpo da requisição, à medida que ele chega
+    
+    O corpo (WAV bruto, não multipart) é repassado em partes a uma sessão de
+    streaming do serviço, com memória constante. Os limites de tamanho e
+    duração são verificados pelo Content-Length e pelo cabeçalho WAV antes de
+    qualquer inferência. A resposta é NDJSON: uma linha {"type": "segment"}
+    por trecho confirmado, enquanto o upload continua, e uma linha final
+    {"type": "final"} com a transcrição completa (ou {"type": "error"}).
+    
+    Args:
+        request: Requisição com o WAV no corpo
+        stt_service: Serviço de STT (injetado)
+        
+    Returns:
+        Resposta NDJSON em streaming
+    """
+    max_bytes = settings.stt_incremental_max_bytes
+    max_seconds = settings.stt_incremental_max_seconds
+    
+    content_length = request.headers.get("content-length")
+    if content_length and content_length.isdigit() and int(content_length) > max_bytes:
+        raise HTTPException(status_code=413, detail=f"Áudio maior que o limite de {max_bytes} bytes")
+    
+    body = request.stream()
+    info, head = await _read_wav_header(body)
+    try:
+        normalizer = PCMStreamNormalizer(info)
+    except AudioDecodeError as e:
+        raise HTTPException(status_code=415, detail=str(e))
+    if info.data_size:
+        declared_seconds = info.data_size / (normalizer.frame_bytes * info.sample_rate)
+        if info.data_offset + info.data_size > max_bytes or declared_seconds > max_seconds:
+            raise HTTPException(
+                status_code=413,
+                detail=f"Áudio de {declared_seconds:.0f}s excede o limite de {max_seconds:.0f}s ou de {max_bytes} bytes"
+            )
+    
+    async def pcm_chunks() -> AsyncIterator[bytes]:
+        # Dados após o chunk "data" (ex.: LIST no final do arquivo) são ignorados
+        remaining = info.data_size or None
+        chunk = head[info.data_offset:]
+        while True:
+            if remaining is not None:
+                chunk = chunk[:remaining]
+                remaining -= len(chunk)
+            pcm = normalizer.feed(chunk)
+            if info.data_offset + normalizer.input_bytes > max_bytes or normalizer.seconds > max_seconds:
+                raise ValueError(f"Áudio excede o limite de {max_seconds:.0f}s ou de {max_bytes} bytes")
+            if pcm:
+                yield pcm
+            if remaining == 0:
+                break
+            try:
+                chunk = await body.__anext__()
+            except StopAsyncIteration:
+                break
+        # Últimas amostras retidas pelo filtro de reamostragem
+        pcm = normalizer.flush()
+        if pcm:
+            yield pcm
+    
+    set_work_context(PRIORITY_INTERACTIVE, tenant_from_headers(request.headers))
+    backend, model = _metric_labels(stt_service)
+    session = await stt_service.start_stream()
+    
+    async def results() -> AsyncIterator[bytes]:
+        start_time = time.perf_counter()
+        seq = 0
+        texts: List[str] = []
+        session_open = True
+        
+        async def close_session() -> str:
+            nonlocal session_open
+            if not session_open:
+                return ""
+            session_open = False
+            return await session.end_stream()
+        
+        try:
+            async for pcm in pcm_chunks():
+                async for event in session.process_audio_events(pcm, partials=False):
+                    seq += 1
+                    texts.append(event.text)
+                    yield _ndjson({"type": "segment", "seq": seq, "text": event.text,
+                                   "end": round(normalizer.seconds, 2)})
+            final_text = await close_session()
+            if final_text:
+                texts.append(final_text)
+        except Exception as e:
+            await close_session()
+            message = str(e) if isinstance(e, ValueError) else f"Erro ao processar áudio: {str(e)}"
+            observe_request("stt", backend, model, {}, status="error")
+            logger.error("stt.incremental", "Erro na transcrição incremental",
+                         service=type(stt_service).__name__, error=message)
+            yield _ndjson({"type": "error", "seq": seq + 1, "message": message})
+            return
+        finally:
+            # Cliente desconectado no meio da resposta: libera a sessão
+            await close_session()
+        
+        processing_time = (time.perf_counter() - start_time) * 1000
+        observe_request("stt", backend, model, {"total": processing_time / 1000})
+        observe_audio(backend, model, normalizer.seconds, "incremental", processing_time / 1000)
+        logger.info("stt.incremental", "Transcrição incremental concluída", service=type(stt_service).__name__,
+                    audio_seconds=normalizer.seconds, segments=len(texts), processing_ms=processing_time)
+        yield _ndjson({"type": "final", "seq": seq + 1, "text": " ".join(text.strip() for text in texts if text.strip()),
+                       "duration": round(normalizer.seconds, 2)})
+    
+    return StreamingResponse(results(), media_type="application/x-ndjson")
+
 @router.websocket("/stt/stream")
 async def websocket_endpoint(
     websocket: WebSocket,
@@ -82,32 +307,125 @@ async def websocket_endpoint(
     """
     Endpoint WebSocket para streaming de áudio em tempo real
     
+    Cada conexão recebe sua própria sessão de streaming, enquanto o modelo
+    carregado é compartilhado por todas as conexões.
+    
     Args:
         websocket: Conexão WebSocket
         stt_service: Serviço de STT (injetado)
     """
+    # Sessões ao vivo têm a maior prioridade nos executores de inferência
+    set_work_context(PRIORITY_LIVE, tenant_from_headers(websocket.headers))
     await websocket.accept()
-    await stt_service.start_stream()
+    session = await stt_service.start_stream()
+    WEBSOCKET_SESSIONS.inc(protocol="v1")
+    received_bytes = 0
     
     try:
         while True:
             audio_chunk = await websocket.receive_bytes()
-            async for text in stt_service.process_audio_stream(audio_chunk):
+            received_bytes += len(audio_chunk)
+            async for text in session.process_audio_stream(audio_chunk):
                 if text:
                     await websocket.send_text(text)
     except Exception as e:
-        print(f"Erro no WebSocket: {str(e)}")
+        logger.error("stt.stream", "Erro no WebSocket", service=type(stt_service).__name__, error=str(e))
     finally:
-        final_text = await stt_service.end_stream()
+        WEBSOCKET_SESSIONS.dec(protocol="v1")
+        observe_audio(*_metric_labels(stt_service), received_bytes / (SAMPLE_RATE * 2), "stream")
+        final_text = await session.end_stream()
+        vad = getattr(session, "vad", None)
+        if vad is not None:
+            logger.info("stt.stream", "Sessão encerrada", service=type(stt_service).__name__,
+                        vad_speech_seconds=vad.speech_seconds, vad_skipped_seconds=vad.skipped_seconds)
         if final_text:
             await websocket.send_text(f"Final: {final_text}")
         await websocket.close()
 
+@router.websocket("/stt/stream/v2")
+async def websocket_endpoint_v2(
+    websocket: WebSocket,
+    min_partial_interval_ms: Optional[int] = Query(None, ge=0, description="Intervalo mínimo entre resultados parciais"),
+    partials: bool = Query(True, description="Enviar resultados parciais"),
+    stt_service: SpeechToTextService = Depends(get_stt_service)
+):
+    """
+    Endpoint WebSocket de streaming com o protocolo v2 (mensagens JSON)
+    
+    O cliente envia o áudio em frames binários e, ao terminar, a mensagem de
+    texto {"type": "end"}. O servidor responde com mensagens JSON tipadas
+    (ready, partial, final, ack, error, end; ver app.utils.stream_protocol),
+    suprime parciais repetidos ou mais frequentes que o intervalo pedido e
+    confirma o áudio processado para que o cliente controle o envio.
+    
+    Args:
+        websocket: Conexão WebSocket
+        min_partial_interval_ms: Intervalo mínimo entre parciais (padrão da configuração)
+        partials: Se False, apenas resultados finais são enviados
+        stt_service: Serviço de STT (injetado)
+    """
+    if min_partial_interval_ms is None:
+        min_partial_interval_ms = settings.stt_stream_min_partial_interval_ms
+    
+    set_work_context(PRIORITY_LIVE, tenant_from_headers(websocket.headers))
+    await websocket.accept()
+    session = await stt_service.start_stream()
+    protocol = StreamProtocol(
+        websocket.send_json,
+        min_partial_interval_ms=min_partial_interval_ms,
+        max_unacked_bytes=settings.stt_stream_max_unacked_bytes
+    )
+    WEBSOCKET_SESSIONS.inc(protocol="v2")
+    connected = True
+    
+    try:
+        await protocol.ready(sample_rate=SAMPLE_RATE, encoding="pcm_s16le")
+        while True:
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                connected = False
+                break
+            if message.get("bytes") is not None:
+                audio_chunk = message["bytes"]
+                want_partials = partials and protocol.partials_due()
+                async for event in session.process_audio_events(audio_chunk, partials=want_partials):
+                    await protocol.event(event)
+                await protocol.processed(len(audio_chunk))
+                continue
+            
+            try:
+                control = json.loads(message.get("text") or "")
+            except ValueError:
+                control = None
+            if isinstance(control, dict) and control.get("type") == "end":
+                break
+            await protocol.error("Mensagem de controle desconhecida; use {\"type\": \"end\"}")
+    except WebSocketDisconnect:
+        connected = False
+    except Exception as e:
+        logger.error("stt.stream", "Erro no WebSocket", service=type(stt_service).__name__, error=str(e))
+        if connected:
+            await protocol.error(f"Erro ao processar áudio: {str(e)}")
+    finally:
+        WEBSOCKET_SESSIONS.dec(protocol="v2")
+        observe_audio(*_metric_labels(stt_service), protocol.received_bytes / (SAMPLE_RATE * 2), "stream")
+        final_text = await session.end_stream()
+        if connected:
+            try:
+                if final_text:
+                    await protocol.event(StreamEvent(final_text, True))
+                await protocol.end()
+                await websocket.close()
+            except (WebSocketDisconnect, RuntimeError):
+                pass
+        logger.info("stt.stream", "Sessão v2 encerrada", service=type(stt_service).__name__, **protocol.get_stats())
+
 # TTS endpoints
 class TextInput(BaseModel):
     text: str
     voice: str = None
     speed: float = 1.0
+    stream: bool = False
 
 class VoiceInfo(BaseModel):
     id: str
@@ -115,145 +433,314 @@ class VoiceInfo(BaseModel):
 
 # Debug info será retornado nos headers ao invés do body
 
-@router.post("/tts")
-def synthesize_text_post(
-    input_data: TextInput,
-    tts_service: TextToSpeechService = Depends(get_tts_service)
-):
+def _tts_cache_key(
+    tts_service: TextToSpeechService,
+    text: str,
+    speed: float,
+    debug_info_dict: Dict[str, Any]
+) -> str:
+    """Monta a chave de cache a partir do backend, voz e idioma efetivos do serviço"""
+    return TTSCache.make_key(
+        backend=debug_info_dict.get('service_type', type(tts_service).__name__),
+        voice=debug_info_dict.get('voice'),
+        speed=speed,
+        language=debug_info_dict.get('language'),
+        text=text
+    )
+
+def _is_long_text(text: str) -> bool:
+    """Textos longos são sintetizados frase a frase, em paralelo"""
+    return settings.tts_long_text_chars > 0 and len(text) >= settings.tts_long_text_chars
+
+async def _synthesize_cached(
+    tts_service: TextToSpeechService,
+    text: str,
+    speed: float,
+    debug_info_dict: Dict[str, Any],
+    tts_cache: Optional[TTSCache]
+) -> Tuple[bytes, str]:
     """
-    Endpoint para sintetizar texto em áudio (compatibilidade com POST)
+    Sintetiza o texto consultando antes o cache de TTS
     
     Args:
-        input_data: Texto a ser sintetizado e voz opcional
-        tts_service: Serviço de TTS (injetado)
+        tts_service: Serviço de TTS já configurado com voz e velocidade
+        text: Texto a ser sintetizado
+        speed: Velocidade da fala
+        debug_info_dict: Informações do serviço (backend, voz e idioma efetivos)
+        tts_cache: Cache de TTS (None se desativado)
         
     Returns:
-        Arquivo de áudio sintetizado (debug info nos headers)
+        Tupla (áudio, status do cache: "hit-memory", "hit-disk", "miss" ou "disabled")
+    """
+    cache_key = None
+    if tts_cache is not None:
+        cache_key = _tts_cache_key(tts_service, text, speed, debug_info_dict)
+        with span("tts.cache.lookup"):
+            audio_data, tier = await run_in_threadpool(tts_cache.lookup, cache_key)
+        if audio_data is not None:
+            return audio_data, f"hit-{tier}"
+    
+    # Sintetizar diretamente em memória, sem arquivo temporário
+    with span("tts.synthesize", long_text=_is_long_text(text), text_length=len(text)):
+        if _is_long_text(text):
+            audio_data = await tts_service.synthesize_long_async(text)
+        else:
+            audio_data = await tts_service.synthesize_async(text)
+    
+    if tts_cache is None:
+        return audio_data, "disabled"
+    
+    with span("tts.cache.store"):
+        await run_in_threadpool(tts_cache.put, cache_key, audio_data)
+    return audio_data, "miss"
+
+async def _stream_synthesis(
+    tts_service: TextToSpeechService,
+    text: str,
+    debug_info_dict: Dict[str, Any],
+    tts_cache: Optional[TTSCache],
+    cache_key: Optional[str],
+    start_time: float
+) -> AsyncIterator[bytes]:
+    """
+    Repassa os blocos de áudio do serviço e registra a latência até o primeiro byte
+    
+    Ao final, o áudio completo é gravado no cache para as próximas requisições.
+    """
+    chunks = []
+    first_byte_ms = None
+    # Os headers (e o Server-Timing) já saíram: as etapas entram só no trace exportado
+    parent_span = get_current_span()
+    synthesis_started = time.perf_counter()
+    backend = debug_info_dict.get('service_type', type(tts_service).__name__)
+    model = debug_info_dict.get('model', '')
+    try:
+        # Textos longos excedem os limites do streaming nativo dos backends
+        if _is_long_text(text):
+            chunks_source = tts_service.synthesize_long_stream_async(text)
+        else:
+            chunks_source = tts_service.synthesize_stream_async(text)
+        async for chunk in chunks_source:
+            if first_byte_ms is None:
+                first_byte_ms = (time.perf_counter() - start_time) * 1000
+            if tts_cache is not None:
+                chunks.append(chunk)
+            yield chunk
+    except Exception as e:
+        processing_time = (time.perf_counter() - start_time) * 1000
+        observe_request("tts", backend, model, {}, status="busy" if isinstance(e, ExecutorSaturatedError) else "error")
+        logger.error("tts.request", "Erro na síntese em streaming", service=type(tts_service).__name__,
+                     error=str(e), processing_ms=processing_time)
+        raise
+    
+    finished = time.perf_counter()
+    record_span(parent_span, "tts.synthesize", synthesis_started, finished, streaming=True,
+                first_byte_ms=first_byte_ms or 0.0, text_length=len(text))
+    processing_time = (finished - start_time) * 1000
+    TTS_CHARACTERS.inc(len(text), backend=backend, model=model)
+    observe_request("tts", backend, model, {"first_byte": (first_byte_ms or 0.0) / 1000, "total": processing_time / 1000})
+    logger.info("tts.request", "Síntese em streaming concluída", service=backend,
+                voice=debug_info_dict.get('voice', ''), first_byte_ms=first_byte_ms or 0.0,
+                processing_ms=processing_time, text_length=len(text))
+    
+    if tts_cache is not None and chunks:
+        audio_data = b"".join(chunks)
+        if tts_service.get_media_type() == "audio/wav":
+            # O stream WAV usa um cabeçalho de tamanho indefinido
+            audio_data = fix_wav_header(audio_data)
+        with span("tts.cache.store"):
+            await run_in_threadpool(tts_cache.put, cache_key, audio_data)
+
+# Extensão do arquivo sugerido ao cliente para cada media type
+AUDIO_EXTENSIONS = {
+    "audio/wav": "wav",
+    "audio/mpeg": "mp3",
+}
+
+def _content_disposition(media_type: str) -> str:
+    """Sugere ao cliente o nome do arquivo de áudio conforme o media type"""
+    return f'attachment; filename="speech.{AUDIO_EXTENSIONS.get(media_type, "bin")}"'
+
+def _audio_response(audio_data: bytes, media_type: str, headers: Dict[str, str]) -> Response:
+    """Monta a resposta com o áudio sintetizado como anexo, servido direto da memória"""
+    return Response(
+        content=audio_data,
+        media_type=media_type,
+        headers={**headers, "Content-Disposition": _content_disposition(media_type)}
+    )
+
+async def _synthesize_response(
+    tts_service: TextToSpeechService,
+    tts_cache: Optional[TTSCache],
+    text: str,
+    voice: Optional[str],
+    speed: float,
+    stream: bool,
+    tenant: str
+) -> Response:
+    """
+    Sintetiza o texto e monta a resposta HTTP (comum às rotas GET e POST)
+    
+    Args:
+        tts_service: Serviço de TTS da requisição
+        tts_cache: Cache de TTS (None se desativado)
+        text: Texto a ser sintetizado
+        voice: ID da voz (opcional)
+        speed: Velocidade da fala
+        stream: Se True, envia o áudio em blocos (chunked) à medida que é gerado
+        tenant: Tenant da requisição (cotas do escalonador de inferência)
+        
+    Returns:
+        Resposta com o áudio sintetizado (debug info nos headers)
     """
     start_time = datetime.datetime.now()
+    start_counter = time.perf_counter()
+    set_work_context(PRIORITY_INTERACTIVE, tenant, len(text))
     
     try:
-        if input_data.voice:
-            tts_service.set_voice(input_data.voice)
+        if voice:
+            tts_service.set_voice(voice)
             
         # Configurar velocidade da fala (speed)
-        if input_data.speed != 1.0:
-            tts_service.set_speed(input_data.speed)
+        if speed != 1.0:
+            tts_service.set_speed(speed)
             
         # Obter informações de debug antes da síntese
         debug_info_dict = getattr(tts_service, 'get_debug_info', lambda: {})() or {}
         
-        # Criar arquivo temporário para guardar o áudio
-        with tempfile.NamedTemporaryFile(delete=False, suffix=".wav") as temp_file:
-            output_path = temp_file.name
-            
-        # Sintetizar o texto e salvar no arquivo
-        tts_service.save_to_file(input_data.text, output_path)
-        
-        processing_time = (datetime.datetime.now() - start_time).total_seconds() * 1000
-        
-        # Preparar headers de debug
         debug_headers = {
             "X-Debug-Service-Type": debug_info_dict.get('service_type', type(tts_service).__name__),
             "X-Debug-Model": debug_info_dict.get('model', ''),
             "X-Debug-Voice": debug_info_dict.get('voice', ''),
-            "X-Debug-Speed": str(input_data.speed),
+            "X-Debug-Speed": str(speed),
             "X-Debug-Timestamp": start_time.isoformat(),
-            "X-Debug-Processing-Time-Ms": str(round(processing_time, 2)),
-            "X-Debug-Text-Length": str(len(input_data.text))
+            "X-Debug-Text-Length": str(len(text)),
+            "X-Debug-Long-Text": str(_is_long_text(text)).lower()
         }
+        media_type = tts_service.get_media_type()
+        
+        if stream:
+            cache_key = None
+            if tts_cache is not None:
+                cache_key = _tts_cache_key(tts_service, text, speed, debug_info_dict)
+                with span("tts.cache.lookup"):
+                    cached_audio, tier = await run_in_threadpool(tts_cache.lookup, cache_key)
+                if cached_audio is not None:
+                    debug_headers["X-Debug-Cache"] = f"hit-{tier}"
+                    debug_headers["X-Debug-Audio-Size-Bytes"] = str(len(cached_audio))
+                    return _audio_response(cached_audio, media_type, debug_headers)
+            
+            # A latência até o primeiro byte é registrada ao final do stream,
+            # já que os headers são enviados antes da síntese terminar
+            debug_headers["X-Debug-Cache"] = "miss" if tts_cache is not None else "disabled"
+            debug_headers["X-Debug-Streaming"] = "true"
+            return StreamingResponse(
+                _stream_synthesis(tts_service, text, debug_info_dict, tts_cache, cache_key, start_counter),
+                media_type=media_type,
+                headers={**debug_headers, "Content-Disposition": _content_disposition(media_type)}
+            )
+        
+        # Sintetizar o texto (ou reaproveitar do cache)
+        task_timings = start_task_timings()
+        synthesis_started = time.perf_counter()
+        audio_data, cache_status = await _synthesize_cached(
+            tts_service, text, speed, debug_info_dict, tts_cache
+        )
+        synthesis_elapsed = time.perf_counter() - synthesis_started
+        
+        processing_time = (time.perf_counter() - start_counter) * 1000
+        
+        debug_headers.update({
+            "X-Debug-Processing-Time-Ms": str(round(processing_time, 2)),
+            "X-Debug-Audio-Size-Bytes": str(len(audio_data)),
+            "X-Debug-Cache": cache_status
+        })
         
         # Log para monitoramento
-        print(f"[TTS DEBUG] Service: {debug_headers['X-Debug-Service-Type']}, "
-              f"Model: {debug_headers['X-Debug-Model']}, Voice: {debug_headers['X-Debug-Voice']}, "
-              f"Speed: {input_data.speed}, Processing time: {processing_time:.2f}ms, "
-              f"Text length: {len(input_data.text)}, Audio file: {output_path}")
+        logger.info("tts.request", "Síntese concluída", service=debug_headers['X-Debug-Service-Type'],
+                    model=debug_headers['X-Debug-Model'], voice=debug_headers['X-Debug-Voice'], speed=speed,
+                    processing_ms=processing_time, text_length=len(text), audio_bytes=len(audio_data),
+                    cache=cache_status)
         
-        # Retornar o arquivo de áudio com headers de debug
-        return FileResponse(
-            output_path, 
-            media_type="audio/wav", 
-            filename="speech.wav",
-            headers=debug_headers,
-            background=None  # Não excluir o arquivo após o envio
+        # Retornar o áudio com headers de debug
+        serialization_started = time.perf_counter()
+        with span("response.serialize"):
+            response = _audio_response(audio_data, media_type, debug_headers)
+        finished = time.perf_counter()
+        backend, model = debug_headers["X-Debug-Service-Type"], debug_headers["X-Debug-Model"]
+        stages = {"serialization": finished - serialization_started, "total": finished - start_counter}
+        if not cache_status.startswith("hit"):
+            TTS_CHARACTERS.inc(len(text), backend=backend, model=model)
+            stages.update(_inference_stages(synthesis_elapsed, task_timings))
+        observe_request("tts", backend, model, stages)
+        return response
+    except ExecutorSaturatedError as e:
+        observe_request("tts", *_metric_labels(tts_service), {}, status="busy")
+        logger.warning("tts.request", "Executor saturado", service=type(tts_service).__name__, error=str(e))
+        raise HTTPException(
+            status_code=503,
+            detail=str(e),
+            headers={"Retry-After": str(e.retry_after)}
         )
     except Exception as e:
-        processing_time = (datetime.datetime.now() - start_time).total_seconds() * 1000
-        print(f"[TTS ERROR] Service: {type(tts_service).__name__}, Error: {str(e)}, "
-              f"Processing time: {processing_time:.2f}ms")
+        observe_request("tts", *_metric_labels(tts_service), {}, status="error")
+        processing_time = (time.perf_counter() - start_counter) * 1000
+        logger.error("tts.request", "Erro na síntese", service=type(tts_service).__name__, error=str(e),
+                     processing_ms=processing_time)
         raise HTTPException(status_code=500, detail=f"Erro na sintetização: {str(e)}")
 
+@router.post("/tts")
+async def synthesize_text_post(
+    request: Request,
+    input_data: TextInput,
+    tts_service: TextToSpeechService = Depends(get_tts_service),
+    tts_cache: Optional[TTSCache] = Depends(get_tts_cache)
+):
+    """
+    Endpoint para sintetizar texto em áudio (compatibilidade com POST)
+    
+    Args:
+        request: Requisição (o tenant vem do header TENANT_HEADER)
+        input_data: Texto a ser sintetizado, voz opcional e modo streaming
+        tts_service: Serviço de TTS (injetado)
+        tts_cache: Cache de TTS (injetado)
+        
+    Returns:
+        Arquivo de áudio sintetizado (debug info nos headers)
+    """
+    return await _synthesize_response(
+        tts_service, tts_cache, input_data.text, input_data.voice, input_data.speed, input_data.stream,
+        tenant_from_headers(request.headers)
+    )
+
 @router.get("/tts")
-def synthesize_text(
+async def synthesize_text(
+    request: Request,
     text: str = Query(..., description="Texto a ser sintetizado em áudio"),
     voice: Optional[str] = Query(None, description="ID da voz a ser utilizada (opcional)"),
     speed: float = Query(1.0, description="Velocidade da fala (1.0 = normal)"),
-    tts_service: TextToSpeechService = Depends(get_tts_service)
+    stream: bool = Query(False, description="Enviar o áudio em blocos à medida que é gerado"),
+    tts_service: TextToSpeechService = Depends(get_tts_service),
+    tts_cache: Optional[TTSCache] = Depends(get_tts_cache)
 ):
     """
     Endpoint para sintetizar texto em áudio
     
     Args:
+        request: Requisição (o tenant vem do header TENANT_HEADER)
         text: Texto a ser sintetizado
         voice: ID da voz a ser utilizada (opcional)
         speed: Velocidade da fala (1.0 = normal)
+        stream: Enviar o áudio em blocos (chunked) à medida que é gerado
         tts_service: Serviço de TTS (injetado)
+        tts_cache: Cache de TTS (injetado)
         
     Returns:
         Arquivo de áudio sintetizado (debug info nos headers)
     """
-    start_time = datetime.datetime.now()
-    
-    try:
-        if voice:
-            tts_service.set_voice(voice)
-            
-        # Configurar velocidade da fala (speed)
-        if speed != 1.0:
-            tts_service.set_speed(speed)
-            
-        # Obter informações de debug antes da síntese
-        debug_info_dict = getattr(tts_service, 'get_debug_info', lambda: {})() or {}
-        
-        # Criar arquivo temporário para guardar o áudio
-        with tempfile.NamedTemporaryFile(delete=False, suffix=".wav") as temp_file:
-            output_path = temp_file.name
-            
-        # Sintetizar o texto e salvar no arquivo
-        tts_service.save_to_file(text, output_path)
-        
-        processing_time = (datetime.datetime.now() - start_time).total_seconds() * 1000
-        
-        # Preparar headers de debug
-        debug_headers = {
-            "X-Debug-Service-Type": debug_info_dict.get('service_type', type(tts_service).__name__),
-            "X-Debug-Model": debug_info_dict.get('model', ''),
-            "X-Debug-Voice": debug_info_dict.get('voice', ''),
-            "X-Debug-Speed": str(speed),
-            "X-Debug-Timestamp": start_time.isoformat(),
-            "X-Debug-Processing-Time-Ms": str(round(processing_time, 2)),
-            "X-Debug-Text-Length": str(len(text))
-        }
-        
-        # Log para monitoramento
-        print(f"[TTS DEBUG] Service: {debug_headers['X-Debug-Service-Type']}, "
-              f"Model: {debug_headers['X-Debug-Model']}, Voice: {debug_headers['X-Debug-Voice']}, "
-              f"Speed: {speed}, Processing time: {processing_time:.2f}ms, "
-              f"Text length: {len(text)}, Audio file: {output_path}")
-        
-        # Retornar o arquivo de áudio com headers de debug
-        return FileResponse(
-            output_path, 
-            media_type="audio/wav", 
-            filename="speech.wav",
-            headers=debug_headers,
-            background=None  # Não excluir o arquivo após o envio
-        )
-    except Exception as e:
-        processing_time = (datetime.datetime.now() - start_time).total_seconds() * 1000
-        print(f"[TTS ERROR] Service: {type(tts_service).__name__}, Error: {str(e)}, "
-              f"Processing time: {processing_time:.2f}ms")
-        raise HTTPException(status_code=500, detail=f"Erro na sintetização: {str(e)}")
+    return await _synthesize_response(
+        tts_service, tts_cache, text, voice, speed, stream, tenant_from_headers(request.headers)
+    )
 
 @router.get("/tts/voices")
 def get_voices(
@@ -274,3 +761,20 @@ def get_voices(
         return [VoiceInfo(id=voice, name=f"Voz {i+1}") for i, voice in enumerate(voices)]
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Erro ao listar vozes: {str(e)}")
+
+@router.get("/tts/cache")
+def get_tts_cache_stats(
+    tts_cache: Optional[TTSCache] = Depends(get_tts_cache)
+) -> Dict[str, Any]:
+    """
+    Endpoint com os contadores do cache de TTS
+    
+    Args:
+        tts_cache: Cache de TTS (injetado)
+        
+    Returns:
+        Acertos, faltas, remoções e ocupação do cache
+    """
+    if tts_cache is None:
+        return {"enabled": False}
+    return {"enabled": True, **tts_cache.get_stats()}
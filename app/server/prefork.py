@@ -0,0 +1,184 @@
+import gc
+import os
+import random
+import signal
+import socket
+import time
+from typing import Dict, Optional
+
+import uvicorn
+
+from app.utils.log import logger
+from app.utils.memory import format_bytes, get_memory_info
+
+# Indica que os modelos são carregados pelo mestre do modo pre-fork e herdados pelos workers
+_preforking = False
+
+
+def is_prefork() -> bool:
+    """Se o processo é (ou foi criado por fork a partir do) mestre do modo pre-fork"""
+    return _preforking
+
+
+class PreforkServer:
+    """
+    Servidor pre-fork: carrega os modelos no processo mestre e cria N workers
+
+    Como os workers são criados por fork() depois da carga, as páginas dos
+    modelos (Vosk, Whisper, engines TTS) são compartilhadas copy-on-write em vez
+    de duplicadas por worker. Isso vale para modelos usados no próprio worker:
+    com WHISPER_EXECUTOR_KIND=process cada processo do pool carrega a sua
+    cópia do Whisper, que não é compartilhada. O mestre reinicia workers que terminam, o que
+    permite reciclá-los após um número de requisições, e reporta periodicamente
+    quanta memória de cada worker continua compartilhada.
+    """
+
+    def __init__(self, app_path: str = "app.main:app", host: str = "0.0.0.0", port: int = 8000,
+                 workers: int = 2, max_requests: Optional[int] = None, max_requests_jitter: int = 0,
+                 memory_report_interval: float = 60.0):
+        """
+        Inicializa o servidor
+
+        Args:
+            app_path: Aplicação ASGI no formato "modulo:atributo"
+            host: Host para servir a API
+            port: Porta para servir a API
+            workers: Número de processos worker
+            max_requests: Requisições atendidas por worker antes de ser reciclado (None = sem limite)
+            max_requests_jitter: Variação aleatória somada a max_requests, para não reciclar todos juntos
+            memory_report_interval: Intervalo em segundos entre relatórios de memória (0 = desativado)
+        """
+        self.app_path = app_path
+        self.host = host
+        self.port = port
+        self.workers = max(1, workers)
+        self.max_requests = max_requests
+        self.max_requests_jitter = max(0, max_requests_jitter)
+        self.memory_report_interval = memory_report_interval
+
+        self._children: Dict[int, int] = {}  # pid -> número do worker
+        self._socket: Optional[socket.socket] = None
+        self._app = None
+        self._should_exit = False
+
+    def _load_app(self) -> None:
+        """Importa a aplicação e carrega os modelos no processo mestre"""
+        module_name, attr = self.app_path.split(":")
+        module = __import__(module_name, fromlist=[attr])
+        self._app = getattr(module, attr)
+
+        global _preforking
+        _preforking = True
+        from app.dependencies import warm_up_services
+        warm_up_services()
+
+        # Move os objetos já criados para uma geração permanente, evitando que o
+        # coletor de lixo dos workers toque (e copie) as páginas herdadas
+        gc.collect()
+        gc.freeze()
+
+    def _bind_socket(self) -> socket.socket:
+        sock = socket.socket(socket.AF_INET6 if ":" in self.host else socket.AF_INET, socket.SOCK_STREAM)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        sock.bind((self.host, self.port))
+        sock.listen(2048)
+        sock.set_inheritable(True)
+        return sock
+
+    def _spawn_worker(self, number: int) -> None:
+        pid = os.fork()
+        if pid:
+            self._children[pid] = number
+            return
+
+        # Processo worker
+        signal.signal(signal.SIGTERM, signal.SIG_DFL)
+        signal.signal(signal.SIGINT, signal.SIG_DFL)
+        exit_code = 0
+        try:
+            limit = None
+            if self.max_requests:
+                limit = self.max_requests + random.randint(0, self.max_requests_jitter)
+            config = uvicorn.Config(self._app, limit_max_requests=limit)
+            uvicorn.Server(config).run(sockets=[self._socket])
+        except BaseException as e:
+            logger.error("prefork", "Worker encerrado com erro", worker=number, pid=os.getpid(), error=str(e))
+            exit_code = 1
+        finally:
+            # os._exit não roda os handlers de atexit: esvazia a fila de log antes
+            logger.flush()
+            os._exit(exit_code)
+
+    def _handle_exit(self, signum, frame) -> None:
+        self._should_exit = True
+
+    def report_memory(self) -> None:
+        """Imprime a memória de cada worker, destacando as páginas compartilhadas"""
+        for pid, number in sorted(self._children.items(), key=lambda item: item[1]):
+            info = get_memory_info(pid)
+            if not info:
+                continue
+            logger.info("prefork", "Memória do worker", worker=number, pid=pid,
+                        rss=format_bytes(info.get('rss')), pss=format_bytes(info.get('pss')),
+                        shared=format_bytes(info.get('shared')), shared_pages=info.get('shared_pages', 0),
+                        private=format_bytes(info.get('private')))
+
+    def run(self) -> None:
+        """Carrega os modelos, cria os workers e supervisiona até receber SIGTERM/SIGINT"""
+        self._load_app()
+        self._socket = self._bind_socket()
+
+        master_info = get_memory_info()
+        logger.info("prefork", "Modelos carregados no mestre; iniciando workers", pid=os.getpid(),
+                    rss=format_bytes(master_info.get('rss')), workers=self.workers)
+
+        signal.signal(signal.SIGTERM, self._handle_exit)
+        signal.signal(signal.SIGINT, self._handle_exit)
+
+        for number in range(1, self.workers + 1):
+            self._spawn_worker(number)
+
+        last_report = time.monotonic()
+        try:
+            while not self._should_exit:
+                self._reap_workers()
+                if self.memory_report_interval and time.monotonic() - last_report >= self.memory_report_interval:
+                    self.report_memory()
+                    last_report = time.monotonic()
+                time.sleep(0.5)
+        finally:
+            self._shutdown()
+
+    def _reap_workers(self) -> None:
+        """Recolhe workers encerrados e cria substitutos"""
+        while self._children:
+            try:
+                pid, status = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                return
+            if pid == 0:
+                return
+            number = self._children.pop(pid, None)
+            if number is None:
+                continue
+            if self._should_exit:
+                return
+            logger.info("prefork", "Worker encerrado; reciclando", worker=number, pid=pid,
+                        status=os.waitstatus_to_exitcode(status))
+            self._spawn_worker(number)
+
+    def _shutdown(self) -> None:
+        logger.info("prefork", "Encerrando workers")
+        for pid in list(self._children):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                self._children.pop(pid, None)
+        for pid in list(self._children):
+            try:
+                os.waitpid(pid, 0)
+            except ChildProcessError:
+                pass
+            self._children.pop(pid, None)
+        if self._socket is not None:
+            self._socket.close()
@@ -1,89 +1,162 @@
-from openai import AzureOpenAI
-from app.interfaces.stt_service import SpeechToTextService
+from app.interfaces.stt_service import SpeechToTextService, StreamSession
 from app.config import settings
-import tempfile
-import os
+from app.utils.http_client import send_with_retry
+from app.utils.tracing import span
+from app.utils.log import logger
+from app.audio.ingest import SAMPLE_RATE, AudioInput, to_wav_bytes
+from app.audio.pcm import pcm16_to_float32
+from app.audio.vad import create_stream_vad
+from app.inference.local_agreement import strip_overlap
 import asyncio
-from typing import Generator, Optional, Dict
+from collections import deque
+import numpy as np
+from typing import AsyncGenerator, List, Optional, Dict, Tuple
 
 
-class AzureOpenAISTTService(SpeechToTextService):
-    def __init__(self):
-        self.client = AzureOpenAI(
-            api_key=settings.azure_openai_api_key,
-            api_version=settings.azure_openai_stt_api_version,
-            azure_endpoint=settings.azure_openai_endpoint
-        )
-        self.deployment_id = settings.azure_openai_stt_deployment
-        self._stream_active = False
+class AzureOpenAIStreamSession(StreamSession):
+    """
+    Sessão de streaming do Azure OpenAI com envio em pipeline
+
+    O áudio é enviado em segmentos WAV de `azure_openai_stt_stream_segment_seconds`
+    sem esperar a resposta do anterior: até `azure_openai_stt_stream_max_in_flight`
+    requisições ficam em andamento e os textos são emitidos na ordem dos
+    segmentos. Cada segmento repete o final do anterior (sobreposição) para
+    não cortar palavras na fronteira; a repetição é removida do texto.
+    """
+
+    def __init__(self, service: "AzureOpenAISTTService"):
+        self._service = service
+        self._stream_active = True
         self._accumulated_audio = b""
+        self._overlap = b""
+        self._previous_text = ""
+        self._in_flight: "deque[Tuple[bool, asyncio.Task]]" = deque()
+        self._segment_bytes = int(settings.azure_openai_stt_stream_segment_seconds * SAMPLE_RATE) * 2
+        self._overlap_bytes = int(SAMPLE_RATE * settings.azure_openai_stt_stream_overlap_ms / 1000) * 2
+        self._max_in_flight = max(1, settings.azure_openai_stt_stream_max_in_flight)
+        self.vad = create_stream_vad()
+        service.active_sessions += 1
 
-    async def transcribe_audio(self, audio_data: bytes, language: Optional[str] = None) -> str:
+    async def _transcribe(self, pcm: bytes) -> str:
         try:
-            with tempfile.NamedTemporaryFile(delete=False, suffix=".wav") as temp_file:
-                temp_file.write(audio_data)
-                temp_file.flush()
-                
-                with open(temp_file.name, "rb") as audio_file:
-                    transcription_params = {
-                        "file": audio_file,
-                        "model": self.deployment_id
-                    }
-                    
-                    if language:
-                        transcription_params["language"] = language
-                    
-                    result = await asyncio.get_event_loop().run_in_executor(
-                        None,
-                        lambda: self.client.audio.transcriptions.create(**transcription_params)
-                    )
-                
-                os.unlink(temp_file.name)
-                
-                return result.text if hasattr(result, 'text') else str(result)
-                
+            return await self._service.transcribe_audio(pcm16_to_float32(pcm))
         except Exception as e:
-            raise Exception(f"Error transcribing audio with Azure OpenAI: {str(e)}")
+            logger.error("stt.stream", "Erro ao transcrever segmento com Azure OpenAI", error=str(e))
+            return ""
 
-    async def start_stream(self) -> None:
-        self._stream_active = True
-        self._accumulated_audio = b""
+    def _submit(self, utterance_ended: bool = False) -> None:
+        # Mantém PCM 16 bits alinhado: um byte solto fica para o próximo segmento
+        usable = len(self._accumulated_audio) - len(self._accumulated_audio) % 2
+        segment, self._accumulated_audio = self._accumulated_audio[:usable], self._accumulated_audio[usable:]
+        if not segment:
+            return
+        overlapped = bool(self._overlap)
+        audio = self._overlap + segment
+        # Após uma pausa na fala não há palavra cortada a costurar
+        self._overlap = b"" if utterance_ended or not self._overlap_bytes else segment[-self._overlap_bytes:]
+        self._in_flight.append((overlapped, asyncio.ensure_future(self._transcribe(audio))))
+
+    def _stitch(self, text: str, overlapped: bool) -> str:
+        if overlapped:
+            text = strip_overlap(self._previous_text, text)
+        text = text.strip()
+        if text:
+            self._previous_text = text
+        return text
 
-    async def process_audio_stream(self, audio_chunk: bytes) -> Generator[str, None, None]:
+    async def _collect(self, limit: int) -> List[str]:
+        """
+        Retira os resultados prontos da frente da fila, na ordem dos segmentos
+
+        Espera pelo primeiro segmento enquanto houver mais de `limit` em andamento.
+        """
+        texts = []
+        while self._in_flight and (len(self._in_flight) > limit or self._in_flight[0][1].done()):
+            overlapped, task = self._in_flight.popleft()
+            text = self._stitch(await task, overlapped)
+            if text:
+                texts.append(text)
+        return texts
+
+    async def process_audio_stream(self, audio_chunk: bytes) -> AsyncGenerator[str, None]:
         if not self._stream_active:
             return
+        
+        # Silêncio não é acumulado; o fim da fala envia o trecho imediatamente
+        speech_ended = False
+        if self.vad is not None:
+            gated = self.vad.process(audio_chunk)
+            audio_chunk, speech_ended = gated.audio, gated.speech_ended
             
         self._accumulated_audio += audio_chunk
         
-        if len(self._accumulated_audio) >= 32000:  # ~2 seconds at 16kHz
-            try:
-                transcript = await self.transcribe_audio(self._accumulated_audio)
-                if transcript.strip():
-                    yield transcript
-                self._accumulated_audio = b""
-            except Exception:
-                pass
+        if len(self._accumulated_audio) >= self._segment_bytes or speech_ended:
+            # Abre espaço no pipeline antes de enviar mais um segmento
+            for text in await self._collect(self._max_in_flight - 1):
+                yield text
+            self._submit(utterance_ended=speech_ended)
+        
+        for text in await self._collect(self._max_in_flight):
+            yield text
 
     async def end_stream(self) -> str:
+        if not self._stream_active:
+            return ""
         self._stream_active = False
+        self._service.active_sessions -= 1
         
-        if self._accumulated_audio:
-            try:
-                final_transcript = await self.transcribe_audio(self._accumulated_audio)
-                self._accumulated_audio = b""
-                return final_transcript
-            except Exception:
-                pass
-        
-        return ""
+        self._submit(utterance_ended=True)
+        try:
+            return " ".join(await self._collect(0))
+        finally:
+            for _, task in self._in_flight:
+                task.cancel()
+
+
+class AzureOpenAISTTService(SpeechToTextService):
+    def __init__(self):
+        self.api_key = settings.azure_openai_api_key
+        self.endpoint = settings.azure_openai_endpoint.rstrip("/")
+        self.api_version = settings.azure_openai_stt_api_version
+        self.deployment_id = settings.azure_openai_stt_deployment
+        self.active_sessions = 0
+
+    async def transcribe_audio(self, audio_data: AudioInput, language: Optional[str] = None) -> str:
+        # O áudio vai direto da memória no corpo multipart, pelo cliente
+        # assíncrono compartilhado (sem arquivo temporário nem thread).
+        # Rotas e jobs entregam o áudio já decodificado por transcribe_segments
+        # (float32 a 16 kHz, sem silêncio), que é empacotado aqui como WAV
+        if isinstance(audio_data, np.ndarray):
+            audio_data = to_wav_bytes(audio_data)
+        url = (f"{self.endpoint}/openai/deployments/{self.deployment_id}"
+               f"/audio/transcriptions?api-version={self.api_version}")
+        data = {"model": self.deployment_id, "response_format": "json"}
+        if language:
+            data["language"] = language
+
+        try:
+            with span("azure_openai.request", deployment=self.deployment_id, audio_bytes=len(audio_data)):
+                response = await send_with_retry(
+                    "POST", url,
+                    headers={"api-key": self.api_key},
+                    data=data,
+                    files={"file": ("audio.wav", audio_data, "audio/wav")}
+                )
+            if response.status_code != 200:
+                raise Exception(f"HTTP {response.status_code} - {response.text}")
+            return response.json().get("text", "")
+        except Exception as e:
+            raise Exception(f"Error transcribing audio with Azure OpenAI: {str(e)}")
+
+    async def start_stream(self) -> StreamSession:
+        return AzureOpenAIStreamSession(self)
     
     def get_debug_info(self) -> Dict[str, str]:
         """Retorna informações de debug do serviço Azure OpenAI STT"""
         return {
             'service_type': 'Azure OpenAI STT',
             'model': self.deployment_id,
-            'endpoint': settings.azure_openai_endpoint,
-            'api_version': settings.azure_openai_stt_api_version,
-            'stream_active': str(self._stream_active),
-            'accumulated_audio_size': str(len(self._accumulated_audio))
+            'endpoint': self.endpoint,
+            'api_version': self.api_version,
+            'active_sessions': str(self.active_sessions)
         }
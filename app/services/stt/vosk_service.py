@@ -1,10 +1,116 @@
 import json
 import asyncio
-from typing import Generator, Optional, Dict
-import io
-import wave
+from typing import AsyncGenerator, List, Optional, Dict
 
-from app.interfaces.stt_service import SpeechToTextService
+import numpy as np
+
+from app.interfaces.stt_service import PARTIAL_PREFIX, SpeechToTextService, StreamEvent, StreamSession
+from app.audio.ingest import AudioInput, ensure_audio_array
+from app.audio.pcm import float32_to_pcm16
+from app.audio.vad import create_stream_vad
+from app.inference.executor import get_executor
+
+class VoskStreamSession(StreamSession):
+    """
+    Sessão de streaming Vosk com KaldiRecognizer exclusivo
+    """
+    
+    def __init__(self, service: "VoskSTTService"):
+        """
+        Cria o recognizer da sessão sobre o modelo do serviço
+        
+        Args:
+            service: Serviço Vosk que detém o modelo compartilhado
+        """
+        self._service = service
+        self.recognizer = service.KaldiRecognizer(service.model, service.sample_rate)
+        self.vad = create_stream_vad(service.sample_rate)
+        self._closed = False
+        service.active_sessions += 1
+        
+    async def process_audio_stream(self, audio_chunk: bytes) -> AsyncGenerator[str, None]:
+        """
+        Processa um chunk de áudio de streaming
+        
+        Args:
+            audio_chunk: Chunk de áudio em bytes
+            
+        Yields:
+            Texto transcrito (parciais com o prefixo "(parcial) ")
+        """
+        async for event in self.process_audio_events(audio_chunk):
+            yield event.text if event.final else f"{PARTIAL_PREFIX}{event.text}"
+    
+    async def process_audio_events(self, audio_chunk: bytes, partials: bool = True) -> AsyncGenerator[StreamEvent, None]:
+        """
+        Processa um chunk de áudio de streaming
+        
+        Chunks de silêncio não chegam ao recognizer; quando a fala termina, o
+        resultado final do trecho é emitido sem esperar o endpoint do Kaldi.
+        
+        Args:
+            audio_chunk: Chunk de áudio em bytes
+            partials: Se False, o resultado parcial nem é consultado no recognizer
+            
+        Yields:
+            Resultados parciais e finais
+        """
+        speech_ended = False
+        if self.vad is not None:
+            gated = self.vad.process(audio_chunk)
+            audio_chunk, speech_ended = gated.audio, gated.speech_ended
+            if not audio_chunk and not speech_ended:
+                return
+        
+        # O Kaldi roda no executor de inferência, com a prioridade da sessão
+        events = await self._service.executor.run(self._recognize_sync, audio_chunk, speech_ended, partials)
+        for event in events:
+            yield event
+    
+    def _recognize_sync(self, audio_chunk: bytes, speech_ended: bool, partials: bool) -> List[StreamEvent]:
+        """
+        Alimenta o recognizer da sessão (bloqueante, roda no executor de inferência)
+        
+        Args:
+            audio_chunk: PCM 16 bits já filtrado pelo VAD (pode ser vazio)
+            speech_ended: Se o VAD detectou o fim de uma fala antes deste chunk
+            partials: Se False, o resultado parcial nem é consultado
+            
+        Returns:
+            Resultados parciais e finais, em ordem
+        """
+        events = []
+        if speech_ended:
+            result = json.loads(self.recognizer.FinalResult())
+            if result.get("text"):
+                events.append(StreamEvent(result["text"], True))
+        if not audio_chunk:
+            return events
+        
+        if self.recognizer.AcceptWaveform(audio_chunk):
+            result = json.loads(self.recognizer.Result())
+            if "text" in result and result["text"]:
+                events.append(StreamEvent(result["text"], True))
+        elif partials:
+            partial = json.loads(self.recognizer.PartialResult())
+            if "partial" in partial and partial["partial"]:
+                events.append(StreamEvent(partial["partial"], False))
+        return events
+    
+    async def end_stream(self) -> str:
+        """
+        Finaliza a sessão de streaming
+        
+        Returns:
+            Texto final transcrito
+        """
+        if self._closed:
+            return ""
+        self._closed = True
+        self._service.active_sessions -= 1
+            
+        result = json.loads(await self._service.executor.run(self.recognizer.FinalResult))
+        return result.get("text", "")
 
 class VoskSTTService(SpeechToTextService):
     """
@@ -27,83 +133,60 @@ class VoskSTTService(SpeechToTextService):
             self.model_path = model_path
             self.sample_rate = sample_rate
             self.model = self.Model(model_path)
-            self.recognizer = None
+            self.active_sessions = 0
         except ImportError:
             raise ImportError("Vosk não está instalado. Execute 'pip install vosk' para instalar.")
         
-    async def transcribe_audio(self, audio_data: bytes, language: Optional[str] = None) -> str:
+        # O Kaldi libera o GIL durante o reconhecimento, então um pool de threads basta
+        self.executor = get_executor("vosk", kind="thread")
+        
+    async def transcribe_audio(self, audio_data: AudioInput, language: Optional[str] = None) -> str:
         """
         Transcreve um arquivo de áudio completo
         
         Args:
-            audio_data: Dados de áudio em bytes (formato WAV)
+            audio_data: Áudio decodificado (float32 a 16 kHz) ou bytes do arquivo
             
         Returns:
             Texto transcrito
-        """
-        # Cria um novo recognizer para este processamento
-        recognizer = self.KaldiRecognizer(self.model, self.sample_rate)
-        
-        # Tenta extrair informações do formato do arquivo
-        try:
-            # Abrir o arquivo WAV para ler formato
-            with io.BytesIO(audio_data) as wav_stream:
-                with wave.open(wav_stream, 'rb') as wav:
-                    # Se o arquivo não tiver taxa de amostragem compatível, avisar
-                    if wav.getframerate() != self.sample_rate:
-                        print(f"Aviso: A taxa de amostragem do arquivo ({wav.getframerate()}) é diferente "
-                              f"da configurada no modelo ({self.sample_rate}). Isso pode reduzir a precisão.")
-        except Exception as e:
-            # Se não for possível ler como WAV, simplesmente seguir com o processamento
-            print(f"Não foi possível ler informações de formato do áudio: {str(e)}")
             
-        # Processa o áudio
-        recognizer.AcceptWaveform(audio_data)
-        result = json.loads(recognizer.FinalResult())
-        
-        return result.get("text", "")
-    
-    async def start_stream(self) -> None:
+        Raises:
+            ExecutorSaturatedError: Se o executor de inferência estiver saturado
         """
-        Inicia uma sessão de streaming
-        """
-        self.recognizer = self.KaldiRecognizer(self.model, self.sample_rate)
-        
-    async def process_audio_stream(self, audio_chunk: bytes) -> Generator[str, None, None]:
+        # Cabeçalho removido, canais mixados e taxa convertida para a do modelo
+        audio = await ensure_audio_array(audio_data, self.sample_rate)
+        if len(audio) == 0:
+            # Só silêncio: nada a enviar ao recognizer
+            return ""
+        return await self.executor.run(self._transcribe_sync, audio)
+    
+    def _transcribe_sync(self, audio: np.ndarray) -> str:
         """
-        Processa um chunk de áudio de streaming
+        Executa o reconhecimento de forma bloqueante (roda no executor de inferência)
         
         Args:
-            audio_chunk: Chunk de áudio em bytes
+            audio: Amostras float32 mono na taxa do modelo
             
-        Yields:
-            Texto transcrito parcial
+        Returns:
+            Texto transcrito
         """
-        if not self.recognizer:
-            await self.start_stream()
-            
-        if self.recognizer.AcceptWaveform(audio_chunk):
-            result = json.loads(self.recognizer.Result())
-            if "text" in result and result["text"]:
-                yield result["text"]
-        else:
-            # Resultado parcial (opcional)
-            partial = json.loads(self.recognizer.PartialResult())
-            if "partial" in partial and partial["partial"]:
-                yield f"(parcial) {partial['partial']}"
+        # Cria um novo recognizer para este processamento
+        recognizer = self.KaldiRecognizer(self.model, self.sample_rate)
+        
+        # O Kaldi recebe PCM 16 bits mono, apenas as amostras
+        recognizer.AcceptWaveform(float32_to_pcm16(audio))
+        result = json.loads(recognizer.FinalResult())
+        
+        return result.get("text", "")
     
-    async def end_stream(self) -> str:
+    async def start_stream(self) -> StreamSession:
         """
-        Finaliza a sessão de streaming
+        Inicia uma sessão de streaming com recognizer próprio
         
         Returns:
-            Texto final transcrito
+            Sessão de streaming que compartilha o modelo carregado
         """
-        if not self.recognizer:
-            return ""
-            
-        result = json.loads(self.recognizer.FinalResult())
-        return result.get("text", "")
+        return VoskStreamSession(self)
     
     def get_debug_info(self) -> Dict[str, str]:
         """Retorna informações de debug do serviço Vosk STT"""
@@ -111,6 +194,6 @@ class VoskSTTService(SpeechToTextService):
             'service_type': 'Vosk STT',
             'model': f'Vosk Model ({self.model_path})',
             'sample_rate': str(self.sample_rate),
-            'recognizer_active': str(self.recognizer is not None),
+            'active_sessions': str(self.active_sessions),
             'model_path': self.model_path
         }
@@ -1,9 +1,318 @@
-import io
-import tempfile
-from typing import Generator, Optional, Dict
-import os
+from typing import AsyncGenerator, List, Optional, Dict, Tuple
 
-from app.interfaces.stt_service import SpeechToTextService
+import numpy as np
+
+from app.interfaces.stt_service import SpeechToTextService, StreamSession
+from app.inference.local_agreement import LocalAgreement, TimedWord, join_words
+from app.audio.ingest import AudioInput, ensure_audio_array
+from app.audio.pcm import pcm16_to_float32
+from app.audio.wav import parse_wav_header
+from app.audio.vad import create_stream_vad
+from app.inference.executor import get_executor
+from app.inference.batching import MicroBatcher
+from app.config import settings
+from app.server.prefork import is_prefork
+from app.utils.log import logger
+
+# Modelo carregado em cada processo do pool de inferência (modo "process")
+_worker_model = None
+
+# Limiares padrão de model.transcribe, aplicados também à decodificação em lote
+_COMPRESSION_RATIO_THRESHOLD = 2.4
+_LOGPROB_THRESHOLD = -1.0
+_NO_SPEECH_THRESHOLD = 0.6
+
+def _init_worker(model_name: str) -> None:
+    """
+    Carrega o modelo Whisper uma vez em cada processo do pool
+    
+    Args:
+        model_name: Nome do modelo Whisper
+    """
+    global _worker_model
+    import whisper
+    _worker_model = whisper.load_model(model_name)
+
+def resolve_executor_kind() -> str:
+    """
+    Tipo do executor do Whisper conforme WHISPER_EXECUTOR_KIND
+
+    "auto" usa threads no modo pre-fork, onde o paralelismo vem dos próprios
+    workers e o modelo carregado no mestre é compartilhado copy-on-write; um
+    pool de processos (spawn) carregaria uma cópia por processo em cada worker.
+    Fora do pre-fork, "auto" usa processos, já que a inferência segura o GIL.
+    """
+    kind = settings.whisper_executor_kind
+    if kind == "auto":
+        return "thread" if is_prefork() else "process"
+    return kind
+
+def _transcribe_with_model(model, audio: np.ndarray, language: str) -> str:
+    """
+    Transcreve áudio com o modelo informado (bloqueante)
+    
+    Args:
+        model: Modelo Whisper carregado
+        audio: Amostras float32 mono a 16 kHz
+        language: Código do idioma
+        
+    Returns:
+        Texto transcrito
+    """
+    result = model.transcribe(audio, language=language, fp16=model.device.type == "cuda")
+    # Sem o espaço inicial dos tokens, como o texto da decodificação em lote
+    return result["text"].strip()
+
+def _decode_batch_with_model(model, audios: List[np.ndarray], language: str) -> List[str]:
+    """
+    Transcreve vários áudios em uma única passada do encoder/decoder (bloqueante)
+    
+    Áudios de até 30s têm seus log-mel empilhados em um tensor (N, n_mels, 3000)
+    e decodificados juntos; áudios mais longos seguem pelo transcribe normal.
+    A passada em lote é gulosa (temperatura 0): como no transcribe, trechos
+    classificados como silêncio ficam vazios, e resultados que falham nos
+    limiares de compressão ou de log-probabilidade (repetições, alucinações)
+    são refeitos pelo transcribe, com o fallback de temperatura.
+    
+    Args:
+        model: Modelo Whisper carregado
+        audios: Lista de áudios float32 mono a 16 kHz
+        language: Código do idioma comum ao lote
+        
+    Returns:
+        Lista de textos, na mesma ordem dos áudios
+    """
+    import torch
+    import whisper
+    
+    results: List[str] = [""] * len(audios)
+    
+    short = [i for i, audio in enumerate(audios) if len(audio) <= whisper.audio.N_SAMPLES]
+    for i in sorted(set(range(len(audios))) - set(short)):
+        results[i] = _transcribe_with_model(model, audios[i], language)
+    
+    if short:
+        n_mels = getattr(model.dims, "n_mels", 80)
+        mels = torch.stack([
+            whisper.log_mel_spectrogram(whisper.pad_or_trim(audios[i]), n_mels)
+            for i in short
+        ]).to(model.device)
+        # Com timestamps, como no transcribe, para que o texto não dependa do lote
+        options = whisper.DecodingOptions(
+            language=language,
+            fp16=model.device.type == "cuda"
+        )
+        decoded = whisper.decode(model, mels, options)
+        for i, result in zip(short, decoded):
+            low_logprob = result.avg_logprob < _LOGPROB_THRESHOLD
+            if low_logprob and result.no_speech_prob > _NO_SPEECH_THRESHOLD:
+                results[i] = ""
+            elif low_logprob or result.compression_ratio > _COMPRESSION_RATIO_THRESHOLD:
+                results[i] = _transcribe_with_model(model, audios[i], language)
+            else:
+                results[i] = result.text
+    
+    return results
+
+def _transcribe_words_with_model(model, audio: np.ndarray, prompt: str, language: str) -> List[Tuple[float, float, str]]:
+    """
+    Transcreve uma janela de áudio em memória com tempos por palavra (bloqueante)
+    
+    Args:
+        model: Modelo Whisper carregado
+        audio: Amostras float32 a 16 kHz
+        prompt: Texto já confirmado, usado como contexto da decodificação
+        language: Código do idioma
+        
+    Returns:
+        Lista de (início, fim, palavra), com tempos relativos ao início da janela
+    """
+    result = model.transcribe(
+        audio,
+        language=language,
+        initial_prompt=prompt or None,
+        word_timestamps=True,
+        condition_on_previous_text=False,
+        fp16=model.device.type == "cuda"
+    )
+    return [
+        (word["start"], word["end"], word["word"])
+        for segment in result["segments"]
+        for word in segment.get("words", [])
+    ]
+
+def _transcribe_in_worker(audio: np.ndarray, language: str) -> str:
+    """Transcreve áudio com o modelo do processo worker"""
+    return _transcribe_with_model(_worker_model, audio, language)
+
+def _decode_batch_in_worker(audios: List[np.ndarray], language: str) -> List[str]:
+    """Transcreve um lote de áudios com o modelo do processo worker"""
+    return _decode_batch_with_model(_worker_model, audios, language)
+
+def _transcribe_words_in_worker(audio: np.ndarray, prompt: str, language: str) -> List[Tuple[float, float, str]]:
+    """Transcreve uma janela de streaming com o modelo do processo worker"""
+    return _transcribe_words_with_model(_worker_model, audio, prompt, language)
+
+class WhisperStreamSession(StreamSession):
+    """
+    Sessão de streaming Whisper com decodificação incremental
+    
+    Mantém uma janela de áudio float32 em memória que é decodificada de novo a
+    cada `whisper_stream_min_chunk_seconds` de áudio novo. As palavras só são
+    emitidas quando duas decodificações consecutivas concordam (LocalAgreement);
+    o texto confirmado vira o prompt da próxima decodificação e o áudio já
+    confirmado sai da janela, de modo que o custo por chunk não cresce com a
+    duração da sessão.
+    """
+    
+    def __init__(self, service: "WhisperSTTService", language: str = "pt"):
+        """
+        Cria a sessão sobre o modelo do serviço
+        
+        Args:
+            service: Serviço Whisper que detém o modelo compartilhado
+            language: Código do idioma da sessão
+        """
+        self._service = service
+        self._language = language
+        self._sample_rate = service.sample_rate
+        
+        self._window = np.zeros(0, dtype=np.float32)
+        self._window_start = 0.0  # Posição (em segundos) do início da janela na sessão
+        self._new_samples = 0
+        self._remainder = b""  # Byte ímpar de um chunk, completado pelo seguinte
+        self._first_chunk = True
+        self._agreement = LocalAgreement()
+        self.vad = create_stream_vad(self._sample_rate)
+        self._closed = False
+        service.active_sessions += 1
+    
+    def _strip_header(self, audio_chunk: bytes) -> bytes:
+        if self._first_chunk:
+            self._first_chunk = False
+            # Clientes podem enviar um WAV: descarta o cabeçalho
+            info = parse_wav_header(audio_chunk)
+            if info is not None:
+                return audio_chunk[info.data_offset:]
+        return audio_chunk
+    
+    def _append(self, audio_chunk: bytes) -> None:
+        data = self._remainder + audio_chunk
+        usable = len(data) - (len(data) % 2)
+        self._remainder = data[usable:]
+        samples = pcm16_to_float32(data[:usable])
+        self._window = np.concatenate((self._window, samples))
+        self._new_samples += len(samples)
+    
+    async def _decode_window(self) -> List[TimedWord]:
+        prompt = self._agreement.committed_text(settings.whisper_stream_prompt_chars)
+        words = await self._service._run_window(self._window, prompt, self._language)
+        return [TimedWord(start + self._window_start, end + self._window_start, text)
+                for start, end, text in words]
+    
+    def _trim_window(self) -> List[TimedWord]:
+        """
+        Descarta da janela o áudio já confirmado
+        
+        Returns:
+            Palavras confirmadas à força, quando a janela atinge o tamanho máximo
+            sem que as hipóteses concordem
+        """
+        window_seconds = len(self._window) / self._sample_rate
+        forced: List[TimedWord] = []
+        if window_seconds > settings.whisper_stream_max_window_seconds:
+            forced = self._agreement.flush()
+        elif window_seconds <= settings.whisper_stream_trim_seconds:
+            return forced
+        
+        if self._agreement.committed:
+            cut_at = self._agreement.last_committed_time
+        else:
+            # Janela longa sem fala reconhecida: mantém apenas o final
+            cut_at = self._window_start + window_seconds - settings.whisper_stream_trim_seconds
+        
+        cut = int((cut_at - self._window_start) * self._sample_rate)
+        cut = min(max(cut, 0), len(self._window))
+        if cut:
+            self._window = self._window[cut:]
+            self._window_start += cut / self._sample_rate
+        return forced
+        
+    async def process_audio_stream(self, audio_chunk: bytes) -> AsyncGenerator[str, None]:
+        """
+        Processa um chunk de áudio de streaming (PCM 16 bits, 16 kHz, mono)
+        
+        Args:
+            audio_chunk: Chunk de áudio em bytes
+            
+        Yields:
+            Texto recém-confirmado
+        """
+        if self._closed:
+            return
+        audio_chunk = self._strip_header(audio_chunk)
+        
+        if self.vad is not None:
+            gated = self.vad.process(audio_chunk)
+            if gated.speech_ended:
+                # Pausa na fala: confirma o trecho inteiro e esvazia a janela
+                text = join_words(await self._commit_window())
+                if text:
+                    yield text
+            if not gated.audio:
+                return
+            audio_chunk = gated.audio
+        
+        self._append(audio_chunk)
+        
+        if self._new_samples < settings.whisper_stream_min_chunk_seconds * self._sample_rate:
+            return
+        self._new_samples = 0
+        
+        try:
+            words = await self._decode_window()
+        except Exception as e:
+            logger.error("stt.stream", "Erro ao processar áudio streaming com Whisper", error=str(e))
+            return
+        
+        committed = self._agreement.insert(words)
+        committed += self._trim_window()
+        text = join_words(committed)
+        if text:
+            yield text
+    
+    async def end_stream(self) -> str:
+        """
+        Finaliza a sessão de streaming
+        
+        Returns:
+            Texto ainda não emitido
+        """
+        if self._closed:
+            return ""
+        self._closed = True
+        self._service.active_sessions -= 1
+        
+        return join_words(await self._commit_window())
+    
+    async def _commit_window(self) -> List[TimedWord]:
+        """
+        Decodifica o áudio ainda não processado e confirma tudo o que restar
+        
+        Returns:
+            Palavras confirmadas nesta chamada
+        """
+        committed: List[TimedWord] = []
+        if self._new_samples and len(self._window):
+            try:
+                committed = self._agreement.insert(await self._decode_window())
+            except Exception as e:
+                logger.error("stt.stream", "Erro ao processar áudio final com Whisper", error=str(e))
+        committed += self._agreement.flush()
+        self._window_start += len(self._window) / self._sample_rate
+        self._window = np.zeros(0, dtype=np.float32)
+        self._new_samples = 0
+        return committed
 
 class WhisperSTTService(SpeechToTextService):
     """
@@ -17,124 +326,135 @@ class WhisperSTTService(SpeechToTextService):
         Args:
             model_name: Nome do modelo Whisper ("tiny", "base", "small", "medium", "large")
         """
+        self.executor_kind = resolve_executor_kind()
         try:
             import whisper
             self.whisper = whisper
             
             self.model_name = model_name
-            self.model = self.whisper.load_model(model_name)
-            self.temp_file = None
-            
-            # Streaming não é nativamente suportado pelo Whisper
-            # Vamos acumular áudio e processar em chunks
-            self.audio_buffer = b""
+            # No modo "process" cada processo do pool carrega o seu modelo
+            # (_init_worker); uma cópia aqui nunca seria usada
+            self.model = self.whisper.load_model(model_name) if self.executor_kind != "process" else None
             self.sample_rate = 16000
+            self.active_sessions = 0
         except ImportError:
             raise ImportError("OpenAI Whisper não está instalado. Execute 'pip install openai-whisper' para instalar.")
         
-    async def transcribe_audio(self, audio_data: bytes, language: Optional[str] = None) -> str:
+        # A inferência do Whisper segura o GIL em boa parte do tempo; fora do
+        # pre-fork roda por padrão em processos separados, cada um com sua cópia do modelo
+        if self.executor_kind == "process":
+            if is_prefork():
+                logger.warning("stt", "Whisper em pool de processos no modo pre-fork: o modelo não é "
+                               "compartilhado entre workers", model=model_name)
+            self.executor = get_executor(
+                f"whisper-{model_name}",
+                kind="process",
+                initializer=_init_worker,
+                initargs=(model_name,)
+            )
+        else:
+            # Os hooks de KV-cache do Whisper ficam no decoder do modelo
+            # compartilhado: duas decodificações simultâneas corromperiam o
+            # cache uma da outra, então a inferência é serializada por modelo
+            self.executor = get_executor(f"whisper-{model_name}", kind="thread", max_workers=1)
+        
+        # Requisições simultâneas são agrupadas em uma única passada do modelo
+        self.batcher = None
+        if settings.whisper_batch_enabled:
+            self.batcher = MicroBatcher(
+                self._run_batch,
+                window_ms=settings.whisper_batch_window_ms,
+                max_batch_size=settings.whisper_batch_max_size,
+                max_pending=self.executor.capacity * settings.whisper_batch_max_size,
+                name=f"whisper-{model_name}-batch",
+                retry_after=self.executor.retry_after
+            )
+        
+    async def transcribe_audio(self, audio_data: AudioInput, language: Optional[str] = None) -> str:
         """
         Transcreve um arquivo de áudio completo
         
         Args:
-            audio_data: Dados de áudio em bytes
+            audio_data: Áudio decodificado (float32 a 16 kHz) ou bytes do arquivo
             
         Returns:
             Texto transcrito
-        """
-        # Salvar áudio em arquivo temporário
-        with tempfile.NamedTemporaryFile(delete=False, suffix=".wav") as temp:
-            temp.write(audio_data)
-            temp_path = temp.name
             
-        try:
-            # Realizar transcrição
-            transcribe_params = {"audio": temp_path}
-            if language:
-                transcribe_params["language"] = language
-            else:
-                transcribe_params["language"] = "pt"  # Idioma padrão
-                
-            result = self.model.transcribe(**transcribe_params)
-            return result["text"]
-        finally:
-            # Limpar arquivo temporário
-            if os.path.exists(temp_path):
-                os.remove(temp_path)
-    
-    async def start_stream(self) -> None:
+        Raises:
+            ExecutorSaturatedError: Se o executor de inferência estiver saturado
         """
-        Inicia uma sessão de streaming
+        language = language or "pt"  # Idioma padrão
+        audio = await ensure_audio_array(audio_data)
+        if len(audio) == 0:
+            # Só silêncio: nada a enviar ao modelo
+            return ""
+        if self.batcher is not None:
+            return await self.batcher.submit(audio, key=language)
+        return await self._run_transcription(audio, language)
+    
+    async def transcribe_segment(self, audio: np.ndarray, language: Optional[str] = None) -> str:
         """
-        self.audio_buffer = b""
+        Transcreve um segmento de um áudio longo direto no executor
         
-    async def process_audio_stream(self, audio_chunk: bytes) -> Generator[str, None, None]:
+        Segmentos não passam pelo micro-batching: cada um vai para um worker,
+        para que um arquivo longo use todos os processos de inferência.
+        """
+        return await self._run_transcription(audio, language or "pt")
+    
+    async def _run_batch(self, language: str, audios: List[np.ndarray]) -> List[str]:
         """
-        Processa um chunk de áudio de streaming
+        Executa um lote de transcrições no executor de inferência configurado
         
         Args:
-            audio_chunk: Chunk de áudio em bytes
+            language: Código do idioma comum ao lote
+            audios: Lista de áudios float32 a 16 kHz
             
-        Yields:
-            Texto transcrito parcial
+        Returns:
+            Lista de textos, na mesma ordem dos áudios
+        """
+        if self.executor_kind == "process":
+            return await self.executor.run(_decode_batch_in_worker, audios, language)
+        return await self.executor.run(_decode_batch_with_model, self.model, audios, language)
+    
+    async def _run_transcription(self, audio: np.ndarray, language: str) -> str:
         """
-        # Acumular áudio
-        self.audio_buffer += audio_chunk
+        Executa a transcrição no executor de inferência configurado
         
-        # Whisper não é ideal para streaming em tempo real, pois foi projetado
-        # para processar arquivos completos. Porém, podemos processar o buffer
-        # acumulado para obter resultados parciais.
+        Args:
+            audio: Amostras float32 a 16 kHz
+            language: Código do idioma
+            
+        Returns:
+            Texto transcrito
+        """
+        if self.executor_kind == "process":
+            return await self.executor.run(_transcribe_in_worker, audio, language)
+        return await self.executor.run(_transcribe_with_model, self.model, audio, language)
+    
+    async def _run_window(self, audio: np.ndarray, prompt: str, language: str) -> List[Tuple[float, float, str]]:
+        """
+        Decodifica uma janela de streaming no executor de inferência configurado
         
-        # Só processar se tivermos pelo menos 1 segundo de áudio (aprox.)
-        # Isso é uma estimativa - 32KB é geralmente suficiente para 1s em 16kHz
-        if len(self.audio_buffer) > 32000:
-            try:
-                with tempfile.NamedTemporaryFile(delete=False, suffix=".wav") as temp:
-                    temp.write(self.audio_buffer)
-                    temp_path = temp.name
-                    
-                # Processar com Whisper
-                result = self.model.transcribe(temp_path, language="pt")
-                
-                # Limpar arquivo temporário
-                os.remove(temp_path)
-                
-                if result["text"]:
-                    yield result["text"]
-                    
-                    # Reset do buffer após processar uma parte significativa
-                    # Mantém um pouco de sobreposição para continuidade
-                    self.audio_buffer = self.audio_buffer[-8000:]
-            except Exception as e:
-                print(f"Erro ao processar áudio streaming com Whisper: {e}")
+        Args:
+            audio: Amostras float32 a 16 kHz
+            prompt: Texto já confirmado da sessão
+            language: Código do idioma
+            
+        Returns:
+            Lista de (início, fim, palavra) relativa ao início da janela
+        """
+        if self.executor_kind == "process":
+            return await self.executor.run(_transcribe_words_in_worker, audio, prompt, language)
+        return await self.executor.run(_transcribe_words_with_model, self.model, audio, prompt, language)
     
-    async def end_stream(self) -> str:
+    async def start_stream(self) -> StreamSession:
         """
-        Finaliza a sessão de streaming
+        Inicia uma sessão de streaming com buffer próprio
         
         Returns:
-            Texto final transcrito
+            Sessão de streaming que compartilha o modelo carregado
         """
-        if not self.audio_buffer:
-            return ""
-            
-        # Processar o buffer de áudio final
-        try:
-            with tempfile.NamedTemporaryFile(delete=False, suffix=".wav") as temp:
-                temp.write(self.audio_buffer)
-                temp_path = temp.name
-                
-            # Processar com Whisper
-            result = self.model.transcribe(temp_path, language="pt")
-            
-            # Limpar arquivo temporário e buffer
-            os.remove(temp_path)
-            self.audio_buffer = b""
-            
-            return result["text"]
-        except Exception as e:
-            print(f"Erro ao processar áudio final com Whisper: {e}")
-            return ""
+        return WhisperStreamSession(self)
     
     def get_debug_info(self) -> Dict[str, str]:
         """Retorna informações de debug do serviço Whisper STT"""
@@ -142,6 +462,8 @@ class WhisperSTTService(SpeechToTextService):
             'service_type': 'OpenAI Whisper STT',
             'model': self.model_name,
             'sample_rate': str(self.sample_rate),
-            'audio_buffer_size': str(len(self.audio_buffer)),
+            'active_sessions': str(self.active_sessions),
+            'batching': str(self.batcher is not None),
+            'streaming': 'incremental (local agreement)',
             'language': 'pt (default)'
         }
@@ -1,9 +1,11 @@
 import os
 import json
-import requests
-from typing import List, Dict
-import tempfile
+from typing import AsyncIterator, Dict, List
 from app.interfaces.tts_service import TextToSpeechService
+from app.audio.concat import join_audio_segments, stream_audio_segments_async
+from app.utils.http_client import get_sync_client, send_with_retry
+from app.utils.tracing import span
+from app.utils.log import logger
 
 class AzureOpenAITTSService(TextToSpeechService):
     """
@@ -39,15 +41,15 @@ class AzureOpenAITTSService(TextToSpeechService):
         self.language = language
         self.speed = speed
         
-    def _generate_audio(self, text: str):
+    def _build_request(self, text: str) -> Dict:
         """
-        Gera áudio a partir do texto usando a API OpenAI
+        Monta URL, headers e corpo da requisição de síntese
         
         Args:
             text: Texto a ser convertido
             
         Returns:
-            Dados de áudio em bytes
+            Argumentos nomeados para a requisição HTTP
         """
         headers = {
             "Authorization": f"Bearer {self.api_key}",
@@ -65,19 +67,47 @@ class AzureOpenAITTSService(TextToSpeechService):
             data["speed"] = self.speed
             
         url = f"{self.endpoint}/openai/deployments/tts/audio/speech?api-version=2025-03-01-preview"
+        return {"url": url, "headers": headers, "json": data}
+    
+    @staticmethod
+    def _error_message(status_code: int, body: bytes) -> str:
+        error_message = f"Erro ao gerar áudio: {status_code}"
+        try:
+            error_message += f" - {json.dumps(json.loads(body))}"
+        except ValueError:
+            error_message += f" - {body.decode('utf-8', errors='replace')}"
+        return error_message
+    
+    def _generate_audio(self, text: str):
+        """
+        Gera áudio a partir do texto usando a API OpenAI (caminho síncrono)
+        
+        Args:
+            text: Texto a ser convertido
+            
+        Returns:
+            Dados de áudio em bytes
+        """
+        response = get_sync_client().post(**self._build_request(text))
+        if response.status_code != 200:
+            raise Exception(self._error_message(response.status_code, response.content))
+        return response.content
+    
+    async def _generate_audio_async(self, text: str) -> bytes:
+        """
+        Gera áudio a partir do texto usando o cliente assíncrono compartilhado
         
-        response = requests.post(url, headers=headers, json=data)
-        
-        if response.status_code == 200:
-            return response.content
-        else:
-            error_message = f"Erro ao gerar áudio: {response.status_code}"
-            try:
-                error_detail = response.json()
-                error_message += f" - {json.dumps(error_detail)}"
-            except:
-                error_message += f" - {response.text}"
-            raise Exception(error_message)
+        Args:
+            text: Texto a ser convertido
+            
+        Returns:
+            Dados de áudio em bytes
+        """
+        with span("azure_openai.request", model=self.model, text_length=len(text)):
+            response = await send_with_retry("POST", **self._build_request(text))
+        if response.status_code != 200:
+            raise Exception(self._error_message(response.status_code, response.content))
+        return response.content
     
     def synthesize(self, text: str) -> bytes:
         """
@@ -91,6 +121,41 @@ class AzureOpenAITTSService(TextToSpeechService):
         """
         return self._generate_audio(text)
     
+    async def synthesize_async(self, text: str) -> bytes:
+        """Converte texto em dados de áudio sem ocupar uma thread"""
+        return await self._generate_audio_async(text)
+    
+    async def synthesize_stream_async(self, text: str) -> AsyncIterator[bytes]:
+        """
+        Sintetiza o texto repassando o áudio à medida que chega da API
+        
+        Args:
+            text: Texto a ser convertido
+            
+        Yields:
+            Blocos do áudio MP3
+        """
+        # Mede até os headers da API; o corpo chega enquanto é repassado ao cliente
+        with span("azure_openai.request", model=self.model, text_length=len(text), streaming=True):
+            response = await send_with_retry("POST", stream=True, **self._build_request(text))
+        try:
+            if response.status_code != 200:
+                raise Exception(self._error_message(response.status_code, await response.aread()))
+            async for chunk in response.aiter_bytes(4096):
+                if chunk:
+                    yield chunk
+        finally:
+            await response.aclose()
+    
+    async def synthesize_long_async(self, text: str) -> bytes:
+        """Sintetiza as frases em paralelo no próprio event loop e junta o MP3 em ordem"""
+        segments = [segment async for segment in self._synthesize_sentences_async(text)]
+        return join_audio_segments(segments, self.get_media_type())
+    
+    def synthesize_long_stream_async(self, text: str) -> AsyncIterator[bytes]:
+        """Como synthesize_long_async, entregando cada frase assim que está pronta"""
+        return stream_audio_segments_async(self._synthesize_sentences_async(text), self.get_media_type())
+    
     def save_to_file(self, text: str, output_path: str) -> str:
         """
         Salva a síntese em um arquivo
@@ -109,6 +174,10 @@ class AzureOpenAITTSService(TextToSpeechService):
             
         return output_path
     
+    def get_media_type(self) -> str:
+        """A API de fala do Azure OpenAI retorna MP3 por padrão"""
+        return "audio/mpeg"
+    
     def get_available_voices(self) -> List[str]:
         """
         Retorna a lista de vozes disponíveis
@@ -140,7 +209,7 @@ class AzureOpenAITTSService(TextToSpeechService):
             else:
                 # Voz solicitada não está disponível, manter a voz padrão
                 # e não alterar self.voice que já está com o valor padrão definido no construtor
-                print(f"Aviso: Voz '{voice}' não encontrada. Usando voz padrão '{self.voice}' como fallback.")
+                logger.warning("tts", "Voz não encontrada; usando a voz padrão", voice=voice, fallback=self.voice)
     
     def set_speed(self, speed: float) -> None:
         """
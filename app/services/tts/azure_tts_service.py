@@ -1,7 +1,8 @@
 import os
-from typing import List, Dict
+from typing import Dict, Iterator, List
 import azure.cognitiveservices.speech as speechsdk
 from app.interfaces.tts_service import TextToSpeechService
+from app.audio.wav import build_wav_header, parse_wav_header
 
 class AzureTTSService(TextToSpeechService):
     """
@@ -32,6 +33,9 @@ class AzureTTSService(TextToSpeechService):
         
         # Configurar o serviço de fala
         self.speech_config = speechsdk.SpeechConfig(subscription=self.subscription_key, region=self.region)
+        self.speech_config.set_speech_synthesis_output_format(
+            speechsdk.SpeechSynthesisOutputFormat.Riff16Khz16BitMonoPcm
+        )
         
         # Configurar idioma e voz padrão
         self.language = language
@@ -40,6 +44,7 @@ class AzureTTSService(TextToSpeechService):
         
         # Usar o método set_voice para validar e configurar a voz
         self.set_voice(voice_name)
+        self.speech_config.speech_synthesis_voice_name = self.voice_name
         
         # Configuração de velocidade
         self.speed = speed
@@ -54,16 +59,16 @@ class AzureTTSService(TextToSpeechService):
         Returns:
             Dados de áudio em bytes
         """
-        # Configuração para receber o resultado como um fluxo de áudio
-        audio_config = speechsdk.audio.AudioOutputConfig(use_default_speaker=False)
-        synthesizer = speechsdk.SpeechSynthesizer(speech_config=self.speech_config, audio_config=audio_config)
+        # Sem audio_config o SDK mantém o áudio em memória (result.audio_data),
+        # sem tocar no alto-falante nem gravar arquivo
+        synthesizer = speechsdk.SpeechSynthesizer(speech_config=self.speech_config, audio_config=None)
         
         # Aplica SSML se necessário
         input_text = self.apply_ssml(text)
         
         # Realizar a síntese de fala
-        if self.speed != 1.0:
-            # Se estiver usando velocidade personalizada, usamos SSML
+        if self._needs_ssml():
+            # Se estiver usando velocidade ou voz personalizada, usamos SSML
             result = synthesizer.speak_ssml_async(input_text).get()
         else:
             # Caso contrário, usamos o texto simples
@@ -82,6 +87,55 @@ class AzureTTSService(TextToSpeechService):
         else:
             raise Exception(f"Falha na síntese de fala: {result.reason}")
     
+    def synthesize_stream(self, text: str) -> Iterator[bytes]:
+        """
+        Sintetiza o texto entregando o áudio à medida que o serviço o produz
+        
+        Usa um PullAudioOutputStream: a síntese roda em segundo plano no SDK e
+        cada leitura devolve o próximo bloco disponível.
+        
+        Args:
+            text: Texto a ser convertido
+            
+        Yields:
+            Blocos de áudio WAV (cabeçalho de tamanho indefinido seguido de PCM)
+        """
+        pull_stream = speechsdk.audio.PullAudioOutputStream()
+        audio_config = speechsdk.audio.AudioOutputConfig(stream=pull_stream)
+        synthesizer = speechsdk.SpeechSynthesizer(speech_config=self.speech_config, audio_config=audio_config)
+        
+        if self._needs_ssml():
+            result_future = synthesizer.speak_ssml_async(self.apply_ssml(text))
+        else:
+            result_future = synthesizer.speak_text_async(text)
+        
+        # Formato configurado no construtor: RIFF 16 kHz, 16 bits, mono
+        yield build_wav_header(16000)
+        
+        buffer = bytes(16000)
+        first_block = True
+        while True:
+            filled = pull_stream.read(buffer)
+            if filled == 0:
+                break
+            block = buffer[:filled]
+            if first_block:
+                first_block = False
+                # Dependendo da versão do SDK o stream traz o cabeçalho RIFF
+                info = parse_wav_header(block)
+                if info is not None:
+                    block = block[info.data_offset:]
+            if block:
+                yield block
+        
+        result = result_future.get()
+        if result.reason == speechsdk.ResultReason.Canceled:
+            cancellation_details = result.cancellation_details
+            error_message = f"Síntese cancelada: {cancellation_details.reason}. "
+            if cancellation_details.reason == speechsdk.CancellationReason.Error:
+                error_message += f"Erro: {cancellation_details.error_details}"
+            raise Exception(error_message)
+    
     def save_to_file(self, text: str, output_path: str) -> str:
         """
         Salva a síntese em um arquivo
@@ -101,8 +155,8 @@ class AzureTTSService(TextToSpeechService):
         input_text = self.apply_ssml(text)
         
         # Realizar a síntese
-        if self.speed != 1.0:
-            # Se estiver usando velocidade personalizada, usamos SSML
+        if self._needs_ssml():
+            # Se estiver usando velocidade ou voz personalizada, usamos SSML
             result = synthesizer.speak_ssml_async(input_text).get()
         else:
             # Caso contrário, usamos o texto simples
@@ -148,6 +202,9 @@ class AzureTTSService(TextToSpeechService):
         """
         Define a voz a ser usada
         
+        A configuração do SDK é compartilhada entre requisições, por isso a voz
+        fica apenas na instância e é aplicada via SSML quando difere da padrão.
+        
         Args:
             voice: ID da voz
         """
@@ -155,10 +212,8 @@ class AzureTTSService(TextToSpeechService):
         
         if voice and voice in self.get_available_voices():
             self.voice_name = voice
-            self.speech_config.speech_synthesis_voice_name = voice
         else:
             self.voice_name = default_voice
-            self.speech_config.speech_synthesis_voice_name = default_voice
     
     def set_speed(self, speed: float) -> None:
         """
@@ -170,6 +225,10 @@ class AzureTTSService(TextToSpeechService):
         if speed is not None:
             self.speed = speed
     
+    def _needs_ssml(self) -> bool:
+        """Indica se a síntese precisa de SSML (velocidade ou voz diferentes da configuração)"""
+        return self.speed != 1.0 or self.voice_name != self.speech_config.speech_synthesis_voice_name
+    
     def apply_ssml(self, text: str) -> str:
         """
         Aplica marcação SSML ao texto para controlar atributos como velocidade
@@ -180,8 +239,8 @@ class AzureTTSService(TextToSpeechService):
         Returns:
             Texto formatado com SSML
         """
-        # Se a velocidade for normal (1.0), não precisa aplicar SSML
-        if self.speed == 1.0:
+        # Se a velocidade e a voz forem as da configuração, não precisa aplicar SSML
+        if not self._needs_ssml():
             return text
             
         # Formata o texto com as tags SSML necessárias
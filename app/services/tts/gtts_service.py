@@ -1,5 +1,4 @@
-import os
-import tempfile
+import io
 from typing import List, Dict
 
 from app.interfaces.tts_service import TextToSpeechService
@@ -47,34 +46,21 @@ class GTTSService(TextToSpeechService):
         Returns:
             Dados de áudio em bytes
         """
-        # Criar arquivo temporário
-        with tempfile.NamedTemporaryFile(delete=False, suffix=".mp3") as temp:
-            temp_path = temp.name
+        # Obter configurações da voz atual
+        voice_config = self._voices.get(self._current_voice, {"lang": self.lang, "slow": False})
         
-        try:
-            # Obter configurações da voz atual
-            voice_config = self._voices.get(self._current_voice, {"lang": self.lang, "slow": False})
-            
-            # Sintetizar texto
-            tts = self.gTTS(
-                text=text, 
-                lang=voice_config["lang"],
-                slow=voice_config["slow"],
-                tld=self._tld
-            )
-            
-            # Salvar para arquivo temporário
-            tts.save(temp_path)
-            
-            # Ler bytes do arquivo
-            with open(temp_path, "rb") as f:
-                audio_data = f.read()
-                
-            return audio_data
-        finally:
-            # Limpar arquivo temporário
-            if os.path.exists(temp_path):
-                os.remove(temp_path)
+        # Sintetizar texto
+        tts = self.gTTS(
+            text=text, 
+            lang=voice_config["lang"],
+            slow=voice_config["slow"],
+            tld=self._tld
+        )
+        
+        # Gravar o MP3 diretamente em um buffer em memória
+        buffer = io.BytesIO()
+        tts.write_to_fp(buffer)
+        return buffer.getvalue()
     
     def save_to_file(self, text: str, output_path: str) -> str:
         """
@@ -102,6 +88,10 @@ class GTTSService(TextToSpeechService):
         tts.save(output_path)
         return output_path
     
+    def get_media_type(self) -> str:
+        """O gTTS produz áudio MP3"""
+        return "audio/mpeg"
+    
     def get_available_voices(self) -> List[str]:
         """
         Retorna a lista de vozes disponíveis
@@ -1,7 +1,12 @@
 import os
+import shutil
+import subprocess
+import tempfile
+import threading
 from typing import List, Dict
 
 from app.interfaces.tts_service import TextToSpeechService
+from app.audio.wav import fix_wav_header
 
 class Pyttsx3TTSService(TextToSpeechService):
     """
@@ -29,6 +34,16 @@ class Pyttsx3TTSService(TextToSpeechService):
             except Exception:
                 # Falha ao definir a voz, mas não vamos interromper a inicialização
                 pass
+            
+            # A engine é compartilhada entre cópias do serviço e não é reentrante:
+            # a voz de cada instância é aplicada sob o lock no momento da síntese
+            self._engine_lock = threading.Lock()
+            self._voice = self.engine.getProperty('voice')
+            self._rate = self.engine.getProperty('rate')
+            
+            # Com o binário do espeak disponível, a síntese em memória usa
+            # `espeak --stdout`, sem arquivo e sem disputar a engine compartilhada
+            self._espeak_path = shutil.which('espeak-ng') or shutil.which('espeak')
         except ImportError:
             raise ImportError("pyttsx3 não está instalado. Execute 'pip install pyttsx3' para instalar.")
         
@@ -42,21 +57,41 @@ class Pyttsx3TTSService(TextToSpeechService):
         Returns:
             Dados de áudio em bytes
         """
-        # pyttsx3 não tem um método direto para retornar bytes,
-        # então precisamos salvar em um arquivo temporário e depois ler
-        temp_file = "temp_speech.wav"
-        self.save_to_file(text, temp_file)
-        
-        with open(temp_file, "rb") as f:
-            audio_data = f.read()
+        if self._espeak_path:
+            return self._synthesize_espeak(text)
         
-        # Limpa o arquivo temporário
+        # pyttsx3 não tem um método direto para retornar bytes; sem o binário
+        # do espeak, usamos um arquivo temporário exclusivo desta requisição
+        fd, temp_path = tempfile.mkstemp(suffix=".wav")
+        os.close(fd)
         try:
-            os.remove(temp_file)
-        except:
-            pass
+            self.save_to_file(text, temp_path)
+            with open(temp_path, "rb") as f:
+                return f.read()
+        finally:
+            os.remove(temp_path)
+    
+    def _synthesize_espeak(self, text: str) -> bytes:
+        """
+        Sintetiza com o espeak escrevendo o WAV na saída padrão (buffer por requisição)
+        
+        Args:
+            text: Texto a ser convertido
             
-        return audio_data
+        Returns:
+            Dados de áudio WAV em bytes
+        """
+        command = [self._espeak_path, '--stdout', '--stdin', '-s', str(self._rate)]
+        if self._voice:
+            command += ['-v', self._voice]
+        
+        # O texto vai pela entrada padrão para não depender de limites de argumentos
+        result = subprocess.run(command, input=text.encode('utf-8'), capture_output=True)
+        if result.returncode != 0 or not result.stdout:
+            raise Exception(f"Falha na síntese com espeak: {result.stderr.decode('utf-8', 'replace').strip()}")
+        
+        # O espeak escreve o cabeçalho antes de saber o tamanho final do áudio
+        return fix_wav_header(result.stdout)
     
     def save_to_file(self, text: str, output_path: str) -> str:
         """
@@ -69,8 +104,11 @@ class Pyttsx3TTSService(TextToSpeechService):
         Returns:
             Caminho do arquivo salvo
         """
-        self.engine.save_to_file(text, output_path)
-        self.engine.runAndWait()
+        with self._engine_lock:
+            if self._voice:
+                self.engine.setProperty('voice', self._voice)
+            self.engine.save_to_file(text, output_path)
+            self.engine.runAndWait()
         return output_path
     
     def get_available_voices(self) -> List[str]:
@@ -90,11 +128,11 @@ class Pyttsx3TTSService(TextToSpeechService):
             voice: ID da voz
         """
         if voice:
-            self.engine.setProperty('voice', voice)
+            self._voice = voice
     
     def get_debug_info(self) -> Dict[str, str]:
         """Retorna informações de debug do serviço pyttsx3 TTS"""
-        current_voice = self.engine.getProperty('voice')
+        current_voice = self._voice
         current_rate = self.engine.getProperty('rate')
         return {
             'service_type': 'pyttsx3 TTS',
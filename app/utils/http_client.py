@@ -0,0 +1,218 @@
+import asyncio
+import os
+import threading
+from typing import Any, Dict, Optional
+
+import httpx
+
+# Respostas que indicam falha transitória do serviço remoto
+RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+
+
+class RetryBudget:
+    """
+    Orçamento de novas tentativas compartilhado pelo processo
+
+    Cada requisição deposita `ratio` fichas e cada nova tentativa consome uma.
+    Assim, as novas tentativas ficam limitadas a uma fração do tráfego e não
+    multiplicam a carga sobre um backend que já está falhando.
+    """
+
+    def __init__(self, ratio: float = 0.2, reserve: float = 10.0):
+        """
+        Inicializa o orçamento
+
+        Args:
+            ratio: Fração de novas tentativas permitida em relação às requisições
+            reserve: Fichas iniciais (permitem tentativas em baixo tráfego)
+        """
+        self.ratio = max(0.0, ratio)
+        self.reserve = max(0.0, reserve)
+        self._tokens = self.reserve
+        self._max_tokens = self.reserve * 10 or 1.0
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.retries = 0
+        self.exhausted = 0
+
+    def record_request(self) -> None:
+        """Registra uma requisição (deposita fichas)"""
+        with self._lock:
+            self.requests += 1
+            self._tokens = min(self._max_tokens, self._tokens + self.ratio)
+
+    def try_spend(self) -> bool:
+        """Consome uma ficha para uma nova tentativa; False se o orçamento acabou"""
+        with self._lock:
+            if self._tokens < 1:
+                self.exhausted += 1
+                return False
+            self._tokens -= 1
+            self.retries += 1
+            return True
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Retorna os contadores do orçamento"""
+        with self._lock:
+            return {
+                "requests": self.requests,
+                "retries": self.retries,
+                "exhausted": self.exhausted,
+                "tokens": round(self._tokens, 2),
+            }
+
+
+_async_client: Optional[httpx.AsyncClient] = None
+_sync_client: Optional[httpx.Client] = None
+_retry_budget: Optional[RetryBudget] = None
+_client_pid: Optional[int] = None
+_lock = threading.Lock()
+
+
+def _http2_available() -> bool:
+    try:
+        import h2  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+def _client_options() -> Dict[str, Any]:
+    from app.config import settings
+    return {
+        "limits": httpx.Limits(
+            max_connections=settings.http_max_connections,
+            max_keepalive_connections=settings.http_max_keepalive_connections,
+            keepalive_expiry=settings.http_keepalive_expiry,
+        ),
+        "timeout": httpx.Timeout(settings.http_read_timeout, connect=settings.http_connect_timeout),
+        "http2": settings.http2 and _http2_available(),
+    }
+
+
+def _reset_after_fork() -> None:
+    # Conexões herdadas de outro processo (fork do servidor) não podem ser reutilizadas
+    global _async_client, _sync_client, _retry_budget, _client_pid
+    if _client_pid != os.getpid():
+        _async_client = None
+        _sync_client = None
+        _retry_budget = None
+        _client_pid = os.getpid()
+
+
+def get_async_client() -> httpx.AsyncClient:
+    """
+    Retorna o cliente HTTP assíncrono compartilhado pelo processo
+
+    Mantém conexões keep-alive em pool (HTTP/2 quando o pacote h2 está
+    instalado), com limites e timeouts definidos na configuração.
+    """
+    global _async_client
+    with _lock:
+        _reset_after_fork()
+        if _async_client is None or _async_client.is_closed:
+            _async_client = httpx.AsyncClient(**_client_options())
+        return _async_client
+
+
+def get_sync_client() -> httpx.Client:
+    """
+    Retorna o cliente HTTP síncrono compartilhado, para chamadas feitas fora do event loop
+    """
+    global _sync_client
+    from app.config import settings
+    with _lock:
+        _reset_after_fork()
+        if _sync_client is None or _sync_client.is_closed:
+            options = _client_options()
+            # Sem o laço de send_with_retry, repete apenas falhas de conexão
+            transport = httpx.HTTPTransport(
+                retries=settings.http_max_retries,
+                http2=options["http2"],
+                limits=options["limits"],
+            )
+            _sync_client = httpx.Client(transport=transport, timeout=options["timeout"])
+        return _sync_client
+
+
+def get_retry_budget() -> RetryBudget:
+    """Retorna o orçamento de novas tentativas do processo"""
+    global _retry_budget
+    from app.config import settings
+    with _lock:
+        _reset_after_fork()
+        if _retry_budget is None:
+            _retry_budget = RetryBudget(settings.http_retry_budget_ratio)
+        return _retry_budget
+
+
+def _retry_delay(attempt: int, response: Optional[httpx.Response]) -> float:
+    from app.config import settings
+    if response is not None:
+        retry_after = response.headers.get("Retry-After")
+        if retry_after and retry_after.isdigit():
+            return min(float(retry_after), 30.0)
+    return settings.http_retry_backoff * (2 ** attempt)
+
+
+async def send_with_retry(method: str, url: str, stream: bool = False, **kwargs) -> httpx.Response:
+    """
+    Envia uma requisição pelo cliente compartilhado, repetindo falhas transitórias
+
+    Erros de transporte e respostas 429/5xx são repetidos com backoff
+    exponencial (ou o Retry-After do servidor), até `http_max_retries` vezes e
+    enquanto houver orçamento de novas tentativas.
+
+    Args:
+        method: Método HTTP
+        url: URL de destino
+        stream: Se True, o corpo não é lido (use aiter_bytes e aclose)
+        **kwargs: Argumentos de httpx.AsyncClient.build_request (headers, json, files...)
+
+    Returns:
+        Última resposta obtida (pode ser um erro, se as tentativas acabarem)
+    """
+    from app.config import settings
+    client = get_async_client()
+    budget = get_retry_budget()
+    budget.record_request()
+
+    attempt = 0
+    while True:
+        response = None
+        try:
+            response = await client.send(client.build_request(method, url, **kwargs), stream=stream)
+        except httpx.TransportError:
+            if attempt >= settings.http_max_retries or not budget.try_spend():
+                raise
+        else:
+            if (response.status_code not in RETRYABLE_STATUS or attempt >= settings.http_max_retries
+                    or not budget.try_spend()):
+                return response
+            await response.aclose()
+
+        await asyncio.sleep(_retry_delay(attempt, response))
+        attempt += 1
+
+
+def get_http_stats() -> Dict[str, Any]:
+    """Retorna a configuração dos clientes e os contadores de novas tentativas"""
+    with _lock:
+        client, budget = _async_client, _retry_budget
+    return {
+        "async_client_open": client is not None and not client.is_closed,
+        "http2": _client_options()["http2"],
+        "retry_budget": budget.get_stats() if budget else None,
+    }
+
+
+async def close_http_clients() -> None:
+    """Fecha os clientes compartilhados (encerramento da aplicação)"""
+    global _async_client, _sync_client
+    with _lock:
+        async_client, _async_client = _async_client, None
+        sync_client, _sync_client = _sync_client, None
+    if async_client is not None:
+        await async_client.aclose()
+    if sync_client is not None:
+        sync_client.close()
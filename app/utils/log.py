@@ -0,0 +1,219 @@
+import atexit
+import datetime
+import json
+import os
+import queue
+import random
+import sys
+import threading
+import time
+from typing import Any, Dict, Optional, TextIO, Tuple
+
+LEVELS = {"debug": 10, "info": 20, "warning": 30, "error": 40}
+
+# Registros gravados por escrita no stream
+_WRITE_BATCH = 256
+
+Record = Tuple[float, str, str, str, Dict[str, Any]]
+
+
+def _format_field(value: Any) -> str:
+    if isinstance(value, float):
+        return f"{value:.2f}"
+    text = str(value)
+    return json.dumps(text, ensure_ascii=False) if (" " in text or not text) else text
+
+
+def format_text(record: Record) -> str:
+    """Uma linha legível: data, nível, categoria, mensagem e campos chave=valor"""
+    timestamp, level, category, message, fields = record
+    moment = datetime.datetime.fromtimestamp(timestamp).isoformat(timespec="milliseconds")
+    line = f"{moment} {level.upper():<7} [{category}] {message}"
+    if fields:
+        line += " " + " ".join(f"{key}={_format_field(value)}" for key, value in fields.items())
+    return line
+
+
+def format_json(record: Record) -> str:
+    """Uma linha JSON com os campos no nível de cima (para coletores de log)"""
+    timestamp, level, category, message, fields = record
+    data = {"ts": round(timestamp, 3), "level": level, "category": category, "message": message}
+    for key, value in fields.items():
+        data[key] = round(value, 3) if isinstance(value, float) else value
+    return json.dumps(data, ensure_ascii=False, default=str)
+
+
+class StructuredLogger:
+    """
+    Logger estruturado com fila: formata e escreve fora do caminho da requisição
+
+    Quem registra apenas decide se o registro entra (nível mínimo e
+    amostragem) e o coloca em uma fila limitada; uma thread dedicada formata
+    (texto ou JSON) e escreve no stream em lotes. Com a fila cheia o registro
+    é descartado e contado, em vez de bloquear o event loop.
+
+    A amostragem vale por categoria e só para debug/info (ex.: 1% das linhas
+    de sucesso de "stt.request"); avisos e erros são sempre registrados.
+    """
+
+    def __init__(self, stream: Optional[TextIO] = None, level: str = "info", fmt: str = "text",
+                 max_queue: int = 10000, sample_rates: Optional[Dict[str, float]] = None):
+        """
+        Inicializa o logger (a thread de escrita é criada no primeiro registro)
+
+        Args:
+            stream: Destino das linhas (padrão: stdout)
+            level: Nível mínimo ("debug", "info", "warning", "error")
+            fmt: Formato das linhas ("text" ou "json")
+            max_queue: Registros aguardando escrita antes de descartar
+            sample_rates: Fração registrada de debug/info por categoria (padrão 1.0)
+        """
+        self._stream = stream
+        self._lock = threading.Lock()
+        self._writer: Optional[threading.Thread] = None
+        self.max_queue = max(1, max_queue)
+        self._queue: "queue.Queue[Any]" = queue.Queue(self.max_queue)
+        self.dropped = 0
+        self.sampled_out = 0
+        self.written = 0
+        self.configure(level, fmt, sample_rates)
+
+    def configure(self, level: str = "info", fmt: str = "text",
+                  sample_rates: Optional[Dict[str, float]] = None) -> None:
+        """Altera nível, formato e amostragem (vale também para o que já está na fila)"""
+        if level not in LEVELS:
+            raise ValueError(f"Nível de log '{level}' não suportado")
+        if fmt not in ("text", "json"):
+            raise ValueError(f"Formato de log '{fmt}' não suportado")
+        self._level = LEVELS[level]
+        self._format = format_json if fmt == "json" else format_text
+        self._sample_rates = {category: min(max(rate, 0.0), 1.0) for category, rate in (sample_rates or {}).items()}
+
+    def reset_after_fork(self) -> None:
+        """Descarta a thread e a fila herdadas do processo pai (threads não sobrevivem ao fork)"""
+        self._lock = threading.Lock()
+        self._writer = None
+        self._queue = queue.Queue(self.max_queue)
+
+    def enabled(self, level: str) -> bool:
+        """Indica se registros do nível seriam gravados (evita montar campos caros)"""
+        return LEVELS[level] >= self._level
+
+    def log(self, level: str, category: str, message: str, **fields) -> None:
+        """
+        Registra uma linha sem bloquear
+
+        Args:
+            level: "debug", "info", "warning" ou "error"
+            category: Categoria do registro (ex.: "stt.request"), usada na amostragem
+            message: Mensagem fixa; os valores variáveis vão em `fields`
+            **fields: Campos estruturados, formatados apenas na thread de escrita
+        """
+        severity = LEVELS[level]
+        if severity < self._level:
+            return
+        if severity < LEVELS["warning"]:
+            rate = self._sample_rates.get(category, 1.0)
+            if rate < 1.0 and random.random() >= rate:
+                with self._lock:
+                    self.sampled_out += 1
+                return
+        if self._writer is None:
+            self._start_writer()
+        try:
+            self._queue.put_nowait((time.time(), level, category, message, fields))
+        except queue.Full:
+            with self._lock:
+                self.dropped += 1
+
+    def debug(self, category: str, message: str, **fields) -> None:
+        self.log("debug", category, message, **fields)
+
+    def info(self, category: str, message: str, **fields) -> None:
+        self.log("info", category, message, **fields)
+
+    def warning(self, category: str, message: str, **fields) -> None:
+        self.log("warning", category, message, **fields)
+
+    def error(self, category: str, message: str, **fields) -> None:
+        self.log("error", category, message, **fields)
+
+    def _start_writer(self) -> None:
+        with self._lock:
+            if self._writer is None:
+                self._writer = threading.Thread(target=self._write_loop, name="log-writer", daemon=True)
+                self._writer.start()
+
+    def _write_loop(self) -> None:
+        while True:
+            batch = [self._queue.get()]
+            while len(batch) < _WRITE_BATCH:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            lines = []
+            flushed = []
+            for item in batch:
+                if isinstance(item, threading.Event):
+                    flushed.append(item)
+                    continue
+                try:
+                    lines.append(self._format(item))
+                except Exception as e:
+                    lines.append(f"Erro ao formatar log: {e!r} ({item[2]}: {item[3]})")
+            if lines:
+                stream = self._stream or sys.stdout
+                try:
+                    stream.write("\n".join(lines) + "\n")
+                    stream.flush()
+                except (OSError, ValueError):
+                    pass
+                with self._lock:
+                    self.written += len(lines)
+            for event in flushed:
+                event.set()
+
+    def flush(self, timeout: float = 2.0) -> bool:
+        """
+        Aguarda a escrita de tudo que já está na fila
+
+        Returns:
+            False se o tempo acabar antes (ou se a fila estiver cheia)
+        """
+        if self._writer is None:
+            return True
+        done = threading.Event()
+        try:
+            self._queue.put(done, timeout=timeout)
+        except queue.Full:
+            return False
+        return done.wait(timeout)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Contadores de registros gravados, descartados e filtrados pela amostragem"""
+        with self._lock:
+            return {
+                "written": self.written,
+                "dropped": self.dropped,
+                "sampled_out": self.sampled_out,
+                "queued": self._queue.qsize(),
+                "max_queue": self.max_queue,
+            }
+
+
+def _create_logger() -> StructuredLogger:
+    from app.config import settings
+    return StructuredLogger(
+        level=settings.log_level,
+        fmt=settings.log_format,
+        max_queue=settings.log_queue_size,
+        sample_rates=settings.log_sample_rates,
+    )
+
+
+logger = _create_logger()
+atexit.register(logger.flush)
+if hasattr(os, "register_at_fork"):
+    # Workers do modo pre-fork criam a própria thread de escrita
+    os.register_at_fork(after_in_child=logger.reset_after_fork)
@@ -0,0 +1,84 @@
+import os
+import resource
+import sys
+from typing import Dict, Optional
+
+
+def get_rss_bytes() -> int:
+    """
+    Retorna a memória residente (RSS) atual do processo em bytes
+
+    Usa /proc/self/statm quando disponível (Linux) e cai para o pico
+    informado por getrusage nos demais sistemas.
+
+    Returns:
+        RSS do processo em bytes
+    """
+    try:
+        with open("/proc/self/statm", "r") as statm:
+            resident_pages = int(statm.read().split()[1])
+        return resident_pages * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # No macOS ru_maxrss é informado em bytes, no Linux em kilobytes
+        return max_rss if sys.platform == "darwin" else max_rss * 1024
+
+
+def format_bytes(size: Optional[int]) -> str:
+    """
+    Formata um tamanho em bytes para leitura humana
+
+    Args:
+        size: Tamanho em bytes
+
+    Returns:
+        Texto no formato "12.3 MB"
+    """
+    if size is None:
+        return "n/a"
+    value = float(size)
+    for unit in ("B", "KB", "MB", "GB"):
+        if abs(value) < 1024 or unit == "GB":
+            return f"{value:.1f} {unit}"
+        value /= 1024
+    return f"{value:.1f} GB"
+
+
+def get_memory_info(pid: Optional[int] = None) -> Dict[str, int]:
+    """
+    Retorna a composição da memória de um processo, separando páginas compartilhadas
+
+    Lê /proc/<pid>/smaps_rollup (Linux 4.14+). Em workers criados por fork, as
+    páginas compartilhadas indicam quanto do modelo carregado no processo
+    mestre continua sendo compartilhado via copy-on-write.
+
+    Args:
+        pid: PID do processo (padrão: processo atual)
+
+    Returns:
+        Dicionário com rss, pss, shared, private (em bytes) e shared_pages;
+        vazio se a informação não estiver disponível
+    """
+    path = f"/proc/{pid or 'self'}/smaps_rollup"
+    fields = {}
+    try:
+        with open(path, "r") as rollup:
+            for line in rollup:
+                parts = line.split()
+                if len(parts) >= 2 and parts[0].endswith(":") and parts[1].isdigit():
+                    # Valores do smaps são informados em kB
+                    fields[parts[0][:-1]] = int(parts[1]) * 1024
+    except OSError:
+        if pid is None or pid == os.getpid():
+            return {"rss": get_rss_bytes()}
+        return {}
+
+    shared = fields.get("Shared_Clean", 0) + fields.get("Shared_Dirty", 0)
+    private = fields.get("Private_Clean", 0) + fields.get("Private_Dirty", 0)
+    return {
+        "rss": fields.get("Rss", 0),
+        "pss": fields.get("Pss", 0),
+        "shared": shared,
+        "private": private,
+        "shared_pages": shared // os.sysconf("SC_PAGE_SIZE"),
+    }
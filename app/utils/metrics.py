@@ -0,0 +1,249 @@
+import bisect
+import math
+import threading
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from app.utils.log import logger
+
+# Limites (segundos) dos histogramas de latência: de 1ms a 2min
+LATENCY_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+# Limites do fator de tempo real (tempo de processamento / duração do áudio)
+RTF_BUCKETS = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 0.75, 1.0, 1.5, 2.0, 5.0)
+
+Sample = Tuple[str, Tuple[Tuple[str, str], ...], float]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class _Metric:
+    """Série com rótulos; cada combinação de valores dos rótulos é um filho"""
+
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._values: Dict[Tuple[str, ...], object] = {}
+
+    def _key(self, labels: Dict[str, object]) -> Tuple[str, ...]:
+        return tuple(str(labels.get(name, "")) for name in self.labelnames)
+
+    def _labels(self, key: Tuple[str, ...]) -> Tuple[Tuple[str, str], ...]:
+        return tuple(zip(self.labelnames, key))
+
+    def samples(self) -> List[Sample]:
+        """Amostras no formato (sufixo do nome, rótulos, valor)"""
+        with self._lock:
+            items = list(self._values.items())
+        return [("", self._labels(key), value) for key, value in items]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._values.clear()
+
+
+class Counter(_Metric):
+    """Contador monotônico (ex.: total de segundos de áudio processados)"""
+
+    kind = "counter"
+
+    def inc(self, amount: float = 1.0, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def get(self, **labels) -> float:
+        return self._values.get(self._key(labels), 0.0)
+
+
+class Gauge(Counter):
+    """Valor que sobe e desce (ex.: sessões WebSocket ativas)"""
+
+    kind = "gauge"
+
+    def set(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def dec(self, amount: float = 1.0, **labels) -> None:
+        self.inc(-amount, **labels)
+
+
+class Histogram(_Metric):
+    """Distribuição em faixas cumulativas (le), com soma e contagem"""
+
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = LATENCY_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                # [contagem por faixa (+Inf no fim), soma]
+                state = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0]
+            state[0][index] += 1
+            state[1] += value
+
+    def samples(self) -> List[Sample]:
+        with self._lock:
+            items = [(key, list(state[0]), state[1]) for key, state in self._values.items()]
+        result: List[Sample] = []
+        for key, counts, total in items:
+            labels = self._labels(key)
+            cumulative = 0
+            for bound, count in zip(self.buckets + (math.inf,), counts):
+                cumulative += count
+                result.append(("_bucket", labels + (("le", _format_value(bound)),), cumulative))
+            result.append(("_sum", labels, total))
+            result.append(("_count", labels, cumulative))
+        return result
+
+
+class MetricsRegistry:
+    """
+    Conjunto de métricas do processo, exportado no formato texto do Prometheus
+
+    Métricas do caminho quente (latência, contadores) são atualizadas pelas
+    rotas; as que já existem como estatísticas de outros componentes
+    (executores, cache) são lidas por coletores apenas no momento da coleta.
+    """
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._collectors: List[Callable[[], Iterable[_Metric]]] = []
+        self._lock = threading.Lock()
+
+    def register(self, metric: _Metric) -> _Metric:
+        with self._lock:
+            if metric.name in self._metrics:
+                raise ValueError(f"Métrica '{metric.name}' já registrada")
+            self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self.register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self.register(Gauge(name, documentation, labelnames))
+
+    def histogram(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                  buckets: Sequence[float] = LATENCY_BUCKETS) -> Histogram:
+        return self.register(Histogram(name, documentation, labelnames, buckets))
+
+    def add_collector(self, collector: Callable[[], Iterable[_Metric]]) -> None:
+        """Registra uma função que gera métricas novas a cada coleta"""
+        with self._lock:
+            if collector not in self._collectors:
+                self._collectors.append(collector)
+
+    def collect(self) -> List[_Metric]:
+        with self._lock:
+            metrics = list(self._metrics.values())
+            collectors = list(self._collectors)
+        for collector in collectors:
+            try:
+                metrics.extend(collector())
+            except Exception as e:
+                logger.error("metrics", "Erro no coletor de métricas",
+                             collector=getattr(collector, '__name__', str(collector)), error=str(e))
+        return metrics
+
+    def render(self) -> str:
+        """Todas as métricas no formato de exposição texto (versão 0.0.4)"""
+        lines = []
+        for metric in self.collect():
+            samples = metric.samples()
+            if not samples:
+                continue
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            for suffix, labels, value in samples:
+                rendered = ",".join(f'{name}="{_escape(value)}"' for name, value in labels)
+                lines.append(f"{metric.name}{suffix}{{{rendered}}} {_format_value(value)}" if rendered
+                             else f"{metric.name}{suffix} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+
+metrics_registry = MetricsRegistry()
+
+# Séries das cargas de fala
+REQUEST_SECONDS = metrics_registry.histogram(
+    "speech_request_stage_seconds",
+    "Latência das requisições por etapa (queue, decode, inference, serialization, total)",
+    ("service", "backend", "model", "stage"),
+)
+REQUESTS = metrics_registry.counter(
+    "speech_requests_total", "Requisições concluídas por resultado", ("service", "backend", "model", "status")
+)
+AUDIO_SECONDS = metrics_registry.counter(
+    "speech_audio_seconds_total", "Segundos de áudio transcritos", ("backend", "model", "mode")
+)
+REAL_TIME_FACTOR = metrics_registry.histogram(
+    "speech_real_time_factor", "Tempo de processamento dividido pela duração do áudio",
+    ("backend", "model"), RTF_BUCKETS,
+)
+TTS_CHARACTERS = metrics_registry.counter(
+    "speech_tts_characters_total", "Caracteres sintetizados (sem contar acertos do cache)", ("backend", "model")
+)
+WEBSOCKET_SESSIONS = metrics_registry.gauge(
+    "speech_websocket_sessions_active", "Sessões de streaming WebSocket abertas", ("protocol",)
+)
+EXECUTOR_QUEUE_SECONDS = metrics_registry.histogram(
+    "speech_executor_queue_seconds", "Espera na fila do executor de inferência por classe de prioridade",
+    ("executor", "priority"),
+)
+
+
+def observe_request(service: str, backend: str, model: str, stages: Dict[str, float],
+                    status: str = "ok") -> None:
+    """
+    Registra uma requisição concluída
+
+    Args:
+        service: "stt" ou "tts"
+        backend: Serviço que atendeu (ex.: VoskSTTService)
+        model: Modelo ou voz usado
+        stages: Segundos gastos em cada etapa medida (queue, decode, inference, serialization, total)
+        status: Resultado ("ok", "error", "busy")
+    """
+    REQUESTS.inc(service=service, backend=backend, model=model, status=status)
+    for stage, seconds in stages.items():
+        REQUEST_SECONDS.observe(seconds, service=service, backend=backend, model=model, stage=stage)
+
+
+def observe_audio(backend: str, model: str, audio_seconds: float, mode: str,
+                  processing_seconds: Optional[float] = None) -> None:
+    """
+    Registra segundos de áudio transcritos e, se informado, o fator de tempo real
+
+    Args:
+        backend: Serviço de STT
+        model: Modelo usado
+        audio_seconds: Duração do áudio
+        mode: Origem ("file", "incremental", "stream", "batch")
+        processing_seconds: Tempo total de processamento do áudio
+    """
+    if audio_seconds <= 0:
+        return
+    AUDIO_SECONDS.inc(audio_seconds, backend=backend, model=model, mode=mode)
+    if processing_seconds is not None:
+        REAL_TIME_FACTOR.observe(processing_seconds / audio_seconds, backend=backend, model=model)
@@ -0,0 +1,127 @@
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from app.interfaces.stt_service import StreamEvent
+
+PROTOCOL_VERSION = 2
+
+
+class StreamProtocol:
+    """
+    Lado do servidor do protocolo v2 de streaming de STT (mensagens JSON)
+
+    Toda mensagem enviada tem "type" e "seq" (sequência crescente por sessão):
+
+    - ready: sessão iniciada; informa a janela de controle de fluxo
+    - partial: transcrição provisória (parciais iguais ao anterior são suprimidos)
+    - final: transcrição confirmada
+    - ack: total de bytes de áudio já processados
+    - error: falha ao processar o áudio
+    - end: fim da sessão, após o último final
+
+    O cliente deve manter no máximo `max_unacked_bytes` enviados e ainda não
+    confirmados por um ack; o servidor confirma a cada `max_unacked_bytes / 4`
+    processados, para que um cliente bem-comportado nunca fique parado.
+    """
+
+    def __init__(self, send_json: Callable[[Dict[str, Any]], Awaitable[None]],
+                 min_partial_interval_ms: float = 0, max_unacked_bytes: int = 65536,
+                 clock: Callable[[], float] = time.monotonic):
+        """
+        Inicializa o protocolo de uma conexão
+
+        Args:
+            send_json: Função que envia uma mensagem JSON ao cliente
+            min_partial_interval_ms: Intervalo mínimo entre resultados parciais
+            max_unacked_bytes: Janela de áudio não confirmado permitida ao cliente
+            clock: Relógio monotônico (em segundos)
+        """
+        self._send_json = send_json
+        self.min_partial_interval = max(0.0, min_partial_interval_ms) / 1000
+        self.max_unacked_bytes = max(1, max_unacked_bytes)
+        self._ack_bytes = max(1, self.max_unacked_bytes // 4)
+        self._clock = clock
+
+        self.seq = 0
+        self.received_bytes = 0
+        self.acked_bytes = 0
+        self.chunks = 0
+        self.partials_sent = 0
+        self.partials_suppressed = 0
+        self.finals_sent = 0
+        self._last_partial = ""
+        self._last_partial_at: Optional[float] = None
+
+    async def send(self, message_type: str, **fields) -> None:
+        """Envia uma mensagem do protocolo com o próximo número de sequência"""
+        self.seq += 1
+        await self._send_json({"type": message_type, "seq": self.seq, **fields})
+
+    async def ready(self, **fields) -> None:
+        """Anuncia o início da sessão e a janela de controle de fluxo"""
+        await self.send("ready", protocol=PROTOCOL_VERSION, max_unacked_bytes=self.max_unacked_bytes, **fields)
+
+    def partials_due(self) -> bool:
+        """Indica se já passou o intervalo mínimo desde o último parcial enviado"""
+        if self._last_partial_at is None:
+            return True
+        return self._clock() - self._last_partial_at >= self.min_partial_interval
+
+    async def event(self, event: StreamEvent) -> None:
+        """
+        Envia um resultado da sessão
+
+        Parciais idênticos ao último enviado são descartados; um final
+        reinicia a comparação.
+        """
+        if event.final:
+            self._last_partial = ""
+            self.finals_sent += 1
+            await self.send("final", text=event.text)
+            return
+        if event.text == self._last_partial:
+            self.partials_suppressed += 1
+            return
+        self._last_partial = event.text
+        self._last_partial_at = self._clock()
+        self.partials_sent += 1
+        await self.send("partial", text=event.text)
+
+    async def processed(self, size: int) -> None:
+        """
+        Registra um chunk de áudio processado e confirma se a janela pedir
+
+        Args:
+            size: Tamanho do chunk, em bytes
+        """
+        self.chunks += 1
+        self.received_bytes += size
+        if self.received_bytes - self.acked_bytes >= self._ack_bytes:
+            await self.ack()
+
+    async def ack(self) -> None:
+        """Confirma todo o áudio processado até agora"""
+        if self.received_bytes == self.acked_bytes:
+            return
+        self.acked_bytes = self.received_bytes
+        await self.send("ack", bytes=self.received_bytes, chunks=self.chunks)
+
+    async def error(self, message: str) -> None:
+        """Informa uma falha ao cliente"""
+        await self.send("error", message=message)
+
+    async def end(self) -> None:
+        """Encerra a sessão: confirma o áudio restante e envia o fim"""
+        await self.ack()
+        await self.send("end", bytes=self.received_bytes)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Retorna os contadores da sessão (para logs)"""
+        return {
+            "messages": self.seq,
+            "chunks": self.chunks,
+            "bytes": self.received_bytes,
+            "partials_sent": self.partials_sent,
+            "partials_suppressed": self.partials_suppressed,
+            "finals_sent": self.finals_sent,
+        }
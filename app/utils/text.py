@@ -0,0 +1,18 @@
+import re
+from typing import List
+
+# Fim de frase: pontuação final seguida de espaço, ou quebras de parágrafo
+_SENTENCE_BOUNDARY = re.compile(r"(?<=[.!?…])\s+|\n\s*\n")
+
+
+def split_sentences(text: str) -> List[str]:
+    """
+    Divide um texto em frases para síntese incremental
+
+    Args:
+        text: Texto de entrada
+
+    Returns:
+        Lista de frases não vazias, na ordem original
+    """
+    return [sentence.strip() for sentence in _SENTENCE_BOUNDARY.split(text) if sentence and sentence.strip()]
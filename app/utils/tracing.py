@@ -0,0 +1,387 @@
+import contextvars
+import json
+import os
+import queue
+import random
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional
+
+from starlette.datastructures import MutableHeaders
+
+from app.config import settings
+from app.utils.log import logger
+
+# Tipos de span do OTLP
+SPAN_KIND_INTERNAL = 1
+SPAN_KIND_SERVER = 2
+
+# Códigos de status do OTLP
+STATUS_UNSET = 0
+STATUS_ERROR = 2
+
+
+class Span:
+    """
+    Etapa de uma requisição, com início e fim no relógio monotônico
+
+    Os instantes são de time.perf_counter(); a conversão para o relógio de
+    parede (exigido pelo OTLP) só acontece na exportação.
+    """
+
+    __slots__ = ("trace", "name", "span_id", "parent_id", "start", "end", "attributes", "error")
+
+    def __init__(self, trace: "Trace", name: str, parent_id: Optional[str], start: float,
+                 attributes: Optional[Dict[str, Any]] = None):
+        self.trace = trace
+        self.name = name
+        self.span_id = f"{random.getrandbits(64):016x}"
+        self.parent_id = parent_id
+        self.start = start
+        self.end: Optional[float] = None
+        self.attributes = attributes or {}
+        self.error: Optional[str] = None
+
+    @property
+    def duration(self) -> float:
+        """Duração em segundos (até agora, se o span ainda não terminou)"""
+        return (self.end if self.end is not None else time.perf_counter()) - self.start
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+
+
+class Trace:
+    """
+    Spans de uma requisição: o span raiz e as etapas medidas dentro dela
+
+    Spans podem ser registrados de qualquer thread (ex.: callbacks dos
+    executores de inferência).
+    """
+
+    def __init__(self, name: str, **attributes):
+        self.trace_id = f"{random.getrandbits(128):032x}"
+        self._lock = threading.Lock()
+        # Âncora para converter os instantes monotônicos em horário Unix
+        self._wall_ns = time.time_ns()
+        self.root = Span(self, name, None, time.perf_counter(), attributes)
+        self.spans: List[Span] = [self.root]
+
+    def add(self, name: str, start: float, end: Optional[float] = None, parent: Optional[Span] = None,
+            **attributes) -> Span:
+        """
+        Registra uma etapa
+
+        Args:
+            name: Nome da etapa (ex.: "audio.decode"); também é a métrica do Server-Timing
+            start: Início (time.perf_counter())
+            end: Fim (None se a etapa ainda está em andamento)
+            parent: Span pai (padrão: raiz)
+            **attributes: Atributos do span
+        """
+        span = Span(self, name, (parent or self.root).span_id, start, attributes)
+        span.end = end
+        with self._lock:
+            self.spans.append(span)
+        return span
+
+    def finish(self, **attributes) -> None:
+        """Encerra o span raiz"""
+        self.root.attributes.update(attributes)
+        self.root.end = time.perf_counter()
+
+    def server_timing(self) -> str:
+        """
+        Valor do header Server-Timing: duração somada por etapa já concluída e o total até agora
+
+        Etapas repetidas (ex.: segmentos transcritos em paralelo) aparecem uma
+        vez, com a soma das durações e a contagem na descrição.
+        """
+        totals: Dict[str, List[float]] = {}
+        with self._lock:
+            spans = list(self.spans[1:])
+        for span in spans:
+            if span.end is None:
+                continue
+            entry = totals.setdefault(span.name, [0.0, 0])
+            entry[0] += span.end - span.start
+            entry[1] += 1
+        metrics = []
+        for name, (seconds, count) in totals.items():
+            metric = f"{name};dur={seconds * 1000:.1f}"
+            if count > 1:
+                metric += f';desc="{count}x"'
+            metrics.append(metric)
+        metrics.append(f"total;dur={self.root.duration * 1000:.1f}")
+        return ", ".join(metrics)
+
+    def _unix_nano(self, moment: float) -> str:
+        return str(self._wall_ns + round((moment - self.root.start) * 1e9))
+
+    def to_otlp(self, service_name: str) -> Dict[str, Any]:
+        """Trace no formato JSON do OTLP (ExportTraceServiceRequest)"""
+        with self._lock:
+            spans = list(self.spans)
+        finished = time.perf_counter()
+        return {"resourceSpans": [{
+            "resource": {"attributes": _otlp_attributes({"service.name": service_name, "process.pid": os.getpid()})},
+            "scopeSpans": [{
+                "scope": {"name": __name__},
+                "spans": [{
+                    "traceId": self.trace_id,
+                    "spanId": span.span_id,
+                    "parentSpanId": span.parent_id or "",
+                    "name": span.name,
+                    "kind": SPAN_KIND_SERVER if span is self.root else SPAN_KIND_INTERNAL,
+                    "startTimeUnixNano": self._unix_nano(span.start),
+                    "endTimeUnixNano": self._unix_nano(span.end if span.end is not None else finished),
+                    "attributes": _otlp_attributes(span.attributes),
+                    "status": {"code": STATUS_ERROR, "message": span.error} if span.error else {"code": STATUS_UNSET},
+                } for span in spans],
+            }],
+        }]}
+
+
+def _otlp_value(value: Any) -> Dict[str, Any]:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        # int64 é serializado como string no JSON do OTLP
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+def _otlp_attributes(attributes: Dict[str, Any]) -> List[Dict[str, Any]]:
+    return [{"key": key, "value": _otlp_value(value)} for key, value in attributes.items() if value is not None]
+
+
+_current_span: contextvars.ContextVar[Optional[Span]] = contextvars.ContextVar("current_span", default=None)
+
+
+def start_trace(name: str, **attributes) -> Trace:
+    """Cria o trace da requisição e torna o seu span raiz o span atual do contexto"""
+    trace = Trace(name, **attributes)
+    _current_span.set(trace.root)
+    return trace
+
+
+def get_current_span() -> Optional[Span]:
+    """Span atual da requisição (None fora de uma requisição rastreada)"""
+    return _current_span.get()
+
+
+def detach_trace() -> None:
+    """
+    Desassocia o contexto atual do trace
+
+    Para trabalho compartilhado por várias requisições (ex.: um lote do
+    micro-batching), que não deve ser atribuído só à que o disparou.
+    """
+    _current_span.set(None)
+
+
+@contextmanager
+def span(name: str, **attributes) -> Iterator[Optional[Span]]:
+    """
+    Mede um bloco como etapa filha do span atual
+
+    Fora de uma requisição rastreada não registra nada, de modo que serviços
+    e factory podem ser instrumentados sem custo quando usados isoladamente.
+    """
+    parent = _current_span.get()
+    if parent is None:
+        yield None
+        return
+    current = parent.trace.add(name, time.perf_counter(), parent=parent, **attributes)
+    token = _current_span.set(current)
+    try:
+        yield current
+    except BaseException as e:
+        current.error = f"{type(e).__name__}: {e}"
+        raise
+    finally:
+        current.end = time.perf_counter()
+        _current_span.reset(token)
+
+
+def record_span(parent: Optional[Span], name: str, start: float, end: float, **attributes) -> None:
+    """Registra uma etapa já medida (ex.: espera na fila de um executor) sob `parent`, se houver"""
+    if parent is not None:
+        parent.trace.add(name, start, end, parent=parent, **attributes)
+
+
+class TraceExporter:
+    """
+    Exportador de traces para arquivo local, uma linha JSON do OTLP por trace
+
+    O formato é o do exportador de arquivo do OpenTelemetry Collector, que
+    pode reenviar o arquivo a qualquer backend com o receiver otlpjsonfile.
+    Como o logger, escreve em uma thread própria a partir de uma fila
+    limitada; com a fila cheia o trace é descartado e contado.
+    """
+
+    def __init__(self, path: str, service_name: str, min_duration_ms: float = 0.0, max_queue: int = 1000):
+        """
+        Args:
+            path: Arquivo de destino (aberto em modo append)
+            service_name: Valor de service.name nos recursos exportados
+            min_duration_ms: Exporta apenas requisições com pelo menos esta duração
+            max_queue: Traces aguardando escrita antes de descartar
+        """
+        self.path = path
+        self.service_name = service_name
+        self.min_duration = max(0.0, min_duration_ms) / 1000
+        self.max_queue = max(1, max_queue)
+        self._queue: "queue.Queue[Any]" = queue.Queue(self.max_queue)
+        self._lock = threading.Lock()
+        self._writer: Optional[threading.Thread] = None
+        self.exported = 0
+        self.dropped = 0
+
+    def export(self, trace: Trace) -> bool:
+        """Enfileira o trace se ele for lento o bastante; retorna se foi aceito"""
+        if trace.root.duration < self.min_duration:
+            return False
+        if self._writer is None:
+            with self._lock:
+                if self._writer is None:
+                    self._writer = threading.Thread(target=self._write_loop, name="trace-exporter", daemon=True)
+                    self._writer.start()
+        try:
+            self._queue.put_nowait(trace)
+            return True
+        except queue.Full:
+            with self._lock:
+                self.dropped += 1
+            return False
+
+    def _write_loop(self) -> None:
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        while True:
+            batch = [self._queue.get()]
+            while True:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            lines = []
+            flushed = []
+            for item in batch:
+                if isinstance(item, threading.Event):
+                    flushed.append(item)
+                else:
+                    lines.append(json.dumps(item.to_otlp(self.service_name), ensure_ascii=False))
+            if lines:
+                try:
+                    with open(self.path, "a", encoding="utf-8") as f:
+                        f.write("\n".join(lines) + "\n")
+                    with self._lock:
+                        self.exported += len(lines)
+                except OSError as e:
+                    with self._lock:
+                        self.dropped += len(lines)
+                    logger.error("tracing", "Erro ao exportar traces", path=self.path, error=str(e))
+            for event in flushed:
+                event.set()
+
+    def flush(self, timeout: float = 2.0) -> bool:
+        """Aguarda a escrita dos traces já enfileirados"""
+        if self._writer is None:
+            return True
+        done = threading.Event()
+        try:
+            self._queue.put(done, timeout=timeout)
+        except queue.Full:
+            return False
+        return done.wait(timeout)
+
+    def reset_after_fork(self) -> None:
+        self._lock = threading.Lock()
+        self._writer = None
+        self._queue = queue.Queue(self.max_queue)
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"path": self.path, "exported": self.exported, "dropped": self.dropped,
+                    "queued": self._queue.qsize()}
+
+
+_exporter: Optional[TraceExporter] = None
+_exporter_lock = threading.Lock()
+
+
+def get_trace_exporter() -> Optional[TraceExporter]:
+    """Exportador configurado em TRACING_EXPORT_PATH (None se desativado)"""
+    global _exporter
+    if not settings.tracing_export_path:
+        return None
+    if _exporter is None:
+        with _exporter_lock:
+            if _exporter is None:
+                _exporter = TraceExporter(
+                    settings.tracing_export_path,
+                    service_name=settings.app_name,
+                    min_duration_ms=settings.tracing_export_min_ms,
+                    max_queue=settings.tracing_export_queue_size,
+                )
+                if hasattr(os, "register_at_fork"):
+                    os.register_at_fork(after_in_child=_exporter.reset_after_fork)
+    return _exporter
+
+
+class ServerTimingMiddleware:
+    """
+    Middleware ASGI que rastreia cada requisição HTTP
+
+    Abre o trace antes da rota (os spans registrados pela rota, factory,
+    serviços e executores ficam sob ele), adiciona o header Server-Timing com
+    as etapas concluídas até o início da resposta e, ao final do envio do
+    corpo, registra a etapa "response.send" e exporta o trace.
+
+    Em respostas em streaming os headers saem antes da síntese: o
+    Server-Timing traz só as etapas anteriores, e o trace exportado traz todas.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not settings.tracing_enabled:
+            await self.app(scope, receive, send)
+            return
+
+        method = scope.get("method", "")
+        trace = start_trace(f"{method} {scope.get('path', '')}", **{
+            "http.request.method": method,
+            "url.path": scope.get("path", ""),
+        })
+        state = {"status": 500, "response_started": None}
+
+        async def send_with_timing(message):
+            if message["type"] == "http.response.start":
+                state["status"] = message["status"]
+                state["response_started"] = time.perf_counter()
+                MutableHeaders(scope=message).append("Server-Timing", trace.server_timing())
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        except BaseException as e:
+            trace.root.error = f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            if state["response_started"] is not None:
+                trace.add("response.send", state["response_started"], time.perf_counter())
+            route = scope.get("route")
+            if route is not None and getattr(route, "path", None):
+                trace.root.name = f"{method} {route.path}"
+                trace.root.set_attribute("http.route", route.path)
+            trace.finish(**{"http.response.status_code": state["status"]})
+            exporter = get_trace_exporter()
+            if exporter is not None:
+                exporter.export(trace)
@@ -0,0 +1,50 @@
+"""
+Processo filho da medição de partida a frio (ver runner.measure_cold_start)
+
+Imprime na última linha da saída um JSON com os tempos de importação, carga
+do modelo e primeira requisição.
+"""
+import time
+
+_started = time.perf_counter()
+
+import argparse
+import asyncio
+import json
+
+from app.audio.ingest import decode_wav
+from benchmarks.corpus import Utterance
+from benchmarks.runner import build_service, parse_backend, stt_request, tts_request
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Mede a partida a frio de um backend")
+    parser.add_argument("kind", choices=("stt", "tts"))
+    parser.add_argument("backend", help="Backend no formato tipo[:modelo]")
+    parser.add_argument("--audio", help="WAV da primeira transcrição")
+    parser.add_argument("--text", default="", help="Texto da primeira síntese")
+    args = parser.parse_args()
+    imported = time.perf_counter()
+
+    service_type, model = parse_backend(args.backend)
+    service = build_service(args.kind, service_type, model)
+    loaded = time.perf_counter()
+
+    if args.kind == "stt":
+        with open(args.audio, "rb") as f:
+            request = stt_request(service, [Utterance(args.text, decode_wav(f.read()))])
+    else:
+        request = tts_request(service, [args.text])
+    asyncio.run(request(0))
+    finished = time.perf_counter()
+
+    print(json.dumps({
+        "import_seconds": round(imported - _started, 4),
+        "load_seconds": round(loaded - imported, 4),
+        "first_request_seconds": round(finished - loaded, 4),
+        "total_seconds": round(finished - _started, 4),
+    }))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""
+Compara dois resultados do benchmark (ex.: antes e depois de um commit)
+
+Exemplo:
+    python -m benchmarks.compare benchmarks/results/abc123.json benchmarks/results/def456.json
+"""
+import argparse
+import json
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+# (rótulo, caminho no resultado de cada nível de concorrência, maior é melhor)
+COLUMNS = (
+    ("req/s", ("throughput_rps",), True),
+    ("p50", ("latency_seconds", "p50"), False),
+    ("p99", ("latency_seconds", "p99"), False),
+    ("rtf p50", ("rtf", "p50"), False),
+)
+
+Key = Tuple[str, str, str, int]
+
+
+def _value(run: Dict[str, Any], path: Tuple[str, ...]) -> Optional[float]:
+    for name in path:
+        if not isinstance(run, dict):
+            return None
+        run = run.get(name)
+    return run
+
+
+def _runs(report: Dict[str, Any]) -> Iterator[Tuple[Key, Dict[str, Any]]]:
+    for result in report.get("results", []):
+        for run in result.get("runs", []):
+            yield (result["kind"], result["backend"], result["model"], run["concurrency"]), run
+
+
+def compare(base: Dict[str, Any], head: Dict[str, Any]) -> Iterator[str]:
+    """Linhas da tabela de comparação, com a variação percentual de cada métrica"""
+    base_runs = dict(_runs(base))
+    yield f"{'backend':<36} {'c':>3} " + " ".join(f"{label:>22}" for label, _, _ in COLUMNS)
+    for key, run in _runs(head):
+        kind, backend, model, concurrency = key
+        previous = base_runs.get(key)
+        cells = []
+        for _, path, higher_is_better in COLUMNS:
+            new = _value(run, path)
+            old = _value(previous, path) if previous else None
+            if new is None:
+                cells.append(f"{'-':>22}")
+            elif not old:
+                cells.append(f"{new:>22.4g}")
+            else:
+                change = (new - old) / old * 100
+                better = change > 0 if higher_is_better else change < 0
+                marker = "+" if better else ("-" if abs(change) >= 0.05 else " ")
+                cells.append(f"{old:>8.4g} → {new:<8.4g}{change:>+4.0f}%{marker}")
+        yield f"{kind + ' ' + backend + ' (' + model + ')':<36} {concurrency:>3} " + " ".join(cells)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compara dois resultados do benchmark")
+    parser.add_argument("base", help="Resultado de referência (JSON)")
+    parser.add_argument("head", help="Resultado a comparar (JSON)")
+    args = parser.parse_args()
+    with open(args.base, encoding="utf-8") as f:
+        base = json.load(f)
+    with open(args.head, encoding="utf-8") as f:
+        head = json.load(f)
+    for name, report in (("base", base), ("head", head)):
+        environment = report.get("environment", {})
+        print(f"{name}: {environment.get('commit')}{' (dirty)' if environment.get('dirty') else ''} "
+              f"em {report.get('created')}")
+    for line in compare(base, head):
+        print(line)
+
+
+if __name__ == "__main__":
+    main()
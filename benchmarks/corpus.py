@@ -0,0 +1,124 @@
+import hashlib
+import os
+import random
+import re
+from typing import List, NamedTuple, Optional
+
+import numpy as np
+
+from app.audio.ingest import SAMPLE_RATE, decode_wav, to_wav_bytes
+
+# Frases-base do corpus (português, tamanhos variados)
+SENTENCES = [
+    "Bom dia, gostaria de saber o saldo da minha conta.",
+    "A reunião foi remarcada para quinta-feira às três da tarde.",
+    "Por favor, confirme o endereço de entrega do pedido.",
+    "O sistema de reconhecimento de fala converte áudio em texto.",
+    "Hoje a previsão é de chuva forte no fim do dia.",
+    "Você pode repetir o número do protocolo, por gentileza?",
+    "A equipe concluiu a migração dos servidores na semana passada.",
+    "Preciso cancelar a assinatura e receber o reembolso.",
+    "O voo das nove horas está atrasado em quarenta minutos.",
+    "Obrigado pela ligação, tenha um ótimo dia.",
+    "Os resultados do trimestre superaram as expectativas do mercado.",
+    "Ligue o ar-condicionado da sala de reuniões, por favor.",
+]
+
+# Onde os áudios sintetizados ficam guardados entre execuções
+DEFAULT_CACHE_DIR = "cache/benchmarks/corpus"
+
+
+class Utterance(NamedTuple):
+    """Texto de referência e áudio float32 mono a 16 kHz"""
+    text: str
+    audio: np.ndarray
+
+    @property
+    def seconds(self) -> float:
+        return len(self.audio) / SAMPLE_RATE
+
+
+def corpus_texts(size: int, seed: int = 0, max_sentences: int = 3) -> List[str]:
+    """
+    Textos do corpus: cada um junta de 1 a `max_sentences` frases-base
+
+    A escolha depende só de `seed`, de modo que duas execuções (ou dois
+    commits) medem exatamente o mesmo conjunto de textos.
+    """
+    rng = random.Random(seed)
+    return [" ".join(rng.sample(SENTENCES, rng.randint(1, max_sentences))) for _ in range(size)]
+
+
+def synthetic_speech(text: str, seed: int = 0) -> np.ndarray:
+    """
+    Sinal determinístico com a estrutura temporal da fala, sem sintetizador
+
+    Cada palavra vira um trecho vozeado (fundamental com harmônicos e envelope
+    silábico) proporcional ao seu tamanho, separado por pausas; pontuação gera
+    pausas maiores. Não é inteligível: serve para medir latência e vazão quando
+    o espeak não está instalado, exercitando VAD e segmentação como fala real.
+    """
+    rng = np.random.default_rng(seed)
+    parts = []
+    for token in re.findall(r"\w+|[.,;:!?]", text):
+        if not token[0].isalnum():
+            parts.append(np.zeros(int(0.25 * SAMPLE_RATE), dtype=np.float32))
+            continue
+        duration = 0.08 + 0.055 * len(token)
+        t = np.arange(int(duration * SAMPLE_RATE)) / SAMPLE_RATE
+        f0 = rng.uniform(100, 220) * (1 + 0.05 * np.sin(2 * np.pi * 3 * t))
+        phase = 2 * np.pi * np.cumsum(f0) / SAMPLE_RATE
+        voiced = sum(np.sin(k * phase) / k for k in range(1, 8))
+        syllables = max(1, len(token) // 3)
+        envelope = np.sin(np.pi * t / duration) * (0.6 + 0.4 * np.abs(np.sin(np.pi * syllables * t / duration)))
+        parts.append((0.25 * envelope * voiced).astype(np.float32))
+        parts.append(np.zeros(int(0.08 * SAMPLE_RATE), dtype=np.float32))
+    audio = np.concatenate(parts) if parts else np.zeros(0, dtype=np.float32)
+    # Piso de ruído baixo para o VAD estimar o silêncio como em uma gravação
+    return (audio + rng.normal(0, 0.001, len(audio))).astype(np.float32)
+
+
+def build_corpus(size: int, seed: int = 0, source: str = "espeak",
+                 cache_dir: Optional[str] = DEFAULT_CACHE_DIR) -> List[Utterance]:
+    """
+    Gera (ou lê do cache) o corpus de fala sintética, sem acesso à rede
+
+    Args:
+        size: Número de áudios
+        seed: Semente da escolha dos textos
+        source: "espeak" (Pyttsx3TTSService via ServiceFactory) ou "synthetic"
+        cache_dir: Diretório dos WAVs já sintetizados (None desativa o cache)
+
+    Returns:
+        Áudios na ordem dos textos
+
+    Raises:
+        ValueError: Se a origem não for suportada
+    """
+    if source not in ("espeak", "synthetic"):
+        raise ValueError(f"Origem de corpus '{source}' não suportada")
+    texts = corpus_texts(size, seed)
+    tts = None
+    corpus = []
+    for index, text in enumerate(texts):
+        if source == "synthetic":
+            corpus.append(Utterance(text, synthetic_speech(text, seed=seed * 1000 + index)))
+            continue
+
+        # A síntese é o passo lento: os WAVs ficam em disco entre execuções
+        key = hashlib.sha256(text.encode("utf-8")).hexdigest()[:24]
+        path = os.path.join(cache_dir, f"{key}.wav") if cache_dir else None
+        if path and os.path.exists(path):
+            with open(path, "rb") as f:
+                data = f.read()
+        else:
+            if tts is None:
+                from app.factories.service_factory import ServiceFactory
+                tts = ServiceFactory.get_tts_service("pyttsx3")
+            data = to_wav_bytes(decode_wav(tts.synthesize(text)))
+            if path:
+                os.makedirs(cache_dir, exist_ok=True)
+                with open(path, "wb") as f:
+                    f.write(data)
+        corpus.append(Utterance(text, decode_wav(data)))
+    return corpus
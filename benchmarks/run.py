@@ -0,0 +1,146 @@
+"""
+Benchmark ponta a ponta dos backends de STT e TTS
+
+Exemplo:
+    python -m benchmarks.run --stt vosk,whisper:tiny,azure_openai --tts pyttsx3,azure_openai \\
+        --concurrency 1,2,4,8 --requests 32
+
+Os resultados vão para benchmarks/results/<commit>.json; use
+`python -m benchmarks.compare antes.json depois.json` para comparar commits.
+"""
+import argparse
+import asyncio
+import time
+from contextlib import ExitStack
+from typing import Any, Dict, List
+
+from app.inference.executor import shutdown_executors
+from app.utils.http_client import close_http_clients
+from benchmarks.corpus import build_corpus
+from benchmarks.runner import (build_service, environment_info, measure_cold_start, model_label, parse_backend,
+                               run_load, save_report, stt_request, tts_request)
+from benchmarks.standins import CLOUD_BACKENDS, UNSUPPORTED_BACKENDS, CloudStandIn
+
+
+async def _benchmark_backend(kind: str, spec: str, corpus, concurrency: List[int], requests: int,
+                             cold_start: bool, standin_env: Dict[str, str]) -> Dict[str, Any]:
+    service_type, model = parse_backend(spec)
+    result: Dict[str, Any] = {
+        "kind": kind,
+        "backend": service_type,
+        "model": model_label(kind, service_type, model),
+        "standin": (kind, service_type) in CLOUD_BACKENDS,
+    }
+    if (kind, service_type) in UNSUPPORTED_BACKENDS:
+        result["error"] = "backend de nuvem sem stand-in local"
+        return result
+
+    if cold_start:
+        env = standin_env if result["standin"] else {}
+        result["cold_start"] = await asyncio.to_thread(measure_cold_start, kind, spec, corpus[0], env)
+
+    started = time.perf_counter()
+    try:
+        service = build_service(kind, service_type, model)
+    except Exception as e:
+        result["error"] = f"{type(e).__name__}: {e}"
+        return result
+    result["load_seconds"] = round(time.perf_counter() - started, 4)
+
+    if kind == "stt":
+        request = stt_request(service, corpus)
+    else:
+        request = tts_request(service, [utterance.text for utterance in corpus])
+
+    # Aquecimento: primeira passada do modelo, conexões e threads dos executores
+    started = time.perf_counter()
+    try:
+        await request(0)
+    except Exception as e:
+        result["error"] = f"{type(e).__name__}: {e}"
+        return result
+    result["warmup_seconds"] = round(time.perf_counter() - started, 4)
+
+    result["runs"] = []
+    for level in concurrency:
+        run = await run_load(request, level, requests)
+        result["runs"].append(run)
+        latency = run["latency_seconds"] or {}
+        print(f"[{kind}] {service_type} ({result['model']}) c={level}: {run['throughput_rps']} req/s, "
+              f"p50 {latency.get('p50')}s, p99 {latency.get('p99')}s, "
+              f"recusadas {run['rejected']}, erros {sum(run['errors'].values())}")
+    return result
+
+
+async def _benchmark(args, corpus, standin_env: Dict[str, str]) -> List[Dict[str, Any]]:
+    backends = [("stt", spec) for spec in args.stt] + [("tts", spec) for spec in args.tts]
+    results = []
+    try:
+        for kind, spec in backends:
+            result = await _benchmark_backend(kind, spec, corpus, args.concurrency, args.requests,
+                                              not args.no_cold_start, standin_env)
+            if "error" in result:
+                print(f"[{kind}] {spec}: ignorado ({result['error']})")
+            results.append(result)
+    finally:
+        await close_http_clients()
+    return results
+
+
+def _list(value: str) -> List[str]:
+    return [item.strip() for item in value.split(",") if item.strip()]
+
+
+def main():
+    """Função principal do benchmark"""
+    parser = argparse.ArgumentParser(description="Benchmark ponta a ponta dos backends de STT e TTS")
+    parser.add_argument("--stt", type=_list, default=_list("vosk,whisper:tiny,azure_openai"),
+                        help="Backends de STT (tipo[:modelo], separados por vírgula)")
+    parser.add_argument("--tts", type=_list, default=_list("pyttsx3,azure_openai"),
+                        help="Backends de TTS (tipo[:voz], separados por vírgula)")
+    parser.add_argument("--concurrency", type=lambda value: [int(item) for item in _list(value)],
+                        default=[1, 2, 4, 8], help="Níveis de concorrência medidos")
+    parser.add_argument("--requests", type=int, default=32, help="Requisições por nível de concorrência")
+    parser.add_argument("--corpus-size", type=int, default=8, help="Áudios/textos distintos no corpus")
+    parser.add_argument("--corpus-source", choices=("espeak", "synthetic"), default="espeak",
+                        help="espeak (fala sintetizada pelo Pyttsx3TTSService) ou synthetic (sinal sem sintetizador)")
+    parser.add_argument("--seed", type=int, default=0, help="Semente da escolha dos textos do corpus")
+    parser.add_argument("--no-cold-start", action="store_true", help="Não medir a partida a frio")
+    parser.add_argument("--standin-latency-ms", type=float, default=50,
+                        help="Latência fixa das respostas do stand-in dos backends de nuvem")
+    parser.add_argument("--output", help="Arquivo JSON dos resultados (padrão: benchmarks/results/<commit>.json)")
+    args = parser.parse_args()
+
+    corpus = build_corpus(args.corpus_size, seed=args.seed, source=args.corpus_source)
+    print(f"Corpus: {len(corpus)} áudios, {sum(utterance.seconds for utterance in corpus):.1f}s ({args.corpus_source})")
+
+    environment = environment_info()
+    with ExitStack() as stack:
+        standin_env: Dict[str, str] = {}
+        kinds = [("stt", parse_backend(spec)[0]) for spec in args.stt] + [("tts", parse_backend(spec)[0]) for spec in args.tts]
+        if any(kind in CLOUD_BACKENDS for kind in kinds):
+            standin = stack.enter_context(CloudStandIn(base_latency=args.standin_latency_ms / 1000))
+            stack.enter_context(standin.patched())
+            standin_env = standin.environment()
+        try:
+            results = asyncio.run(_benchmark(args, corpus, standin_env))
+        finally:
+            shutdown_executors()
+
+    report = {
+        "environment": environment,
+        "corpus": {
+            "source": args.corpus_source,
+            "seed": args.seed,
+            "size": len(corpus),
+            "audio_seconds": round(sum(utterance.seconds for utterance in corpus), 3),
+        },
+        "concurrency": args.concurrency,
+        "requests": args.requests,
+        "results": results,
+    }
+    print(f"Resultados salvos em {save_report(report, args.output)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,268 @@
+import asyncio
+import datetime
+import json
+import math
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence, Tuple
+
+from app.audio.ingest import to_wav_bytes
+from app.audio.wav import parse_wav_header
+from app.config import settings
+from app.factories.service_factory import ServiceFactory
+from app.inference.executor import ExecutorSaturatedError
+from benchmarks.corpus import Utterance
+
+# Onde os resultados são gravados por padrão, um arquivo por commit
+RESULTS_DIR = "benchmarks/results"
+
+# Modelo usado quando a especificação do backend não informa um
+DEFAULT_MODELS = {
+    ("stt", "whisper"): "tiny",
+    ("stt", "azure_openai"): settings.azure_openai_stt_deployment,
+    ("tts", "azure_openai"): settings.azure_openai_tts_voice,
+}
+
+
+def parse_backend(spec: str) -> Tuple[str, Optional[str]]:
+    """Separa "tipo[:modelo]" (ex.: "whisper:base", "vosk:app/models/vosk-model-pt")"""
+    service_type, _, model = spec.partition(":")
+    return service_type.strip(), model.strip() or None
+
+
+def model_label(kind: str, service_type: str, model: Optional[str]) -> str:
+    if model:
+        return model
+    if (kind, service_type) == ("stt", "vosk"):
+        return os.path.basename(settings.stt_model_path.rstrip("/"))
+    return DEFAULT_MODELS.get((kind, service_type), "default")
+
+
+def build_service(kind: str, service_type: str, model: Optional[str] = None):
+    """
+    Cria o serviço pela ServiceFactory, como a aplicação faz no registro
+
+    Args:
+        kind: "stt" ou "tts"
+        service_type: Tipo aceito pela ServiceFactory
+        model: Modelo (STT) ou voz (TTS); None usa a configuração
+    """
+    if kind == "stt":
+        kwargs: Dict[str, Any] = {}
+        if service_type == "vosk":
+            kwargs["model_path"] = model or settings.stt_model_path
+        elif service_type == "whisper":
+            kwargs["model_name"] = model or DEFAULT_MODELS[("stt", "whisper")]
+        return ServiceFactory.get_stt_service(service_type, **kwargs)
+
+    kwargs = {"lang": settings.tts_lang}
+    if service_type == "azure_openai":
+        kwargs.update({
+            "api_key": settings.azure_openai_api_key,
+            "endpoint": settings.azure_openai_endpoint,
+            "model": settings.azure_openai_tts_model,
+            "voice": model or settings.azure_openai_tts_voice,
+        })
+    service = ServiceFactory.get_tts_service(service_type, **kwargs)
+    if model and service_type != "azure_openai":
+        service.set_voice(model)
+    return service
+
+
+def percentile(values: Sequence[float], q: float) -> float:
+    """Percentil `q` (0-100) com interpolação linear entre as amostras ordenadas"""
+    if not values:
+        return math.nan
+    ordered = sorted(values)
+    position = (len(ordered) - 1) * q / 100
+    lower = math.floor(position)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower)
+
+
+def summarize(values: Sequence[float]) -> Optional[Dict[str, float]]:
+    """Média, percentis 50/90/99 e máximo (None sem amostras)"""
+    if not values:
+        return None
+    return {
+        "count": len(values),
+        "mean": round(sum(values) / len(values), 4),
+        "p50": round(percentile(values, 50), 4),
+        "p90": round(percentile(values, 90), 4),
+        "p99": round(percentile(values, 99), 4),
+        "max": round(max(values), 4),
+    }
+
+
+def wav_seconds(data: bytes) -> Optional[float]:
+    """Duração de um WAV PCM (None para outros formatos)"""
+    info = parse_wav_header(data)
+    if info is None:
+        return None
+    return info.data_size / (info.sample_rate * info.channels * info.sample_width)
+
+
+async def run_load(request: Callable[[int], Awaitable[Optional[float]]], concurrency: int,
+                   requests: int) -> Dict[str, Any]:
+    """
+    Gera carga em malha fechada: `concurrency` clientes, cada um enviando a
+    próxima requisição assim que a anterior termina, até `requests` no total
+
+    Args:
+        request: Corrotina que executa a requisição de índice i e retorna os
+            segundos de áudio envolvidos (entrada no STT, saída no TTS) ou None
+        concurrency: Requisições simultâneas
+        requests: Total de requisições
+
+    Returns:
+        Latências, fator de tempo real, vazão e contagem de recusas e erros
+    """
+    latencies: List[float] = []
+    rtfs: List[float] = []
+    audio_seconds = 0.0
+    rejected = 0
+    errors: Dict[str, int] = {}
+    next_index = 0
+
+    async def client() -> None:
+        nonlocal next_index, audio_seconds, rejected
+        while next_index < requests:
+            index = next_index
+            next_index += 1
+            started = time.perf_counter()
+            try:
+                seconds = await request(index)
+            except ExecutorSaturatedError:
+                rejected += 1
+                continue
+            except Exception as e:
+                name = type(e).__name__
+                errors[name] = errors.get(name, 0) + 1
+                continue
+            elapsed = time.perf_counter() - started
+            latencies.append(elapsed)
+            if seconds:
+                audio_seconds += seconds
+                rtfs.append(elapsed / seconds)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(max(1, concurrency))))
+    wall = time.perf_counter() - started
+    return {
+        "concurrency": concurrency,
+        "requests": requests,
+        "ok": len(latencies),
+        "rejected": rejected,
+        "errors": errors,
+        "wall_seconds": round(wall, 4),
+        "throughput_rps": round(len(latencies) / wall, 3) if wall else None,
+        "audio_seconds_per_second": round(audio_seconds / wall, 3) if wall and audio_seconds else None,
+        "latency_seconds": summarize(latencies),
+        "rtf": summarize(rtfs),
+    }
+
+
+def stt_request(service, corpus: List[Utterance]) -> Callable[[int], Awaitable[float]]:
+    """Requisição de transcrição de arquivo, pelo mesmo caminho da rota (decodificação, VAD e segmentos)"""
+    files = [to_wav_bytes(utterance.audio) for utterance in corpus]
+
+    async def request(index: int) -> float:
+        await service.transcribe_segments(files[index % len(files)])
+        return corpus[index % len(corpus)].seconds
+
+    return request
+
+
+def tts_request(service, texts: List[str]) -> Callable[[int], Awaitable[Optional[float]]]:
+    """Requisição de síntese, com a mesma escolha entre texto curto e longo da rota"""
+    async def request(index: int) -> Optional[float]:
+        text = texts[index % len(texts)]
+        if 0 < settings.tts_long_text_chars <= len(text):
+            audio = await service.synthesize_long_async(text)
+        else:
+            audio = await service.synthesize_async(text)
+        return wav_seconds(audio)
+
+    return request
+
+
+def measure_cold_start(kind: str, spec: str, utterance: Utterance,
+                       env: Optional[Dict[str, str]] = None, timeout: float = 600) -> Dict[str, Any]:
+    """
+    Mede importação, carga do modelo e primeira requisição em um processo novo
+
+    Args:
+        kind: "stt" ou "tts"
+        spec: Backend no formato "tipo[:modelo]"
+        utterance: Áudio (STT) ou texto (TTS) da primeira requisição
+        env: Variáveis de ambiente extras (ex.: endpoint do stand-in)
+        timeout: Tempo máximo do processo
+
+    Returns:
+        Tempos em segundos, ou {"error": ...} se o processo falhar
+    """
+    fd, path = tempfile.mkstemp(suffix=".wav")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(to_wav_bytes(utterance.audio))
+        command = [sys.executable, "-m", "benchmarks.cold_start", kind, spec, "--audio", path, "--text", utterance.text]
+        result = subprocess.run(command, capture_output=True, text=True, timeout=timeout,
+                                env={**os.environ, **(env or {})})
+    except subprocess.TimeoutExpired:
+        return {"error": f"timeout após {timeout:.0f}s"}
+    finally:
+        os.remove(path)
+    lines = result.stdout.strip().splitlines()
+    if result.returncode != 0 or not lines:
+        return {"error": (result.stderr.strip().splitlines() or ["falha sem mensagem"])[-1]}
+    return json.loads(lines[-1])
+
+
+def _git(*args: str) -> str:
+    try:
+        return subprocess.run(["git", *args], capture_output=True, text=True, timeout=30).stdout.strip()
+    except (OSError, subprocess.TimeoutExpired):
+        return ""
+
+
+def environment_info() -> Dict[str, Any]:
+    """Commit, máquina e configuração que influenciam os números"""
+    return {
+        "commit": _git("rev-parse", "HEAD") or None,
+        "dirty": bool(_git("status", "--porcelain", "--untracked-files=no")),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "settings": {name: getattr(settings, name) for name in (
+            "inference_workers", "inference_max_queue", "whisper_executor_kind", "tts_workers",
+            "whisper_batch_enabled", "whisper_batch_window_ms", "whisper_batch_max_size",
+            "vad_enabled", "stt_long_audio_seconds", "stt_parallel_segments", "tts_long_text_chars",
+            "stt_stream_min_partial_interval_ms", "stt_stream_max_unacked_bytes",
+        )},
+    }
+
+
+def save_report(report: Dict[str, Any], output: Optional[str] = None, prefix: str = "") -> str:
+    """
+    Grava o relatório em JSON, por padrão em benchmarks/results/<prefixo><commit>.json
+
+    Returns:
+        Caminho do arquivo gravado
+    """
+    report = {
+        "version": 1,
+        "created": datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds"),
+        **report,
+    }
+    if not output:
+        environment = report.get("environment") or environment_info()
+        commit = (environment["commit"] or "local")[:12] + ("-dirty" if environment["dirty"] else "")
+        output = os.path.join(RESULTS_DIR, f"{prefix}{commit}.json")
+    os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    return output
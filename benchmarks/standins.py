@@ -0,0 +1,127 @@
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Iterator, Optional
+
+from app.audio.wav import build_wav_header
+from app.config import settings
+
+# Backends que falam com a nuvem e são medidos contra o stand-in local
+CLOUD_BACKENDS = {("stt", "azure_openai"), ("tts", "azure_openai")}
+
+# Backends de nuvem sem protocolo reproduzível localmente (SDK proprietário ou API não documentada)
+UNSUPPORTED_BACKENDS = {("tts", "azure"), ("tts", "gtts")}
+
+# Taxa do PCM devolvido pela síntese simulada (a mesma do Azure OpenAI em WAV)
+_TTS_SAMPLE_RATE = 24000
+
+
+class CloudStandIn:
+    """
+    Servidor HTTP local com as rotas do Azure OpenAI usadas pelos serviços
+
+    Responde a `/audio/transcriptions` e `/audio/speech` com latência
+    simulada (fixa + proporcional ao áudio ou ao texto), de modo que os
+    backends de nuvem sejam medidos pelo mesmo caminho de código (cliente
+    HTTP compartilhado, novas tentativas, pipeline do streaming) sem rede
+    nem custo, e com resultados comparáveis entre commits.
+    """
+
+    def __init__(self, base_latency: float = 0.05, stt_seconds_per_audio_second: float = 0.05,
+                 tts_seconds_per_char: float = 0.0005, transcript: str = "transcrição simulada"):
+        """
+        Args:
+            base_latency: Segundos de toda resposta (rede + fila do serviço)
+            stt_seconds_per_audio_second: Segundos por segundo de áudio transcrito
+            tts_seconds_per_char: Segundos por caractere sintetizado
+            transcript: Texto devolvido pelas transcrições
+        """
+        self.base_latency = base_latency
+        self.stt_seconds_per_audio_second = stt_seconds_per_audio_second
+        self.tts_seconds_per_char = tts_seconds_per_char
+        self.transcript = transcript
+        self.requests = 0
+        self._lock = threading.Lock()
+        self._server: Optional[ThreadingHTTPServer] = None
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "CloudStandIn":
+        standin = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+                with standin._lock:
+                    standin.requests += 1
+                if "/audio/transcriptions" in self.path:
+                    # O multipart carrega um WAV PCM 16 bits mono a 16 kHz
+                    seconds = max(len(body) - 44, 0) / 32000
+                    time.sleep(standin.base_latency + standin.stt_seconds_per_audio_second * seconds)
+                    self._reply(200, "application/json", json.dumps({"text": standin.transcript}).encode("utf-8"))
+                elif "/audio/speech" in self.path:
+                    text = json.loads(body or b"{}").get("input", "")
+                    time.sleep(standin.base_latency + standin.tts_seconds_per_char * len(text))
+                    # Silêncio com a duração típica de fala para o texto (~15 caracteres/s)
+                    pcm = bytes(int(len(text) / 15 * _TTS_SAMPLE_RATE) * 2)
+                    self._reply(200, "audio/wav", build_wav_header(_TTS_SAMPLE_RATE, data_size=len(pcm)) + pcm)
+                else:
+                    self._reply(404, "application/json", b'{"error": "not found"}')
+
+            def _reply(self, status: int, content_type: str, payload: bytes):
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, format, *args):
+                pass
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, name="cloud-standin", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def environment(self) -> Dict[str, str]:
+        """Variáveis de ambiente que apontam os serviços para o stand-in (para subprocessos)"""
+        return {"AZURE_OPENAI_ENDPOINT": self.url, "AZURE_OPENAI_API_KEY": "standin"}
+
+    @contextmanager
+    def patched(self) -> Iterator["CloudStandIn"]:
+        """Aponta configuração e ambiente deste processo para o stand-in enquanto ativo"""
+        saved_settings = (settings.azure_openai_endpoint, settings.azure_openai_api_key)
+        saved_env = {name: os.environ.get(name) for name in self.environment()}
+        settings.azure_openai_endpoint, settings.azure_openai_api_key = self.url, "standin"
+        os.environ.update(self.environment())
+        try:
+            yield self
+        finally:
+            settings.azure_openai_endpoint, settings.azure_openai_api_key = saved_settings
+            for name, value in saved_env.items():
+                if value is None:
+                    os.environ.pop(name, None)
+                else:
+                    os.environ[name] = value
+
+    def __enter__(self) -> "CloudStandIn":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
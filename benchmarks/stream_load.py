@@ -0,0 +1,391 @@
+"""
+Gerador de carga do streaming de STT por WebSocket
+
+Abre N conexões simultâneas e envia áudio no ritmo do tempo real, em frames
+de tamanho configurável, medindo:
+
+- tempo até o primeiro resultado (a partir do primeiro frame enviado)
+- intervalo entre atualizações (parciais e finais) durante o envio
+- latência do final e da mensagem "end" após o fim do áudio (protocolo v2)
+- atraso do servidor ao longo do tempo: quanto depois do instante em que o
+  áudio "existiu" (ritmo do tempo real) ele foi confirmado por um ack (v2)
+
+Com --find-max, aumenta o número de streams até o atraso divergir e procura
+o maior número de streams em tempo real que o worker sustenta.
+
+Exemplos:
+    python -m benchmarks.stream_load --streams 16 --duration 30 --frame-ms 100
+    python -m benchmarks.stream_load --find-max --max-streams 256
+"""
+import argparse
+import asyncio
+import json
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from app.audio.ingest import SAMPLE_RATE, decode_wav
+from app.audio.pcm import float32_to_pcm16
+from app.interfaces.stt_service import PARTIAL_PREFIX
+from benchmarks.corpus import build_corpus
+from benchmarks.runner import environment_info, percentile, save_report, summarize
+
+# PCM 16 bits mono a 16 kHz
+BYTES_PER_SECOND = SAMPLE_RATE * 2
+
+# Pausa entre os áudios concatenados de um stream (deixa o VAD fechar a frase)
+_GAP_SECONDS = 1.0
+
+
+def _connect(url: str):
+    try:
+        from websockets.asyncio.client import connect
+    except ImportError:
+        raise ImportError("websockets não está instalado. Execute 'pip install websockets' para instalar.")
+    return connect(url, max_size=None, open_timeout=30, ping_interval=None)
+
+
+def lag_slope(samples: Sequence[Tuple[float, float]]) -> Optional[float]:
+    """
+    Crescimento do atraso (segundos de atraso por segundo de stream), por mínimos quadrados
+
+    Perto de zero o servidor acompanha o tempo real; positivo e sustentado
+    indica que o áudio se acumula mais rápido do que é processado.
+    """
+    if len(samples) < 2:
+        return None
+    times = np.array([t for t, _ in samples])
+    lags = np.array([lag for _, lag in samples])
+    spread = np.var(times)
+    if spread == 0:
+        return None
+    return float(np.mean((times - times.mean()) * (lags - lags.mean())) / spread)
+
+
+class StreamResult:
+    """Tempos observados por um stream"""
+
+    def __init__(self, index: int):
+        self.index = index
+        self.first_result: Optional[float] = None
+        self.update_intervals: List[float] = []
+        self.final_latency: Optional[float] = None
+        self.end_latency: Optional[float] = None
+        self.lags: List[Tuple[float, float]] = []
+        self.finals = 0
+        self.partials = 0
+        self.error: Optional[str] = None
+
+    @property
+    def slope(self) -> Optional[float]:
+        return lag_slope(self.lags)
+
+    @property
+    def last_lag(self) -> Optional[float]:
+        return self.lags[-1][1] if self.lags else None
+
+
+async def run_stream(url: str, pcm: bytes, frame_bytes: int, protocol: str = "v2",
+                     delay: float = 0.0, index: int = 0, drain_seconds: float = 2.0) -> StreamResult:
+    """
+    Envia um áudio no ritmo do tempo real e coleta os tempos das respostas
+
+    Cada frame é enviado no instante em que terminaria de ser gravado. No v2 o
+    envio respeita a janela de controle de fluxo anunciada no "ready"; se o
+    servidor atrasar os acks, o envio atrasa junto e o atraso aparece nos acks.
+
+    Args:
+        url: Endereço WebSocket do streaming
+        pcm: Áudio PCM 16 bits mono a 16 kHz
+        frame_bytes: Bytes por frame enviado
+        protocol: "v1" (texto) ou "v2" (JSON com ack e end)
+        delay: Espera antes de conectar (escalonamento da rampa)
+        index: Número do stream (para o relatório)
+        drain_seconds: Espera pelos últimos resultados no v1, que não tem mensagem de fim
+    """
+    result = StreamResult(index)
+    await asyncio.sleep(delay)
+    loop = asyncio.get_running_loop()
+    try:
+        async with _connect(url) as socket:
+            window = None
+            if protocol == "v2":
+                ready = json.loads(await socket.recv())
+                window = ready.get("max_unacked_bytes")
+            acked = 0
+            acked_changed = asyncio.Event()
+            state = {"start": None, "first_sent": None, "last_update": None, "end_sent": None}
+
+            def update(now: float) -> None:
+                if result.first_result is None:
+                    result.first_result = now - state["first_sent"]
+                elif state["end_sent"] is None:
+                    result.update_intervals.append(now - state["last_update"])
+                state["last_update"] = now
+
+            async def read() -> None:
+                nonlocal acked
+                try:
+                    async for message in socket:
+                        now = loop.time()
+                        if protocol == "v1":
+                            if message.startswith(PARTIAL_PREFIX):
+                                result.partials += 1
+                            else:
+                                result.finals += 1
+                            update(now)
+                            continue
+                        data = json.loads(message)
+                        kind = data.get("type")
+                        if kind in ("partial", "final"):
+                            if kind == "final":
+                                result.finals += 1
+                                if state["end_sent"] is not None:
+                                    result.final_latency = now - state["end_sent"]
+                            else:
+                                result.partials += 1
+                            update(now)
+                        elif kind == "ack":
+                            acked = data["bytes"]
+                            # Instante em que o último byte confirmado existiu, no ritmo do tempo real
+                            result.lags.append((now - state["start"], now - (state["start"] + acked / BYTES_PER_SECOND)))
+                            acked_changed.set()
+                        elif kind == "error":
+                            result.error = data.get("message", "erro")
+                        elif kind == "end":
+                            if state["end_sent"] is not None:
+                                result.end_latency = now - state["end_sent"]
+                            return
+                finally:
+                    # Libera o envio parado na janela se a conexão terminar
+                    acked_changed.set()
+
+            reader = asyncio.ensure_future(read())
+            try:
+                state["start"] = loop.time()
+                sent = 0
+                for offset in range(0, len(pcm), frame_bytes):
+                    frame = pcm[offset:offset + frame_bytes]
+                    wait = state["start"] + (offset + len(frame)) / BYTES_PER_SECOND - loop.time()
+                    if wait > 0:
+                        await asyncio.sleep(wait)
+                    while window and sent + len(frame) - acked > window and not reader.done():
+                        acked_changed.clear()
+                        await acked_changed.wait()
+                    if reader.done():
+                        break
+                    if state["first_sent"] is None:
+                        state["first_sent"] = loop.time()
+                    await socket.send(frame)
+                    sent += len(frame)
+
+                if protocol == "v2":
+                    state["end_sent"] = loop.time()
+                    await socket.send(json.dumps({"type": "end"}))
+                    await reader
+                else:
+                    await asyncio.sleep(drain_seconds)
+            finally:
+                reader.cancel()
+    except Exception as e:
+        result.error = f"{type(e).__name__}: {e}"
+    return result
+
+
+def summarize_trial(results: List[StreamResult], max_lag_seconds: float,
+                    max_lag_slope: float) -> Dict[str, Any]:
+    """
+    Agrega os streams de uma rodada e decide se o servidor acompanhou o tempo real
+
+    A rodada é sustentável se nenhum stream falhou e, no percentil 95 dos
+    streams, o atraso cresce no máximo `max_lag_slope` por segundo e termina
+    abaixo de `max_lag_seconds`.
+    """
+    errors = [result.error for result in results if result.error]
+    slopes = [result.slope for result in results if result.slope is not None]
+    last_lags = [result.last_lag for result in results if result.last_lag is not None]
+
+    # Atraso ao longo do tempo: p95 entre os streams, por segundo de stream
+    by_second: Dict[int, List[float]] = {}
+    for result in results:
+        for moment, lag in result.lags:
+            by_second.setdefault(int(moment), []).append(lag)
+    timeline = [[second, round(percentile(lags, 95), 4)] for second, lags in sorted(by_second.items())]
+
+    sustained = not errors
+    if slopes and percentile(slopes, 95) > max_lag_slope:
+        sustained = False
+    if last_lags and percentile(last_lags, 95) > max_lag_seconds:
+        sustained = False
+    return {
+        "streams": len(results),
+        "errors": len(errors),
+        "error_samples": sorted(set(errors))[:5],
+        "first_result_seconds": summarize([r.first_result for r in results if r.first_result is not None]),
+        "update_interval_seconds": summarize([i for r in results for i in r.update_intervals]),
+        "final_latency_seconds": summarize([r.final_latency for r in results if r.final_latency is not None]),
+        "end_latency_seconds": summarize([r.end_latency for r in results if r.end_latency is not None]),
+        "lag_slope": summarize(slopes),
+        "last_lag_seconds": summarize(last_lags),
+        "lag_timeline_p95": timeline,
+        "partials": sum(r.partials for r in results),
+        "finals": sum(r.finals for r in results),
+        "sustained": sustained,
+    }
+
+
+def build_stream_audio(clips: List[np.ndarray], duration: float, offset: int = 0) -> bytes:
+    """
+    Concatena os áudios (a partir do `offset`-ésimo, com pausas) até `duration` segundos
+
+    Streams diferentes começam em áudios diferentes, para não sincronizar as
+    frases e as pausas de todas as conexões.
+    """
+    gap = np.zeros(int(_GAP_SECONDS * SAMPLE_RATE), dtype=np.float32)
+    parts = []
+    total = 0
+    position = offset
+    while total < duration * SAMPLE_RATE:
+        clip = clips[position % len(clips)]
+        parts += [clip, gap]
+        total += len(clip) + len(gap)
+        position += 1
+    audio = np.concatenate(parts)[:int(duration * SAMPLE_RATE)]
+    return float32_to_pcm16(audio)
+
+
+async def run_trial(url: str, streams: int, clips: List[np.ndarray], duration: float, frame_ms: float,
+                    protocol: str, ramp_seconds: float, max_lag_seconds: float,
+                    max_lag_slope: float) -> Dict[str, Any]:
+    """Roda `streams` conexões simultâneas (com entrada escalonada ao longo da rampa)"""
+    frame_bytes = max(2, int(SAMPLE_RATE * frame_ms / 1000) * 2)
+    tasks = [
+        run_stream(url, build_stream_audio(clips, duration, index), frame_bytes, protocol,
+                   delay=ramp_seconds * index / streams, index=index)
+        for index in range(streams)
+    ]
+    results = await asyncio.gather(*tasks)
+    return summarize_trial(list(results), max_lag_seconds, max_lag_slope)
+
+
+async def find_max_streams(run, start: int, max_streams: int) -> Tuple[Optional[int], List[Dict[str, Any]]]:
+    """
+    Dobra o número de streams até o atraso divergir e faz busca binária entre
+    o último número sustentado e o primeiro que falhou
+
+    Args:
+        run: Corrotina que recebe o número de streams e retorna o resumo da rodada
+        start: Número inicial de streams
+        max_streams: Limite da busca
+
+    Returns:
+        Maior número sustentado (None se nem `start` for) e todas as rodadas
+    """
+    trials: List[Dict[str, Any]] = []
+
+    async def sustained(streams: int) -> bool:
+        trial = await run(streams)
+        trials.append(trial)
+        print(_describe(trial))
+        return trial["sustained"]
+
+    good, bad = None, None
+    streams = max(1, start)
+    while streams <= max_streams:
+        if not await sustained(streams):
+            bad = streams
+            break
+        good = streams
+        streams *= 2
+    if bad is None:
+        return good, trials
+    low = good or 0
+    while bad - low > 1:
+        middle = (low + bad) // 2
+        if await sustained(middle):
+            low = middle
+        else:
+            bad = middle
+    return (low or None), trials
+
+
+def _describe(trial: Dict[str, Any]) -> str:
+    def p(metric: str, q: str) -> str:
+        values = trial.get(metric) or {}
+        value = values.get(q)
+        return "-" if value is None else f"{value:.3f}"
+
+    return (f"{trial['streams']:>4} streams: primeiro resultado p50 {p('first_result_seconds', 'p50')}s, "
+            f"final p90 {p('final_latency_seconds', 'p90')}s, atraso final p90 {p('last_lag_seconds', 'p90')}s, "
+            f"crescimento p90 {p('lag_slope', 'p90')}s/s, erros {trial['errors']} -> "
+            f"{'sustentado' if trial['sustained'] else 'DIVERGIU'}")
+
+
+def _load_clips(args) -> List[np.ndarray]:
+    if args.wav:
+        clips = []
+        for path in args.wav:
+            with open(path, "rb") as f:
+                audio = decode_wav(f.read())
+            if audio is None:
+                raise ValueError(f"{path} não é um WAV suportado")
+            clips.append(audio)
+        return clips
+    return [utterance.audio for utterance in build_corpus(args.corpus_size, seed=args.seed, source=args.corpus_source)]
+
+
+def main():
+    """Função principal do gerador de carga"""
+    parser = argparse.ArgumentParser(description="Gerador de carga do streaming de STT por WebSocket")
+    parser.add_argument("--url", help="Endereço do streaming (padrão: ws://127.0.0.1:8000/speech/stt/stream[/v2])")
+    parser.add_argument("--protocol", choices=("v1", "v2"), default="v2",
+                        help="Protocolo do endpoint; atraso e latência do final só existem no v2")
+    parser.add_argument("--streams", type=int, default=8, help="Conexões simultâneas")
+    parser.add_argument("--duration", type=float, default=30.0, help="Segundos de áudio enviados por conexão")
+    parser.add_argument("--frame-ms", type=float, default=100.0, help="Duração de cada frame enviado")
+    parser.add_argument("--ramp-seconds", type=float, default=2.0, help="Janela de entrada escalonada das conexões")
+    parser.add_argument("--wav", action="append", help="WAV a transmitir (pode repetir; padrão: corpus do benchmark)")
+    parser.add_argument("--corpus-size", type=int, default=8, help="Áudios do corpus quando --wav não é informado")
+    parser.add_argument("--corpus-source", choices=("espeak", "synthetic"), default="espeak",
+                        help="Origem do corpus quando --wav não é informado")
+    parser.add_argument("--seed", type=int, default=0, help="Semente da escolha dos textos do corpus")
+    parser.add_argument("--find-max", action="store_true",
+                        help="Procurar o maior número de streams sustentados em tempo real")
+    parser.add_argument("--max-streams", type=int, default=256, help="Limite da busca de --find-max")
+    parser.add_argument("--max-lag-seconds", type=float, default=2.0,
+                        help="Atraso máximo (p95) no fim do áudio para considerar a rodada sustentada")
+    parser.add_argument("--max-lag-slope", type=float, default=0.05,
+                        help="Crescimento máximo (p95) do atraso, em segundos por segundo de stream")
+    parser.add_argument("--output", help="Arquivo JSON dos resultados (padrão: benchmarks/results/stream-<commit>.json)")
+    args = parser.parse_args()
+
+    url = args.url or f"ws://127.0.0.1:8000/speech/stt/stream{'/v2' if args.protocol == 'v2' else ''}"
+    if args.find_max and args.protocol != "v2":
+        parser.error("--find-max depende dos acks do protocolo v2")
+    clips = _load_clips(args)
+
+    async def run(streams: int) -> Dict[str, Any]:
+        return await run_trial(url, streams, clips, args.duration, args.frame_ms, args.protocol,
+                               args.ramp_seconds, args.max_lag_seconds, args.max_lag_slope)
+
+    report: Dict[str, Any] = {
+        "environment": environment_info(),
+        "url": url,
+        "protocol": args.protocol,
+        "duration_seconds": args.duration,
+        "frame_ms": args.frame_ms,
+        "criteria": {"max_lag_seconds": args.max_lag_seconds, "max_lag_slope": args.max_lag_slope},
+    }
+    if args.find_max:
+        best, trials = asyncio.run(find_max_streams(run, args.streams, args.max_streams))
+        report.update({"max_sustained_streams": best, "trials": trials})
+        print(f"Máximo de streams em tempo real sustentados: {best if best is not None else 'nenhum'}")
+    else:
+        trial = asyncio.run(run(args.streams))
+        report["trials"] = [trial]
+        print(_describe(trial))
+    print(f"Resultados salvos em {save_report(report, args.output, prefix='stream-')}")
+
+
+if __name__ == "__main__":
+    main()
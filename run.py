@@ -42,6 +42,15 @@ def main():
                         help='Ativar auto-reload para desenvolvimento')
     parser.add_argument('--check-models', action='store_true',
                         help='Verificar se os modelos estão disponíveis antes de iniciar')
+    parser.add_argument('--workers', type=int, default=int(os.environ.get('WORKERS', 1)),
+                        help='Número de workers; acima de 1 usa o modo pre-fork com modelos compartilhados')
+    parser.add_argument('--max-requests', type=int, default=int(os.environ.get('MAX_REQUESTS', 0)),
+                        help='Requisições por worker antes de reciclá-lo (0 = sem reciclagem)')
+    parser.add_argument('--max-requests-jitter', type=int, default=int(os.environ.get('MAX_REQUESTS_JITTER', 0)),
+                        help='Variação aleatória somada a --max-requests por worker')
+    parser.add_argument('--memory-report-interval', type=float,
+                        default=float(os.environ.get('MEMORY_REPORT_INTERVAL', 60)),
+                        help='Intervalo em segundos entre relatórios de memória dos workers (0 = desativado)')
                         
     args = parser.parse_args()
     
@@ -58,6 +67,24 @@ def main():
     print(f"Acesse a documentação em http://{args.host}:{args.port}/docs")
     print(f"Acesse a demo em http://{args.host}:{args.port}/static/index.html")
     
+    if args.workers > 1:
+        if reload:
+            print("Aviso: auto-reload não é compatível com múltiplos workers; iniciando um único processo")
+        else:
+            # Modo pre-fork: modelos carregados uma vez e compartilhados copy-on-write
+            from app.server.prefork import PreforkServer
+            print(f"Modo pre-fork: {args.workers} workers")
+            PreforkServer(
+                app_path="app.main:app",
+                host=args.host,
+                port=args.port,
+                workers=args.workers,
+                max_requests=args.max_requests or None,
+                max_requests_jitter=args.max_requests_jitter,
+                memory_report_interval=args.memory_report_interval
+            ).run()
+            return
+    
     # Iniciar o servidor
     uvicorn.run(
         "app.main:app",
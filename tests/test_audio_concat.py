@@ -0,0 +1,69 @@
+import os
+import sys
+import io
+import wave
+import unittest
+
+# Adicionar o diretório raiz do projeto ao path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.audio.concat import join_audio_segments, stream_audio_segments, strip_id3
+from app.audio.wav import build_wav_header, fix_wav_header, parse_wav_header
+from app.utils.text import split_sentences
+
+class TestStreamingHelpers(unittest.TestCase):
+    """
+    Testes dos utilitários de síntese incremental
+    """
+
+    def test_split_sentences(self):
+        """
+        O texto deve ser dividido em frases e parágrafos, sem itens vazios
+        """
+        text = "Olá, tudo bem? Sim! Vamos começar.\n\nNovo parágrafo sem ponto"
+        self.assertEqual(
+            split_sentences(text),
+            ["Olá, tudo bem?", "Sim!", "Vamos começar.", "Novo parágrafo sem ponto"]
+        )
+        self.assertEqual(split_sentences("   "), [])
+
+    def test_wav_segments_form_single_stream(self):
+        """
+        Segmentos WAV devem virar um único cabeçalho seguido do PCM de cada um
+        """
+        segments = [build_wav_header(16000, data_size=200) + b"\x01\x00" * 100,
+                    build_wav_header(16000, data_size=100) + b"\x02\x00" * 50]
+        chunks = list(stream_audio_segments(iter(segments), "audio/wav"))
+
+        self.assertEqual(len(chunks), 3)
+        audio = fix_wav_header(b"".join(chunks))
+        info = parse_wav_header(audio)
+        self.assertEqual(info.sample_rate, 16000)
+        self.assertEqual(info.data_size, 300)
+        self.assertEqual(audio[info.data_offset:], b"\x01\x00" * 100 + b"\x02\x00" * 50)
+
+    def test_join_wav_rewrites_header(self):
+        """
+        A junção de WAVs deve produzir um arquivo com o tamanho total correto
+        """
+        segments = [build_wav_header(16000, data_size=20) + b"\x01\x00" * 10,
+                    build_wav_header(16000, data_size=40) + b"\x02\x00" * 20]
+        audio = join_audio_segments(segments, "audio/wav")
+
+        with wave.open(io.BytesIO(audio), "rb") as wav:
+            self.assertEqual(wav.getnframes(), 30)
+            self.assertEqual(wav.readframes(30), b"\x01\x00" * 10 + b"\x02\x00" * 20)
+
+    def test_mp3_segments_drop_id3_tags(self):
+        """
+        Tags ID3v2 e ID3v1 devem ser removidas ao concatenar MP3
+        """
+        frames = b"\xff\xfb\x90\x00" + b"\x00" * 60
+        id3v2 = b"ID3\x04\x00\x00\x00\x00\x00\x05" + b"x" * 5
+        id3v1 = b"TAG" + b"\x00" * 125
+
+        self.assertEqual(strip_id3(id3v2 + frames + id3v1), frames)
+        self.assertEqual(b"".join(stream_audio_segments([id3v2 + frames, frames], "audio/mpeg")), frames * 2)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,153 @@
+import asyncio
+import os
+import sys
+import threading
+import stat
+import time
+import tempfile
+import unittest
+
+import numpy as np
+
+# Adicionar o diretório raiz do projeto ao path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.audio.ffmpeg import FFmpegDecoder, FFmpegError
+from app.audio import ingest
+from app.audio.ingest import PCMStreamNormalizer, decode_audio_async, decode_wav, start_ingest_stats, to_wav_bytes
+from app.audio.pcm import float32_to_pcm16, pcm_to_float32
+from app.audio.wav import build_wav_header, parse_wav_header
+
+class TestAudioIngest(unittest.TestCase):
+    """
+    Testes da decodificação de áudio em memória
+    """
+
+    def test_decode_wav_in_memory(self):
+        """
+        WAV 16 kHz deve ser decodificado direto do buffer, com mixagem para mono
+        """
+        mono = np.array([0, 16384, -16384, 32767], dtype="<i2").tobytes()
+        audio = decode_wav(build_wav_header(16000, data_size=len(mono)) + mono)
+        np.testing.assert_allclose(audio, [0.0, 0.5, -0.5, 32767 / 32768], atol=1e-6)
+        self.assertEqual(audio.dtype, np.float32)
+
+        stereo = np.array([16384, 0, -16384, -16384], dtype="<i2").tobytes()
+        np.testing.assert_allclose(decode_wav(build_wav_header(16000, channels=2, data_size=len(stereo)) + stereo),
+                                   [0.25, -0.5], atol=1e-6)
+
+        self.assertIsNone(decode_wav(b"ID3 nao e wav"))
+
+    def test_resample_and_downmix(self):
+        """
+        WAV estéreo a 44,1 kHz deve virar mono na taxa pedida, preservando o tom
+        """
+        seconds = 0.5
+        t = np.arange(int(44100 * seconds)) / 44100
+        tone = (np.sin(2 * np.pi * 440 * t) * 16000).astype(np.int16)
+        stereo = np.column_stack([tone, tone]).ravel().astype("<i2").tobytes()
+
+        stats = start_ingest_stats()
+        audio = decode_wav(build_wav_header(44100, channels=2, data_size=len(stereo)) + stereo, target_rate=16000)
+
+        self.assertEqual(len(audio), int(16000 * seconds))
+        spectrum = np.abs(np.fft.rfft(audio))
+        peak_hz = np.argmax(spectrum) * 16000 / len(audio)
+        self.assertAlmostEqual(peak_hz, 440, delta=5)
+
+        headers = stats.to_headers()
+        self.assertEqual(headers["X-Debug-Audio-Decode"], "wav")
+        self.assertTrue(headers["X-Debug-Resample"].startswith("44100Hz/2ch -> 16000Hz/1ch"))
+        self.assertIn("X-Debug-Resample-Ms", headers)
+
+    def test_decode_async_off_event_loop(self):
+        """
+        Também o WAV deve ser decodificado fora da thread do event loop, com as estatísticas da requisição
+        """
+        threads = []
+        original = ingest.decode_wav
+
+        def tracked(*args, **kwargs):
+            threads.append(threading.get_ident())
+            return original(*args, **kwargs)
+
+        async def run():
+            stats = start_ingest_stats()
+            audio = await decode_audio_async(build_wav_header(44100, data_size=88200) + bytes(88200))
+            return threading.get_ident(), stats, audio
+
+        ingest.decode_wav = tracked
+        try:
+            loop_thread, stats, audio = asyncio.run(run())
+        finally:
+            ingest.decode_wav = original
+
+        self.assertEqual(len(audio), 16000)
+        self.assertEqual(len(threads), 1)
+        self.assertNotEqual(threads[0], loop_thread)
+        self.assertEqual(stats.source, "wav")
+
+    def test_stream_normalizer_matches_one_shot(self):
+        """
+        Reamostrar o WAV em partes de 64 KB deve dar o mesmo PCM que reamostrar o arquivo inteiro
+        """
+        rng = np.random.default_rng(0)
+        samples = (rng.standard_normal(44100 * 3 * 2) * 4000).astype("<i2").tobytes()
+        data = build_wav_header(44100, channels=2, data_size=len(samples)) + samples
+        info = parse_wav_header(data)
+
+        normalizer = PCMStreamNormalizer(info)
+        pcm = data[info.data_offset:]
+        chunks = [normalizer.feed(pcm[i:i + 65536]) for i in range(0, len(pcm), 65536)]
+        chunks.append(normalizer.flush())
+
+        self.assertEqual(b"".join(chunks), float32_to_pcm16(decode_wav(data)))
+
+    def test_sample_widths(self):
+        """
+        PCM de 8, 24 e 32 bits deve ser convertido para a mesma escala
+        """
+        np.testing.assert_allclose(pcm_to_float32(bytes([128, 192, 64]), 1), [0.0, 0.5, -0.5])
+        np.testing.assert_allclose(pcm_to_float32(b"\x00\x00\x40\x00\x00\xc0", 3), [0.5, -0.5])
+        np.testing.assert_allclose(
+            pcm_to_float32(np.array([2 ** 30, -2 ** 30], dtype="<i4").tobytes(), 4), [0.5, -0.5]
+        )
+
+    def test_wav_round_trip(self):
+        """
+        Áudio decodificado reempacotado como WAV deve voltar às mesmas amostras
+        """
+        audio = np.linspace(-0.5, 0.5, 320, dtype=np.float32)
+        np.testing.assert_allclose(decode_wav(to_wav_bytes(audio)), audio, atol=1e-4)
+
+    def test_ffmpeg_pipe_prewarmed(self):
+        """
+        O decodificador deve usar processos já iniciados e repor a reserva
+        """
+        with tempfile.TemporaryDirectory() as directory:
+            # Substituto do ffmpeg: devolve no stdout o que recebe no stdin
+            fake = os.path.join(directory, "ffmpeg")
+            with open(fake, "w") as script:
+                script.write("#!/bin/sh\nexec cat\n")
+            os.chmod(fake, os.stat(fake).st_mode | stat.S_IEXEC)
+
+            decoder = FFmpegDecoder(prewarm=2, binary=fake)
+            try:
+                decoder.warm_up()
+                self.assertEqual(len(decoder._ready), 2)
+                self.assertEqual(decoder.decode(b"\x01\x02\x03\x04"), b"\x01\x02\x03\x04")
+
+                deadline = time.monotonic() + 5
+                while len(decoder._ready) < 2 and time.monotonic() < deadline:
+                    time.sleep(0.01)
+                self.assertEqual(len(decoder._ready), 2)
+            finally:
+                decoder.close()
+
+        missing = FFmpegDecoder()
+        missing.binary = None
+        with self.assertRaises(FFmpegError):
+            missing.decode(b"x")
+
+if __name__ == "__main__":
+    unittest.main()
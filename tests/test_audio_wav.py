@@ -0,0 +1,40 @@
+import os
+import sys
+import io
+import wave
+import unittest
+
+# Adicionar o diretório raiz do projeto ao path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.audio.wav import build_wav_header, fix_wav_header, parse_wav_header
+
+class TestWavHelpers(unittest.TestCase):
+    """
+    Testes dos utilitários de cabeçalho WAV
+    """
+
+    def test_parse_header(self):
+        """
+        O formato e a posição dos dados devem ser extraídos sem copiar as amostras
+        """
+        data = build_wav_header(22050, channels=2, data_size=200) + b"\x01\x00" * 100
+        info = parse_wav_header(data)
+        self.assertEqual((info.sample_rate, info.channels, info.sample_width), (22050, 2, 2))
+        self.assertEqual(data[info.data_offset:info.data_offset + info.data_size], b"\x01\x00" * 100)
+        self.assertIsNone(parse_wav_header(b"ID3 not a wav"))
+
+    def test_fix_streaming_header(self):
+        """
+        Um WAV com tamanho desconhecido deve ganhar um cabeçalho com o tamanho real
+        """
+        pcm = b"\x02\x00" * 50
+        streamed = build_wav_header(16000) + pcm
+        fixed = fix_wav_header(streamed)
+
+        with wave.open(io.BytesIO(fixed), "rb") as wav:
+            self.assertEqual(wav.getnframes(), 50)
+            self.assertEqual(wav.readframes(50), pcm)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,260 @@
+import os
+import sys
+import io
+import json
+import shutil
+import asyncio
+import tarfile
+import tempfile
+import threading
+import unittest
+import zipfile
+from types import SimpleNamespace
+
+# Adicionar o diretório raiz do projeto ao path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.interfaces.stt_service import SpeechToTextService, TranscriptSegment
+from app.jobs.batch import JOB_CANCELLED, JOB_COMPLETED, BatchJob, BatchJobManager, JobQueueFullError, JobTooLargeError
+
+class EchoSTTService(SpeechToTextService):
+    """Serviço falso: a "transcrição" é o conteúdo do arquivo"""
+
+    def __init__(self):
+        self.executor = SimpleNamespace(pending=0, max_workers=1)
+        self.calls = 0
+
+    async def transcribe_audio(self, audio_data, language=None):
+        return ""
+
+    async def transcribe_segments(self, audio_data, language=None):
+        self.calls += 1
+        await asyncio.sleep(0.001)
+        if audio_data == b"ruim":
+            raise ValueError("áudio inválido")
+        return [TranscriptSegment(0.0, 1.0, audio_data.decode())]
+
+    async def start_stream(self):
+        raise NotImplementedError
+
+class TestBatchJobs(unittest.TestCase):
+    """
+    Testes da fila de jobs de transcrição em lote
+    """
+
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.root, ignore_errors=True)
+
+    def test_job_with_files_and_archive(self):
+        """
+        Arquivos soltos e de um zip viram itens; resultados e estado ficam em disco
+        """
+        archive = io.BytesIO()
+        with zipfile.ZipFile(archive, "w") as bundle:
+            bundle.writestr("pasta/b.wav", b"dois")
+            bundle.writestr("pasta/.oculto", b"ignorar")
+            bundle.writestr("c.wav", b"ruim")
+        archive.seek(0)
+
+        service = EchoSTTService()
+        manager = BatchJobManager(self.root, concurrency=2)
+
+        async def scenario():
+            manager.start(lambda: service)
+            job = manager.create_job([("a.wav", io.BytesIO(b"um")), ("lote.zip", archive)], language="pt")
+            manager.submit(job)
+            while job.status != JOB_COMPLETED:
+                await job.wait_for_change(timeout=1.0)
+            await manager.stop()
+            return job
+
+        job = asyncio.run(scenario())
+
+        self.assertEqual(job.files, ["a.wav", "pasta/b.wav", "c.wav"])
+        self.assertEqual((job.completed, job.failed), (2, 1))
+        results = sorted((json.loads(line) for line in manager.iter_results(job)), key=lambda r: r["index"])
+        self.assertEqual([r.get("transcript") for r in results], ["um", "dois", None])
+        self.assertEqual(results[2]["error"], "áudio inválido")
+
+        # Outro processo enxerga o job pelo disco
+        stored = BatchJob.load(job.directory)
+        self.assertEqual(stored.status, JOB_COMPLETED)
+        self.assertEqual(stored.to_dict()["progress"], 1.0)
+        self.assertEqual(os.listdir(job.inputs_dir), [])
+
+    def test_size_limits(self):
+        """
+        Arquivos e jobs acima do limite de bytes são recusados, sem sobrar nada em disco
+        """
+        manager = BatchJobManager(self.root, max_file_bytes=10, max_job_bytes=16)
+
+        # Um zip pequeno que se expande muito além do limite
+        bomb = io.BytesIO()
+        with zipfile.ZipFile(bomb, "w", zipfile.ZIP_DEFLATED) as bundle:
+            bundle.writestr("bomba.wav", b"\0" * 100000)
+        bomb.seek(0)
+        with self.assertRaises(JobTooLargeError):
+            manager.create_job([("bomba.zip", bomb)])
+
+        # Sem tamanho declarado, a cópia para ao passar do limite
+        with self.assertRaises(JobTooLargeError):
+            manager.create_job([("c.wav", io.BytesIO(b"0" * 11))])
+        with self.assertRaises(JobTooLargeError):
+            manager.create_job([("a.wav", io.BytesIO(b"0123456789")), ("b.wav", io.BytesIO(b"0123456789"))])
+        self.assertEqual(os.listdir(self.root), [])
+
+        packed = io.BytesIO()
+        with tarfile.open(fileobj=packed, mode="w") as bundle:
+            info = tarfile.TarInfo("d.wav")
+            info.size = 4
+            bundle.addfile(info, io.BytesIO(b"1234"))
+        packed.seek(0)
+        job = manager.create_job([("a.wav", io.BytesIO(b"0123456789")), ("lote.tar", packed)])
+        self.assertEqual(job.files, ["a.wav", "d.wav"])
+
+    def test_batch_waits_for_interactive_load(self):
+        """
+        Enquanto o executor está ocupado com requisições interativas, o lote não começa novos arquivos
+        """
+        service = EchoSTTService()
+        service.executor.pending = 1
+        manager = BatchJobManager(self.root, busy_backoff=0.01)
+
+        async def scenario():
+            manager.start(lambda: service)
+            job = manager.create_job([("a.wav", io.BytesIO(b"um"))])
+            manager.submit(job)
+            await asyncio.sleep(0.05)
+            self.assertEqual(service.calls, 0)
+            service.executor.pending = 0
+            while job.status != JOB_COMPLETED:
+                await job.wait_for_change(timeout=1.0)
+            await manager.stop()
+
+        asyncio.run(scenario())
+        self.assertEqual(service.calls, 1)
+        self.assertGreater(manager.get_stats()["busy_waits"], 0)
+
+    def test_queue_limit_and_cancel(self):
+        """
+        Jobs acima da capacidade da fila são recusados; jobs cancelados não são processados
+        """
+        service = EchoSTTService()
+        service.executor.pending = 1  # segura o processamento
+        manager = BatchJobManager(self.root, max_queued_files=2, busy_backoff=0.01)
+
+        async def scenario():
+            manager.start(lambda: service)
+            first = manager.create_job([("a.wav", io.BytesIO(b"um")), ("b.wav", io.BytesIO(b"dois"))])
+            manager.submit(first)
+            second = manager.create_job([("c.wav", io.BytesIO(b"tres"))])
+            with self.assertRaises(JobQueueFullError):
+                manager.submit(second)
+            self.assertFalse(os.path.exists(second.directory))
+
+            manager.cancel(first)
+            service.executor.pending = 0
+            await asyncio.sleep(0.05)
+            await manager.stop()
+            return first
+
+        first = asyncio.run(scenario())
+        self.assertEqual(first.status, JOB_CANCELLED)
+        self.assertEqual(list(manager.iter_results(first)), [])
+
+    def test_results_are_persisted_off_event_loop(self):
+        """
+        Resultado, remoção da entrada e job.json de cada arquivo não são gravados no event loop
+        """
+        service = EchoSTTService()
+        manager = BatchJobManager(self.root, concurrency=2)
+        saving_threads = set()
+        original_write = BatchJob._write
+
+        def write(job, state):
+            saving_threads.add(threading.get_ident())
+            original_write(job, state)
+
+        async def scenario():
+            manager.start(lambda: service)
+            job = manager.create_job([("a.wav", io.BytesIO(b"um")), ("b.wav", io.BytesIO(b"dois"))])
+            manager.submit(job)
+            BatchJob._write = write
+            try:
+                while job.status != JOB_COMPLETED:
+                    await job.wait_for_change(timeout=1.0)
+            finally:
+                BatchJob._write = original_write
+            await manager.stop()
+            return job
+
+        loop_thread = threading.get_ident()
+        job = asyncio.run(scenario())
+        self.assertTrue(saving_threads)
+        self.assertNotIn(loop_thread, saving_threads)
+        self.assertEqual(BatchJob.load(job.directory).status, JOB_COMPLETED)
+        self.assertEqual(len(list(manager.iter_results(job))), 2)
+
+    def test_delete_wakes_watchers_on_event_loop(self):
+        """
+        DELETE cancela no event loop (acordando quem acompanha o job) e remove o diretório
+        """
+        service = EchoSTTService()
+        service.executor.pending = 1  # segura o processamento
+        manager = BatchJobManager(self.root, busy_backoff=0.01)
+
+        async def scenario():
+            manager.start(lambda: service)
+            job = manager.create_job([("a.wav", io.BytesIO(b"um"))])
+            manager.submit(job)
+            watcher = asyncio.ensure_future(job.wait_for_change(timeout=5))
+            await asyncio.sleep(0)
+            await manager.delete(job)
+            await asyncio.wait_for(watcher, 1)
+            await manager.stop()
+            return job
+
+        job = asyncio.run(scenario(), debug=True)
+        self.assertEqual(job.status, JOB_CANCELLED)
+        self.assertFalse(os.path.exists(job.directory))
+        self.assertEqual(manager.get_stats()["active_jobs"], 0)
+
+    def test_cancel_requested_by_another_worker(self):
+        """
+        O dono do job deve aplicar o cancelamento pedido por outro worker, e largar jobs removidos do disco
+        """
+        service = EchoSTTService()
+        service.executor.pending = 1  # segura o processamento
+        owner = BatchJobManager(self.root, busy_backoff=0.01)
+        other = BatchJobManager(self.root)
+
+        async def scenario():
+            owner.start(lambda: service)
+            cancelled = owner.create_job([("a.wav", io.BytesIO(b"um")), ("b.wav", io.BytesIO(b"dois"))])
+            removed = owner.create_job([("c.wav", io.BytesIO(b"tres"))])
+            owner.submit(cancelled)
+            owner.submit(removed)
+            await asyncio.sleep(0.02)
+
+            remote = other.get_job(cancelled.id)
+            self.assertFalse(other.is_local(remote))
+            other.request_cancel(remote)
+            shutil.rmtree(removed.directory)
+            service.executor.pending = 0
+            await asyncio.sleep(0.1)
+            await owner.stop()
+            return cancelled, removed
+
+        cancelled, removed = asyncio.run(scenario())
+        self.assertEqual(service.calls, 0)
+        self.assertEqual(cancelled.status, JOB_CANCELLED)
+        self.assertEqual(BatchJob.load(cancelled.directory).status, JOB_CANCELLED)
+        self.assertEqual(removed.status, JOB_CANCELLED)
+        self.assertIsNone(owner.get_job(removed.id))
+        self.assertEqual(owner.get_stats()["active_jobs"], 0)
+
+if __name__ == "__main__":
+    unittest.main()
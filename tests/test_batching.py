@@ -0,0 +1,77 @@
+import os
+import sys
+import asyncio
+import unittest
+
+# Adicionar o diretório raiz do projeto ao path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.inference.batching import MicroBatcher
+from app.inference.executor import ExecutorSaturatedError
+
+class TestMicroBatcher(unittest.TestCase):
+    """
+    Testes do agrupamento de requisições concorrentes
+    """
+
+    def test_concurrent_requests_share_batch(self):
+        """
+        Requisições dentro da janela devem ir juntas, por chave, na ordem de chegada
+        """
+        calls = []
+
+        async def run_batch(key, items):
+            calls.append((key, list(items)))
+            return [f"{key}:{item}" for item in items]
+
+        async def scenario():
+            batcher = MicroBatcher(run_batch, window_ms=20, max_batch_size=8)
+            return await asyncio.gather(
+                batcher.submit(1, key="pt"),
+                batcher.submit(2, key="en"),
+                batcher.submit(3, key="pt"),
+            )
+
+        results = asyncio.run(scenario())
+        self.assertEqual(results, ["pt:1", "en:2", "pt:3"])
+        self.assertEqual(sorted(calls), [("en", [2]), ("pt", [1, 3])])
+
+    def test_full_batch_dispatched_immediately(self):
+        """
+        Ao atingir o tamanho máximo o lote não espera a janela
+        """
+        sizes = []
+
+        async def run_batch(key, items):
+            sizes.append(len(items))
+            return items
+
+        async def scenario():
+            batcher = MicroBatcher(run_batch, window_ms=10000, max_batch_size=2)
+            return await asyncio.wait_for(
+                asyncio.gather(*(batcher.submit(i) for i in range(4))), timeout=1
+            )
+
+        self.assertEqual(asyncio.run(scenario()), [0, 1, 2, 3])
+        self.assertEqual(sizes, [2, 2])
+
+    def test_errors_propagate_and_saturation(self):
+        """
+        Falhas do lote chegam a todos os chamadores e o excesso é recusado
+        """
+        async def run_batch(key, items):
+            raise RuntimeError("falha")
+
+        async def scenario():
+            batcher = MicroBatcher(run_batch, window_ms=5, max_batch_size=4, max_pending=1)
+            first = asyncio.ensure_future(batcher.submit("a"))
+            await asyncio.sleep(0)
+            with self.assertRaises(ExecutorSaturatedError):
+                await batcher.submit("b")
+            with self.assertRaises(RuntimeError):
+                await first
+
+        asyncio.run(scenario())
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,153 @@
+import os
+import sys
+import json
+import asyncio
+import unittest
+
+import numpy as np
+
+# Adicionar o diretório raiz do projeto ao path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.utils.http_client import close_http_clients
+from benchmarks.compare import compare
+from benchmarks.corpus import build_corpus, corpus_texts
+from benchmarks.runner import build_service, percentile, run_load, stt_request, summarize, tts_request
+from benchmarks.standins import CloudStandIn
+from benchmarks.stream_load import find_max_streams, lag_slope, run_stream, summarize_trial
+
+class TestBenchmarks(unittest.TestCase):
+    """
+    Testes do harness de benchmark
+    """
+
+    def test_percentile(self):
+        """
+        Os percentis devem interpolar entre as amostras ordenadas
+        """
+        values = [4.0, 1.0, 3.0, 2.0, 5.0]
+        self.assertEqual(percentile(values, 50), 3.0)
+        self.assertAlmostEqual(percentile(values, 90), 4.6)
+        self.assertEqual(percentile(values, 100), 5.0)
+        self.assertEqual(summarize(values)["p50"], 3.0)
+        self.assertIsNone(summarize([]))
+
+    def test_corpus_is_deterministic(self):
+        """
+        A mesma semente deve gerar os mesmos textos e o mesmo áudio
+        """
+        self.assertEqual(corpus_texts(5, seed=3), corpus_texts(5, seed=3))
+        self.assertNotEqual(corpus_texts(5, seed=3), corpus_texts(5, seed=4))
+
+        first = build_corpus(2, seed=1, source="synthetic", cache_dir=None)
+        second = build_corpus(2, seed=1, source="synthetic", cache_dir=None)
+        for a, b in zip(first, second):
+            self.assertEqual(a.text, b.text)
+            np.testing.assert_array_equal(a.audio, b.audio)
+            self.assertGreater(a.seconds, 1.0)
+
+    def test_cloud_backends_against_standin(self):
+        """
+        Os backends de nuvem devem ser criados pela ServiceFactory e medidos contra o stand-in local
+        """
+        corpus = build_corpus(2, source="synthetic", cache_dir=None)
+
+        async def scenario():
+            try:
+                stt = build_service("stt", "azure_openai")
+                tts = build_service("tts", "azure_openai")
+                stt_run = await run_load(stt_request(stt, corpus), concurrency=2, requests=4)
+                tts_run = await run_load(tts_request(tts, [u.text for u in corpus]), concurrency=2, requests=4)
+                return stt_run, tts_run
+            finally:
+                await close_http_clients()
+
+        with CloudStandIn(base_latency=0.01, stt_seconds_per_audio_second=0.0) as standin, standin.patched():
+            stt_run, tts_run = asyncio.run(scenario())
+            self.assertEqual(standin.requests, 8)
+
+        for run in (stt_run, tts_run):
+            self.assertEqual(run["ok"], 4)
+            self.assertEqual(run["errors"], {})
+            self.assertGreaterEqual(run["latency_seconds"]["p50"], 0.01)
+            self.assertIsNotNone(run["rtf"])
+
+    def test_compare(self):
+        """
+        A comparação deve casar backend e concorrência e mostrar a variação
+        """
+        def report(rps):
+            run = {"concurrency": 2, "throughput_rps": rps, "latency_seconds": {"p50": 0.1, "p99": 0.2}, "rtf": None}
+            return {"results": [{"kind": "stt", "backend": "vosk", "model": "small", "runs": [run]}]}
+
+        lines = list(compare(report(10.0), report(12.0)))
+        self.assertEqual(len(lines), 2)
+        self.assertIn("stt vosk (small)", lines[1])
+        self.assertIn("+20%", lines[1])
+
+    def test_lag_slope(self):
+        """
+        O crescimento do atraso deve ser a inclinação da reta atraso x tempo
+        """
+        self.assertAlmostEqual(lag_slope([(t, 0.1 + 0.5 * t) for t in range(10)]), 0.5)
+        self.assertAlmostEqual(lag_slope([(t, 0.2) for t in range(10)]), 0.0)
+        self.assertIsNone(lag_slope([(1.0, 0.2)]))
+
+    def test_find_max_streams(self):
+        """
+        A busca deve dobrar até divergir e refinar entre o último sustentado e o primeiro que falhou
+        """
+        tried = []
+
+        async def run(streams):
+            tried.append(streams)
+            return {"streams": streams, "sustained": streams <= 5, "errors": 0}
+
+        best, trials = asyncio.run(find_max_streams(run, 1, 64))
+        self.assertEqual(best, 5)
+        self.assertEqual(tried, [1, 2, 4, 8, 6, 5])
+        self.assertEqual(len(trials), 6)
+
+    def test_run_stream_v2(self):
+        """
+        O stream deve seguir a janela do protocolo v2 e medir resultados, final e atraso
+        """
+        try:
+            from websockets.asyncio.server import serve
+        except ImportError:
+            self.skipTest("websockets não está instalado")
+
+        async def handler(socket):
+            await socket.send(json.dumps({"type": "ready", "seq": 1, "max_unacked_bytes": 3200}))
+            received = 0
+            async for message in socket:
+                if isinstance(message, bytes):
+                    received += len(message)
+                    await socket.send(json.dumps({"type": "partial", "text": f"{received}"}))
+                    await socket.send(json.dumps({"type": "ack", "bytes": received}))
+                else:
+                    await socket.send(json.dumps({"type": "final", "text": "fim"}))
+                    await socket.send(json.dumps({"type": "end", "bytes": received}))
+                    return
+
+        async def scenario():
+            async with serve(handler, "127.0.0.1", 0) as server:
+                port = server.sockets[0].getsockname()[1]
+                # 0,5s de áudio em frames de 50ms
+                return await run_stream(f"ws://127.0.0.1:{port}", bytes(16000), 1600)
+
+        result = asyncio.run(scenario())
+        self.assertIsNone(result.error)
+        self.assertEqual(result.partials, 10)
+        self.assertEqual(result.finals, 1)
+        self.assertEqual(len(result.lags), 10)
+        self.assertLess(result.last_lag, 0.5)
+        self.assertIsNotNone(result.final_latency)
+        self.assertIsNotNone(result.end_latency)
+
+        trial = summarize_trial([result], max_lag_seconds=1.0, max_lag_slope=0.5)
+        self.assertTrue(trial["sustained"])
+        self.assertGreaterEqual(trial["update_interval_seconds"]["count"], 8)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,67 @@
+import os
+import sys
+import asyncio
+import unittest
+
+import httpx
+
+# Adicionar o diretório raiz do projeto ao path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.config import settings
+from app.utils import http_client
+from app.utils.http_client import RetryBudget, send_with_retry
+
+class TestHttpClient(unittest.TestCase):
+    """
+    Testes do cliente HTTP compartilhado e do orçamento de novas tentativas
+    """
+
+    def setUp(self):
+        self.calls = []
+        self._backoff = settings.http_retry_backoff
+        settings.http_retry_backoff = 0
+
+    def tearDown(self):
+        settings.http_retry_backoff = self._backoff
+        http_client._async_client = None
+        http_client._retry_budget = None
+
+    def use_transport(self, statuses, budget):
+        """Substitui o cliente compartilhado por um que responde os status informados"""
+        def handler(request):
+            self.calls.append(request)
+            return httpx.Response(statuses[min(len(self.calls), len(statuses)) - 1], content=b"ok")
+
+        http_client._reset_after_fork()
+        http_client._async_client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        http_client._retry_budget = budget
+
+    def test_retries_transient_errors(self):
+        """
+        Respostas 503 devem ser repetidas até o sucesso, consumindo o orçamento
+        """
+        budget = RetryBudget(ratio=0.2, reserve=10)
+        self.use_transport([503, 503, 200], budget)
+
+        response = asyncio.run(send_with_retry("POST", "http://backend/tts", json={"input": "oi"}))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(self.calls), 3)
+        self.assertEqual(budget.get_stats()["retries"], 2)
+
+    def test_budget_limits_retries(self):
+        """
+        Sem orçamento, a falha deve ser devolvida sem novas tentativas
+        """
+        budget = RetryBudget(ratio=0.0, reserve=0)
+        self.use_transport([503, 200], budget)
+
+        response = asyncio.run(send_with_retry("GET", "http://backend/tts"))
+
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(len(self.calls), 1)
+        self.assertEqual(budget.get_stats()["exhausted"], 1)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,117 @@
+import os
+import sys
+import json
+import unittest
+
+import numpy as np
+
+# Adicionar o diretório raiz do projeto ao path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.config import settings
+from app.dependencies import get_stt_service
+from app.audio.wav import build_wav_header
+from app.interfaces.stt_service import SpeechToTextService, StreamEvent, StreamSession
+
+class ByteCountingSession(StreamSession):
+    """Sessão falsa: um resultado final a cada segundo de PCM 16 bits mono a 16 kHz"""
+
+    def __init__(self):
+        self.received = 0
+        self.ended = False
+
+    async def process_audio_stream(self, audio_chunk):
+        yield ""
+
+    async def process_audio_events(self, audio_chunk, partials=True):
+        before = self.received
+        self.received += len(audio_chunk)
+        for second in range(before // 32000 + 1, self.received // 32000 + 1):
+            yield StreamEvent(f"s{second}", True)
+
+    async def end_stream(self):
+        self.ended = True
+        return "fim"
+
+class FakeSTTService(SpeechToTextService):
+    def __init__(self):
+        self.session = ByteCountingSession()
+
+    async def transcribe_audio(self, audio_data, language=None):
+        return ""
+
+    async def start_stream(self):
+        return self.session
+
+def _chunks(data, size=8192):
+    for offset in range(0, len(data), size):
+        yield data[offset:offset + size]
+
+class TestIncrementalSTT(unittest.TestCase):
+    """
+    Testes da transcrição incremental com o corpo da requisição em streaming
+    """
+
+    def setUp(self):
+        self.service = FakeSTTService()
+        app.dependency_overrides[get_stt_service] = lambda: self.service
+        self.client = TestClient(app)
+
+    def tearDown(self):
+        app.dependency_overrides.clear()
+
+    def test_streams_segments_as_ndjson(self):
+        """
+        WAV estéreo a 44,1 kHz é convertido em partes e os segmentos saem em NDJSON
+        """
+        frames = 44100 * 3
+        pcm = np.zeros(frames * 2, dtype="<i2").tobytes()
+        wav = build_wav_header(44100, channels=2, data_size=len(pcm)) + pcm + b"LIST\x04\x00\x00\x00info"
+
+        response = self.client.post("/speech/stt/incremental", content=_chunks(wav))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.headers["content-type"], "application/x-ndjson")
+        lines = [json.loads(line) for line in response.text.splitlines()]
+        self.assertEqual([line["text"] for line in lines], ["s1", "s2", "s3", "s1 s2 s3 fim"])
+        self.assertEqual(lines[-1]["type"], "final")
+        self.assertEqual(lines[-1]["duration"], 3.0)
+        self.assertEqual([line["seq"] for line in lines], [1, 2, 3, 4])
+        # Metadados após os dados não chegam ao reconhecedor
+        self.assertAlmostEqual(self.service.session.received, 16000 * 3 * 2, delta=16)
+        self.assertTrue(self.service.session.ended)
+
+    def test_limits_are_checked_before_inference(self):
+        """
+        A duração declarada no cabeçalho acima do limite é rejeitada com 413 sem abrir sessão
+        """
+        too_long = int(settings.stt_incremental_max_seconds + 1) * 32000
+        wav = build_wav_header(16000, data_size=too_long) + bytes(1024)
+
+        response = self.client.post("/speech/stt/incremental", content=wav)
+
+        self.assertEqual(response.status_code, 413)
+        self.assertEqual(self.service.session.received, 0)
+        self.assertEqual(self.client.post("/speech/stt/incremental", content=b"ID3" + bytes(100)).status_code, 415)
+
+    def test_undeclared_size_is_limited_while_streaming(self):
+        """
+        Sem tamanho no cabeçalho, o limite é aplicado durante o upload com uma linha de erro
+        """
+        max_seconds = settings.stt_incremental_max_seconds
+        settings.stt_incremental_max_seconds = 1.0
+        try:
+            wav = build_wav_header(16000) + bytes(32000 * 2)
+            response = self.client.post("/speech/stt/incremental", content=_chunks(wav))
+        finally:
+            settings.stt_incremental_max_seconds = max_seconds
+
+        lines = [json.loads(line) for line in response.text.splitlines()]
+        self.assertEqual(lines[-1]["type"], "error")
+        self.assertTrue(self.service.session.ended)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,201 @@
+import os
+import sys
+import asyncio
+import threading
+import time
+import unittest
+
+# Adicionar o diretório raiz do projeto ao path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.inference.executor import InferenceExecutor, ExecutorSaturatedError
+from app.inference.scheduling import PRIORITY_BATCH, PRIORITY_INTERACTIVE, PRIORITY_LIVE, work_context
+
+class TestInferenceExecutor(unittest.TestCase):
+    """
+    Testes do executor de inferência com fila limitada
+    """
+
+    def test_runs_off_loop(self):
+        """
+        A função deve rodar em uma thread do pool e devolver o resultado
+        """
+        executor = InferenceExecutor("test", max_workers=1, max_queue=0)
+
+        async def scenario():
+            return await executor.run(lambda x: (x * 2, threading.current_thread().name), 21)
+
+        try:
+            result, thread_name = asyncio.run(scenario())
+            self.assertEqual(result, 42)
+            self.assertTrue(thread_name.startswith("inference-test"))
+            self.assertEqual(executor.pending, 0)
+        finally:
+            executor.shutdown(wait=True)
+
+    def test_rejects_when_saturated(self):
+        """
+        Acima de workers + fila, a submissão deve falhar com Retry-After
+        """
+        executor = InferenceExecutor("busy", max_workers=1, max_queue=1, retry_after=3)
+        release = threading.Event()
+
+        try:
+            first = executor.submit(release.wait)
+            second = executor.submit(release.wait)
+            with self.assertRaises(ExecutorSaturatedError) as context:
+                executor.submit(release.wait)
+            self.assertEqual(context.exception.retry_after, 3)
+            self.assertEqual(executor.get_stats()["queued"], 1)
+
+            release.set()
+            first.result(timeout=5)
+            second.result(timeout=5)
+            self.assertEqual(executor.pending, 0)
+        finally:
+            release.set()
+            executor.shutdown(wait=True)
+
+    def test_map_ordered(self):
+        """
+        Os itens devem rodar em paralelo e os resultados sair na ordem original,
+        mesmo quando o executor satura e o item roda na thread do chamador
+        """
+        executor = InferenceExecutor("ordered", max_workers=3, max_queue=0)
+        delays = [0.06, 0.01, 0.03, 0.0, 0.02]
+
+        def work(index):
+            time.sleep(delays[index])
+            return index
+
+        try:
+            start = time.perf_counter()
+            results = list(executor.map_ordered(work, range(len(delays)), window=4))
+            elapsed = time.perf_counter() - start
+
+            self.assertEqual(results, [0, 1, 2, 3, 4])
+            self.assertLess(elapsed, sum(delays))
+            self.assertEqual(executor.pending, 0)
+        finally:
+            executor.shutdown(wait=True)
+
+    def test_priority_and_shortest_first(self):
+        """
+        Com o worker ocupado, a fila deve sair por prioridade e, dentro da
+        classe, do menor custo para o maior
+        """
+        executor = InferenceExecutor("priority", max_workers=1, max_queue=8)
+        release = threading.Event()
+        order = []
+
+        try:
+            blocker = executor.submit(release.wait)
+            queued = [
+                ("batch", PRIORITY_BATCH, 1.0),
+                ("long", PRIORITY_INTERACTIVE, 30.0),
+                ("short", PRIORITY_INTERACTIVE, 2.0),
+                ("live", PRIORITY_LIVE, 0.0),
+            ]
+            futures = []
+            for label, priority, cost in queued:
+                with work_context(priority, cost=cost):
+                    futures.append(executor.submit(order.append, label))
+            self.assertEqual(executor.get_stats()["queued"], 4)
+
+            release.set()
+            blocker.result(timeout=5)
+            for future in futures:
+                future.result(timeout=5)
+            self.assertEqual(order, ["live", "short", "long", "batch"])
+
+            queue_time = executor.get_stats()["queue_time"]
+            self.assertEqual(queue_time["interactive"]["count"], 3)
+            self.assertEqual(queue_time["batch"]["count"], 1)
+        finally:
+            release.set()
+            executor.shutdown(wait=True)
+
+    def test_tenant_quota(self):
+        """
+        Um tenant no limite de workers não deve bloquear os demais
+        """
+        executor = InferenceExecutor("quota", max_workers=2, max_queue=8, tenant_max_concurrency=1)
+        release = threading.Event()
+        started = []
+
+        def work(label):
+            started.append(label)
+            release.wait()
+
+        try:
+            with work_context(tenant="a"):
+                first = executor.submit(work, "a1")
+                second = executor.submit(work, "a2")
+            with work_context(tenant="b"):
+                third = executor.submit(work, "b1")
+
+            deadline = time.monotonic() + 5
+            while len(started) < 2 and time.monotonic() < deadline:
+                time.sleep(0.01)
+            self.assertEqual(sorted(started), ["a1", "b1"])
+            self.assertEqual(executor.get_stats()["running_by_tenant"], {"a": 1, "b": 1})
+
+            release.set()
+            for future in (first, second, third):
+                future.result(timeout=5)
+            self.assertEqual(sorted(started), ["a1", "a2", "b1"])
+            self.assertEqual(executor.pending, 0)
+        finally:
+            release.set()
+            executor.shutdown(wait=True)
+
+    def test_batch_admission(self):
+        """
+        Trabalho em lote só ocupa sua fração da fila; o restante fica para as
+        requisições interativas
+        """
+        executor = InferenceExecutor("admission", max_workers=1, max_queue=4, batch_queue_share=0.5)
+        release = threading.Event()
+
+        try:
+            futures = []
+            with work_context(PRIORITY_BATCH):
+                futures += [executor.submit(release.wait) for _ in range(3)]
+                with self.assertRaises(ExecutorSaturatedError):
+                    executor.submit(release.wait)
+            futures += [executor.submit(release.wait) for _ in range(2)]
+            with self.assertRaises(ExecutorSaturatedError):
+                executor.submit(release.wait)
+
+            release.set()
+            for future in futures:
+                future.result(timeout=5)
+            self.assertEqual(executor.pending, 0)
+        finally:
+            release.set()
+            executor.shutdown(wait=True)
+
+    def test_cancel_queued(self):
+        """
+        Uma tarefa cancelada ainda na fila deve liberar a vaga sem executar
+        """
+        executor = InferenceExecutor("cancel", max_workers=1, max_queue=1)
+        release = threading.Event()
+        calls = []
+
+        try:
+            blocker = executor.submit(release.wait)
+            queued = executor.submit(calls.append, "queued")
+            self.assertTrue(queued.cancel())
+            self.assertEqual(executor.pending, 1)
+
+            release.set()
+            blocker.result(timeout=5)
+            self.assertEqual(calls, [])
+            self.assertEqual(executor.pending, 0)
+        finally:
+            release.set()
+            executor.shutdown(wait=True)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,103 @@
+import io
+import json
+import os
+import sys
+import threading
+import unittest
+
+# Adicionar o diretório raiz do projeto ao path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.utils.log import StructuredLogger
+
+class _BlockingStream(io.StringIO):
+    """Stream que segura a thread de escrita até ser liberado"""
+
+    def __init__(self):
+        super().__init__()
+        self.writing = threading.Event()
+        self.release = threading.Event()
+
+    def write(self, text):
+        self.writing.set()
+        self.release.wait(5)
+        return super().write(text)
+
+class TestStructuredLogger(unittest.TestCase):
+    """
+    Testes do logger estruturado com fila
+    """
+
+    def test_writes_text_and_json(self):
+        """
+        Os registros devem ser escritos pela thread, em texto ou JSON
+        """
+        stream = io.StringIO()
+        logger = StructuredLogger(stream=stream)
+        logger.info("stt.request", "Transcrição concluída", service="Vosk", seconds=1.234)
+        self.assertTrue(logger.flush())
+        line = stream.getvalue().strip()
+        self.assertIn("INFO", line)
+        self.assertIn("[stt.request] Transcrição concluída", line)
+        self.assertIn("service=Vosk seconds=1.23", line)
+
+        stream = io.StringIO()
+        logger = StructuredLogger(stream=stream, fmt="json")
+        logger.error("batch", "Erro", job="abc", file=2)
+        self.assertTrue(logger.flush())
+        data = json.loads(stream.getvalue())
+        self.assertEqual(data["level"], "error")
+        self.assertEqual(data["category"], "batch")
+        self.assertEqual(data["job"], "abc")
+        self.assertEqual(data["file"], 2)
+
+    def test_sampling_keeps_errors(self):
+        """
+        A amostragem deve filtrar debug/info da categoria e manter os erros
+        """
+        stream = io.StringIO()
+        logger = StructuredLogger(stream=stream, level="debug", sample_rates={"stt.request": 0.0})
+        for _ in range(10):
+            logger.debug("stt.request", "ok")
+        logger.error("stt.request", "falhou")
+        logger.info("tts.request", "ok")
+        self.assertTrue(logger.flush())
+
+        lines = stream.getvalue().strip().splitlines()
+        self.assertEqual(len(lines), 2)
+        stats = logger.get_stats()
+        self.assertEqual(stats["sampled_out"], 10)
+        self.assertEqual(stats["written"], 2)
+
+    def test_drops_when_queue_full(self):
+        """
+        Com a fila cheia o registro deve ser descartado e contado, sem bloquear
+        """
+        stream = _BlockingStream()
+        logger = StructuredLogger(stream=stream, max_queue=2)
+        try:
+            logger.info("test", "primeiro")
+            # Espera a thread retirar o primeiro registro e ficar presa na escrita
+            self.assertTrue(stream.writing.wait(5))
+            for index in range(5):
+                logger.info("test", "mais", index=index)
+            self.assertEqual(logger.get_stats()["dropped"], 3)
+        finally:
+            stream.release.set()
+        self.assertTrue(logger.flush())
+        self.assertEqual(logger.get_stats()["written"], 3)
+
+    def test_level_filter(self):
+        """
+        Registros abaixo do nível mínimo não devem entrar na fila
+        """
+        stream = io.StringIO()
+        logger = StructuredLogger(stream=stream, level="warning")
+        logger.info("test", "ignorado")
+        self.assertFalse(logger.enabled("info"))
+        logger.warning("test", "aviso")
+        self.assertTrue(logger.flush())
+        self.assertEqual(len(stream.getvalue().strip().splitlines()), 1)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,114 @@
+import os
+import sys
+import asyncio
+import threading
+import unittest
+
+import numpy as np
+
+# Adicionar o diretório raiz do projeto ao path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.audio import ingest
+from app.audio.ingest import to_wav_bytes
+from app.audio.segment import plan_segments
+from app.config import settings
+from app.interfaces.stt_service import SpeechToTextService, join_segments
+
+SAMPLE_RATE = 16000
+
+class SegmentRecorder(SpeechToTextService):
+    """Serviço falso que devolve a duração de cada segmento e mede o paralelismo"""
+
+    def __init__(self):
+        self.running = 0
+        self.max_running = 0
+
+    async def transcribe_audio(self, audio_data, language=None):
+        self.running += 1
+        self.max_running = max(self.max_running, self.running)
+        # Segmentos mais curtos terminam antes: a ordem deve ser preservada
+        await asyncio.sleep(len(audio_data) / SAMPLE_RATE / 1000)
+        self.running -= 1
+        return f"{len(audio_data) / SAMPLE_RATE:.0f}s"
+
+    async def start_stream(self):
+        raise NotImplementedError
+
+class TestLongAudio(unittest.TestCase):
+    """
+    Testes da transcrição de áudios longos em segmentos
+    """
+
+    def test_segments_are_grouped_at_pauses(self):
+        """
+        Trechos de fala são agrupados até o limite; trechos longos são cortados no ponto mais silencioso
+        """
+        audio = np.full(100 * SAMPLE_RATE, 0.1, dtype=np.float32)
+        audio[45 * SAMPLE_RATE:45 * SAMPLE_RATE + 480] = 0.0  # pausa curta dentro de um trecho longo
+        regions = [(0, 10 * SAMPLE_RATE), (12 * SAMPLE_RATE, 25 * SAMPLE_RATE), (30 * SAMPLE_RATE, 80 * SAMPLE_RATE)]
+
+        segments = plan_segments(audio, SAMPLE_RATE, 30, regions)
+
+        self.assertEqual(segments[0].pieces, ((0, 10 * SAMPLE_RATE), (12 * SAMPLE_RATE, 25 * SAMPLE_RATE)))
+        self.assertEqual(len(segments[0].extract(audio)), 23 * SAMPLE_RATE)
+        self.assertEqual(segments[1].start, 30 * SAMPLE_RATE)
+        self.assertAlmostEqual(segments[1].end / SAMPLE_RATE, 45, delta=0.03)
+        self.assertEqual(segments[-1].end, 80 * SAMPLE_RATE)
+        for segment in segments:
+            self.assertLessEqual(len(segment.extract(audio)), 30 * SAMPLE_RATE)
+
+        self.assertEqual(len(plan_segments(audio, SAMPLE_RATE, None, regions)), 1)
+        self.assertEqual(plan_segments(audio, SAMPLE_RATE, 30, []), [])
+
+    def test_segments_transcribed_in_parallel_and_in_order(self):
+        """
+        Segmentos de um áudio longo rodam em paralelo (limitado) e voltam na ordem do áudio
+        """
+        service = SegmentRecorder()
+        audio = np.full(200 * SAMPLE_RATE, 0.1, dtype=np.float32)
+
+        segments = asyncio.run(service.transcribe_segments(audio))
+
+        self.assertEqual(len(segments), 7)
+        for i, segment in enumerate(segments):
+            self.assertAlmostEqual(segment.start, 30.0 * i, delta=0.1)
+        self.assertEqual(join_segments(segments), "30s 30s 30s 30s 30s 30s 20s")
+        self.assertEqual(service.max_running, settings.stt_parallel_segments)
+
+    def test_short_audio_is_a_single_segment(self):
+        """
+        Áudios abaixo do limite seguem como um único segmento
+        """
+        service = SegmentRecorder()
+        segments = asyncio.run(service.transcribe_segments(np.full(40 * SAMPLE_RATE, 0.1, dtype=np.float32)))
+        self.assertEqual([segment.text for segment in segments], ["40s"])
+
+    def test_uploaded_file_decoded_and_gated_off_event_loop(self):
+        """
+        Decodificação e VAD de um arquivo longo devem rodar fora da thread do event loop
+        """
+        service = SegmentRecorder()
+        threads = []
+        original = ingest.detect_speech
+
+        def tracked(*args, **kwargs):
+            threads.append(threading.get_ident())
+            return original(*args, **kwargs)
+
+        async def run():
+            segments = await service.transcribe_segments(to_wav_bytes(np.full(70 * SAMPLE_RATE, 0.1, dtype=np.float32)))
+            return threading.get_ident(), segments
+
+        ingest.detect_speech = tracked
+        try:
+            loop_thread, segments = asyncio.run(run())
+        finally:
+            ingest.detect_speech = original
+
+        self.assertEqual(len(threads), 1)
+        self.assertNotEqual(threads[0], loop_thread)
+        self.assertEqual(join_segments(segments), "30s 30s 10s")
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,85 @@
+import os
+import sys
+import threading
+import unittest
+
+# Adicionar o diretório raiz do projeto ao path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.utils.metrics import Counter, Gauge, Histogram, MetricsRegistry
+
+class TestMetrics(unittest.TestCase):
+    """
+    Testes das métricas no formato do Prometheus
+    """
+
+    def test_counter_and_gauge(self):
+        """
+        Contadores somam por combinação de rótulos e gauges sobem e descem
+        """
+        registry = MetricsRegistry()
+        requests = registry.counter("requests_total", "Requisições", ("service",))
+        sessions = registry.gauge("sessions_active", "Sessões")
+
+        def work():
+            for _ in range(1000):
+                requests.inc(service="stt")
+
+        threads = [threading.Thread(target=work) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        requests.inc(2.5, service="tts")
+        sessions.inc()
+        sessions.inc()
+        sessions.dec()
+
+        text = registry.render()
+        self.assertIn("# TYPE requests_total counter", text)
+        self.assertIn('requests_total{service="stt"} 4000', text)
+        self.assertIn('requests_total{service="tts"} 2.5', text)
+        self.assertIn("sessions_active 1", text)
+
+    def test_histogram_buckets(self):
+        """
+        As faixas do histograma devem ser cumulativas, com soma e contagem
+        """
+        histogram = Histogram("latency_seconds", "Latência", ("stage",), buckets=(0.1, 1.0))
+        for value in (0.05, 0.1, 0.5, 3.0):
+            histogram.observe(value, stage="inference")
+
+        samples = {(suffix, dict(labels).get("le")): value for suffix, labels, value in histogram.samples()}
+        self.assertEqual(samples[("_bucket", "0.1")], 2)
+        self.assertEqual(samples[("_bucket", "1")], 3)
+        self.assertEqual(samples[("_bucket", "+Inf")], 4)
+        self.assertEqual(samples[("_count", None)], 4)
+        self.assertAlmostEqual(samples[("_sum", None)], 3.65)
+
+    def test_collectors_and_escaping(self):
+        """
+        Coletores geram métricas a cada coleta; falhas não derrubam o endpoint
+        """
+        registry = MetricsRegistry()
+        depth = {"value": 3}
+
+        def collect():
+            gauge = Gauge("queue_depth", "Fila", ("executor",))
+            gauge.set(depth["value"], executor='whisper "tiny"')
+            yield gauge
+
+        def broken():
+            raise RuntimeError("indisponível")
+
+        registry.add_collector(collect)
+        registry.add_collector(broken)
+        self.assertIn('queue_depth{executor="whisper \\"tiny\\""} 3', registry.render())
+        depth["value"] = 5
+        self.assertIn('queue_depth{executor="whisper \\"tiny\\""} 5', registry.render())
+
+        with self.assertRaises(ValueError):
+            registry.register(Counter("queue_depth_total", "x"))
+            registry.register(Counter("queue_depth_total", "x"))
+
+if __name__ == "__main__":
+    unittest.main()
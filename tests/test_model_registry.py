@@ -0,0 +1,51 @@
+import os
+import sys
+import unittest
+from unittest import mock
+
+# Adicionar o diretório raiz do projeto ao path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.registry.model_registry import ModelRegistry
+
+class TestModelRegistry(unittest.TestCase):
+    """
+    Testes do registro de modelos compartilhados
+    """
+
+    def test_service_loaded_once(self):
+        """
+        O mesmo serviço deve ser reaproveitado entre chamadas com os mesmos parâmetros
+        """
+        registry = ModelRegistry()
+        with mock.patch("app.registry.model_registry.ServiceFactory.get_stt_service",
+                        side_effect=lambda **kwargs: object()) as factory:
+            first = registry.get_stt_service("vosk", model_path="a")
+            second = registry.get_stt_service("vosk", model_path="a")
+            other = registry.get_stt_service("vosk", model_path="b")
+
+        self.assertIs(first, second)
+        self.assertIsNot(first, other)
+        self.assertEqual(factory.call_count, 2)
+
+    def test_stats_reported(self):
+        """
+        Cada modelo carregado deve informar tempo de carga e memória
+        """
+        registry = ModelRegistry()
+        with mock.patch("app.registry.model_registry.ServiceFactory.get_tts_service",
+                        side_effect=lambda **kwargs: object()):
+            registry.get_tts_service("gtts", lang="pt-br")
+
+        stats = registry.get_stats()
+        self.assertEqual(len(stats), 1)
+        self.assertEqual(stats[0]["kind"], "tts")
+        self.assertEqual(stats[0]["service_type"], "gtts")
+        self.assertIn("load_time_ms", stats[0])
+        self.assertGreaterEqual(stats[0]["memory_bytes"], 0)
+
+        registry.clear()
+        self.assertEqual(registry.get_stats(), [])
+
+if __name__ == "__main__":
+    unittest.main()
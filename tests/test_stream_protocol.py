@@ -0,0 +1,103 @@
+import os
+import sys
+import unittest
+
+# Adicionar o diretório raiz do projeto ao path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.dependencies import get_stt_service
+from app.interfaces.stt_service import SpeechToTextService, StreamEvent, StreamSession
+
+class CountingSession(StreamSession):
+    """Sessão falsa: parcial repetido a cada chunk e um final a cada 4 chunks"""
+
+    def __init__(self):
+        self.chunks = 0
+        self.partial_requests = 0
+
+    async def process_audio_stream(self, audio_chunk):
+        yield ""
+
+    async def process_audio_events(self, audio_chunk, partials=True):
+        self.chunks += 1
+        if self.chunks % 4 == 0:
+            yield StreamEvent(f"frase {self.chunks // 4}", True)
+        elif partials:
+            self.partial_requests += 1
+            yield StreamEvent(f"frase {self.chunks // 4 + 1}", False)
+
+    async def end_stream(self):
+        return "resto"
+
+class FakeSTTService(SpeechToTextService):
+    def __init__(self):
+        self.session = CountingSession()
+
+    async def transcribe_audio(self, audio_data, language=None):
+        return ""
+
+    async def start_stream(self):
+        return self.session
+
+class TestStreamProtocol(unittest.TestCase):
+    """
+    Testes do protocolo v2 de streaming (WebSocket)
+    """
+
+    def setUp(self):
+        self.service = FakeSTTService()
+        app.dependency_overrides[get_stt_service] = lambda: self.service
+
+    def tearDown(self):
+        app.dependency_overrides.clear()
+
+    def _run(self, url, chunks):
+        with TestClient(app).websocket_connect(url) as websocket:
+            messages = [websocket.receive_json()]
+            for chunk in chunks:
+                websocket.send_bytes(chunk)
+            websocket.send_json({"type": "end"})
+            while messages[-1]["type"] != "end":
+                messages.append(websocket.receive_json())
+        return messages
+
+    def test_typed_messages_and_acks(self):
+        """
+        Mensagens JSON tipadas e sequenciais, sem parciais repetidos, com acks e fim explícito
+        """
+        chunk = bytes(6400)  # 200 ms
+        messages = self._run("/speech/stt/stream/v2?min_partial_interval_ms=0", [chunk] * 8)
+
+        self.assertEqual(messages[0]["type"], "ready")
+        self.assertEqual(messages[0]["protocol"], 2)
+        self.assertEqual([message["seq"] for message in messages], list(range(1, len(messages) + 1)))
+
+        texts = [(message["type"], message["text"]) for message in messages if "text" in message]
+        self.assertEqual(texts, [
+            ("partial", "frase 1"), ("final", "frase 1"),
+            ("partial", "frase 2"), ("final", "frase 2"),
+            ("final", "resto"),
+        ])
+
+        acks = [message["bytes"] for message in messages if message["type"] == "ack"]
+        self.assertEqual(acks[-1], len(chunk) * 8)
+        self.assertEqual(acks, sorted(acks))
+        self.assertEqual(messages[-1], {"type": "end", "seq": len(messages), "bytes": len(chunk) * 8})
+
+    def test_partials_are_throttled(self):
+        """
+        Com intervalo mínimo alto, a sessão nem calcula parciais depois do primeiro
+        """
+        self._run("/speech/stt/stream/v2?min_partial_interval_ms=60000", [bytes(320)] * 8)
+        self.assertEqual(self.service.session.partial_requests, 1)
+
+        self.service = FakeSTTService()
+        messages = self._run("/speech/stt/stream/v2?partials=false", [bytes(320)] * 8)
+        self.assertEqual(self.service.session.partial_requests, 0)
+        self.assertNotIn("partial", [message["type"] for message in messages])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,139 @@
+import os
+import sys
+import json
+import asyncio
+import threading
+import unittest
+from types import SimpleNamespace
+
+import numpy as np
+
+# Adicionar o diretório raiz do projeto ao path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.config import settings
+from app.inference.executor import InferenceExecutor
+from app.inference.scheduling import PRIORITY_LIVE, PRIORITY_NAMES, set_work_context
+from app.services.stt.azure_openai_service import AzureOpenAISTTService
+from app.services.stt.vosk_service import VoskSTTService
+
+class FakeRecognizer:
+    """Recognizer mínimo que apenas acumula os bytes recebidos"""
+
+    def __init__(self, model, sample_rate):
+        self.received = b""
+        self.threads = set()
+
+    def AcceptWaveform(self, data):
+        self.threads.add(threading.get_ident())
+        self.received += data
+        return False
+
+    def PartialResult(self):
+        return json.dumps({"partial": self.received.decode()})
+
+    def FinalResult(self):
+        return json.dumps({"text": self.received.decode()})
+
+class TestStreamSessions(unittest.TestCase):
+    """
+    Testes das sessões de streaming sobre um modelo compartilhado
+    """
+
+    def setUp(self):
+        # Os chunks de teste não são áudio: o VAD os descartaria
+        self._vad_enabled = settings.vad_enabled
+        settings.vad_enabled = False
+        self.executor = InferenceExecutor("vosk-test", max_workers=2, max_queue=4)
+
+    def tearDown(self):
+        settings.vad_enabled = self._vad_enabled
+        self.executor.shutdown()
+
+    def _make_service(self):
+        service = VoskSTTService.__new__(VoskSTTService)
+        service.KaldiRecognizer = FakeRecognizer
+        service.model = SimpleNamespace()
+        service.model_path = "fake"
+        service.sample_rate = 16000
+        service.active_sessions = 0
+        service.executor = self.executor
+        return service
+
+    def test_sessions_are_independent(self):
+        """
+        Sessões simultâneas não devem compartilhar estado do recognizer
+        """
+        async def scenario():
+            service = self._make_service()
+            first = await service.start_stream()
+            second = await service.start_stream()
+            self.assertEqual(service.active_sessions, 2)
+
+            partials = [text async for text in first.process_audio_stream(b"abc")]
+            [text async for text in second.process_audio_stream(b"xyz")]
+
+            self.assertEqual(partials, ["(parcial) abc"])
+            self.assertEqual(await first.end_stream(), "abc")
+            self.assertEqual(await second.end_stream(), "xyz")
+            self.assertEqual(await second.end_stream(), "")
+            self.assertEqual(service.active_sessions, 0)
+
+        asyncio.run(scenario())
+
+    def test_recognizer_runs_in_executor(self):
+        """
+        O Kaldi da sessão deve rodar no executor de inferência, com a prioridade do stream
+        """
+        async def scenario():
+            set_work_context(PRIORITY_LIVE, "tenant-a")
+            service = self._make_service()
+            session = await service.start_stream()
+            [text async for text in session.process_audio_stream(b"abc")]
+            self.assertEqual(await session.end_stream(), "abc")
+            return session.recognizer.threads
+
+        threads = asyncio.run(scenario())
+        self.assertNotIn(threading.get_ident(), threads)
+        queue_time = self.executor.get_stats()["queue_time"]
+        self.assertEqual(list(queue_time), [PRIORITY_NAMES[PRIORITY_LIVE]])
+        self.assertEqual(queue_time[PRIORITY_NAMES[PRIORITY_LIVE]]["count"], 2)
+
+    def test_azure_openai_segments_are_pipelined(self):
+        """
+        Segmentos são enviados sem esperar os anteriores e os textos saem em ordem, sem repetição na sobreposição
+        """
+        service = AzureOpenAISTTService.__new__(AzureOpenAISTTService)
+        service.active_sessions = 0
+        state = {"running": 0, "max_running": 0}
+
+        async def transcribe_audio(audio, language=None):
+            # Cada segundo de áudio do teste tem um valor constante: uma "palavra" por valor
+            values = np.round(audio * 32768 / 1000).astype(int)
+            words = [f"w{value}" for i, value in enumerate(values) if i == 0 or values[i - 1] != value]
+            state["running"] += 1
+            state["max_running"] = max(state["max_running"], state["running"])
+            await asyncio.sleep(0.05 / (values[-1] + 1))  # os últimos respondem antes
+            state["running"] -= 1
+            return " ".join(words)
+
+        service.transcribe_audio = transcribe_audio
+        second = np.full(16000, 1, dtype="<i2")
+
+        async def scenario():
+            session = await service.start_stream()
+            emitted = []
+            for value in range(8):
+                chunk = (second * value * 1000).tobytes()
+                emitted.extend([text async for text in session.process_audio_stream(chunk)])
+            emitted.append(await session.end_stream())
+            return emitted
+
+        emitted = asyncio.run(scenario())
+
+        self.assertEqual(" ".join(emitted).split(), [f"w{value}" for value in range(8)])
+        self.assertEqual(state["max_running"], settings.azure_openai_stt_stream_max_in_flight)
+        self.assertEqual(service.active_sessions, 0)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,134 @@
+import asyncio
+import contextvars
+import json
+import os
+import sys
+import tempfile
+import time
+import unittest
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+# Adicionar o diretório raiz do projeto ao path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.inference.executor import InferenceExecutor
+from app.utils.tracing import ServerTimingMiddleware, TraceExporter, Trace, get_current_span, span, start_trace
+
+class TestTracing(unittest.TestCase):
+    """
+    Testes do tracing por requisição
+    """
+
+    def test_spans_nest_and_aggregate_in_server_timing(self):
+        """
+        Spans devem ficar sob o span atual, e etapas repetidas somadas no Server-Timing
+        """
+        def run():
+            trace = start_trace("GET /teste")
+            with span("stt.transcribe") as outer:
+                with span("stt.segment") as first:
+                    pass
+                with span("stt.segment"):
+                    pass
+            self.assertEqual(outer.parent_id, trace.root.span_id)
+            self.assertEqual(first.parent_id, outer.span_id)
+            self.assertIs(get_current_span(), trace.root)
+            return trace.server_timing()
+
+        # Contexto próprio, para o trace não vazar para os outros testes
+        header = contextvars.copy_context().run(run)
+        self.assertRegex(header, r'^stt\.transcribe;dur=[\d.]+, stt\.segment;dur=[\d.]+;desc="2x", total;dur=[\d.]+$')
+
+    def test_span_without_trace_is_noop(self):
+        """
+        Fora de uma requisição rastreada, span() não deve registrar nada
+        """
+        async def run():
+            with span("audio.decode") as current:
+                return current
+
+        self.assertIsNone(asyncio.run(run()))
+
+    def test_executor_records_queue_and_run(self):
+        """
+        A fila e a execução no executor devem entrar no trace da requisição
+        """
+        executor = InferenceExecutor("tracing-test", max_workers=1, max_queue=4)
+
+        async def run():
+            trace = start_trace("POST /stt")
+            await executor.run(time.sleep, 0.01)
+            return trace
+
+        try:
+            trace = asyncio.run(run())
+        finally:
+            executor.shutdown()
+        spans = {item.name: item for item in trace.spans}
+        self.assertIn("executor.queue", spans)
+        self.assertGreaterEqual(spans["executor.run"].duration, 0.01)
+        self.assertEqual(spans["executor.run"].attributes["executor"], "tracing-test")
+
+    def test_exporter_writes_otlp_json_lines(self):
+        """
+        O exportador deve gravar uma linha OTLP por trace, ignorando os rápidos
+        """
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "traces", "spans.jsonl")
+            exporter = TraceExporter(path, service_name="Speech API", min_duration_ms=5)
+
+            fast = Trace("GET /health")
+            fast.finish()
+            slow = Trace("POST /stt")
+            slow.add("audio.read", slow.root.start, slow.root.start + 0.002, **{"audio.bytes": 1024})
+            time.sleep(0.01)
+            slow.root.error = "RuntimeError: falhou"
+            slow.finish()
+
+            self.assertFalse(exporter.export(fast))
+            self.assertTrue(exporter.export(slow))
+            self.assertTrue(exporter.flush())
+            with open(path, encoding="utf-8") as f:
+                lines = f.read().splitlines()
+
+        self.assertEqual(len(lines), 1)
+        resource = json.loads(lines[0])["resourceSpans"][0]
+        self.assertIn({"key": "service.name", "value": {"stringValue": "Speech API"}},
+                      resource["resource"]["attributes"])
+        root, child = resource["scopeSpans"][0]["spans"]
+        self.assertEqual(root["traceId"], slow.trace_id)
+        self.assertEqual(root["kind"], 2)
+        self.assertEqual(root["status"], {"code": 2, "message": "RuntimeError: falhou"})
+        self.assertEqual(child["parentSpanId"], root["spanId"])
+        self.assertAlmostEqual(int(child["endTimeUnixNano"]) - int(child["startTimeUnixNano"]), 2_000_000, delta=1)
+        self.assertEqual(child["attributes"], [{"key": "audio.bytes", "value": {"intValue": "1024"}}])
+        self.assertEqual(exporter.get_stats()["exported"], 1)
+
+    def test_middleware_adds_server_timing_header(self):
+        """
+        Toda resposta HTTP deve trazer o header Server-Timing com as etapas da rota
+        """
+        app = FastAPI()
+        app.add_middleware(ServerTimingMiddleware)
+        traces = []
+
+        @app.get("/items/{item_id}")
+        async def item(item_id: int):
+            traces.append(get_current_span().trace)
+            with span("db.read"):
+                pass
+            return {"id": item_id}
+
+        response = TestClient(app).get("/items/7")
+        self.assertEqual(response.status_code, 200)
+        self.assertRegex(response.headers["Server-Timing"], r'^db\.read;dur=[\d.]+, total;dur=[\d.]+$')
+
+        trace = traces[0]
+        self.assertEqual(trace.root.name, "GET /items/{item_id}")
+        self.assertEqual(trace.root.attributes["http.response.status_code"], 200)
+        self.assertIn("response.send", [item.name for item in trace.spans])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,73 @@
+import os
+import sys
+import time
+import tempfile
+import unittest
+
+# Adicionar o diretório raiz do projeto ao path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.cache.tts_cache import TTSCache
+
+class TestTTSCache(unittest.TestCase):
+    """
+    Testes do cache de TTS em memória e disco
+    """
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_key_normalizes_text(self):
+        """
+        Espaços extras não devem gerar entradas diferentes; voz e velocidade sim
+        """
+        key = TTSCache.make_key("gtts", "pt-br-normal", 1.0, "pt-br", "Olá  mundo ")
+        self.assertEqual(key, TTSCache.make_key("gtts", "pt-br-normal", 1, "pt-br", "Olá mundo"))
+        self.assertNotEqual(key, TTSCache.make_key("gtts", "pt-br-slow", 1.0, "pt-br", "Olá mundo"))
+        self.assertNotEqual(key, TTSCache.make_key("gtts", "pt-br-normal", 1.2, "pt-br", "Olá mundo"))
+
+    def test_memory_lru_eviction(self):
+        """
+        O nível em memória deve respeitar o limite de bytes removendo o menos usado
+        """
+        cache = TTSCache(max_memory_bytes=10)
+        cache.put("a", b"12345")
+        cache.put("b", b"12345")
+        self.assertEqual(cache.get("a"), b"12345")
+        cache.put("c", b"12345")
+
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(cache.get("a"), b"12345")
+        stats = cache.get_stats()
+        self.assertEqual(stats["evictions"], 1)
+        self.assertEqual(stats["memory_bytes"], 10)
+
+    def test_disk_tier_survives_restart(self):
+        """
+        Entradas gravadas em disco devem ser lidas por uma nova instância
+        """
+        TTSCache(disk_dir=self.temp_dir.name).put("key", b"audio")
+
+        cache = TTSCache(disk_dir=self.temp_dir.name)
+        self.assertEqual(cache.lookup("key"), (b"audio", "disk"))
+        self.assertEqual(cache.lookup("key"), (b"audio", "memory"))
+        self.assertEqual(cache.lookup("missing"), (None, "miss"))
+
+    def test_ttl_expiration(self):
+        """
+        Entradas expiradas não devem ser devolvidas por nenhum dos níveis
+        """
+        cache = TTSCache(disk_dir=self.temp_dir.name, ttl_seconds=60)
+        cache.put("key", b"audio")
+        old = time.time() - 120
+        os.utime(cache._disk_path("key"), (old, old))
+        cache.clear()
+
+        self.assertIsNone(cache.get("key"))
+        self.assertEqual(cache.get_stats()["expirations"], 1)
+
+if __name__ == "__main__":
+    unittest.main()
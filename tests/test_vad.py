@@ -0,0 +1,75 @@
+import os
+import sys
+import unittest
+
+import numpy as np
+
+# Adicionar o diretório raiz do projeto ao path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.audio.pcm import float32_to_pcm16
+from app.audio.vad import StreamingVAD, VoiceActivityDetector
+
+SAMPLE_RATE = 16000
+
+def _tone(seconds, freq=220.0, amplitude=0.3):
+    t = np.arange(int(seconds * SAMPLE_RATE)) / SAMPLE_RATE
+    return (amplitude * np.sin(2 * np.pi * freq * t)).astype(np.float32)
+
+def _noise(seconds, amplitude=0.002, seed=0):
+    rng = np.random.default_rng(seed)
+    return (amplitude * rng.standard_normal(int(seconds * SAMPLE_RATE))).astype(np.float32)
+
+class TestVAD(unittest.TestCase):
+    """
+    Testes do detector de atividade de voz
+    """
+
+    def test_gate_removes_silence(self):
+        """
+        Ruído de fundo longo deve ser descartado, mantendo a fala com padding
+        """
+        detector = VoiceActivityDetector(SAMPLE_RATE, padding_ms=200, hangover_ms=300)
+        audio = np.concatenate([_noise(3.0), _tone(1.0) + _noise(1.0, seed=1), _noise(4.0, seed=2)])
+
+        result = detector.gate(audio)
+
+        self.assertEqual(len(result.regions), 1)
+        start, end = result.regions[0]
+        self.assertLessEqual(start, 3.0 * SAMPLE_RATE)
+        self.assertGreaterEqual(end, 4.0 * SAMPLE_RATE)
+        self.assertAlmostEqual(result.speech_seconds, 1.7, delta=0.1)
+        self.assertAlmostEqual(result.skipped_seconds, 6.3, delta=0.1)
+
+    def test_gate_of_pure_noise_is_empty(self):
+        """
+        Um áudio só de ruído não deve chegar à inferência
+        """
+        result = VoiceActivityDetector(SAMPLE_RATE).gate(_noise(2.0))
+        self.assertEqual(len(result.audio), 0)
+        self.assertEqual(result.regions, [])
+
+    def test_streaming_skips_silence_and_reports_end_of_speech(self):
+        """
+        Chunks de silêncio são retidos e o fim da fala é sinalizado após o hangover
+        """
+        vad = StreamingVAD(VoiceActivityDetector(SAMPLE_RATE), padding_ms=200, hangover_ms=300)
+        audio = np.concatenate([_noise(2.0), _tone(1.0), _noise(2.0, seed=1)])
+        pcm = float32_to_pcm16(audio)
+        chunk_size = SAMPLE_RATE // 10 * 2  # 100 ms
+
+        forwarded = b""
+        ended = []
+        for offset in range(0, len(pcm), chunk_size):
+            result = vad.process(pcm[offset:offset + chunk_size])
+            forwarded += result.audio
+            ended.append(result.speech_ended)
+
+        # Pré-roll + fala + hangover, sem o resto do silêncio
+        self.assertAlmostEqual(len(forwarded) / 2 / SAMPLE_RATE, 1.5, delta=0.15)
+        self.assertEqual(sum(ended), 1)
+        self.assertAlmostEqual(vad.skipped_seconds, 3.5, delta=0.15)
+        self.assertFalse(vad.in_speech)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,257 @@
+import os
+import sys
+import asyncio
+import threading
+import time
+import types
+import unittest
+
+# Adicionar o diretório raiz do projeto ao path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import numpy as np
+
+from app.config import settings
+from app.inference.executor import shutdown_executors
+from app.inference.local_agreement import LocalAgreement, TimedWord, join_words
+from app.server import prefork
+from app.services.stt.whisper_service import (
+    WhisperSTTService, _decode_batch_with_model, _transcribe_with_model, resolve_executor_kind
+)
+
+class ScriptedDecoder:
+    """
+    Simula o Whisper: uma palavra a cada 0,5s de áudio, sendo a última palavra
+    da janela sempre instável (difere entre decodificações)
+    """
+
+    def __init__(self):
+        self.session_samples = 0
+        self.calls = 0
+        self.max_window = 0.0
+
+    async def __call__(self, audio, prompt, language):
+        self.calls += 1
+        end = self.session_samples / 16000
+        start = end - len(audio) / 16000
+        self.max_window = max(self.max_window, len(audio) / 16000)
+
+        words = []
+        index = int(start / 0.5)
+        while (index + 1) * 0.5 <= end:
+            if index * 0.5 >= start:
+                words.append((index * 0.5 - start, index * 0.5 + 0.4 - start, f" w{index}"))
+            index += 1
+        if words:
+            first, last, _ = words[-1]
+            words[-1] = (first, last, f" instavel{self.calls}")
+        return words
+
+class TestWhisperStreaming(unittest.TestCase):
+    """
+    Testes da decodificação incremental do Whisper
+    """
+
+    def setUp(self):
+        # O áudio de teste é silêncio: o VAD o descartaria
+        self._vad_enabled = settings.vad_enabled
+        settings.vad_enabled = False
+
+    def tearDown(self):
+        settings.vad_enabled = self._vad_enabled
+
+    def test_local_agreement_commits_common_prefix(self):
+        """
+        Só o prefixo em que duas hipóteses consecutivas concordam deve ser confirmado
+        """
+        agreement = LocalAgreement()
+        first = [TimedWord(0.0, 0.4, " Olá"), TimedWord(0.5, 0.9, " mundo")]
+        second = [TimedWord(0.0, 0.4, " olá,"), TimedWord(0.5, 0.9, " mudo"), TimedWord(1.0, 1.4, " hoje")]
+
+        self.assertEqual(agreement.insert(first), [])
+        self.assertEqual(join_words(agreement.insert(second)), "olá,")
+        self.assertEqual(join_words(agreement.flush()), "mudo hoje")
+        self.assertEqual(agreement.committed_text(), "olá, mudo hoje")
+
+    def test_long_session_stays_bounded(self):
+        """
+        Em uma sessão longa, cada palavra é emitida uma única vez e a janela não cresce
+        """
+        decoder = ScriptedDecoder()
+        service = WhisperSTTService.__new__(WhisperSTTService)
+        service.sample_rate = 16000
+        service.active_sessions = 0
+        service._run_window = decoder
+
+        chunk = bytes(16000)  # 0,5s de PCM 16 bits
+        seconds = 300
+
+        async def scenario():
+            session = await service.start_stream()
+            emitted = []
+            for _ in range(seconds * 2):
+                decoder.session_samples += len(chunk) // 2
+                emitted.extend([text async for text in session.process_audio_stream(chunk)])
+            return emitted, await session.end_stream()
+
+        emitted, final = asyncio.run(scenario())
+        words = " ".join(emitted).split()
+
+        self.assertEqual(words, [f"w{i}" for i in range(len(words))])
+        self.assertGreater(len(words), seconds * 2 - 10)
+        self.assertLessEqual(decoder.max_window, settings.whisper_stream_trim_seconds + 2)
+        self.assertTrue(final.startswith(f"w{len(words)}"))
+        self.assertEqual(service.active_sessions, 0)
+
+class TestWhisperExecutorKind(unittest.TestCase):
+    """
+    Testes da escolha do executor do Whisper
+    """
+
+    def test_auto_uses_threads_under_prefork(self):
+        """
+        Em "auto", o pre-fork usa threads (modelo herdado do mestre) e o processo único usa processos
+        """
+        original = settings.whisper_executor_kind
+        try:
+            settings.whisper_executor_kind = "auto"
+            self.assertEqual(resolve_executor_kind(), "process")
+            prefork._preforking = True
+            self.assertEqual(resolve_executor_kind(), "thread")
+            settings.whisper_executor_kind = "process"
+            self.assertEqual(resolve_executor_kind(), "process")
+        finally:
+            prefork._preforking = False
+            settings.whisper_executor_kind = original
+
+    def test_thread_mode_serializes_inference_on_shared_model(self):
+        """
+        No modo thread, transcrições simultâneas não podem usar o modelo compartilhado ao mesmo tempo
+        """
+        class SharedModel:
+            device = types.SimpleNamespace(type="cpu")
+
+            def __init__(self):
+                self.lock = threading.Lock()
+                self.active = 0
+                self.max_active = 0
+
+            def transcribe(self, audio, **kwargs):
+                with self.lock:
+                    self.active += 1
+                    self.max_active = max(self.max_active, self.active)
+                time.sleep(0.05)
+                with self.lock:
+                    self.active -= 1
+                return {"text": f"{len(audio)}"}
+
+        model = SharedModel()
+        fake_whisper = types.ModuleType("whisper")
+        fake_whisper.load_model = lambda name: model
+        original_module = sys.modules.get("whisper")
+        original_kind = settings.whisper_executor_kind
+        original_workers = settings.inference_workers
+        sys.modules["whisper"] = fake_whisper
+        settings.whisper_executor_kind = "thread"
+        settings.inference_workers = 2
+        try:
+            service = WhisperSTTService("teste-concorrencia")
+
+            async def run():
+                return await asyncio.gather(
+                    service.transcribe_segment(np.zeros(1600, dtype=np.float32)),
+                    service.transcribe_segment(np.zeros(3200, dtype=np.float32))
+                )
+
+            texts = asyncio.run(run())
+        finally:
+            shutdown_executors()
+            settings.whisper_executor_kind = original_kind
+            settings.inference_workers = original_workers
+            if original_module is None:
+                sys.modules.pop("whisper", None)
+            else:
+                sys.modules["whisper"] = original_module
+
+        self.assertEqual(texts, ["1600", "3200"])
+        self.assertEqual(model.max_active, 1)
+
+class FakeTensor:
+    """Tensor mínimo: guarda os log-mel empilhados"""
+
+    def __init__(self, items):
+        self.items = items
+
+    def to(self, device):
+        return self
+
+class TestWhisperBatchDecode(unittest.TestCase):
+    """
+    Testes da decodificação em lote do Whisper
+    """
+
+    # Valor constante de cada clipe -> (texto, avg_logprob, no_speech_prob, compression_ratio) da passada gulosa
+    GREEDY = {
+        1: (" bom dia", -0.3, 0.01, 1.2),
+        2: (" sim sim sim sim sim sim", -0.4, 0.02, 6.0),  # repetição: compressão alta
+        3: (" ruído", -1.6, 0.9, 1.0),  # silêncio
+        4: (" palavra incerta", -1.4, 0.1, 1.1),  # log-probabilidade baixa
+    }
+    # O que model.transcribe (com fallback de temperatura) produz para cada clipe
+    TRANSCRIBED = {1: " bom dia", 2: " sim", 3: "", 4: " palavra certa"}
+
+    def setUp(self):
+        fake_torch = types.ModuleType("torch")
+        fake_torch.stack = lambda items: FakeTensor(items)
+        fake_whisper = types.ModuleType("whisper")
+        fake_whisper.audio = types.SimpleNamespace(N_SAMPLES=480000)
+        fake_whisper.pad_or_trim = lambda audio: audio
+        fake_whisper.log_mel_spectrogram = lambda audio, n_mels: int(audio[0])
+        fake_whisper.DecodingOptions = lambda **kwargs: kwargs
+
+        def decode(model, mels, options):
+            results = []
+            for key in mels.items:
+                text, avg_logprob, no_speech_prob, compression_ratio = self.GREEDY[key]
+                results.append(types.SimpleNamespace(text=text.strip(), avg_logprob=avg_logprob,
+                                                     no_speech_prob=no_speech_prob,
+                                                     compression_ratio=compression_ratio))
+            return results
+
+        fake_whisper.decode = decode
+        self._modules = {name: sys.modules.get(name) for name in ("torch", "whisper")}
+        sys.modules["torch"] = fake_torch
+        sys.modules["whisper"] = fake_whisper
+
+    def tearDown(self):
+        for name, module in self._modules.items():
+            if module is None:
+                sys.modules.pop(name, None)
+            else:
+                sys.modules[name] = module
+
+    def test_batched_output_matches_unbatched(self):
+        """
+        Silêncio, repetições e decodificações incertas do lote devem dar o mesmo texto do transcribe
+        """
+        transcribed = []
+
+        def transcribe(audio, **kwargs):
+            transcribed.append(int(audio[0]))
+            return {"text": self.TRANSCRIBED[int(audio[0])]}
+
+        model = types.SimpleNamespace(device=types.SimpleNamespace(type="cpu"),
+                                      dims=types.SimpleNamespace(n_mels=80), transcribe=transcribe)
+        audios = [np.full(16000, value, dtype=np.float32) for value in self.GREEDY]
+
+        unbatched = [_transcribe_with_model(model, audio, "pt") for audio in audios]
+        transcribed.clear()
+        batched = _decode_batch_with_model(model, audios, "pt")
+
+        self.assertEqual(batched, unbatched)
+        self.assertEqual(batched, ["bom dia", "sim", "", "palavra certa"])
+        # Só os resultados reprovados nos limiares voltam ao transcribe
+        self.assertEqual(transcribed, [2, 4])
+
+if __name__ == "__main__":
+    unittest.main()